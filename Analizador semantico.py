@@ -1,20 +1,46 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, Toplevel,  messagebox
-from lark import Lark, UnexpectedInput, Tree, Token, Visitor
+from tkinter import ttk, scrolledtext, Toplevel,  messagebox, filedialog
+from lark import Lark, UnexpectedInput, Tree, Token
+from lark.visitors import Interpreter
+from types import MappingProxyType
 import pickle
+from gramatica import cargar_parser
+from compilacion_incremental import CompilacionIncremental
+from trabajador_analisis import IndicadorProgreso, TrabajadorAnalisis
+from vista_tabla import VistaTablaVirtual
+from formato_tabla import escribir_tabla, registro_de_simbolo
+from diagnosticos import MAXIMO_POR_NODO, Diagnostico, IndiceDiagnosticos
+from perfilado import Perfilador, fase, reglas_de
+from registro import obtener_registro, esta_activo
+
+log_gramatica = obtener_registro("gramatica")
+log_ambitos = obtener_registro("ambitos")
+log_semantico = obtener_registro("semantico")
+log_arbol = obtener_registro("arbol")
 
 
 try:
-    with open("polux.txt", "r") as file:
-        grammar = file.read()
-    # Añade keep_all_tokens=True
-    parser = Lark(grammar, parser="lalr", propagate_positions=True, keep_all_tokens=True)
-    print("Gramática cargada correctamente (con keep_all_tokens).") # Mensaje modificado
+    # Añade keep_all_tokens=True (tablas LALR en caché)
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    log_gramatica.info("Gramática cargada correctamente (con keep_all_tokens).")
 except Exception as e:
-    print(f"Error al cargar la gramática: {e}")
+    log_gramatica.error("Error al cargar la gramática: %s", e)
     exit(1)
 
+# Colecciones compartidas para los símbolos que no las usan (solo lectura a propósito:
+# para llenarlas hay que asignar una colección propia, p. ej. symbol.parameters = [...])
+_SIN_ELEMENTOS = ()
+_SIN_MIEMBROS = MappingProxyType({})
+
+
 class SymbolEntry:
+    # __slots__ en lugar de __dict__: la mayoría de los símbolos son variables y no
+    # necesitan las colecciones de funciones y clases, que se crean solo al asignarlas
+    __slots__ = ("name", "kind", "sym_type", "scope", "line", "initialized", "references",
+                 "memory_size", "relative_address", "value", "is_constant", "is_mutable",
+                 "signature", "_parameters", "return_type", "local_symbol_table", "is_defined",
+                 "_internal_structure", "_associated_methods", "inheritance", "_restrictions")
+
     def __init__(self, name, kind, sym_type, scope, line, initialized=False, value=None, is_constant=False, is_mutable=True):
         # Campos Comunes
         self.name = name              # Nombre del identificador
@@ -34,16 +60,48 @@ class SymbolEntry:
 
         # Campos Específicos para Funciones/Procedimientos
         self.signature = None         # Firma (ej: "func(int, string): bool")
-        self.parameters = []          # Lista de SymbolEntry para parámetros
+        self._parameters = None       # Lista de SymbolEntry para parámetros (ver parameters)
         self.return_type = None       # Tipo de retorno (string o Type)
         self.local_symbol_table = None # Referencia a la tabla de símbolos local (Scope)
         self.is_defined = False       # Estado de implementación (declarada vs definida)
 
         # Campos para Tipos Definidos por el Usuario (Clases/Structs)
-        self.internal_structure = {} # Descripción de componentes (atributos)
-        self.associated_methods = {} # Métodos asociados
+        self._internal_structure = None # Descripción de componentes (atributos)
+        self._associated_methods = None # Métodos asociados
         self.inheritance = None       # Jerarquía de herencia
-        self.restrictions = []        # Restricciones específicas
+        self._restrictions = None     # Restricciones específicas
+
+    @property
+    def parameters(self):
+        return self._parameters if self._parameters is not None else _SIN_ELEMENTOS
+
+    @parameters.setter
+    def parameters(self, value):
+        self._parameters = value
+
+    @property
+    def internal_structure(self):
+        return self._internal_structure if self._internal_structure is not None else _SIN_MIEMBROS
+
+    @internal_structure.setter
+    def internal_structure(self, value):
+        self._internal_structure = value
+
+    @property
+    def associated_methods(self):
+        return self._associated_methods if self._associated_methods is not None else _SIN_MIEMBROS
+
+    @associated_methods.setter
+    def associated_methods(self, value):
+        self._associated_methods = value
+
+    @property
+    def restrictions(self):
+        return self._restrictions if self._restrictions is not None else _SIN_ELEMENTOS
+
+    @restrictions.setter
+    def restrictions(self, value):
+        self._restrictions = value
 
     def __str__(self):
         # Representación básica para la tabla
@@ -52,12 +110,23 @@ class SymbolEntry:
                 f"Value: {self.value if self.value is not None else 'N/A'}, Const: {self.is_constant}")
 
 class Scope:
+    __slots__ = ("name", "level", "parent", "symbols", "_children_scopes")
+
     def __init__(self, name, level, parent=None):
         self.name = name              # Nombre del ámbito (e.g., "global", "func_main", "class_MyClass")
         self.level = level            # Nivel de anidamiento
         self.parent = parent          # Ámbito padre (None para global)
         self.symbols = {}             # Diccionario de símbolos en este ámbito {name: SymbolEntry}
-        self.children_scopes = []     # Ámbitos hijos
+        self._children_scopes = None  # Ámbitos hijos; la lista se crea con el primero
+
+    @property
+    def children_scopes(self):
+        return self._children_scopes if self._children_scopes is not None else _SIN_ELEMENTOS
+
+    def add_child_scope(self, scope):
+        if self._children_scopes is None:
+            self._children_scopes = []
+        self._children_scopes.append(scope)
 
     def add_symbol(self, symbol_entry):
         """Agrega un símbolo a este ámbito, verificando duplicados."""
@@ -70,10 +139,13 @@ class Scope:
 
     def lookup(self, name, check_parents=True):
         """Busca un símbolo por nombre en este ámbito y opcionalmente en los padres."""
-        if name in self.symbols:
-            return self.symbols[name]
-        if check_parents and self.parent:
-            return self.parent.lookup(name, check_parents=True)
+        scope = self
+        while scope is not None: # Iterativo: sin límite de recursión en anidamientos profundos
+            if name in scope.symbols:
+                return scope.symbols[name]
+            if not check_parents:
+                break
+            scope = scope.parent
         return None # No encontrado
 
     def __str__(self):
@@ -85,6 +157,10 @@ class SymbolTableManager:
         self.current_scope = self.global_scope
         self.scopes = {"global": self.global_scope} # Para buscar ámbitos por nombre si es necesario
         self._scope_counter = 0 # Para nombres de ámbitos anónimos
+        # Índice de resolución: {nombre: [SymbolEntry, ...]} con los enlaces visibles desde el
+        # ámbito actual, el más interno al final. Se mantiene en add_symbol/pop_scope, así que
+        # lookup es O(1) sin recorrer la cadena de padres. El árbol de Scope no cambia.
+        self._bindings = {}
 
     def push_scope(self, name=None):
         """Entra en un nuevo ámbito."""
@@ -94,33 +170,42 @@ class SymbolTableManager:
         elif name in self.scopes: # Evitar nombres de ámbito duplicados al mismo nivel si son nombrados (funciones, clases)
              # Podría ser un error o necesitar un manejo más complejo si se permiten sobrecargas/sombras de funciones
              # Por ahora, simplemente añadimos un sufijo para diferenciar, pero lo ideal sería validar esto.
-             print(f"Advertencia: Ámbito con nombre '{name}' ya existe. Creando uno nuevo.")
+             log_ambitos.debug("Ámbito con nombre '%s' ya existe. Creando uno nuevo.", name)
              name = f"{name}_{self._scope_counter}"
              self._scope_counter += 1
 
 
         new_scope = Scope(name, self.current_scope.level + 1, parent=self.current_scope)
-        self.current_scope.children_scopes.append(new_scope)
+        self.current_scope.add_child_scope(new_scope)
         self.current_scope = new_scope
         self.scopes[name] = new_scope
-        print(f"Entering Scope: {self.current_scope.name} (Level: {self.current_scope.level})") # Debug
+        log_ambitos.debug("Entering Scope: %s (Level: %s)", new_scope.name, new_scope.level)
         return self.current_scope
 
     def pop_scope(self):
         """Sale del ámbito actual."""
         if self.current_scope.parent:
-            print(f"Exiting Scope: {self.current_scope.name}") # Debug
+            log_ambitos.debug("Exiting Scope: %s", self.current_scope.name)
+            for name in self.current_scope.symbols:
+                bindings = self._bindings[name]
+                bindings.pop()
+                if not bindings:
+                    del self._bindings[name]
             self.current_scope = self.current_scope.parent
         else:
-            print("Warning: Attempting to pop the global scope.") # No debería ocurrir
+            log_ambitos.warning("Attempting to pop the global scope.") # No debería ocurrir
 
     def add_symbol(self, symbol_entry):
         """Agrega un símbolo al ámbito actual."""
-        return self.current_scope.add_symbol(symbol_entry)
+        success, error_msg = self.current_scope.add_symbol(symbol_entry)
+        if success:
+            self._bindings.setdefault(symbol_entry.name, []).append(symbol_entry)
+        return success, error_msg
 
     def lookup(self, name):
         """Busca un símbolo empezando desde el ámbito actual hacia arriba."""
-        return self.current_scope.lookup(name, check_parents=True)
+        bindings = self._bindings.get(name)
+        return bindings[-1] if bindings else None
 
     def get_all_symbols(self):
         """Recorre todos los ámbitos y recopila todos los símbolos."""
@@ -137,58 +222,95 @@ class SymbolTableManager:
             scopes_to_visit.extend(scope.children_scopes)
         return all_symbols
 
+    def export_symbols(self, ruta):
+        """Exporta get_all_symbols() a un archivo .plxs (ver formato_tabla.py)."""
+        return escribir_tabla(ruta, (registro_de_simbolo(s) for s in self.get_all_symbols()))
+
     def reset(self):
         """Reinicia la tabla de símbolos para un nuevo análisis."""
         self.global_scope = Scope("global", 0)
         self.current_scope = self.global_scope
         self.scopes = {"global": self.global_scope}
         self._scope_counter = 0
+        self._bindings = {}
 
 # (Añadir esta clase en Analizador sintactico.py)
-from lark import Visitor, Token, Tree
+from lark import Token, Tree
 
-class SemanticAnalyzer(Visitor):
+# Recorrido de arriba hacia abajo (Interpreter): cada manejador decide cuándo visitar
+# a sus hijos y los visita una sola vez. Los manejadores de expresiones devuelven el
+# tipo inferido, así que el padre no vuelve a recorrer el subárbol para calcularlo.
+# Los nodos sin manejador visitan a sus hijos en orden de aparición.
+class SemanticAnalyzer(Interpreter):
     def __init__(self):
         self.symbol_table = SymbolTableManager()
-        self.errors = []
+        self.errors = [] # Diagnostico (diagnosticos.py) en el orden del recorrido
         self.current_function = None # Para verificar retornos
+        self._claves_errores = set() # Diagnosticos ya reportados en este recorrido; ver add_error
+        self._errores_por_nodo = {} # {id(nodo): diagnósticos reportados sobre él}
+        self._depurar = False # Se consulta una vez por análisis; ver start_analysis
 
     def start_analysis(self, tree):
         """Punto de entrada para iniciar el análisis semántico completo."""
-        print("DEBUG (SemanticAnalyzer): Starting analysis - RESETTING TABLE.")
+        self.prepare_analysis()
+        self.analyze_tree(tree)
+
+    def prepare_analysis(self):
+        """Deja la tabla de símbolos y la lista de errores vacías para un análisis nuevo."""
+        log_semantico.debug("Starting analysis - RESETTING TABLE.")
         self.symbol_table.reset()
-        self.errors = [] # Inicializa la lista de errores
+        self.prepare_reanalysis()
         self.current_function = None
+
+    def prepare_reanalysis(self):
+        """
+        Deja la lista de errores vacía sin tocar la tabla de símbolos, para volver a analizar
+        parte del árbol con analyze_tree (compilacion_incremental.py).
+        """
+        # Con la depuración apagada los manejadores no formatean ningún mensaje
+        self._depurar = esta_activo(log_semantico)
+        self.errors = []
+
+    def analyze_tree(self, tree):
+        """
+        Visita 'tree' sobre el estado actual de la tabla de símbolos, sin reiniciarla.
+        start_analysis lo usa con el programa completo; compilacion_incremental.py, con
+        una sentencia de nivel superior cada vez.
+        """
+        # Repetidos y tope por nodo se cuentan por recorrido (cada fragmento en modo incremental)
+        self._claves_errores = set()
+        self._errores_por_nodo = {}
         try:
-            # Iniciar el recorrido estándar de Lark Visitor.
+            # Recorrido único de arriba hacia abajo, en orden de aparición.
             # No necesitamos capturar el valor de retorno de self.visit().
             self.visit(tree)
-            print("DEBUG (start_analysis): self.visit(tree) completed.") # Debug
+            log_semantico.debug("self.visit(tree) completed.")
         except Exception as e:
-            print(f"ERROR durante la visita del árbol: {e}")
-            import traceback
-            traceback.print_exc()
+            log_semantico.exception("ERROR durante la visita del árbol: %s", e)
             # Añadir error a la lista interna
             error_node = tree if isinstance(tree, (Tree, Token)) else None
             if error_node:
-                 self.add_error(f"Error interno del analizador: {e}", error_node)
+                 self.add_error(f"Error interno del analizador: {e}", error_node, "S001")
             else:
                  # Añadir error general si no hay nodo
-                 self.errors.append(f"Error Semántico (General): Error interno del analizador: {e}")
+                 self.errors.append(Diagnostico("S001", f"Error interno del analizador: {e}"))
     
-    def add_error(self, message, node):
-        """Añade un error semántico con información de línea."""
-        line = 'N/A'
-        column = 'N/A'
-        # Intentar obtener línea/columna del nodo o token
-        if hasattr(node, 'meta'): # Para Trees con propagate_positions=True
-             line = node.meta.line if hasattr(node.meta, 'line') else 'N/A'
-             column = node.meta.column if hasattr(node.meta, 'column') else 'N/A'
-        elif isinstance(node, Token): # Para Tokens (aunque vimos que pueden no tener meta)
-             line = node.line if hasattr(node, 'line') else 'N/A'
-             column = node.column if hasattr(node, 'column') else 'N/A'
-
-        self.errors.append(f"Error Semántico (Línea {line}, Col {column}): {message}")
+    def add_error(self, message, node, codigo):
+        """
+        Añade un error semántico con la posición y el span del nodo (o token) y su código
+        de diagnosticos.CODIGOS. Los repetidos se descartan y cada nodo admite como mucho
+        MAXIMO_POR_NODO, para que un archivo roto no inunde la lista.
+        """
+        reportados = self._errores_por_nodo.get(id(node), 0)
+        if reportados >= MAXIMO_POR_NODO:
+            return
+        diagnostico = Diagnostico.en_nodo(codigo, message, node)
+        clave = diagnostico.clave()
+        if clave in self._claves_errores:
+            return
+        self._claves_errores.add(clave)
+        self._errores_por_nodo[id(node)] = reportados + 1
+        self.errors.append(diagnostico)
 
     
     def _get_node_text(self, node):
@@ -197,148 +319,68 @@ class SemanticAnalyzer(Visitor):
         if isinstance(node, Token):
             return node.value
         elif isinstance(node, Tree):
+            if node.data == 'variable' and len(node.children) == 1:
+                # Uso de una variable: el texto es el nombre del identificador que contiene
+                return self._get_node_text(node.children[0])
             if node.children and isinstance(node.children[0], Token):
+                # Literales de cadena y carácter son un único token con comillas y escapes
                 # Intenta obtener el valor del primer token si es simple
                  return node.children[0].value
             # Fallback genérico si no se puede obtener texto simple
             return f"<{node.data}>"
         return str(node)
 
-    def _get_expression_type(self, node):
-        """Intenta determinar el tipo de una expresión. Muy simplificado."""
-        if isinstance(node, Token):
-            # ... (tus casos existentes para Tokens: INTEGER, STRING_LITERAL, TRUE/FALSE, IDENTIFIER) ...
-            # Asegúrate de que estos casos funcionan bien. Ej:
-            if node.type == 'INTEGER' or node.type == 'DIGIT': return 'int'
-            if node.type == 'STRING_LITERAL': return 'string' # Debería funcionar para el token directo
-            if node.type == 'TRUE' or node.type == 'FALSE' or node.type == 'BOOLEANO': return 'bool'
-            if node.type == 'IDENTIFIER':
-                symbol = self.symbol_table.lookup(node.value)
-                if symbol:
-                    return symbol.sym_type
-                else:
-                    self.add_error(f"Identificador '{node.value}' no declarado.", node)
-                    return 'error_type'
-            # Añade más tipos de tokens si es necesario
+    def _arithmetic_result(self, op, left_type, right_type):
+        """Tipo resultante de 'left op right' y, si la operación es inválida, el mensaje de error."""
+        # No reportar errores adicionales si ya hay errores en los operandos
+        if left_type == 'error_type' or right_type == 'error_type':
+            return 'error_type', None
+        # Tipos que no se pueden inferir (p. ej. parámetros) no generan errores en cascada
+        if left_type == 'desconocido' or right_type == 'desconocido':
+            return 'desconocido', None
+
+        # Tipos válidos para operaciones aritméticas
+        numeric_types = ['int', 'float']
+
+        # Arreglos numéricos: la operación se aplica elemento a elemento (vectores.py),
+        # entre dos arreglos o entre un arreglo y un escalar
+        if left_type.startswith('array<') or right_type.startswith('array<'):
+            left_element = left_type[6:-1] if left_type.startswith('array<') else left_type
+            right_element = right_type[6:-1] if right_type.startswith('array<') else right_type
+            if 'desconocido' in (left_element, right_element):
+                return 'desconocido', None
+            if left_element not in numeric_types or right_element not in numeric_types:
+                return 'error_type', f"Operador '{op}' entre arreglos requiere elementos numéricos, no '{left_type}' y '{right_type}'"
+            return f"array<{'float' if 'float' in [left_element, right_element] else 'int'}>", None
+
+        # Manejar operador + para strings (concatenación)
+        if op == '+':
+            if left_type == 'string' and right_type == 'string':
+                return 'string', None  # Concatenación válida
+            if {left_type, right_type} == {'string', 'int'}:
+                return 'error_type', "No se puede concatenar string con int directamente"
+            if left_type not in numeric_types or right_type not in numeric_types:
+                return 'error_type', f"No se puede sumar {left_type} con {right_type}"
+
+        # Para otros operadores (-, *, /, %, ^)
+        elif left_type not in numeric_types or right_type not in numeric_types:
+            return 'error_type', f"Operador '{op}' requiere operandos numéricos, no '{left_type}' y '{right_type}'"
+
+        # Permitir operaciones entre int y float (conversión implícita)
+        return ('float' if 'float' in [left_type, right_type] else 'int'), None
+
+    def _unary_result(self, op, operand_type):
+        """Tipo resultante de 'op operando' y, si la operación es inválida, el mensaje de error."""
+        if operand_type in ('error_type', 'desconocido'):
+            return operand_type, None
+        if op == 'NOT':
+            if operand_type != 'bool':
+                return 'error_type', f"Operador lógico 'NOT' requiere un operando booleano, pero se encontró '{operand_type}'."
+            return 'bool', None
+        if operand_type not in ('int', 'float'):
+            return 'error_type', f"Operador '{op}' requiere un operando numérico, no '{operand_type}'"
+        return operand_type, None
 
-        elif isinstance(node, Tree):
-            if node.data == 'expression' and len(node.children) == 1:
-                return self._get_expression_type(node.children[0])
-                
-            elif node.data == 'arithmetic_expression':
-                left_type = self._get_expression_type(node.children[0])
-                right_type = self._get_expression_type(node.children[2])
-                
-                if 'error_type' in [left_type, right_type]:
-                    return 'error_type'
-                
-                # Obtener operador de forma segura
-                op_node = node.children[1]
-                op = self._get_operator_text(op_node)
-                
-                if op == '+':
-                    if left_type == 'string' and right_type == 'string':
-                        return 'string'
-                    elif left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                        return 'float' if 'float' in [left_type, right_type] else 'int'
-                    else:
-                        self.add_error(f"No se puede sumar {left_type} con {right_type}", op_node)
-                        return 'error_type'
-                        
-                elif op in ['-', '*', '/', '%']:
-                    if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                        return 'float' if 'float' in [left_type, right_type] else 'int'
-                    else:
-                        self.add_error(f"Operador '{op}' no válido para {left_type} y {right_type}", op_node)
-                        return 'error_type'
-                
-                return 'error_type ' #error_type' si es un error seguro
-
-            # --- AÑADIR CASO PARA 'array_literal' ---
-            elif node.data == 'array_literal':
-                if node.children:
-                    # Intentar determinar el tipo basado en el primer elemento
-                    first_expr_node = None
-                    for child in node.children:
-                        # Saltar comas si son tokens (ajusta si son nodos)
-                        if isinstance(child, Tree) and child.data == 'expression':
-                            first_expr_node = child
-                            break # Encontró la primera expresión
-
-                    if first_expr_node:
-                        element_type = self._get_expression_type(first_expr_node)
-                        # Aquí podrías añadir un bucle para verificar que todos los elementos son compatibles
-                        # Por ahora, solo usamos el tipo del primero
-                        if element_type != 'error_type':
-                            return f"array<{element_type}>" # Devuelve tipo array
-                        else:
-                            return 'error_type' # Error en elemento
-                    else:
-                        return "array<empty>" # El nodo array_literal no contiene expresiones
-                else:
-                    return "array<empty>" 
-
-            elif node.data == 'assignment_expression':
-                 # El tipo de una asignación suele ser el tipo del lado izquierdo,
-                 # pero la validación ocurre en visit_assignment_expression
-                 return self._get_expression_type(node.children[0])
-
-            elif node.data == 'grouped_expression':
-                 return self._get_expression_type(node.children[0]) # Tipo de la expresión interna
-
-            elif node.data == 'identifier': # Si 'identifier' es un nodo Tree en tu gramática
-                 return self._get_expression_type(node.children[0])
-
-            elif node.data == 'integer': return 'int'
-            elif node.data == 'string_literal': return 'string'
-            elif node.data == 'booleano': return 'bool'
-            # ... añadir más casos para otros tipos de nodos de expresión ...
-            elif node.data == 'method_call':
-                 # Buscar la función y devolver su tipo de retorno declarado
-                 func_name = self._get_node_text(node.children[0]) # Asumiendo estructura simple
-                 symbol = self.symbol_table.lookup(func_name)
-                 if symbol and symbol.kind == 'funcion':
-                      return symbol.return_type if symbol.return_type else 'void' # O tipo específico si no retorna nada
-                 elif symbol:
-                      self.add_error(f"'{func_name}' no es una función.", node)
-                 # else: el error de no declarado ya se dio al buscar func_name
-                 return 'error_type'
-            elif node.data == 'array_literal':
-                # Determinar tipo del array (podría ser complejo si son mixtos)
-                # Asumimos homogéneo por ahora, basado en el primer elemento
-                if len(node.children) > 0:
-                    element_type = self._get_expression_type(node.children[0])
-                    # Verificar que todos los elementos sean del mismo tipo (o compatibles)
-                    # ... (lógica de verificación omitida por brevedad) ...
-                    return f"array<{element_type}>"
-                else:
-                    return "array<empty>" # O un tipo genérico
-                
-            elif node.data == 'arithmetic_expression':
-                left_type = self._get_expression_type(node.children[0])
-                right_type = self._get_expression_type(node.children[2])
-                
-                # Si hay errores en los operandos, propagar el error
-                if left_type == 'error_type' or right_type == 'error_type':
-                    return 'error_type'
-                
-                # Manejar operador +
-                if node.children[1].data == 'arithmetic_operator' and '+':
-                    if left_type == 'string' and right_type == 'string':
-                        return 'string'
-                    elif left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                        return 'float' if 'float' in [left_type, right_type] else 'int'
-                
-                # Manejar otros operadores
-                if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                    return 'float' if 'float' in [left_type, right_type] else 'int'
-                
-                return 'error_type'
-        
-        # Si no se puede determinar o es un nodo no esperado en una expresión
-        # self.add_error(f"No se puede determinar el tipo para el nodo {node.data if isinstance(node, Tree) else node}.", node)
-        return 'desconocido' # O 'error_type' si es claramente un problema
-    
     
     def _get_safe_value(self, node, expected_type=None):
         """Helper para obtener el valor de un Token o el primer Token de un Tree."""
@@ -372,7 +414,7 @@ class SemanticAnalyzer(Visitor):
         if isinstance(nodo_valor, Token): # Es un Token?
             if nodo_valor.type == 'NUMBER':
                 return 'numero' 
-            elif nodo_valor.type == 'STRING':
+            elif nodo_valor.type == 'STRING_LITERAL':
                 return 'texto'
             # Añade más tipos básicos aquí
             else:
@@ -401,12 +443,14 @@ class SemanticAnalyzer(Visitor):
     # Dentro de la clase SemanticAnalyzer, método variable_declaration
 
     def variable_declaration(self, node):
-        print("\nDEBUG: Entrando a variable_declaration (MODIFICADO)")
-        print(f"DEBUG: Nodo recibido: Tree(data='{node.data}') con {len(node.children)} hijos: {node.children}")
+        depurar = self._depurar
+        if depurar: log_semantico.debug("Entrando a variable_declaration (MODIFICADO)")
+        # Solo el tipo de cada hijo: repr(node.children) volvería a recorrer todo el subárbol
+        if depurar: log_semantico.debug(f"Nodo recibido: Tree(data='{node.data}') con {len(node.children)} hijos: {[c.data if isinstance(c, Tree) else c.type for c in node.children]}")
 
         # --- Verificar número mínimo de hijos ---
         if len(node.children) < 2:
-            self.add_error("Estructura inesperada para variable_declaration (faltan tipo y/o identificador).", node)
+            self.add_error("Estructura inesperada para variable_declaration (faltan tipo y/o identificador).", node, "S002")
             return
 
         type_node = node.children[0]
@@ -421,18 +465,18 @@ class SemanticAnalyzer(Visitor):
             if isinstance(node.children[2], Token) and node.children[2].type == 'EQUAL': # Asume que el token se llama 'EQUAL'
                 assignment_operator_node = node.children[2]
                 expression_node = node.children[3] # La expresión está en el índice 3
-                print(f"  DEBUG: Asignación encontrada. Operador: {assignment_operator_node}, Nodo Expresión: {expression_node.data if isinstance(expression_node, Tree) else expression_node}")
+                if depurar: log_semantico.debug(f"Asignación encontrada. Operador: {assignment_operator_node}, Nodo Expresión: {expression_node.data if isinstance(expression_node, Tree) else expression_node}")
             else:
                 # Esto sería raro si la gramática siempre pone '=' antes de la expresión
-                 print(f"  WARN: Se esperaban 4 hijos con '=' en índice 2, pero se encontró {node.children[2]}.")
+                 log_semantico.info(f"Se esperaban 4 hijos con '=' en índice 2, pero se encontró {node.children[2]}.")
                  # Podrías intentar tomar el hijo 3 como expresión de todas formas, o dar error
                  # expression_node = node.children[3] # Intento riesgoso
         elif len(node.children) == 2:
             # Solo tipo e identificador, sin inicialización
-            print("  DEBUG: Variable declarada sin inicialización.")
+            if depurar: log_semantico.debug("Variable declarada sin inicialización.")
         else:
             # Caso inesperado (ej. 3 hijos sin que el 3ro sea una expresión válida?)
-             print(f"  WARN: Número inesperado de hijos ({len(node.children)}) para variable_declaration.")
+             log_semantico.info(f"Número inesperado de hijos ({len(node.children)}) para variable_declaration.")
 
 
         # --- 1. Extraer Nombre del Identificador (Debería estar OK) ---
@@ -443,12 +487,14 @@ class SemanticAnalyzer(Visitor):
             if identifier_node.children and isinstance(identifier_node.children[0], Token):
                  identifier_token_for_meta = identifier_node.children[0]
                  variable_name = identifier_token_for_meta.value
-                 print(f"  DEBUG: Nombre de variable extraído: '{variable_name}'")
-            else: print(f"  WARN: Nodo 'identifier' no tiene un Token como primer hijo.")
-        else: print(f"  WARN: Segundo hijo no es un Tree 'identifier'.")
+                 if depurar: log_semantico.debug(f"Nombre de variable extraído: '{variable_name}'")
+            else:
+                log_semantico.info(f"Nodo 'identifier' no tiene un Token como primer hijo.")
+        else:
+            log_semantico.info(f"Segundo hijo no es un Tree 'identifier'.")
 
         if not variable_name:
-             self.add_error("No se pudo extraer el nombre de la variable.", identifier_node if identifier_node else node)
+             self.add_error("No se pudo extraer el nombre de la variable.", identifier_node if identifier_node else node, "S002")
              # return
 
         # --- 2. Extraer Tipo Declarado Explícitamente (CORREGIDO) ---
@@ -466,21 +512,21 @@ class SemanticAnalyzer(Visitor):
                       type_token = type_content_node.children[0]
                       # Usa el VALOR del token ('int', 'float', etc.)
                       declared_type = type_token.value.lower()
-                      print(f"  DEBUG: Tipo declarado extraído de Token dentro de primitive_type: '{declared_type}' (Token: {type_token})")
+                      if depurar: log_semantico.debug(f"Tipo declarado extraído de Token dentro de primitive_type: '{declared_type}' (Token: {type_token})")
                  else:
-                      print(f"  WARN: primitive_type no contenía un Token como primer hijo. Hijos: {type_content_node.children}")
+                      log_semantico.info(f"primitive_type no contenía un Token como primer hijo. Hijos: {type_content_node.children}")
             # Añadir 'elif' para 'composite_type' si lo manejas
             # elif isinstance(type_content_node, Tree) and type_content_node.data == 'composite_type':
             #      # Lógica para extraer tipos compuestos (string, array, etc.)
             #      pass
             else:
-                 print(f"  WARN: El hijo de 'type' no fue 'primitive_type'. Fue: {type_content_node}")
+                 log_semantico.info(f"El hijo de 'type' no fue 'primitive_type'. Fue: {type_content_node}")
         else:
-            print(f"  WARN: Primer hijo de variable_declaration no es un Tree 'type'.")
+            log_semantico.info(f"Primer hijo de variable_declaration no es un Tree 'type'.")
 
         # Ya no necesitamos la línea redundante con _get_node_text aquí
 
-        print(f"DEBUG: Tipo declarado final extraído: '{declared_type}'") # Verifica el resultado final
+        if depurar: log_semantico.debug(f"Tipo declarado final extraído: '{declared_type}'") # Verifica el resultado final
 
         # --- 3. Procesar Inicialización y Verificar Tipos (Usa expression_node corregido) ---
         is_initialized = False
@@ -488,16 +534,16 @@ class SemanticAnalyzer(Visitor):
         expression_type = None # Inicializar a None
 
         if expression_node: # Solo si se encontró un nodo de expresión (en índice 3)
-            print(f"DEBUG: Procesando nodo de inicialización: {expression_node.data if isinstance(expression_node, Tree) else expression_node}")
-            expression_type = self._get_expression_type(expression_node)
+            if depurar: log_semantico.debug(f"Procesando nodo de inicialización: {expression_node.data if isinstance(expression_node, Tree) else expression_node}")
+            expression_type = self.visit(expression_node)
             initial_value_text = self._get_node_text(expression_node)
             is_initialized = True
 
-            print(f"DEBUG: Tipo de expresión determinado: '{expression_type}'")
-            print(f"DEBUG: Texto de expresión determinado: '{initial_value_text}'")
+            if depurar: log_semantico.debug(f"Tipo de expresión determinado: '{expression_type}'")
+            if depurar: log_semantico.debug(f"Texto de expresión determinado: '{initial_value_text}'")
 
             # *** ¡LA COMPARACIÓN CLAVE! ***
-            print(f"DEBUG: Comparando: Declarado='{declared_type}', Expresión='{expression_type}'")
+            if depurar: log_semantico.debug(f"Comparando: Declarado='{declared_type}', Expresión='{expression_type}'")
 
             # Ahora la comparación SÍ debería funcionar si los tipos son correctos
             if expression_type not in ['error_type', 'desconocido', None] and declared_type != 'desconocido' and expression_type != declared_type:
@@ -511,10 +557,10 @@ class SemanticAnalyzer(Visitor):
                 if not is_compatible:
                     # ¡Este es el error que buscamos!
                     self.add_error(f"Tipo incompatible en inicialización. No se puede asignar tipo '{expression_type}' a la variable '{variable_name}' declarada como '{declared_type}'.",
-                                   expression_node) # Reportar error en la expresión
+                                   expression_node, "S201") # Reportar error en la expresión
 
         else:
-            print(f"DEBUG: No se encontró inicialización válida.")
+            if depurar: log_semantico.debug(f"No se encontró inicialización válida.")
 
         # --- 4. Añadir Símbolo a la Tabla (Debería estar OK) ---
         line = 'N/A'
@@ -523,7 +569,7 @@ class SemanticAnalyzer(Visitor):
         elif hasattr(node, 'meta') and hasattr(node.meta, 'line'):
             line = node.meta.line
 
-        print(f"DEBUG: Creando SymbolEntry: Nombre='{variable_name}', Tipo='{declared_type}', Línea='{line}', Scope='{self.symbol_table.current_scope.name}', Init={is_initialized}")
+        if depurar: log_semantico.debug(f"Creando SymbolEntry: Nombre='{variable_name}', Tipo='{declared_type}', Línea='{line}', Scope='{self.symbol_table.current_scope.name}', Init={is_initialized}")
 
         if variable_name is not None:
             symbol_entry = SymbolEntry(name=variable_name, kind='variable', sym_type=declared_type,
@@ -532,15 +578,16 @@ class SemanticAnalyzer(Visitor):
 
             success, error_msg = self.symbol_table.add_symbol(symbol_entry)
             if not success:
-                self.add_error(error_msg, identifier_token_for_meta if identifier_token_for_meta else node)
+                self.add_error(error_msg, identifier_token_for_meta if identifier_token_for_meta else node, "S101")
         else:
-            print(f"ERROR: No se pudo añadir símbolo porque el nombre es None.")
+            log_semantico.error("No se pudo añadir símbolo porque el nombre es None.")
 
     def constant_declaration(self, node):
         """Procesa la declaración de constantes."""
-        print("\nDEBUG: Entrando a constant_declaration")
+        depurar = self._depurar
+        if depurar: log_semantico.debug("Entrando a constant_declaration")
         if not isinstance(node, Tree): # Verificación básica
-             self.add_error("Error interno: Se esperaba Tree para constant_declaration.", node)
+             self.add_error("Error interno: Se esperaba Tree para constant_declaration.", node, "S001")
              return
 
         const_name = None
@@ -550,7 +597,7 @@ class SemanticAnalyzer(Visitor):
         # --- Obtener Identificador (Asumiendo posible estructura anidada como en var) ---
         for i, child in enumerate(node.children):
              if isinstance(child, Tree) and child.data == 'identifier':
-                  print(f"DEBUG (const): Identificador en Tree 'identifier'. Reconstruyendo...")
+                  if depurar: log_semantico.debug(f"(const) Identificador en Tree 'identifier'. Reconstruyendo...")
                   identifier_node_index = i
                   reconstructed_name = ""
                   first_token_found = None
@@ -561,29 +608,30 @@ class SemanticAnalyzer(Visitor):
                   if first_token_found:
                        identifier_node_or_first_token = first_token_found
                        const_name = reconstructed_name
-                       print(f"DEBUG (const): Nombre reconstruido: '{const_name}'")
+                       if depurar: log_semantico.debug(f"(const) Nombre reconstruido: '{const_name}'")
                        break
-                  else: print(f"WARN (const): Tree 'identifier' vacío.")
+                  else:
+                      log_semantico.info(f"(const) Tree 'identifier' vacío.")
 
              elif isinstance(child, Token) and child.type == 'IDENTIFIER': # Si fuera directo
                   identifier_node_or_first_token = child
                   const_name = child.value
                   identifier_node_index = i
-                  print(f"DEBUG (const): Identificador como Token directo: '{const_name}'")
+                  if depurar: log_semantico.debug(f"(const) Identificador como Token directo: '{const_name}'")
                   break
 
         if const_name is None:
             error_line = node.meta.line if hasattr(node, 'meta') and hasattr(node.meta, 'line') else 'N/A'
-            self.add_error(f"Error interno (Línea ~{error_line}): No se pudo encontrar/reconstruir el nombre de la constante.", node)
+            self.add_error(f"Error interno (Línea ~{error_line}): No se pudo encontrar/reconstruir el nombre de la constante.", node, "S001")
             return
 
         # --- Obtener Línea (del nodo padre 'constant_declaration') ---
         line = 'N/A'
         if hasattr(node, 'meta') and hasattr(node.meta, 'line'):
             line = node.meta.line
-            print(f"DEBUG (const): Línea obtenida del nodo 'constant_declaration': {line}")
+            if depurar: log_semantico.debug(f"(const) Línea obtenida del nodo 'constant_declaration': {line}")
         else:
-             print(f"WARN (const): No se pudo obtener línea desde node.meta para '{const_name}'.")
+             log_semantico.info(f"(const) No se pudo obtener línea desde node.meta para '{const_name}'.")
 
         # --- Procesar Expresión ---
         expression_node = None
@@ -591,55 +639,65 @@ class SemanticAnalyzer(Visitor):
         # Asumiendo cte ID = expr (índice + 2) o cte identifier = expr (índice + 2)
         if identifier_node_index != -1 and identifier_node_index + 2 < len(node.children):
              possible_expr_node = node.children[identifier_node_index + 2] # Asumiendo que hay un '=' en +1
-             if isinstance(possible_expr_node, Tree) and possible_expr_node.data == 'expression':
+             if isinstance(possible_expr_node, Tree):
                  expression_node = possible_expr_node
-                 print(f"DEBUG (const): Nodo de expresión encontrado en índice {identifier_node_index + 2}.")
+                 if depurar: log_semantico.debug(f"(const) Nodo de expresión encontrado en índice {identifier_node_index + 2}.")
 
         if not expression_node:
-            self.add_error(f"Declaración de constante '{const_name}' (Línea {line}) está incompleta, falta la expresión '='.", node)
+            self.add_error(f"Declaración de constante '{const_name}' (Línea {line}) está incompleta, falta la expresión '='.", node, "S105")
             return
 
-        # Determinar tipo y valor SIN llamar a self.visit()
-        const_type = self._get_expression_type(expression_node)
+        # Determinar tipo y valor visitando la expresión una sola vez
+        const_type = self.visit(expression_node)
         const_value = self._get_node_text(expression_node)
-        print(f"DEBUG (const): Expresión encontrada. Tipo: {const_type}, Valor Texto: {const_value}")
+        if depurar: log_semantico.debug(f"(const) Expresión encontrada. Tipo: {const_type}, Valor Texto: {const_value}")
 
         if const_type == 'error_type':
             const_type = 'desconocido' # Marcar si hubo error en la expr
 
         # --- Añadir Símbolo Constante ---
-        print(f"DEBUG (const): Creando SymbolEntry Const: Nombre='{const_name}', Tipo='{const_type}', Línea='{line}'")
+        if depurar: log_semantico.debug(f"(const) Creando SymbolEntry Const: Nombre='{const_name}', Tipo='{const_type}', Línea='{line}'")
         symbol = SymbolEntry(name=const_name, kind='constante', sym_type=const_type,
                              scope=self.symbol_table.current_scope, line=line,
                              initialized=True, value=const_value, is_constant=True)
 
         success, error_msg = self.symbol_table.add_symbol(symbol)
         if success:
-             print(f"DEBUG (const): Símbolo constante '{const_name}' añadido correctamente.")
+             if depurar: log_semantico.debug(f"(const) Símbolo constante '{const_name}' añadido correctamente.")
         else:
-             print(f"DEBUG (const): Falló al añadir símbolo constante '{const_name}'. Mensaje: {error_msg}")
+             if depurar: log_semantico.debug(f"(const) Falló al añadir símbolo constante '{const_name}'. Mensaje: {error_msg}")
              # Reportar error
-             self.add_error(error_msg, identifier_node_or_first_token if identifier_node_or_first_token else node)
+             self.add_error(error_msg, identifier_node_or_first_token if identifier_node_or_first_token else node, "S101")
 
 
 
     def assignment_expression(self, node):
         """Procesa asignaciones como 'x = 6', con declaración implícita opcional."""
-        print("\nDEBUG: Entrando a assignment_expression")
+        depurar = self._depurar
+        if depurar: log_semantico.debug("Entrando a assignment_expression")
         if not (isinstance(node, Tree) and len(node.children) == 3):
-             self.add_error("Estructura inesperada para assignment_expression.", node)
-             return
+             self.add_error("Estructura inesperada para assignment_expression.", node, "S002")
+             return 'error_type'
 
         target_node = node.children[0] # Expresión del LHS
         op_node = node.children[1]     # Operador (=)
         value_node = node.children[2]  # Expresión del RHS
 
+        # --- Procesar Lado Derecho (RHS - Valor) ---
+        # Se visita primero y una sola vez, aunque el LHS resulte inválido
+        value_type = self.visit(value_node)
+        value_text = self._get_node_text(value_node)
+        if depurar: log_semantico.debug(f"(assign) RHS Tipo determinado: {value_type}, Valor Texto: {value_text}")
+        if value_type == 'error_type':
+            log_semantico.info(f"(assign) Error al determinar tipo del RHS.")
+            # El error ya se reportó al visitar la expresión
+
         # --- Procesar Lado Izquierdo (LHS - Identificador) ---
         target_name = None
         identifier_node_lhs = None
         first_token_lhs = None
 
-        if isinstance(target_node, Tree) and target_node.data == 'expression':
+        if isinstance(target_node, Tree) and target_node.data == 'variable':
             if target_node.children and isinstance(target_node.children[0], Tree) and target_node.children[0].data == 'identifier':
                 identifier_node_lhs = target_node.children[0]
                 reconstructed_name = ""
@@ -649,36 +707,28 @@ class SemanticAnalyzer(Visitor):
                         reconstructed_name += sub_child.value
                 if first_token_lhs:
                     target_name = reconstructed_name
-                    print(f"DEBUG (assign): LHS Identificador reconstruido: '{target_name}'")
-                else: print(f"WARN (assign): No se encontraron tokens dentro del identifier del LHS.")
+                    if depurar: log_semantico.debug(f"(assign) LHS Identificador reconstruido: '{target_name}'")
+                else:
+                    log_semantico.info(f"(assign) No se encontraron tokens dentro del identifier del LHS.")
             else:
-                 self.add_error("El lado izquierdo de la asignación no es un identificador simple (expr->ident).", target_node)
-                 return
+                 self.add_error("El lado izquierdo de la asignación no es un identificador simple.", target_node, "S104")
+                 return 'error_type'
         else:
             # Podría ser un Token ID directo si la gramática lo permite? Revisar AST si falla.
-            self.add_error("Lado izquierdo de la asignación inválido (no es expression->identifier).", target_node)
-            return
+            self.add_error("Lado izquierdo de la asignación inválido (debe ser una variable).", target_node, "S104")
+            return 'error_type'
 
         if target_name is None: # No se pudo obtener nombre
-            self.add_error("No se pudo obtener el nombre de la variable del lado izquierdo.", target_node)
-            return
+            self.add_error("No se pudo obtener el nombre de la variable del lado izquierdo.", target_node, "S104")
+            return 'error_type'
 
         # --- Obtener Línea (del nodo 'assignment_expression') ---
         line = 'N/A'
         if hasattr(node, 'meta') and hasattr(node.meta, 'line'):
             line = node.meta.line
-            print(f"DEBUG (assign): Línea obtenida del nodo 'assignment_expression': {line}")
+            if depurar: log_semantico.debug(f"(assign) Línea obtenida del nodo 'assignment_expression': {line}")
         else:
-            print(f"WARN (assign): No se pudo obtener línea para asignación a '{target_name}'.")
-
-        # --- Procesar Lado Derecho (RHS - Valor) ---
-        # Determinar tipo SIN llamar a self.visit()
-        value_type = self._get_expression_type(value_node)
-        value_text = self._get_node_text(value_node)
-        print(f"DEBUG (assign): RHS Tipo determinado: {value_type}, Valor Texto: {value_text}")
-        if value_type == 'error_type':
-            print(f"WARN (assign): Error al determinar tipo del RHS.")
-            # Asumimos que el error ya se añadió en _get_expression_type
+            log_semantico.info(f"(assign) No se pudo obtener línea para asignación a '{target_name}'.")
 
         # --- Buscar Símbolo y Actuar ---
         symbol = self.symbol_table.lookup(target_name)
@@ -686,26 +736,27 @@ class SemanticAnalyzer(Visitor):
         if not symbol:
             # *** DECLARACIÓN IMPLÍCITA ACTIVADA ***
             # Si NO se permite, cambia esta sección para llamar a self.add_error y return
-            print(f"DEBUG (assign): Variable '{target_name}' no encontrada. Realizando declaración implícita.")
+            if depurar: log_semantico.debug(f"(assign) Variable '{target_name}' no encontrada. Realizando declaración implícita.")
             variable_type = value_type if value_type not in ['error_type', 'desconocido'] else 'desconocido'
-            print(f"DEBUG (assign): Creando SymbolEntry Implícito: Nombre='{target_name}', Tipo='{variable_type}', Línea='{line}'")
+            if depurar: log_semantico.debug(f"(assign) Creando SymbolEntry Implícito: Nombre='{target_name}', Tipo='{variable_type}', Línea='{line}'")
             symbol_entry = SymbolEntry(name=target_name, kind='variable', sym_type=variable_type,
                                        scope=self.symbol_table.current_scope, line=line,
                                        initialized=True, value=value_text)
             success, error_msg = self.symbol_table.add_symbol(symbol_entry)
             if success:
-                print(f"DEBUG (assign): Símbolo '{target_name}' añadido implícitamente.")
+                if depurar: log_semantico.debug(f"(assign) Símbolo '{target_name}' añadido implícitamente.")
             else:
-                print(f"DEBUG (assign): Falló al añadir implícitamente '{target_name}'. Mensaje: {error_msg}")
-                self.add_error(error_msg, first_token_lhs if first_token_lhs else node)
+                if depurar: log_semantico.debug(f"(assign) Falló al añadir implícitamente '{target_name}'. Mensaje: {error_msg}")
+                self.add_error(error_msg, first_token_lhs if first_token_lhs else node, "S101")
             # *** FIN DECLARACIÓN IMPLÍCITA ***
+            return variable_type
 
         else:
             # El símbolo SÍ existe
-            print(f"DEBUG (assign): Variable '{target_name}' encontrada en la tabla.")
+            if depurar: log_semantico.debug(f"(assign) Variable '{target_name}' encontrada en la tabla.")
             if symbol.is_constant:
-                self.add_error(f"No se puede asignar a la constante '{target_name}'.", first_token_lhs if first_token_lhs else node)
-                return
+                self.add_error(f"No se puede asignar a la constante '{target_name}'.", first_token_lhs if first_token_lhs else node, "S103")
+                return 'error_type'
 
             # Verificar compatibilidad de tipos (Simplificado)
             target_type = symbol.sym_type
@@ -713,7 +764,7 @@ class SemanticAnalyzer(Visitor):
                 # Añadir lógica de compatibilidad si se permite (ej: int a float)
                 is_compatible = False # Por defecto no son compatibles si son diferentes
                 if not is_compatible:
-                    self.add_error(f"Tipo incompatible: No se puede asignar tipo '{value_type}' a variable '{target_name}' de tipo '{target_type}'.", node)
+                    self.add_error(f"Tipo incompatible: No se puede asignar tipo '{value_type}' a variable '{target_name}' de tipo '{target_type}'.", node, "S201")
 
             # Actualizar símbolo existente
             symbol.initialized = True
@@ -721,23 +772,73 @@ class SemanticAnalyzer(Visitor):
             # Actualizar tipo si era desconocido y ahora se conoce
             if symbol.sym_type == 'desconocido' and value_type not in ['desconocido', 'error_type']:
                  symbol.sym_type = value_type
-                 print(f"DEBUG (assign): Actualizado tipo para '{target_name}' a '{value_type}'")
+                 if depurar: log_semantico.debug(f"(assign) Actualizado tipo para '{target_name}' a '{value_type}'")
+            return symbol.sym_type
 
     def identifier(self, node):
-         """Verifica el uso de identificadores en expresiones."""
-         # Este método se llamará si 'identifier' es un nodo del árbol (no solo un Token)
-         # Si 'identifier' es solo un Token, la verificación se hará dentro de _get_expression_type
-         # o en el contexto donde se use (ej: method_call).
-         # Asumamos que 'identifier' es un Token que se procesa en otros nodos.
-         pass # La lógica principal está en lookup y _get_expression_type
+         """Los identificadores de declaraciones (nombres, parámetros) no se resuelven."""
+         # El uso de un identificador dentro de una expresión es un nodo 'variable' y se
+         # verifica en variable() -> check_identifier_usage(); aquí no hay nada que hacer.
+         pass
+
+
+    def variable(self, node):
+         """Uso de un identificador dentro de una expresión: verifica que exista y devuelve su tipo."""
+         child = node.children[0] if node.children else None
+         token = self._get_token_from_node(child) if child is not None else None
+         symbol = self.check_identifier_usage(token) if token else None
+         return symbol.sym_type if symbol else 'error_type'
+
+    # --- Literales ---
 
+    def integer(self, node):
+        literal = ''.join(child.value for child in node.children if isinstance(child, Token))
+        # DIGIT es NUMBER, así que también acepta literales con parte decimal
+        return 'float' if any(c in literal for c in '.eE') else 'int'
 
-    def expression(self, node):
-         """Visita nodos de expresión para asegurar que los hijos se visiten."""
-         # Llama al visitador genérico para los hijos, lo que activará
-         # arithmetic_expression, logical_expression, etc.
-         self._visit_children(node)
-         # Podrías añadir verificaciones generales de expresión aquí si es necesario
+    def string_literal(self, node):
+        return 'string'
+
+    def char_literal(self, node):
+        return 'char'
+
+    def booleano(self, node):
+        return 'bool'
+
+    def grouped_expression(self, node):
+        for child in node.children:
+            if isinstance(child, Tree):
+                return self.visit(child) # Tipo de la expresión interna
+        return 'desconocido'
+
+    def _array_element_type(self, element_types):
+        """
+        (tipo de los elementos, índice del primero que no coincide o None). Todos deben ser
+        del mismo tipo; los desconocidos (p. ej. parámetros) no cuentan.
+        """
+        if 'error_type' in element_types:
+            return 'error_type', None
+        known = [t for t in element_types if t != 'desconocido']
+        if not known:
+            return element_types[0], None
+        for index, element_type in enumerate(element_types):
+            if element_type != 'desconocido' and element_type != known[0]:
+                return 'error_type', index
+        return known[0], None
+
+    def array_literal(self, node):
+        elements = [child for child in node.children if isinstance(child, Tree)]
+        element_types = [self.visit(child) for child in elements]
+        if not element_types:
+            return "array<empty>"
+        element_type, mismatch = self._array_element_type(element_types)
+        if mismatch is not None:
+            expected = next(t for t in element_types if t != 'desconocido')
+            self.add_error(f"Los elementos de un arreglo deben ser del mismo tipo: se esperaba '{expected}', "
+                           f"pero el elemento {mismatch + 1} es '{element_types[mismatch]}'.", elements[mismatch], "S206")
+        if element_type == 'error_type':
+            return 'error_type'
+        return f"array<{element_type}>"
 
     def _get_operator_text(self, node):
         """Obtiene el texto del operador de forma segura"""
@@ -749,147 +850,154 @@ class SemanticAnalyzer(Visitor):
                 return node.children[0].value
         return "?"  # Valor por defecto si no se puede determinar
 
+    def _es_cero_literal(self, node):
+        """True si el nodo es (un envoltorio de) el literal numérico 0, también como '-0'."""
+        while isinstance(node, Tree) and node.data in ('grouped_expression', 'unary_expression'):
+            children = node.children
+            if node.data == 'unary_expression':
+                if self._get_operator_text(children[0]) != '-':
+                    return False
+                children = children[1:]  # Sin el nodo unary_operator
+            node = next((child for child in children if isinstance(child, Tree)), None)
+        if isinstance(node, Tree) and node.data == 'integer':
+            literal = ''.join(child.value for child in node.children if isinstance(child, Token))
+            return float(literal) == 0
+        return False
+
+    # --- Operadores ---
+
     def arithmetic_expression(self, node):
-        """Verifica operaciones aritméticas."""
-        self._visit_children(node)  # Visita operandos primero
-        
-        # Obtener tipos de los operandos
-        left_type = self._get_expression_type(node.children[0])
-        right_type = self._get_expression_type(node.children[2])
-        
+        """Verifica operaciones aritméticas y devuelve el tipo resultante."""
+        # Cada operando se visita una sola vez; su tipo llega como valor de retorno
+        left_type = self.visit(node.children[0])
+        right_type = self.visit(node.children[2])
+
         op_node = node.children[1]
-        op = self._get_operator_text(op_node) 
-        # No reportar errores adicionales si ya hay errores en los operandos
-        if left_type == 'error_type' or right_type == 'error_type':
-            return
+        op = self._get_operator_text(op_node)
+        result_type, error_msg = self._arithmetic_result(op, left_type, right_type)
+        if error_msg:
+            self.add_error(error_msg, op_node, "S202")
+            return result_type
 
-        # Tipos válidos para operaciones aritméticas
-        numeric_types = ['int', 'float']
-        string_types = ['string']
-        
-        # Manejar operador + para strings (concatenación)
-        if op == '+':
-            if left_type in string_types and right_type in string_types:
-                return  # Concatenación válida
-            elif {left_type, right_type} == {'string', 'int'}:
-                self.add_error(f"No se puede concatenar string con int directamente", op_node)
-                return
-        
-        # Para otros operadores (-, *, /, etc.)
-        if op in ['-', '*', '/', '%']:
-            if left_type not in numeric_types or right_type not in numeric_types:
-                self.add_error(f"Operador '{op}' requiere operandos numéricos, no '{left_type}' y '{right_type}'", op_node)
-                return
-        
         # Verificar división por cero
-        if op == '/':
-            right_operand = node.children[2]
-            if isinstance(right_operand, Token) and right_operand.type in ['INTEGER', 'DIGIT']:
-                if float(right_operand.value) == 0:
-                    self.add_error("División por cero detectada", right_operand)
-        
-        # Permitir operaciones entre int y float (conversión implícita)
-        if {left_type, right_type} == {'int', 'float'}:
-            return  # Conversión implícita permitida
-        
-        # Si ambos operandos son del mismo tipo válido
-        if left_type == right_type and left_type in numeric_types:
-            return
-        
-        # Si llegamos aquí, es una combinación no válida
-        if left_type != right_type:
-            self.add_error(f"Tipos incompatibles: '{left_type}' {op} '{right_type}'", op_node)
+        if op == '/' and self._es_cero_literal(node.children[2]):
+            self.add_error("División por cero detectada", node.children[2], "S205")
+        return result_type
 
 
     def relational_expression(self, node):
          """Verifica operaciones relacionales."""
-         self._visit_children(node)
-         left_type = self._get_expression_type(node.children[0])
-         right_type = self._get_expression_type(node.children[2])
+         left_type = self.visit(node.children[0])
+         right_type = self.visit(node.children[2])
          op_node = node.children[1]
-         op_token = self._get_token_from_node(op_node)
-         op = op_token.value if op_token else f"<{op_node.data if isinstance(op_node, Tree) else '?'}>"
-         op_line_node = op_token if op_token else op_node
+         op = self._get_operator_text(op_node)
 
          # Los tipos deben ser comparables
-         if left_type != right_type and (left_type != 'error_type' and right_type != 'error_type'):
-              # Permitir comparaciones int/float si es necesario
-              # if not ((left_type == 'int' and right_type == 'float') or \
-              #         (left_type == 'float' and right_type == 'int')):
-                   self.add_error(f"No se pueden comparar tipos incompatibles: '{left_type}' {op} '{right_type}'.", op_node)
+         if left_type != right_type and not {left_type, right_type} & {'error_type', 'desconocido'}:
+              self.add_error(f"No se pueden comparar tipos incompatibles: '{left_type}' {op} '{right_type}'.", op_node, "S202")
+         return 'bool'
 
 
     def logical_expression(self, node):
          """Verifica operaciones lógicas."""
-         self._visit_children(node)
-         left_type = self._get_expression_type(node.children[0])
-         right_type = self._get_expression_type(node.children[2])
+         left_type = self.visit(node.children[0])
+         right_type = self.visit(node.children[2])
          op_node = node.children[1]
-         op_token = self._get_token_from_node(op_node)
-         op = op_token.value if op_token else f"<{op_node.data if isinstance(op_node, Tree) else '?'}>"
-         op_line_node = op_token if op_token else op_node
+         op = self._get_operator_text(op_node)
 
          if left_type != 'bool' or right_type != 'bool':
-               if left_type != 'error_type' and right_type != 'error_type':
-                  self.add_error(f"Operador lógico '{op}' requiere operandos booleanos, pero se encontraron '{left_type}' y '{right_type}'.", op_node)
-         # Manejar NOT si tiene una estructura diferente
-
+               if not {left_type, right_type} & {'error_type', 'desconocido'}:
+                  self.add_error(f"Operador lógico '{op}' requiere operandos booleanos, pero se encontraron '{left_type}' y '{right_type}'.", op_node, "S202")
+         return 'bool'
+
+    def unary_expression(self, node):
+         """Verifica '-x' (numérico) y 'NOT x' (booleano)."""
+         op_node = node.children[0]
+         operand_type = self.visit(node.children[1])
+         result_type, error_msg = self._unary_result(self._get_operator_text(op_node), operand_type)
+         if error_msg:
+              self.add_error(error_msg, op_node, "S202")
+         return result_type
+
+    # --- Estructuras de control ---
+
+    def _verificar_condicion(self, node, keyword):
+        """Visita la condición y los bloques de un if/while exactamente una vez."""
+        for child in node.children:
+            if not isinstance(child, Tree):
+                continue
+            if child.data in ('statement_block', 'else_clause'):
+                self.visit(child) # Bloque THEN / ELSE o cuerpo del bucle
+            else:
+                condition_type = self.visit(child) # La condición es el único otro subárbol
+                if condition_type not in ['bool', 'error_type', 'desconocido']: # Permitir desconocido para no dar error doble
+                     self.add_error(f"La condición del '{keyword}' debe ser booleana, pero se encontró tipo '{condition_type}'.", child, "S203")
 
     def if_statement(self, node):
         """Verifica sentencias IF."""
-        condition_node = node.children[0] # Asumiendo if (expression) || block || else?
-        self.visit(condition_node)
-        condition_type = self._get_expression_type(condition_node)
-
-        if condition_type not in ['bool', 'error_type', 'desconocido']: # Permitir desconocido para no dar error doble
-             self.add_error(f"La condición del 'if' debe ser booleana, pero se encontró tipo '{condition_type}'.", condition_node)
-
-        # Visitar los bloques
-        self.visit(node.children[1]) # Bloque THEN
-        if len(node.children) > 2: # Si hay ELSE
-             self.visit(node.children[2]) # Bloque ELSE (o nodo else_clause)
+        self._verificar_condicion(node, 'if')
 
     def while_loop(self, node):
         """Verifica bucles WHILE."""
-        condition_node = node.children[0] # Asumiendo while (expression) || block ||
-        self.visit(condition_node)
-        condition_type = self._get_expression_type(condition_node)
-
-        if condition_type not in ['bool', 'error_type', 'desconocido']:
-             self.add_error(f"La condición del 'while' debe ser booleana, pero se encontró tipo '{condition_type}'.", condition_node)
+        self._verificar_condicion(node, 'while')
+
+    def for_loop(self, node):
+        """Verifica bucles FOR: la variable de iteración toma el tipo de los elementos."""
+        # Estructura: "for" "(" identifier "in" expression ")" "||" statement_block "||"
+        children = [child for child in node.children if isinstance(child, Tree)]
+        if len(children) < 3:
+            self.add_error("Estructura inesperada para for_loop.", node, "S002")
+            return
+        identifier_node, iterable_node, block_node = children[0], children[1], children[2]
+
+        iterable_type = self.visit(iterable_node)
+        element_type = 'desconocido'
+        if isinstance(iterable_type, str) and iterable_type.startswith('array<') and iterable_type != 'array<empty>':
+            element_type = iterable_type[len('array<'):-1]
+        elif iterable_type == 'string':
+            element_type = 'char'
+        elif iterable_type not in ['error_type', 'desconocido', 'array<empty>']:
+            self.add_error(f"El 'for' solo puede recorrer arreglos o strings, no '{iterable_type}'.", iterable_node, "S204")
+
+        var_token = self._get_token_from_node(identifier_node)
+        if var_token:
+            symbol = self.symbol_table.lookup(var_token.value)
+            if symbol:
+                symbol.initialized = True
+                symbol.references += 1
+            else:
+                # La variable de iteración se declara implícitamente, igual que en una asignación
+                symbol = SymbolEntry(name=var_token.value, kind='variable', sym_type=element_type,
+                                     scope=self.symbol_table.current_scope, line=var_token.line, initialized=True)
+                self.symbol_table.add_symbol(symbol)
 
-        # Visitar el bloque del bucle
-        self.visit(node.children[1]) # Bloque del Bucle
+        self.visit(block_node)
 
-    # --- Funciones ---
+    # --- Funciones, métodos y clases ---
 
     def function_declaration(self, node):
         """Procesa la declaración de funciones."""
-        # Estructura asumida: DO "function" identifier "(" parameter_list? ")" "||" statement_block "||"
-        func_token = None
-        idx = 0
-        for i, child in enumerate(node.children):
-             # Buscar el token 'function' (o el nodo DO si es lo primero)
-             # y tomar el siguiente token/nodo como el identificador
-             if isinstance(child, Token) and child.value == 'function':
-                  if i + 1 < len(node.children):
-                      func_token_node = node.children[i+1]
-                      func_token = self._get_token_from_node(func_token_node, 'IDENTIFIER')
-                      idx = i+1 # Guardar índice para referencia posterior
-                      break
-             # Alternativa si el primer nodo es DO
-             elif isinstance(child, Token) and child.value == 'DO' and i + 2 < len(node.children):
-                 # Asumiendo DO 'function' IDENTIFIER ...
-                 func_token_node = node.children[i+2]
-                 func_token = self._get_token_from_node(func_token_node, 'IDENTIFIER')
-                 idx = i+2
-                 break
+        # Estructura: DO "function" identifier "(" parameter_list? ")" "||" statement_block "||"
+        self._declarar_funcion(node, 'funcion')
+
+    def method_declaration(self, node):
+        """Procesa los métodos de una clase (misma estructura que una función)."""
+        self._declarar_funcion(node, 'metodo')
+
+    def constructor_declaration(self, node):
+        """Procesa constructores: DO identifier "(" parameter_list? ")" "||" statement_block "||"."""
+        self._declarar_funcion(node, 'metodo')
+
+    def _declarar_funcion(self, node, kind):
+        # El nombre es el primer nodo 'identifier' (después de DO y, si existe, 'function')
+        name_node = next((child for child in node.children if isinstance(child, Tree) and child.data == 'identifier'), None)
+        func_token = self._get_token_from_node(name_node) if name_node is not None else None
 
         if not func_token:
-             self.add_error("Error interno: No se pudo encontrar el nombre de la función en la declaración.", node)
+             self.add_error("Error interno: No se pudo encontrar el nombre de la función en la declaración.", node, "S001")
              return
         func_name = func_token.value
-        line = func_token.meta.line
+        line = func_token.line
 
         # TODO: Determinar tipo de retorno (necesita sintaxis en la gramática, ej: ... ) -> type ||)
         return_type = 'void' # Asumir void si no se especifica
@@ -906,7 +1014,7 @@ class SemanticAnalyzer(Visitor):
                     statement_block_node = child
 
         # Crear entrada de símbolo para la función ANTES de entrar al nuevo ámbito
-        function_symbol = SymbolEntry(name=func_name, kind='funcion', sym_type=f"function(...)->{return_type}", scope=self.symbol_table.current_scope, line=line)
+        function_symbol = SymbolEntry(name=func_name, kind=kind, sym_type=f"function(...)->{return_type}", scope=self.symbol_table.current_scope, line=line)
         function_symbol.return_type = return_type
         function_symbol.is_defined = True # Marcamos como definida porque tenemos el bloque
 
@@ -914,30 +1022,16 @@ class SemanticAnalyzer(Visitor):
         param_symbols = []
         param_types_for_sig = []
         if param_list_node:
-            for i, param_node in enumerate(param_list_node.children): # Asumiendo que los hijos son los parámetros
+            for param_node in param_list_node.children:
                 if isinstance(param_node, Tree) and param_node.data == 'parameter':
-                    # Asumiendo: parameter: identifier (':' type)?
-                    param_name_token = param_node.children[0]
-                    param_name = param_name_token.value
-                    param_line = param_name_token.meta.line
-                    param_type = 'desconocido' # Tipo por defecto o inferido
-                    if len(param_node.children) > 1:
-                         # TODO: Extraer tipo explícito si existe en tu gramática
-                         # param_type = self._get_node_text(param_node.children[1]) # Ajustar índice
-                         pass
-
-                    param_entry = SymbolEntry(name=param_name, kind='parametro', sym_type=param_type, scope=None, line=param_line, initialized=True) # Parámetros se consideran inicializados
+                    # parameter: identifier
+                    param_name_token = self._get_token_from_node(param_node.children[0])
+                    if not param_name_token:
+                        continue
+                    param_type = 'desconocido' # La gramática no declara tipos de parámetros
+                    param_entry = SymbolEntry(name=param_name_token.value, kind='parametro', sym_type=param_type, scope=None, line=param_name_token.line, initialized=True) # Parámetros se consideran inicializados
                     param_symbols.append(param_entry)
                     param_types_for_sig.append(param_type)
-                elif isinstance(param_node, Token) and param_node.type == 'IDENTIFIER':
-                     # Caso simple: solo identificador como parámetro
-                     param_name = param_node.value
-                     param_line = param_node.meta.line
-                     param_type = 'desconocido'
-                     param_entry = SymbolEntry(name=param_name, kind='parametro', sym_type=param_type, scope=None, line=param_line, initialized=True)
-                     param_symbols.append(param_entry)
-                     param_types_for_sig.append(param_type)
-
 
         function_symbol.parameters = param_symbols
         function_symbol.signature = f"({', '.join(param_types_for_sig)}) -> {return_type}"
@@ -947,132 +1041,180 @@ class SemanticAnalyzer(Visitor):
         success, error_msg = self.symbol_table.add_symbol(function_symbol)
         if not success:
             # Error de redeclaración de función (o variable con mismo nombre)
-            self.add_error(error_msg, func_token)
-            # Podríamos no continuar con el cuerpo si hay error de declaración
-            # return
-
+            self.add_error(error_msg, func_token, "S101")
 
         # --- Entrar al Ámbito de la Función ---
         self.symbol_table.push_scope(func_name)
         previous_function = self.current_function
         self.current_function = function_symbol # Guardar referencia a la función actual
         function_symbol.local_symbol_table = self.symbol_table.current_scope # Vincular tabla local
+        try:
+            # Añadir parámetros al nuevo ámbito local
+            for p_sym in param_symbols:
+                success_p, error_msg_p = self.symbol_table.add_symbol(p_sym)
+                if not success_p:
+                     self.add_error(error_msg_p, func_token, "S101") # Reportar en la línea de la función
+
+            # Visitar el cuerpo de la función (una sola vez, dentro de su ámbito)
+            if statement_block_node:
+                 self.visit(statement_block_node)
+            else:
+                 self.add_error(f"Función '{func_name}' declarada pero no tiene cuerpo.", func_token, "S306")
+        finally:
+            # --- Salir del Ámbito de la Función (también si el cuerpo lanzó una excepción) ---
+            self.symbol_table.pop_scope()
+            self.current_function = previous_function # Restaurar función anterior (si estábamos anidados)
+
+    def class_declaration(self, node):
+        """Procesa clases: atributos y métodos se declaran en el ámbito de la clase."""
+        # Estructura: "class" identifier ("inherits" identifier)? "||" class_body "||"
+        identifier_nodes = [child for child in node.children if isinstance(child, Tree) and child.data == 'identifier']
+        class_token = self._get_token_from_node(identifier_nodes[0]) if identifier_nodes else None
+        if not class_token:
+            self.add_error("Error interno: No se pudo encontrar el nombre de la clase.", node, "S001")
+            return
+        class_name = class_token.value
 
-        # Añadir parámetros al nuevo ámbito local
-        for p_sym in param_symbols:
-            success_p, error_msg_p = self.symbol_table.add_symbol(p_sym)
-            if not success_p:
-                 # Este error (redeclaración de parámetro) es menos probable si los nombres son únicos en la lista
-                 self.add_error(error_msg_p, func_token) # Reportar en la línea de la función
-
-
-        # Visitar el cuerpo de la función
-        if statement_block_node:
-             self.visit(statement_block_node) # Analizar el cuerpo
-        else:
-             self.add_error(f"Función '{func_name}' declarada pero no tiene cuerpo.", func_token)
-
-
-        # --- Salir del Ámbito de la Función ---
-        self.symbol_table.pop_scope()
-        self.current_function = previous_function # Restaurar función anterior (si estábamos anidados)
-
-        # TODO: Verificación de retorno (requiere análisis de flujo o al menos buscar 'return')
-        # Necesitaría un flag 'has_return_statement' que se active al visitar un 'return'
-        # if function_symbol.return_type != 'void' and not hasattr(function_symbol, '_has_return'):
-        #    self.add_error(f"Función '{func_name}' debe retornar un valor de tipo '{function_symbol.return_type}', pero no se encontró sentencia 'return'.", func_token)
-
-
-    def method_call(self, node):
-        """Verifica llamadas a funciones/métodos."""
-        # Asumiendo: identifier "(" argument_list? ")"  O obj.method(...)
-        # Simplificado a: identifier "(" argument_list? ")"
-        func_token = self._get_token_from_node(node.children[0], 'IDENTIFIER')
-        if not func_token:
-             # Podría ser una llamada más compleja como obj.method()
-             # Necesitarías manejar 'member_access' aquí o en _get_expression_type
-             # Por ahora, asumimos llamada simple
-             self.add_error("Error interno: No se encontró el identificador de la función en la llamada.", node.children[0])
-             # Visitar argumentos igualmente para detectar errores dentro de ellos
-             if len(node.children) > 1 and isinstance(node.children[1], Tree) and node.children[1].data == 'argument_list':
-                  self.visit(node.children[1])
-             return
-        func_name = func_token.value
-        line = func_token.meta.line
-
-        symbol = self.symbol_table.lookup(func_name)
+        class_symbol = SymbolEntry(name=class_name, kind='clase', sym_type=class_name,
+                                   scope=self.symbol_table.current_scope, line=class_token.line)
+        class_symbol.is_defined = True
 
-        if not symbol:
-             self.add_error(f"Función o método '{func_name}' no declarado.", func_name_token)
-             # Visitar argumentos igualmente para detectar errores dentro de ellos
-             if len(node.children) > 1 and isinstance(node.children[1], Tree) and node.children[1].data == 'argument_list':
-                  self.visit(node.children[1])
-             return
+        if len(identifier_nodes) > 1:
+            base_token = self._get_token_from_node(identifier_nodes[1])
+            base_symbol = self.symbol_table.lookup(base_token.value) if base_token else None
+            if not base_symbol or base_symbol.kind != 'clase':
+                self.add_error(f"Clase base '{base_token.value if base_token else '?'}' no declarada.", base_token or node, "S305")
+            else:
+                base_symbol.references += 1
+                class_symbol.inheritance = base_symbol.name
 
-        if symbol.kind not in ['funcion', 'metodo']: # Asumiendo que tienes 'metodo'
-             self.add_error(f"'{func_name}' no es una función o método, es de tipo '{symbol.kind}'.", func_name_token)
-             # Visitar argumentos
-             if len(node.children) > 1 and isinstance(node.children[1], Tree) and node.children[1].data == 'argument_list':
-                  self.visit(node.children[1])
-             return
+        success, error_msg = self.symbol_table.add_symbol(class_symbol)
+        if not success:
+            self.add_error(error_msg, class_token, "S101")
 
-        symbol.references += 1 # Incrementar referencia
+        self.symbol_table.push_scope(class_name)
+        class_symbol.local_symbol_table = self.symbol_table.current_scope
+        try:
+            for child in node.children:
+                if isinstance(child, Tree) and child.data == 'class_body':
+                    self.visit(child)
+        finally:
+            self.symbol_table.pop_scope()
+
+        methods, attributes = {}, {}
+        for member in class_symbol.local_symbol_table.symbols.values():
+            if member.kind == 'metodo':
+                methods[member.name] = member
+            else:
+                if member.kind == 'variable':
+                    member.kind = 'atributo'
+                attributes[member.name] = member
+        if methods:
+            class_symbol.associated_methods = methods
+        if attributes:
+            class_symbol.internal_structure = attributes
+
+    def _buscar_metodo(self, class_symbol, method_name):
+        """Busca un método en la clase y en su cadena de herencia."""
+        visited = set()
+        while class_symbol and class_symbol.name not in visited:
+            visited.add(class_symbol.name)
+            if method_name in class_symbol.associated_methods:
+                return class_symbol.associated_methods[method_name]
+            class_symbol = self.symbol_table.lookup(class_symbol.inheritance) if class_symbol.inheritance else None
+        return None
+
+    def _argumentos(self, node):
+        """Visita cada argumento una vez y devuelve (nodos, tipos)."""
+        arg_nodes = []
+        for child in node.children:
+            if isinstance(child, Tree) and child.data == 'argument_list':
+                arg_nodes = [arg for arg in child.children if isinstance(arg, Tree)]
+        return arg_nodes, [self.visit(arg) for arg in arg_nodes]
 
-        # Comparar argumentos
+    def _verificar_llamada(self, symbol, func_name, arg_nodes, arg_types, report_node):
+        """Compara los argumentos de una llamada con los parámetros formales."""
         formal_params = symbol.parameters
-        actual_args_nodes = []
-        if len(node.children) > 1 and isinstance(node.children[1], Tree) and node.children[1].data == 'argument_list':
-             actual_args_nodes = node.children[1].children # Los nodos de expresión de los argumentos
 
         # Verificar número de argumentos
-        if len(formal_params) != len(actual_args_nodes):
-             self.add_error(f"Llamada a '{func_name}': Se esperaban {len(formal_params)} argumentos, pero se proporcionaron {len(actual_args_nodes)}.", func_name_token)
-             # Aún así, visitar los argumentos que sí se pasaron
-             for arg_node in actual_args_nodes:
-                  self.visit(arg_node)
-             return # Salir si el número no coincide para evitar errores de índice
+        if len(formal_params) != len(arg_nodes):
+             self.add_error(f"Llamada a '{func_name}': Se esperaban {len(formal_params)} argumentos, pero se proporcionaron {len(arg_nodes)}.", report_node, "S301")
+             return symbol.return_type if symbol.return_type else 'void'
 
         # Verificar tipos de argumentos
-        for i, arg_node in enumerate(actual_args_nodes):
-             self.visit(arg_node) # Visitar el argumento para detectar errores internos
-             actual_type = self._get_expression_type(arg_node)
+        for i, (arg_node, actual_type) in enumerate(zip(arg_nodes, arg_types)):
              formal_type = formal_params[i].sym_type
-
              if actual_type != 'error_type' and formal_type != 'desconocido' and actual_type != 'desconocido' and actual_type != formal_type:
-                   # Añadir lógica de compatibilidad si es necesario
-                   is_compatible = False
-                   # ej: if formal_type == 'float' and actual_type == 'int': is_compatible = True
-
-                   if not is_compatible:
-                       self.add_error(f"Llamada a '{func_name}': Argumento {i+1} incompatible. Se esperaba tipo '{formal_type}', pero se encontró tipo '{actual_type}'.", arg_node)
-
+                   self.add_error(f"Llamada a '{func_name}': Argumento {i+1} incompatible. Se esperaba tipo '{formal_type}', pero se encontró tipo '{actual_type}'.", arg_node, "S302")
+        return symbol.return_type if symbol.return_type else 'void'
 
-    # Añadir más métodos visit_* para class_declaration, control_structure, print_statement, etc.
-    # según tu gramática y las validaciones necesarias.
-
-    # Helper para visitar hijos (evita repetición)
-    def _visit_children(self, node):
-        for child in node.children:
-            if isinstance(child, Tree):
-                self.visit(child)
-            # Podrías querer visitar Tokens específicos si contienen identificadores a verificar
-            # elif isinstance(child, Token) and child.type == 'IDENTIFIER':
-            #    self.check_identifier_usage(child)
+    def instance_creation(self, node):
+        """Verifica llamadas f(args) a funciones y creación de instancias Clase(args)."""
+        arg_nodes, arg_types = self._argumentos(node)
+        func_token = self._get_token_from_node(node.children[0])
+        if not func_token:
+             self.add_error("Error interno: No se encontró el identificador de la función en la llamada.", node, "S001")
+             return 'error_type'
+        func_name = func_token.value
 
+        symbol = self.check_identifier_usage(func_token)
+        if not symbol:
+             return 'error_type'
+        if symbol.kind == 'clase':
+             constructor = symbol.associated_methods.get(func_name)
+             if constructor:
+                  self._verificar_llamada(constructor, func_name, arg_nodes, arg_types, func_token)
+             return symbol.name
+        if symbol.kind not in ['funcion', 'metodo']:
+             self.add_error(f"'{func_name}' no es una función o método, es de tipo '{symbol.kind}'.", func_token, "S303")
+             return 'error_type'
+        return self._verificar_llamada(symbol, func_name, arg_nodes, arg_types, func_token)
 
-    # --- Ejemplo de Verificación de Uso ---
+    def method_call(self, node):
+        """Verifica llamadas obj.metodo(args)."""
+        # Estructura: identifier "." identifier "(" argument_list? ")"
+        arg_nodes, arg_types = self._argumentos(node)
+        identifier_nodes = [child for child in node.children if isinstance(child, Tree) and child.data == 'identifier']
+        if len(identifier_nodes) < 2:
+             self.add_error("Error interno: No se encontró el identificador de la función en la llamada.", node, "S001")
+             return 'error_type'
+        receiver_token = self._get_token_from_node(identifier_nodes[0])
+        method_token = self._get_token_from_node(identifier_nodes[1])
+        if not receiver_token or not method_token:
+             self.add_error("Error interno: No se encontró el identificador de la función en la llamada.", node, "S001")
+             return 'error_type'
+
+        receiver = self.check_identifier_usage(receiver_token)
+        if not receiver:
+             return 'error_type'
+
+        # El receptor puede ser la clase misma o una instancia cuyo tipo es el nombre de la clase
+        class_symbol = receiver if receiver.kind == 'clase' else self.symbol_table.lookup(receiver.sym_type) if isinstance(receiver.sym_type, str) else None
+        if not class_symbol or class_symbol.kind != 'clase':
+             return 'desconocido' # No se conoce la clase del receptor; no se puede verificar el método
+
+        method = self._buscar_metodo(class_symbol, method_token.value)
+        if not method:
+             self.add_error(f"La clase '{class_symbol.name}' no tiene un método '{method_token.value}'.", method_token, "S304")
+             return 'error_type'
+        method.references += 1 # Incrementar referencia
+        return self._verificar_llamada(method, method_token.value, arg_nodes, arg_types, method_token)
+
+
+    # --- Verificación de Uso ---
     def check_identifier_usage(self, token):
-         """Llamado cuando se encuentra un IDENTIFIER en un contexto de uso."""
+         """Llamado cuando se encuentra un identificador en un contexto de uso. Devuelve su símbolo."""
          identifier = token.value
          symbol = self.symbol_table.lookup(identifier)
          if not symbol:
-              self.add_error(f"Identificador '{identifier}' no declarado.", token)
+              self.add_error(f"Identificador '{identifier}' no declarado.", token, "S102")
          else:
               symbol.references += 1
               # Comprobar inicialización (si no es el lado izquierdo de una asignación)
               # Necesita contexto para saber si es LHS.
               # if not symbol.initialized and not self._is_lhs_of_assignment(token):
               #     self.add_error(f"Variable '{identifier}' usada antes de ser inicializada.", token)
+         return symbol
 
 # (Dentro de Analizador sintactico.py)
 
@@ -1080,6 +1222,8 @@ class SemanticAnalyzer(Visitor):
 
 # Instancia global del analizador semántico (o crearla dentro de analizar)
 semantic_analyzer = SemanticAnalyzer()
+# Entre dos pulsaciones de 'Analizar' solo se reparsean y reanalizan las sentencias afectadas
+compilacion = CompilacionIncremental(parser, semantic_analyzer)
 # La tabla de símbolos ahora la maneja el semantic_analyzer internamente
 # global tabla_simbolos # Ya no necesitamos la tabla global antigua
 
@@ -1087,75 +1231,150 @@ semantic_analyzer = SemanticAnalyzer()
 
 
 # Función para analizar código y mostrar errores en la interfaz
-def analizar():
+def analizar(al_escribir=False):
     # Obtener el código fuente del área de texto
     codigo = entrada_texto.get("1.0", tk.END).strip()
 
-    # Configurar el widget de salida
-    salida_texto.config(state=tk.NORMAL)
-    salida_texto.delete("1.0", tk.END)
-    entrada_texto.tag_remove("error", "1.0", tk.END) # Limpiar resaltado de error anterior
-
     # Verificar si hay código para analizar
     if not codigo:
-        salida_texto.insert(tk.END, "Error: No hay código para analizar\n", "error")
-        salida_texto.config(state=tk.DISABLED)
+        if not al_escribir:
+            salida_texto.config(state=tk.NORMAL)
+            salida_texto.delete("1.0", tk.END)
+            salida_texto.insert(tk.END, "Error: No hay código para analizar\n", "error")
+            salida_texto.config(state=tk.DISABLED)
         return
 
-    try:
-        salida_texto.insert(tk.END, "--- Análisis Sintáctico ---\n", "info")
-        arbol = parser.parse(codigo)
-        salida_texto.insert(tk.END, "✓ Análisis sintáctico completado con éxito\n", "success")
+    # Con "Perfilar" marcado cada fase (y cada método visitante) se mide; ver perfilado.py
+    perfilador = Perfilador(memoria=True, cprofile=True) if perfilar_analisis.get() else None
+
+    # El análisis corre en el hilo del trabajador; un clic nuevo deja obsoleto el anterior
+    trabajador.enviar(lambda avisar: compilar_codigo(codigo, avisar, perfilador), mostrar_analisis,
+                      mostrar_error_analisis, descripcion="Compilando...")
+
 
-        # --- DEBUG: Print AST node names ---
-        print("\n--- AST Structure (Relevant Nodes) ---")
+def compilar_codigo(codigo, avisar, perfilador=None):
+    """Trabajo de fondo de analizar(): compila y resume el resultado, sin tocar los widgets."""
+    avisar("Análisis sintáctico y semántico...")
+    if perfilador is not None:
+        perfilador.instrumentar(semantic_analyzer, reglas_de(parser))
+        compilacion.perfilador = perfilador
+    try:
+        compilacion.compilar(codigo) # Parseo y análisis semántico, incrementales
+    finally:
+        if perfilador is not None:
+            perfilador.desinstrumentar()
+            compilacion.perfilador = None
+
+    # Volcados del árbol solo si se piden (POLUX_LOG=arbol=DEBUG); son caros en archivos grandes
+    if esta_activo(log_arbol):
+        avisar("Volcando el árbol...")
+        arbol = compilacion.arbol()
+        nombres = []
         def print_node_names(node, indent=""):
             if isinstance(node, Tree):
-                print(f"{indent}Node: {node.data}")
+                nombres.append(f"{indent}Node: {node.data}")
                 for child in node.children:
                     print_node_names(child, indent + "  ")
-            # Optional: print tokens too
-            # elif isinstance(node, Token):
-            #    print(f"{indent}Token: {node.type} ({node.value})")
         print_node_names(arbol)
-        print("------------------------------------\n")
-        # --- END DEBUG ---
+        log_arbol.debug("AST Structure (Relevant Nodes)\n%s", "\n".join(nombres))
+        log_arbol.debug("AST Tree\n%s", arbol.pretty())
+
+    avisar("Preparando resultados...")
+    categorias = {}
+    with fase(perfilador, "resumen"):
+        indice = IndiceDiagnosticos(semantic_analyzer.errors) # Por línea: resaltado sin releer los mensajes
+        if not indice:
+            for s in semantic_analyzer.symbol_table.get_all_symbols():
+                categorias[s.kind] = categorias.get(s.kind, 0) + 1
+    return {"errores": indice, "categorias": categorias, "perfilador": perfilador}
 
+
+def _preparar_salida():
+    salida_texto.config(state=tk.NORMAL)
+    salida_texto.delete("1.0", tk.END)
+    entrada_texto.tag_remove("error", "1.0", tk.END) # Limpiar resaltado de error anterior
+
+
+def mostrar_analisis(resultado):
+    perfilador = resultado["perfilador"]
+    with fase(perfilador, "interfaz"): # La inserción en los widgets también se mide
+        insertar_analisis(resultado)
+    if perfilador is not None:
+        mostrar_perfil(perfilador)
+
+
+def insertar_analisis(resultado):
+    _preparar_salida()
+    try:
+        salida_texto.insert(tk.END, "--- Análisis Sintáctico ---\n", "info")
+        salida_texto.insert(tk.END, "✓ Análisis sintáctico completado con éxito\n", "success")
         salida_texto.insert(tk.END, "--- Análisis Semántico ---\n", "info")
-        print("--- AST Tree ---")
-        print(arbol.pretty())
-        print("----------------")
-        semantic_analyzer.start_analysis(arbol)
-        semantic_errors = semantic_analyzer.errors 
+        semantic_errors = resultado["errores"]
 
         if not semantic_errors:
             salida_texto.insert(tk.END, "✓ Análisis semántico completado con éxito\n", "success")
 
             # Opcional: Mostrar resumen de la tabla de símbolos semántica
-            all_symbols = semantic_analyzer.symbol_table.get_all_symbols()
-            salida_texto.insert(tk.END, f"\nSe encontraron {len(all_symbols)} símbolos válidos:\n", "info")
-            categorias = {}
-            for s in all_symbols:
-                categorias[s.kind] = categorias.get(s.kind, 0) + 1
+            categorias = resultado["categorias"]
+            salida_texto.insert(tk.END, f"\nSe encontraron {sum(categorias.values())} símbolos válidos:\n", "info")
             for cat, cantidad in categorias.items():
                 salida_texto.insert(tk.END, f"- {cat}: {cantidad}\n", "info")
 
         else:
-            salida_texto.insert(tk.END, f"✗ Se encontraron {len(semantic_errors)} errores semánticos:\n", "error")
-            for error_msg in semantic_errors:
-                salida_texto.insert(tk.END, f"- {error_msg}\n", "error")
-                # Intenta resaltar la línea del primer error (simple)
-                try:
-                    line_info = error_msg.split('(Línea ')[1].split(',')[0]
-                    if line_info != 'N/A':
-                        line_num = int(line_info)
-                        entrada_texto.tag_add("error", f"{line_num}.0", f"{line_num}.end")
-                        entrada_texto.tag_config("error", background="orange", foreground="black")
-                except Exception:
-                    pass # No resaltar si no se puede parsear la línea
-
-
-    except UnexpectedInput as e:
+            salida_texto.insert(tk.END, f"✗ Se encontraron {len(semantic_errors)} errores semánticos "
+                                        f"en {len(semantic_errors.por_linea)} líneas:\n", "error")
+            # Un solo insert y un solo tag_add aunque haya miles de errores
+            salida_texto.insert(tk.END, "".join(f"- {error}\n" for error in semantic_errors), "error")
+            rangos = semantic_errors.rangos()
+            if rangos:
+                entrada_texto.tag_config("error", background="orange", foreground="black")
+                entrada_texto.tag_add("error", *rangos)
+    finally:
+        # Deshabilitar la edición del widget de salida
+        salida_texto.config(state=tk.DISABLED)
+
+    # Si la tabla está abierta, se refresca en su sitio con el análisis nuevo
+    if tabla_abierta():
+        trabajador.enviar(filas_tabla_simbolos, refrescar_tabla, mostrar_error_tabla,
+                          clave="tabla", descripcion="Actualizando la tabla de símbolos...")
+
+
+# Perfil del último análisis con "Perfilar" marcado, para "Guardar perfil..."
+ultimo_perfil = None
+
+
+def mostrar_perfil(perfilador):
+    global ultimo_perfil
+    ultimo_perfil = perfilador
+    salida_texto.config(state=tk.NORMAL)
+    salida_texto.insert(tk.END, "\n--- Perfil ---\n", "info")
+    salida_texto.insert(tk.END, perfilador.informe() + "\n", "info")
+    salida_texto.config(state=tk.DISABLED)
+    boton_guardar_perfil.config(state=tk.NORMAL)
+
+
+def guardar_perfil():
+    if ultimo_perfil is None:
+        return
+    ruta = filedialog.asksaveasfilename(
+        title="Guardar perfil", defaultextension=".pstats",
+        filetypes=[("Perfil de cProfile", "*.pstats"), ("Pilas colapsadas (flamegraph)", "*.txt")])
+    if ruta:
+        try:
+            ultimo_perfil.guardar(ruta)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo guardar el perfil: {e}")
+
+
+def mostrar_error_analisis(e):
+    _preparar_salida()
+    try:
+        if not isinstance(e, UnexpectedInput):
+            # Manejar otros errores inesperados
+            salida_texto.insert(tk.END, f"Error inesperado durante el análisis: {str(e)}\n", "error")
+            log_semantico.error("Error inesperado durante el análisis", exc_info=e)
+            return
+
         # Manejar errores sintácticos
         error_msg = f"✗ Error Sintáctico (Línea {e.line}, Col {e.column}):\n"
         # error_msg += f"Contexto: {e.get_context(codigo)}\n" # Puede ser muy largo
@@ -1172,153 +1391,200 @@ def analizar():
             entrada_texto.tag_add("error", inicio, fin)
             entrada_texto.tag_config("error", background="red", foreground="white")
         except tk.TclError: # En caso de que los índices no sean válidos
-             print(f"Error al resaltar línea {e.line}, col {e.column}")
-
-
-    except Exception as e:
-        # Manejar otros errores inesperados
-        salida_texto.insert(tk.END, f"Error inesperado durante el análisis: {str(e)}\n", "error")
-        import traceback
-        traceback.print_exc() # Imprimir traceback en consola para depuración
-
+             log_semantico.warning("Error al resaltar línea %s, col %s", e.line, e.column)
     finally:
         # Deshabilitar la edición del widget de salida
         salida_texto.config(state=tk.DISABLED)
 
 
+def al_modificar_texto(event=None):
+    # <<Modified>> solo se vuelve a generar si se limpia la marca de modificado
+    if not entrada_texto.edit_modified():
+        return
+    entrada_texto.edit_modified(False)
+    if analizar_al_escribir.get():
+        trabajador.programar(lambda: analizar(al_escribir=True))
+
+
 # Función para mostrar la tabla de símbolos en una nueva ventana (MODIFICADA)
 def mostrar_tabla_simbolos():
+    # Las filas se leen en el hilo del trabajador: así no se cruzan con un análisis en curso
+    trabajador.enviar(filas_tabla_simbolos, crear_ventana_tabla, mostrar_error_tabla,
+                      clave="tabla", descripcion="Leyendo la tabla de símbolos...")
+
+
+def filas_tabla_simbolos(avisar):
+    """Trabajo de fondo de mostrar_tabla_simbolos(): una lista de valores por símbolo."""
+    # Usar los símbolos del último análisis semántico exitoso (si hubo)
+    # Idealmente, 'analizar' debería guardar la tabla si no hay errores
+    # Por ahora, la obtenemos directamente del analizador
+    simbolos = semantic_analyzer.symbol_table.get_all_symbols() # Obtener todos los símbolos de todos los ámbitos
+
+    filas = []
+    for simbolo in simbolos:
+        scope_name = simbolo.scope.name if simbolo.scope else 'N/A'
+        scope_level = simbolo.scope.level if simbolo.scope else 'N/A'
+        valor_firma = simbolo.value if simbolo.kind in ['variable', 'constante'] and simbolo.value is not None else (simbolo.signature if simbolo.kind == 'funcion' else 'N/A')
+        ret_type = simbolo.return_type if simbolo.kind == 'funcion' else 'N/A'
+        num_params = len(simbolo.parameters) if simbolo.kind == 'funcion' else 'N/A'
+
+        filas.append([
+            simbolo.name,
+            simbolo.kind,
+            simbolo.sym_type,
+            scope_name,
+            scope_level,
+            simbolo.line,
+            simbolo.initialized,
+            simbolo.references,
+            str(valor_firma)[:100], # Limitar longitud para visualización
+            simbolo.is_constant,
+            simbolo.is_mutable,
+            ret_type,
+            num_params
+        ])
+    return {"filas": filas, "hubo_errores": bool(semantic_analyzer.errors)}
+
+
+# Columnas de la tabla semántica, en el orden de filas_tabla_simbolos()
+COLUMNAS_TABLA = [
+    "Nombre", "Categoría", "Tipo", "Ámbito", "Nivel Ámbito", "Línea Decl.",
+    "Inicializado", "Referencias", "Valor/Firma", "Constante", "Mutable",
+    "Tipo Retorno", "#Params", # Añade más según necesites: "Tamaño", "Dirección", etc.
+]
+
+# Una sola ventana de tabla; mientras está abierta se refresca en su sitio tras cada análisis
+ventana_tabla = None
+vista_simbolos = None
+aviso_tabla = None
+
+
+def tabla_abierta():
+    return ventana_tabla is not None and ventana_tabla.winfo_exists()
+
+
+def crear_ventana_tabla(resultado):
+    global ventana_tabla, vista_simbolos, aviso_tabla
     try:
-        
-        ventana_tabla = Toplevel(ventana)
-        ventana_tabla.title("Tabla de Símbolos (Semántica)")
-        ventana_tabla.geometry("1400x700") # Más ancha para más columnas
-        ventana_tabla.configure(bg="white")
-
-        # Usar los símbolos del último análisis semántico exitoso (si hubo)
-        # Idealmente, 'analizar' debería guardar la tabla si no hay errores
-        # Por ahora, la obtenemos directamente del analizador
-        simbolos = semantic_analyzer.symbol_table.get_all_symbols() # Obtener todos los símbolos de todos los ámbitos
-
-        if not simbolos:
-             # Comprobar si hubo errores semánticos que impidieron llenar la tabla
-             if semantic_analyzer.errors:
-                  tk.Label(ventana_tabla, text="El análisis semántico falló. No se generó la tabla completa.", fg="orange", bg="white", font=("Times New Roman", 12, "bold")).pack(pady=10)
-             else: # O si simplemente no había símbolos
-                  tk.Label(ventana_tabla, text="No se encontraron símbolos en el código o no se ha analizado.", fg="red", bg="white", font=("Times New Roman", 12, "bold")).pack(pady=10)
-             return
-
-        # Definir las columnas basadas en la nueva estructura SymbolEntry
-        columnas = [
-            "Nombre", "Categoría", "Tipo", "Ámbito", "Nivel Ámbito", "Línea Decl.",
-            "Inicializado", "Referencias", "Valor/Firma", "Constante", "Mutable",
-            "Tipo Retorno", "#Params", # Añade más según necesites: "Tamaño", "Dirección", etc.
-        ]
-
-        style = ttk.Style()
-        style.configure("Treeview", font=("Consolas", 10), background="white", foreground="black", rowheight=25, fieldbackground="white")
-        style.configure("Treeview.Heading", font=("Times New Roman", 11, "bold"), background="#EAECEE", foreground="#17202A")
-        style.map("Treeview.Heading", background=[("active", "#D5D8DC")])
-
-        tabla = ttk.Treeview(ventana_tabla, columns=columnas, show="headings", style="Treeview")
-
-        # Configurar columnas
-        for col in columnas:
-            tabla.heading(col, text=col)
-            tabla.column(col, width=110, anchor="w") # Anchor west para mejor lectura
-
-        tabla.column("Nombre", width=130)
-        tabla.column("Tipo", width=150)
-        tabla.column("Valor/Firma", width=200)
-        tabla.column("Línea Decl.", width=80, anchor="center")
-        tabla.column("Referencias", width=80, anchor="center")
-        tabla.column("Nivel Ámbito", width=80, anchor="center")
-
-        # Insertar datos desde los objetos SymbolEntry
-        for simbolo in simbolos:
-            scope_name = simbolo.scope.name if simbolo.scope else 'N/A'
-            scope_level = simbolo.scope.level if simbolo.scope else 'N/A'
-            valor_firma = simbolo.value if simbolo.kind in ['variable', 'constante'] and simbolo.value is not None else (simbolo.signature if simbolo.kind == 'funcion' else 'N/A')
-            ret_type = simbolo.return_type if simbolo.kind == 'funcion' else 'N/A'
-            num_params = len(simbolo.parameters) if simbolo.kind == 'funcion' else 'N/A'
-
-            valores = [
-                simbolo.name,
-                simbolo.kind,
-                simbolo.sym_type,
-                scope_name,
-                scope_level,
-                simbolo.line,
-                simbolo.initialized,
-                simbolo.references,
-                str(valor_firma)[:100], # Limitar longitud para visualización
-                simbolo.is_constant,
-                simbolo.is_mutable,
-                ret_type,
-                num_params
-            ]
-            tabla.insert("", "end", values=valores)
-
-        # Scrollbars
-        scroll_y = ttk.Scrollbar(ventana_tabla, orient="vertical", command=tabla.yview)
-        scroll_x = ttk.Scrollbar(ventana_tabla, orient="horizontal", command=tabla.xview)
-        tabla.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-
-        # Layout
-        tabla.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
-        scroll_y.grid(row=0, column=1, sticky="ns")
-        scroll_x.grid(row=1, column=0, sticky="ew", padx=10)
-        ventana_tabla.grid_rowconfigure(0, weight=1)
-        ventana_tabla.grid_columnconfigure(0, weight=1)
-
-    except UnexpectedInput as e:
-         messagebox.showerror("Error de Análisis Sintáctico", f"No se puede generar la tabla debido a un error sintáctico previo:\n{e}")
+        if tabla_abierta():
+            ventana_tabla.lift()
+        else:
+            ventana_tabla = Toplevel(ventana)
+            ventana_tabla.title("Tabla de Símbolos (Semántica)")
+            ventana_tabla.geometry("1400x700") # Más ancha para más columnas
+            ventana_tabla.configure(bg="white")
+
+            aviso_tabla = tk.Label(ventana_tabla, text="", bg="white", font=("Times New Roman", 12, "bold"))
+            aviso_tabla.pack(pady=(5, 0))
+
+            # Solo se crean las filas que caben en la ventana (ver vista_tabla.py)
+            vista_simbolos = VistaTablaVirtual(
+                ventana_tabla, COLUMNAS_TABLA, "Nombre", "Categoría", "Ámbito",
+                anchos={"Nombre": 130, "Tipo": 150, "Valor/Firma": 200, "Línea Decl.": 80,
+                        "Referencias": 80, "Nivel Ámbito": 80},
+                anclajes={"Línea Decl.": "center", "Referencias": "center", "Nivel Ámbito": "center"})
+            vista_simbolos.pack(fill="both", expand=True)
+        refrescar_tabla(resultado)
     except Exception as e:
-        messagebox.showerror("Error inesperado", f"Ocurrió un error al mostrar la tabla: {str(e)}")
-        import traceback
-        traceback.print_exc()
-
-
-# ... (resto de la configuración de la UI: ventana, frame, widgets, mainloop) ...
-ventana = tk.Tk()
-ventana.title("Analizador Sintáctico - Polux")
-ventana.geometry("900x600")
-ventana.configure(bg="#447091")
-
-style = ttk.Style()
-style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
-style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
-style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
-style.configure("TFrame", background="#447091")
-
-frame = ttk.Frame(ventana)
-frame.pack(padx=20, pady=20, fill="both", expand=True)
+        mostrar_error_tabla(e)
 
-etiqueta_entrada = ttk.Label(frame, text="Ingrese el código fuente:")
-etiqueta_entrada.pack(anchor="w")
 
-entrada_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1")
-entrada_texto.pack(pady=5)
-
-boton_analizar = ttk.Button(frame, text="Compilar", command=analizar)
-boton_analizar.pack(pady=10)
-
-boton_tabla = ttk.Button(frame, text="Ver Tabla de Símbolos", command=mostrar_tabla_simbolos)
-boton_tabla.pack(pady=5)
+def refrescar_tabla(resultado):
+    if not tabla_abierta():
+        return
+    filas = resultado["filas"]
 
-etiqueta_salida = ttk.Label(frame, text="Resultados del análisis sintáctico:")
-etiqueta_salida.pack(anchor="w")
+    if not filas:
+         # Comprobar si hubo errores semánticos que impidieron llenar la tabla
+         if resultado["hubo_errores"]:
+              aviso_tabla.config(text="El análisis semántico falló. No se generó la tabla completa.", fg="orange")
+         else: # O si simplemente no había símbolos
+              aviso_tabla.config(text="No se encontraron símbolos en el código o no se ha analizado.", fg="red")
+    else:
+        aviso_tabla.config(text="")
+    vista_simbolos.actualizar(filas)
 
-salida_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", state=tk.DISABLED)
-salida_texto.pack(pady=5)
 
-# Configurar estilos de texto
-salida_texto.tag_configure("success", foreground="green")
-salida_texto.tag_configure("info", foreground="blue")
-salida_texto.tag_configure("error", foreground="red")
+def mostrar_error_tabla(e):
+    if isinstance(e, UnexpectedInput):
+         messagebox.showerror("Error de Análisis Sintáctico", f"No se puede generar la tabla debido a un error sintáctico previo:\n{e}")
+    else:
+        messagebox.showerror("Error inesperado", f"Ocurrió un error al mostrar la tabla: {str(e)}")
+        log_semantico.error("Error al mostrar la tabla de símbolos", exc_info=e)
 
-# Asegúrate de reemplazar la llamada a extraer_simbolos y la tabla_simbolos global antigua
-# por el uso del semantic_analyzer.
 
-# Ejecutar la aplicación
-ventana.mainloop()
\ No newline at end of file
+# ... (resto de la configuración de la UI: ventana, frame, widgets, mainloop) ...
+if __name__ == "__main__":
+    ventana = tk.Tk()
+    ventana.title("Analizador Sintáctico - Polux")
+    ventana.geometry("900x600")
+    ventana.configure(bg="#447091")
+
+    style = ttk.Style()
+    style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
+    style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
+    style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
+    style.configure("TFrame", background="#447091")
+    # Estilo de la tabla de símbolos: se configura una vez, no cada vez que se abre
+    style.configure("Treeview", font=("Consolas", 10), background="white", foreground="black", rowheight=VistaTablaVirtual.ALTO_FILA, fieldbackground="white")
+    style.configure("Treeview.Heading", font=("Times New Roman", 11, "bold"), background="#EAECEE", foreground="#17202A")
+    style.map("Treeview.Heading", background=[("active", "#D5D8DC")])
+
+    frame = ttk.Frame(ventana)
+    frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+    etiqueta_entrada = ttk.Label(frame, text="Ingrese el código fuente:")
+    etiqueta_entrada.pack(anchor="w")
+
+    entrada_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1")
+    entrada_texto.pack(pady=5)
+
+    boton_analizar = ttk.Button(frame, text="Compilar", command=analizar)
+    boton_analizar.pack(pady=10)
+
+    boton_tabla = ttk.Button(frame, text="Ver Tabla de Símbolos", command=mostrar_tabla_simbolos)
+    boton_tabla.pack(pady=5)
+
+    # Analizar mientras se escribe (con retardo, ver POLUX_RETARDO_MS)
+    analizar_al_escribir = tk.BooleanVar(value=False)
+    casilla_al_escribir = tk.Checkbutton(frame, text="Analizar al escribir", variable=analizar_al_escribir,
+                                         bg="#447091", fg="white", selectcolor="#2C3E50", activebackground="#447091",
+                                         font=("Times New Roman", 11, "italic"))
+    casilla_al_escribir.pack(anchor="w")
+    entrada_texto.bind("<<Modified>>", al_modificar_texto)
+
+    # Perfilado: tiempos por fase y por método visitante, memoria pico y perfil de cProfile
+    perfilar_analisis = tk.BooleanVar(value=False)
+    casilla_perfilar = tk.Checkbutton(frame, text="Perfilar", variable=perfilar_analisis,
+                                      bg="#447091", fg="white", selectcolor="#2C3E50", activebackground="#447091",
+                                      font=("Times New Roman", 11, "italic"))
+    casilla_perfilar.pack(anchor="w")
+    boton_guardar_perfil = ttk.Button(frame, text="Guardar perfil...", command=guardar_perfil, state=tk.DISABLED)
+    boton_guardar_perfil.pack(anchor="w")
+
+    # El análisis corre en segundo plano; la barra indica la fase en curso
+    indicador = IndicadorProgreso(frame)
+    indicador.pack(anchor="w", pady=5)
+    trabajador = TrabajadorAnalisis(ventana, indicador)
+
+    etiqueta_salida = ttk.Label(frame, text="Resultados del análisis sintáctico:")
+    etiqueta_salida.pack(anchor="w")
+
+    salida_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", state=tk.DISABLED)
+    salida_texto.pack(pady=5)
+
+    # Configurar estilos de texto
+    salida_texto.tag_configure("success", foreground="green")
+    salida_texto.tag_configure("info", foreground="blue")
+    salida_texto.tag_configure("error", foreground="red")
+
+    # Asegúrate de reemplazar la llamada a extraer_simbolos y la tabla_simbolos global antigua
+    # por el uso del semantic_analyzer.
+
+    def cerrar_ventana():
+        trabajador.cerrar()
+        ventana.destroy()
+    ventana.protocol("WM_DELETE_WINDOW", cerrar_ventana)
+
+    # Ejecutar la aplicación
+    ventana.mainloop()
\ No newline at end of file
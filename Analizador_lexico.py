@@ -1,24 +1,36 @@
+import os
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-from lark import Lark
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 from lark.exceptions import UnexpectedInput
+from gramatica import cargar_parser
+from lexico_flujo import EstadisticasLexicas, analizar_archivo
+from sesion import SesionCompilacion
+from trabajador_analisis import IndicadorProgreso, TrabajadorAnalisis
+from registro import obtener_registro
 
-# Cargar la gramática desde el archivo EBNF
+log_gramatica = obtener_registro("gramatica")
+
+# Cargar la gramática desde el archivo EBNF (tablas LALR en caché)
 try:
-    with open("polux.txt", "r") as file:
-        grammar = file.read()
-    parser = Lark(grammar, parser="lalr")
-    print("Gramática válida")
+    parser = cargar_parser()
+    log_gramatica.info("Gramática válida")
 except Exception as e:
-    print(f"Error al cargar la gramática: {e}")
+    log_gramatica.error("Error al cargar la gramática: %s", e)
     exit(1)
 
+# Sesión de compilación: los tokens salen de la misma pasada que valida el código
+sesion = SesionCompilacion(parser)
+
+# Tokens que se escriben en el área de resultados; el resto solo cuenta en las estadísticas
+LIMITE_TOKENS_MOSTRADOS = 5000
+
 # Función para realizar el análisis léxico
 def analizador_lexico(codigo):
+    compilacion = sesion.compilar(codigo)
     try:
-        parser.parse(codigo)
-        tokens = list(parser.lex(codigo))
-        return tokens, None
+        if compilacion.error is not None:
+            raise compilacion.error
+        return compilacion.tokens, None
     except UnexpectedInput as error:
         return None, f"Error léxico en línea {error.line}, columna {error.column}: {error}"
 
@@ -34,59 +46,120 @@ def analizar():
         salida_texto.insert(tk.END, f"Error:\n{error}")
     else:
         salida_texto.insert(tk.END, "Tokens encontrados:\n")
-        tabla_simbolos = {}
-        for token in tokens:
-            salida_texto.insert(tk.END, f"Token: {token.value} \tCategoría: {token.type}\n")
-            if token.type not in tabla_simbolos:
-                tabla_simbolos[token.type] = []
-            tabla_simbolos[token.type].append(token.value)
-        tabla_simbolos_texto.insert(tk.END, "Tabla de símbolos:\n")
-        for tipo, valores in tabla_simbolos.items():
-            tabla_simbolos_texto.insert(tk.END, f"{tipo}:\n")
-            for valor in valores:
-                tabla_simbolos_texto.insert(tk.END, f"  - {valor}\n")
+        # Un solo insert con las primeras filas; las categorías se cuentan sin guardar cada valor
+        estadisticas = EstadisticasLexicas()
+        lineas = []
+        for token in estadisticas.contar(tokens):
+            if len(lineas) < LIMITE_TOKENS_MOSTRADOS:
+                lineas.append(f"Token: {token.value} \tCategoría: {token.type}\n")
+        salida_texto.insert(tk.END, "".join(lineas))
+        if estadisticas.total > LIMITE_TOKENS_MOSTRADOS:
+            salida_texto.insert(tk.END, f"... y {estadisticas.total - LIMITE_TOKENS_MOSTRADOS} tokens más "
+                                        "(use 'Analizar archivo' para volcarlos a disco)\n")
+        mostrar_categorias(estadisticas)
     salida_texto.config(state=tk.DISABLED)
     tabla_simbolos_texto.config(state=tk.DISABLED)
 
-# Crear la ventana principal
-ventana = tk.Tk()
-ventana.title("Analizador Léxico")
-ventana.geometry("900x700")
-ventana.configure(bg="#447091")
 
-style = ttk.Style()
-style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
-style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
-style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
-style.configure("TFrame", background="#447091")
+def mostrar_categorias(estadisticas):
+    tabla_simbolos_texto.insert(tk.END, "Tabla de símbolos:\n")
+    for tipo, datos in estadisticas.categorias.items():
+        tabla_simbolos_texto.insert(tk.END, f"{tipo} ({datos['cantidad']}):\n")
+        valores = datos["valores"]
+        texto = "".join(f"  - {valor}\n" for valor in valores)
+        if datos["cantidad"] > len(valores) and len(valores) == estadisticas.muestras:
+            texto += "  - ...\n"
+        tabla_simbolos_texto.insert(tk.END, texto)
+
+
+# Análisis en flujo de un archivo del disco (para archivos demasiado grandes para el editor)
+def analizar_archivo_en_flujo():
+    ruta = filedialog.askopenfilename(title="Archivo a analizar",
+                                      filetypes=[("Programas Polux", "*.polux"), ("Todos los archivos", "*.*")])
+    if not ruta:
+        return
+    volcado = filedialog.asksaveasfilename(title="Guardar los tokens (Cancelar para no guardarlos)",
+                                           defaultextension=".tsv",
+                                           filetypes=[("Tokens TSV", "*.tsv"), ("Tokens JSON Lines", "*.jsonl")])
+    formato = "jsonl" if volcado and volcado.endswith(".jsonl") else "tsv"
+    trabajador.enviar(lambda avisar: analizar_archivo(parser, ruta, volcado or None, formato, avisar=avisar),
+                      lambda estadisticas: mostrar_estadisticas(ruta, volcado, estadisticas),
+                      mostrar_error_archivo, clave="archivo", descripcion=f"Leyendo {os.path.basename(ruta)}...")
+
+
+def mostrar_estadisticas(ruta, volcado, estadisticas):
+    salida_texto.config(state=tk.NORMAL)
+    tabla_simbolos_texto.config(state=tk.NORMAL)
+    salida_texto.delete("1.0", tk.END)
+    tabla_simbolos_texto.delete("1.0", tk.END)
+    salida_texto.insert(tk.END, f"Archivo: {ruta}\n")
+    if volcado:
+        salida_texto.insert(tk.END, f"Tokens guardados en: {volcado}\n")
+    salida_texto.insert(tk.END, estadisticas.resumen() + "\n")
+    mostrar_categorias(estadisticas)
+    salida_texto.config(state=tk.DISABLED)
+    tabla_simbolos_texto.config(state=tk.DISABLED)
+
+
+def mostrar_error_archivo(error):
+    if isinstance(error, UnexpectedInput):
+        messagebox.showerror("Error léxico", f"Error léxico en línea {error.line}, columna {error.column}")
+    else:
+        messagebox.showerror("Error", f"No se pudo analizar el archivo: {error}")
+
+if __name__ == "__main__":
+    # Crear la ventana principal
+    ventana = tk.Tk()
+    ventana.title("Analizador Léxico")
+    ventana.geometry("900x700")
+    ventana.configure(bg="#447091")
+
+    style = ttk.Style()
+    style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
+    style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
+    style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
+    style.configure("TFrame", background="#447091")
+
+    frame = ttk.Frame(ventana)
+    frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+    # Marco para centrar los elementos
+    contenedor = ttk.Frame(frame)
+    contenedor.pack(expand=True)
+
+    etiqueta_entrada = ttk.Label(contenedor, text="Ingrese el código fuente:")
+    etiqueta_entrada.pack(anchor="w", pady=5)
 
-frame = ttk.Frame(ventana)
-frame.pack(padx=20, pady=20, fill="both", expand=True)
+    entrada_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833")
+    entrada_texto.pack(pady=5)
 
-# Marco para centrar los elementos
-contenedor = ttk.Frame(frame)
-contenedor.pack(expand=True)
+    boton_analizar = ttk.Button(contenedor, text="Compilar", command=analizar)
+    boton_analizar.pack(pady=10)
 
-etiqueta_entrada = ttk.Label(contenedor, text="Ingrese el código fuente:")
-etiqueta_entrada.pack(anchor="w", pady=5)
+    boton_archivo = ttk.Button(contenedor, text="Analizar archivo...", command=analizar_archivo_en_flujo)
+    boton_archivo.pack(pady=5)
 
-entrada_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833")
-entrada_texto.pack(pady=5)
+    # El análisis de archivos corre en segundo plano; la barra indica por dónde va
+    indicador = IndicadorProgreso(contenedor)
+    indicador.pack(anchor="w", pady=5)
+    trabajador = TrabajadorAnalisis(ventana, indicador)
 
-boton_analizar = ttk.Button(contenedor, text="Compilar", command=analizar)
-boton_analizar.pack(pady=10)
+    etiqueta_salida = ttk.Label(contenedor, text="Resultados del análisis léxico:")
+    etiqueta_salida.pack(anchor="w", pady=5)
 
-etiqueta_salida = ttk.Label(contenedor, text="Resultados del análisis léxico:")
-etiqueta_salida.pack(anchor="w", pady=5)
+    salida_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833", state=tk.DISABLED)
+    salida_texto.pack(pady=5)
 
-salida_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833", state=tk.DISABLED)
-salida_texto.pack(pady=5)
+    etiqueta_tabla = ttk.Label(contenedor, text="Tabla de símbolos:")
+    etiqueta_tabla.pack(anchor="w", pady=5)
 
-etiqueta_tabla = ttk.Label(contenedor, text="Tabla de símbolos:")
-etiqueta_tabla.pack(anchor="w", pady=5)
+    tabla_simbolos_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833", state=tk.DISABLED)
+    tabla_simbolos_texto.pack(pady=5)
 
-tabla_simbolos_texto = scrolledtext.ScrolledText(contenedor, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", fg="#1F2833", state=tk.DISABLED)
-tabla_simbolos_texto.pack(pady=5)
+    def cerrar_ventana():
+        trabajador.cerrar()
+        ventana.destroy()
+    ventana.protocol("WM_DELETE_WINDOW", cerrar_ventana)
 
-ventana.mainloop()
+    ventana.mainloop()
 
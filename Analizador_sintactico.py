@@ -1,106 +1,37 @@
 from lark import Lark, UnexpectedInput
 import tkinter as tk
-from tkinter import ttk, scrolledtext, Toplevel,  messagebox
+from tkinter import ttk, scrolledtext, Toplevel,  messagebox, filedialog
 from lark import Lark, UnexpectedInput, Tree, Token
-import pickle
+from gramatica import cargar_parser
+from almacen_simbolos import TablaSimbolos
+from perfilado import Perfilador, fase
+from sesion import SesionCompilacion
+from trabajador_analisis import IndicadorProgreso, TrabajadorAnalisis
+from vista_tabla import VistaTablaVirtual
+from expresiones import compilar_rpn
+from registro import obtener_registro, esta_activo
 
+log_gramatica = obtener_registro("gramatica")
+log_simbolos = obtener_registro("simbolos")
 
 
-# Cargar la gramática desde el archivo
+
+# Cargar la gramática desde el archivo (tablas LALR en caché)
 try:
-    with open("polux.txt", "r") as file:
-        grammar = file.read()
-    parser = Lark(grammar, parser="lalr", propagate_positions=True)
-    print("Gramática cargada correctamente.")
+    parser = cargar_parser(propagate_positions=True)
+    log_gramatica.info("Gramática cargada correctamente.")
 except Exception as e:
-    print(f"Error al cargar la gramática: {e}")
+    log_gramatica.error("Error al cargar la gramática: %s", e)
     exit(1)
 
-# Tabla de símbolos con manejo de desbordamiento
-class TablaSimbolos:
-    def __init__(self, capacidad=100):
-        self.capacidad = capacidad
-        self.simbolos = []  # Memoria principal
-        self.archivo_secundario = "simbolos_overflow.pkl"
-
-    def agregar(self, simbolo):
-
-        # Si no existe, agregarlo como nuevo símbolo
-        if len(self.simbolos) < self.capacidad:
-            self.simbolos.append(simbolo)
-        else:
-            with open(self.archivo_secundario, "ab") as f:
-                pickle.dump(simbolo, f)
-        print(f"Símbolo agregado: {simbolo}")  # Depuración
+# Tabla de símbolos con manejo de desbordamiento (ver almacen_simbolos.py)
+tabla_simbolos = TablaSimbolos()
 
-    def obtener_todos(self):
-        simbolos_totales = self.simbolos[:]
-        try:
-            with open(self.archivo_secundario, "rb") as f:
-                while True:
-                    simbolos_totales.append(pickle.load(f))
-        except (EOFError, FileNotFoundError):
-            pass  # Fin del archivo o archivo no encontrado
-        return simbolos_totales
-
-    def limpiar(self):
-        self.simbolos.clear()
-        open(self.archivo_secundario, "wb").close()  # Vaciar archivo
-
-    def incrementar_referencia(self, identificador):
-        """Incrementa el contador de referencias de un símbolo por su identificador"""
-        for simbolo in self.simbolos:
-            if simbolo["Identificador"] == identificador:
-                simbolo["Referencias"] += 1
-                print(f"Referencia incrementada para: {identificador}, Total: {simbolo['Referencias']}")
-                return
-        # Si no está en memoria principal, buscar en el archivo secundario
-        try:
-            with open(self.archivo_secundario, "rb") as f:
-                simbolos_secundarios = []
-                encontrado = False
-                while True:
-                    simbolo = pickle.load(f)
-                    if simbolo["Identificador"] == identificador:
-                        simbolo["Referencias"] += 1
-                        encontrado = True
-                    simbolos_secundarios.append(simbolo)
-        except (EOFError, FileNotFoundError):
-            pass  # Fin del archivo o archivo no encontrado
-
-        # Reescribir el archivo secundario con los cambios
-        if encontrado:
-            with open(self.archivo_secundario, "wb") as f:
-                for simbolo in simbolos_secundarios:
-                    pickle.dump(simbolo, f)
-            print(f"Referencia incrementada para: {identificador} en archivo secundario")
-
-# Algoritmo de Shunting Yard para evaluar expresiones matemáticas
+# Algoritmo de Shunting Yard: la expresión en notación polaca inversa, como texto.
+# Compila con expresiones.py (tokens del lexer de la gramática, caché por texto); para
+# evaluarla, usar directamente compilar_rpn(expresion).evaluar(variables).
 def shunting_yard(expresion):
-    precedencia = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
-    salida = []
-    operadores = []
-    tokens = expresion.split()
-    
-    for token in tokens:
-        if token.isnumeric():
-            salida.append(token)
-        elif token in precedencia:
-            while (operadores and operadores[-1] in precedencia and
-                   precedencia[operadores[-1]] >= precedencia[token]):
-                salida.append(operadores.pop())
-            operadores.append(token)
-        elif token == "(":
-            operadores.append(token)
-        elif token == ")":
-            while operadores and operadores[-1] != "(":
-                salida.append(operadores.pop())
-            operadores.pop()
-    
-    while operadores:
-        salida.append(operadores.pop())
-    
-    return " ".join(salida)
+    return " ".join(compilar_rpn(expresion).rpn)
 
 
 
@@ -154,18 +85,21 @@ def extraer_simbolos(tree, ambito="Global"):
                 return 'struct'
             elif node.data == 'type':
                 return get_identifier(node.children[0])  # Extrae el tipo explícito
-            elif node.data == 'expression':
-                # Intenta determinar el tipo de la expresión
+            elif node.data == 'grouped_expression':
+                # El tipo de una expresión entre paréntesis es el de la expresión interna
                 if len(node.children) == 1:
                     return determinar_tipo(node.children[0])
         return 'desconocido'
 
+    # Se consulta una sola vez: con la depuración apagada el bucle no formatea nada
+    depurar = esta_activo(log_simbolos)
     for node in tree.iter_subtrees():
         current_line = get_line(node)
-        print(f"Procesando nodo: {node.data}, Línea: {current_line}")
-        if node.data == "variable_declaration":
-            tipo = determinar_tipo(node.children[1]) if len(node.children) > 1 else "desconocido"
-            print(f"Tipo de dato detectado: {tipo}")
+        if depurar:
+            log_simbolos.debug("Procesando nodo: %s, Línea: %s", node.data, current_line)
+            if node.data == "variable_declaration":
+                tipo = determinar_tipo(node.children[1]) if len(node.children) > 1 else "desconocido"
+                log_simbolos.debug("Tipo de dato detectado: %s", tipo)
 
         # Variables globales
         if node.data == "variable_declaration":
@@ -188,7 +122,8 @@ def extraer_simbolos(tree, ambito="Global"):
             })
 
         elif node.data == "constant_declaration":
-            print(f"Determinando tipo para constante: {node}")
+            if depurar:
+                log_simbolos.debug("Determinando tipo para constante: %s", node)
             identificador = get_identifier(node.children[0])
             tipo = determinar_tipo(node.children[1]) if len(node.children) > 1 else "desconocido"
             valor = get_identifier(node.children[1]) if len(node.children) > 1 else "N/A"
@@ -324,8 +259,9 @@ def extraer_simbolos(tree, ambito="Global"):
                 continue
 
             identificador = get_identifier(node.children[0])
-            valor = get_identifier(node.children[1])
-            tipo = determinar_tipo(node.children[1])
+            # [variable, operador, valor]: el operador de asignación es el hijo del medio
+            valor = get_identifier(node.children[-1])
+            tipo = determinar_tipo(node.children[-1])
             tabla_simbolos.incrementar_referencia(identificador)
             simbolos.append({
                 "Identificador": identificador,
@@ -342,14 +278,27 @@ def extraer_simbolos(tree, ambito="Global"):
 
     return simbolos
 
+# Sesión de compilación: cada versión del código se parsea una vez (incrementalmente
+# respecto a la anterior) y sus símbolos se extraen una vez; todas las vistas la comparten
+sesion = SesionCompilacion(parser, extraer_simbolos=extraer_simbolos, incremental=True)
+
+
+def actualizar_tabla_global(simbolos):
+    tabla_simbolos.limpiar()  # Limpiar la tabla antes de cada análisis
+    for simbolo in simbolos:
+        tabla_simbolos.agregar(simbolo)
+
+
 # Función para el análisis sintáctico con manejo de errores mejorado
 def analizador_sintactico(codigo):
+    compilacion = sesion.compilar(codigo)
     try:
-        tabla_simbolos.limpiar()  # Limpiar la tabla antes de cada análisis
-        tree = parser.parse(codigo)
-        extraer_simbolos(tree)  # Extraer símbolos después del análisis
-        return tree, None  # Devuelve el árbol si no hay errores
+        if compilacion.error is not None:
+            raise compilacion.error
+        actualizar_tabla_global(compilacion.simbolos)
+        return compilacion.arbol, None  # Devuelve el árbol si no hay errores
     except UnexpectedInput as error:
+        tabla_simbolos.limpiar()
         # Obtener tokens esperados y filtrarlos
         tokens_esperados = error.accepts if hasattr(error, 'accepts') else []
         tokens_legibles = [t for t in tokens_esperados if not t.startswith("__ANON_")]
@@ -361,173 +310,311 @@ def analizador_sintactico(codigo):
     
 
 # Función para analizar código y mostrar errores en la interfaz
-def analizar():
+def analizar(al_escribir=False):
     # Obtener el código fuente del área de texto
     codigo = entrada_texto.get("1.0", tk.END).strip()
     
-    # Configurar el widget de salida
-    salida_texto.config(state=tk.NORMAL)
-    salida_texto.delete("1.0", tk.END)
-    
     # Verificar si hay código para analizar
     if not codigo:
-        salida_texto.insert(tk.END, "Error: No hay código para analizar\n", "error")
-        salida_texto.config(state=tk.DISABLED)
+        if not al_escribir:
+            salida_texto.config(state=tk.NORMAL)
+            salida_texto.delete("1.0", tk.END)
+            salida_texto.insert(tk.END, "Error: No hay código para analizar\n", "error")
+            salida_texto.config(state=tk.DISABLED)
         return
     
+    # Con "Perfilar" marcado cada fase se mide; ver perfilado.py
+    perfilador = Perfilador(memoria=True, cprofile=True) if perfilar_analisis.get() else None
+
+    # El análisis corre en el hilo del trabajador; un clic nuevo deja obsoleto el anterior
+    trabajador.enviar(lambda avisar: analizar_codigo(codigo, avisar, perfilador), mostrar_analisis,
+                      lambda error: mostrar_error_analisis(error, codigo), descripcion="Analizando...")
+
+
+def analizar_codigo(codigo, avisar, perfilador=None):
+    """Trabajo de fondo de analizar(): toma la compilación del código y prepara el texto a mostrar."""
+    # Análisis sintáctico y extracción de símbolos (una vez por versión del código)
+    avisar("Análisis sintáctico...")
+    sesion.perfilador = perfilador
     try:
-        # Realizar el análisis sintáctico
-        arbol = parser.parse(codigo)
-        
-        # Mostrar éxito en el análisis
-        salida_texto.insert(tk.END, "✓ Análisis sintáctico completado con éxito\n\n", "success")
-        
-        # Mostrar el árbol sintáctico (formateado)
-        salida_texto.insert(tk.END, "Árbol sintáctico generado:\n", "info")
-        salida_texto.insert(tk.END, arbol.pretty(), "info")
-        salida_texto.insert(tk.END, "\n\n")
-        
-        # Extraer símbolos y mostrar estadísticas
-        simbolos = extraer_simbolos(arbol)
-        salida_texto.insert(tk.END, f"Se encontraron {len(simbolos)} símbolos en el código\n", "info")
-        
+        compilacion = sesion.compilar(codigo)
+    finally:
+        sesion.perfilador = None
+    if compilacion.error is not None:
+        raise compilacion.error
+    
+    # El árbol formateado se genera aquí: en archivos grandes es lo más caro de mostrar
+    avisar("Formateando el árbol...")
+    with fase(perfilador, "formatear_arbol"):
+        arbol_formateado = compilacion.derivado("arbol_formateado", lambda c: c.arbol.pretty())
+    
+    with fase(perfilador, "tabla"):
         # Actualizar la tabla de símbolos global
-        global tabla_simbolos
-        tabla_simbolos.limpiar()
-        for simbolo in simbolos:
-            tabla_simbolos.agregar(simbolo)
+        simbolos = compilacion.simbolos
+        actualizar_tabla_global(simbolos)
         
-        # Mostrar resumen de categorías
+        # Resumen de categorías
         categorias = {}
         for s in simbolos:
             categorias[s["Categoría"]] = categorias.get(s["Categoría"], 0) + 1
-        
-        salida_texto.insert(tk.END, "Resumen por categorías:\n", "info")
-        for cat, cantidad in categorias.items():
-            salida_texto.insert(tk.END, f"- {cat}: {cantidad}\n", "info")
+        filas = compilacion.derivado("filas", lambda c: filas_de_simbolos(c.simbolos))
+    return {"arbol": arbol_formateado, "total": len(simbolos), "categorias": categorias, "filas": filas,
+            "perfilador": perfilador}
+
+
+def mostrar_analisis(resultado):
+    perfilador = resultado["perfilador"]
+    with fase(perfilador, "interfaz"):  # La inserción del árbol en el widget también se mide
+        insertar_analisis(resultado)
+    if perfilador is not None:
+        mostrar_perfil(perfilador)
+
+
+def insertar_analisis(resultado):
+    salida_texto.config(state=tk.NORMAL)
+    salida_texto.delete("1.0", tk.END)
+    entrada_texto.tag_remove("error", "1.0", tk.END)
     
-    except UnexpectedInput as e:
-        # Manejar errores sintácticos
-        error_msg = f"✗ Error sintáctico en línea {e.line}, columna {e.column}:\n"
-        error_msg += f"Contexto: {e.get_context(codigo)}\n"
-        error_msg += f"Se esperaba: {', '.join(e.accepts) if hasattr(e, 'accepts') else 'desconocido'}\n"
-        
-        salida_texto.insert(tk.END, error_msg, "error")
-        
-        # Resaltar el error en el código
-        inicio = f"{e.line}.{e.column}"
-        fin = f"{e.line}.{e.column + 5}"
-        entrada_texto.tag_add("error", inicio, fin)
-        entrada_texto.tag_config("error", background="red", foreground="white")
+    # Mostrar éxito en el análisis
+    salida_texto.insert(tk.END, "✓ Análisis sintáctico completado con éxito\n\n", "success")
     
-    except Exception as e:
-        # Manejar otros errores inesperados
-        salida_texto.insert(tk.END, f"Error inesperado: {str(e)}\n", "error")
+    # Mostrar el árbol sintáctico (formateado)
+    salida_texto.insert(tk.END, "Árbol sintáctico generado:\n", "info")
+    salida_texto.insert(tk.END, resultado["arbol"], "info")
+    salida_texto.insert(tk.END, "\n\n")
+    
+    # Mostrar estadísticas
+    salida_texto.insert(tk.END, f"Se encontraron {resultado['total']} símbolos en el código\n", "info")
+    
+    salida_texto.insert(tk.END, "Resumen por categorías:\n", "info")
+    for cat, cantidad in resultado["categorias"].items():
+        salida_texto.insert(tk.END, f"- {cat}: {cantidad}\n", "info")
+    
+    # Deshabilitar la edición del widget de salida
+    salida_texto.config(state=tk.DISABLED)
+    
+    # Si la tabla está abierta, se refresca en su sitio con los símbolos nuevos
+    refrescar_tabla(resultado["filas"])
+
+
+# Perfil del último análisis con "Perfilar" marcado, para "Guardar perfil..."
+ultimo_perfil = None
+
+
+def mostrar_perfil(perfilador):
+    global ultimo_perfil
+    ultimo_perfil = perfilador
+    salida_texto.config(state=tk.NORMAL)
+    salida_texto.insert(tk.END, "\n--- Perfil ---\n", "info")
+    salida_texto.insert(tk.END, perfilador.informe() + "\n", "info")
+    salida_texto.config(state=tk.DISABLED)
+    boton_guardar_perfil.config(state=tk.NORMAL)
+
+
+def guardar_perfil():
+    if ultimo_perfil is None:
+        return
+    ruta = filedialog.asksaveasfilename(
+        title="Guardar perfil", defaultextension=".pstats",
+        filetypes=[("Perfil de cProfile", "*.pstats"), ("Pilas colapsadas (flamegraph)", "*.txt")])
+    if ruta:
+        try:
+            ultimo_perfil.guardar(ruta)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo guardar el perfil: {e}")
+
+
+def mostrar_error_analisis(e, codigo):
+    salida_texto.config(state=tk.NORMAL)
+    salida_texto.delete("1.0", tk.END)
+    entrada_texto.tag_remove("error", "1.0", tk.END)
+    
+    try:
+        if isinstance(e, UnexpectedInput):
+            # Manejar errores sintácticos
+            error_msg = f"✗ Error sintáctico en línea {e.line}, columna {e.column}:\n"
+            error_msg += f"Contexto: {e.get_context(codigo)}\n"
+            error_msg += f"Se esperaba: {', '.join(e.accepts) if hasattr(e, 'accepts') else 'desconocido'}\n"
+            
+            salida_texto.insert(tk.END, error_msg, "error")
+            
+            # Resaltar el error en el código
+            inicio = f"{e.line}.{e.column}"
+            fin = f"{e.line}.{e.column + 5}"
+            entrada_texto.tag_add("error", inicio, fin)
+            entrada_texto.tag_config("error", background="red", foreground="white")
+        else:
+            # Manejar otros errores inesperados
+            salida_texto.insert(tk.END, f"Error inesperado: {str(e)}\n", "error")
     
     finally:
         # Deshabilitar la edición del widget de salida
         salida_texto.config(state=tk.DISABLED)
 
+
+def al_modificar_texto(event=None):
+    # <<Modified>> solo se vuelve a generar si se limpia la marca de modificado
+    if not entrada_texto.edit_modified():
+        return
+    entrada_texto.edit_modified(False)
+    if analizar_al_escribir.get():
+        trabajador.programar(lambda: analizar(al_escribir=True))
+
 # Función para mostrar la tabla de símbolos en una nueva ventana
 def mostrar_tabla_simbolos():
-    try:
-        ventana_tabla = Toplevel(ventana)
-        ventana_tabla.title("Tabla de Símbolos")
-        ventana_tabla.geometry("1200x600")
-        ventana_tabla.configure(bg="white")  # Fondo blanco
-
-        # Obtener el código actual
-        codigo = entrada_texto.get("1.0", tk.END).strip()
-        if not codigo:
-            tk.Label(ventana_tabla, text="No hay código para analizar", fg="red", bg="white", font=("Times New Roman", 12, "bold")).pack(pady=10)
-            return
-
-        # Parsear y extraer símbolos
-        arbol = parser.parse(codigo)
-        simbolos = extraer_simbolos(arbol)
-
-        # Crear Treeview
-        columnas = [
-            "Identificador", "Categoría", "Tipo de Dato", "Ámbito",
-            "Dirección", "Línea", "Valor", "Estado", "Estructura", "Referencias"
-        ]
-
-        style = ttk.Style()
-        style.configure("Treeview", font=("Consolas", 10), background="white", foreground="black", rowheight=25, fieldbackground="white")
-        style.configure("Treeview.Heading", font=("Times New Roman", 12, "bold"), background="white", foreground="#1F2833")  # Azul oscuro
-        style.map("Treeview.Heading", background=[("active", "#E67E22")])
-
-        tabla = ttk.Treeview(ventana_tabla, columns=columnas, show="headings", style="Treeview")
-
-        # Configurar columnas
-        for col in columnas:
-            tabla.heading(col, text=col)
-            tabla.column(col, width=120, anchor="center")
-
-        # Insertar datos
-        if not simbolos:
-            tk.Label(ventana_tabla, text="No se encontraron símbolos", fg="red", bg="white", font=("Times New Roman", 12, "bold")).pack(pady=10)
-        else:
-            for simbolo in simbolos:
-                valores = [simbolo.get(col, "") for col in columnas]
-                tabla.insert("", "end", values=valores)
-
-            # Configurar scrollbars
-            scroll_y = ttk.Scrollbar(ventana_tabla, orient="vertical", command=tabla.yview)
-            scroll_x = ttk.Scrollbar(ventana_tabla, orient="horizontal", command=tabla.xview)
-            tabla.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-
-            # Layout
-            tabla.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
-            scroll_y.grid(row=0, column=1, sticky="ns")
-            scroll_x.grid(row=1, column=0, sticky="ew", padx=10)
-            ventana_tabla.grid_rowconfigure(0, weight=1)
-            ventana_tabla.grid_columnconfigure(0, weight=1)
-
-    except UnexpectedInput as e:
-        messagebox.showerror("Error de análisis", f"Error sintáctico: {e}")
-    except Exception as e:
-        messagebox.showerror("Error inesperado", f"Ocurrió un error: {str(e)}")
+    # Obtener el código actual
+    codigo = entrada_texto.get("1.0", tk.END).strip()
+    if not codigo:
+        crear_ventana_tabla(None)
+        return
 
+    # Parsear y extraer símbolos en el hilo del trabajador
+    trabajador.enviar(lambda avisar: simbolos_del_codigo(codigo, avisar), crear_ventana_tabla,
+                      mostrar_error_tabla, clave="tabla", descripcion="Extrayendo símbolos...")
 
-# Configuración de la interfaz gráfica
-ventana = tk.Tk()
-ventana.title("Analizador Sintáctico - Polux")
-ventana.geometry("900x600")
-ventana.configure(bg="#447091")
 
-style = ttk.Style()
-style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
-style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
-style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
-style.configure("TFrame", background="#447091")
+def simbolos_del_codigo(codigo, avisar):
+    avisar("Análisis sintáctico...")
+    compilacion = sesion.compilar(codigo) # Ya compilado si no cambió desde 'Compilar'
+    if compilacion.error is not None:
+        raise compilacion.error
+    return compilacion.derivado("filas", lambda c: filas_de_simbolos(c.simbolos))
 
-frame = ttk.Frame(ventana)
-frame.pack(padx=20, pady=20, fill="both", expand=True)
 
-etiqueta_entrada = ttk.Label(frame, text="Ingrese el código fuente:")
-etiqueta_entrada.pack(anchor="w")
+# Columnas de la tabla de símbolos (claves de los diccionarios de extraer_simbolos)
+COLUMNAS_TABLA = [
+    "Identificador", "Categoría", "Tipo de Dato", "Ámbito",
+    "Dirección", "Línea", "Valor", "Estado", "Estructura", "Referencias"
+]
 
-entrada_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1")
-entrada_texto.pack(pady=5)
+# Una sola ventana de tabla; mientras está abierta se refresca en su sitio tras cada análisis
+ventana_tabla = None
+vista_simbolos = None
+aviso_tabla = None
 
-boton_analizar = ttk.Button(frame, text="Compilar", command=analizar)
-boton_analizar.pack(pady=10)
 
-boton_tabla = ttk.Button(frame, text="Ver Tabla de Símbolos", command=mostrar_tabla_simbolos)
-boton_tabla.pack(pady=5)
+def filas_de_simbolos(simbolos):
+    return [[simbolo.get(col, "") for col in COLUMNAS_TABLA] for simbolo in simbolos]
 
-etiqueta_salida = ttk.Label(frame, text="Resultados del análisis sintáctico:")
-etiqueta_salida.pack(anchor="w")
 
-salida_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", state=tk.DISABLED)
-salida_texto.pack(pady=5)
+def tabla_abierta():
+    return ventana_tabla is not None and ventana_tabla.winfo_exists()
+
+
+def crear_ventana_tabla(filas):
+    global ventana_tabla, vista_simbolos, aviso_tabla
+    try:
+        if tabla_abierta():
+            ventana_tabla.lift()
+        else:
+            ventana_tabla = Toplevel(ventana)
+            ventana_tabla.title("Tabla de Símbolos")
+            ventana_tabla.geometry("1200x600")
+            ventana_tabla.configure(bg="white")  # Fondo blanco
+
+            aviso_tabla = tk.Label(ventana_tabla, text="", fg="red", bg="white", font=("Times New Roman", 12, "bold"))
+            aviso_tabla.pack(pady=(5, 0))
+
+            # Solo se crean las filas que caben en la ventana (ver vista_tabla.py)
+            vista_simbolos = VistaTablaVirtual(
+                ventana_tabla, COLUMNAS_TABLA, "Identificador", "Categoría", "Ámbito",
+                anchos={col: 120 for col in COLUMNAS_TABLA}, anclajes={col: "center" for col in COLUMNAS_TABLA})
+            vista_simbolos.pack(fill="both", expand=True)
+        refrescar_tabla(filas)
+    except Exception as e:
+        mostrar_error_tabla(e)
+
+
+def refrescar_tabla(filas):
+    if not tabla_abierta():
+        return
+    if filas is None:
+        aviso_tabla.config(text="No hay código para analizar")
+        filas = []
+    elif not filas:
+        aviso_tabla.config(text="No se encontraron símbolos")
+    else:
+        aviso_tabla.config(text="")
+    vista_simbolos.actualizar(filas)
+
+
+def mostrar_error_tabla(e):
+    if isinstance(e, UnexpectedInput):
+        messagebox.showerror("Error de análisis", f"Error sintáctico: {e}")
+    else:
+        messagebox.showerror("Error inesperado", f"Ocurrió un error: {str(e)}")
 
-# Configurar estilos de texto
-salida_texto.tag_configure("success", foreground="green")
-salida_texto.tag_configure("info", foreground="blue")
-salida_texto.tag_configure("error", foreground="red")
 
-ventana.mainloop()
+if __name__ == "__main__":
+    # Configuración de la interfaz gráfica
+    ventana = tk.Tk()
+    ventana.title("Analizador Sintáctico - Polux")
+    ventana.geometry("900x600")
+    ventana.configure(bg="#447091")
+
+    style = ttk.Style()
+    style.configure("TButton", font=("Times New Roman", 12, "bold italic"), padding=8, relief="flat")
+    style.map("TButton", background=[("active", "#E67E22"), ("!disabled", "#D35400")], foreground=[("active", "white"), ("!disabled", "#447091")])
+    style.configure("TLabel", font=("Times New Roman", 12, "bold italic"), background="#447091", foreground="white")
+    style.configure("TFrame", background="#447091")
+    # Estilo de la tabla de símbolos: se configura una vez, no cada vez que se abre
+    style.configure("Treeview", font=("Consolas", 10), background="white", foreground="black", rowheight=VistaTablaVirtual.ALTO_FILA, fieldbackground="white")
+    style.configure("Treeview.Heading", font=("Times New Roman", 12, "bold"), background="white", foreground="#1F2833")  # Azul oscuro
+    style.map("Treeview.Heading", background=[("active", "#E67E22")])
+
+    frame = ttk.Frame(ventana)
+    frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+    etiqueta_entrada = ttk.Label(frame, text="Ingrese el código fuente:")
+    etiqueta_entrada.pack(anchor="w")
+
+    entrada_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1")
+    entrada_texto.pack(pady=5)
+
+    boton_analizar = ttk.Button(frame, text="Compilar", command=analizar)
+    boton_analizar.pack(pady=10)
+
+    boton_tabla = ttk.Button(frame, text="Ver Tabla de Símbolos", command=mostrar_tabla_simbolos)
+    boton_tabla.pack(pady=5)
+
+    # Analizar mientras se escribe (con retardo, ver POLUX_RETARDO_MS)
+    analizar_al_escribir = tk.BooleanVar(value=False)
+    casilla_al_escribir = tk.Checkbutton(frame, text="Analizar al escribir", variable=analizar_al_escribir,
+                                         bg="#447091", fg="white", selectcolor="#2C3E50", activebackground="#447091",
+                                         font=("Times New Roman", 11, "italic"))
+    casilla_al_escribir.pack(anchor="w")
+    entrada_texto.bind("<<Modified>>", al_modificar_texto)
+
+    # Perfilado: tiempos por fase, memoria pico y perfil de cProfile
+    perfilar_analisis = tk.BooleanVar(value=False)
+    casilla_perfilar = tk.Checkbutton(frame, text="Perfilar", variable=perfilar_analisis,
+                                      bg="#447091", fg="white", selectcolor="#2C3E50", activebackground="#447091",
+                                      font=("Times New Roman", 11, "italic"))
+    casilla_perfilar.pack(anchor="w")
+    boton_guardar_perfil = ttk.Button(frame, text="Guardar perfil...", command=guardar_perfil, state=tk.DISABLED)
+    boton_guardar_perfil.pack(anchor="w")
+
+    # El análisis corre en segundo plano; la barra indica la fase en curso
+    indicador = IndicadorProgreso(frame)
+    indicador.pack(anchor="w", pady=5)
+    trabajador = TrabajadorAnalisis(ventana, indicador)
+
+    etiqueta_salida = ttk.Label(frame, text="Resultados del análisis sintáctico:")
+    etiqueta_salida.pack(anchor="w")
+
+    salida_texto = scrolledtext.ScrolledText(frame, width=90, height=10, font=("Consolas", 10), bg="#ECF0F1", state=tk.DISABLED)
+    salida_texto.pack(pady=5)
+
+    # Configurar estilos de texto
+    salida_texto.tag_configure("success", foreground="green")
+    salida_texto.tag_configure("info", foreground="blue")
+    salida_texto.tag_configure("error", foreground="red")
+
+    def cerrar_ventana():
+        trabajador.cerrar()
+        ventana.destroy()
+    ventana.protocol("WM_DELETE_WINDOW", cerrar_ventana)
+
+    ventana.mainloop()
 
 
@@ -0,0 +1,269 @@
+"""
+Tabla de símbolos con memoria secundaria indexada.
+
+TablaSimbolos guarda los primeros 'capacidad' símbolos en memoria y manda el resto a
+un AlmacenDesborde: un archivo de registros con un índice hash en memoria
+(identificador, ámbito) -> desplazamiento y una caché LRU acotada de registros ya
+decodificados. El contador de referencias vive en la cabecera fija de cada registro,
+así que incrementar_referencia escribe 8 bytes en su sitio en lugar de reescribir el
+archivo completo.
+
+Formato de cada registro:
+
+    estado (B) | referencias (q) | longitud (I) | capacidad (I) | pickle del símbolo
+
+'capacidad' es el espacio reservado para el pickle; si una versión nueva del símbolo
+cabe, se sobrescribe en su sitio, y si no, el registro viejo se marca como borrado y se
+añade uno nuevo al final.
+"""
+import os
+import pickle
+import struct
+from collections import OrderedDict
+
+from formato_tabla import escribir_tabla, registro_de_fila
+from registro import obtener_registro, esta_activo
+
+log_simbolos = obtener_registro("simbolos")
+
+ARCHIVO_DESBORDE = "simbolos_overflow.dat"
+AMBITO_POR_DEFECTO = "Global"
+
+_CABECERA = struct.Struct("<BqII")
+_REFERENCIAS = struct.Struct("<q")
+_DESPLAZAMIENTO_REFERENCIAS = 1  # Las referencias van justo después del byte de estado
+_VIVO = 1
+_BORRADO = 0
+
+
+def clave_simbolo(simbolo):
+    """Clave única de un símbolo: (identificador, ámbito)."""
+    return simbolo["Identificador"], simbolo.get("Ámbito", AMBITO_POR_DEFECTO)
+
+
+class AlmacenDesborde:
+    """Registros de símbolos en disco con índice hash y caché LRU de entradas calientes."""
+
+    def __init__(self, ruta=ARCHIVO_DESBORDE, capacidad_cache=1024, tamano_bloque=1 << 20):
+        self.ruta = ruta
+        self.capacidad_cache = capacidad_cache
+        self.tamano_bloque = tamano_bloque
+        self._archivo = None  # Se abre (y se vacía) la primera vez que hace falta escribir
+        self._escrito = 0  # Bytes ya volcados al archivo
+        self._pendiente = bytearray()  # Registros añadidos que aún no se volcaron
+        self._fin = 0
+        self._indice = {}  # {(identificador, ámbito): desplazamiento}, en orden de inserción
+        self._primero = {}  # {identificador: clave} del primer símbolo con ese nombre
+        self._cache = OrderedDict()  # {clave: símbolo decodificado}, el más reciente al final
+        self.borrados = 0
+
+    def __len__(self):
+        return len(self._indice)
+
+    def __contains__(self, clave):
+        return clave in self._indice
+
+    def _abrir(self):
+        if self._archivo is None:
+            # El archivo es espacio de trabajo de esta tabla: no se reutilizan datos viejos
+            self._archivo = open(self.ruta, "w+b", buffering=0)
+        return self._archivo.fileno()
+
+    def _volcar(self):
+        if self._pendiente:
+            os.pwrite(self._abrir(), self._pendiente, self._escrito)
+            self._escrito += len(self._pendiente)
+            self._pendiente.clear()
+
+    def _agregar_al_final(self, datos):
+        """Añade bytes al final; se acumulan en memoria y se vuelcan por bloques."""
+        desplazamiento = self._fin
+        self._pendiente += datos
+        self._fin += len(datos)
+        if len(self._pendiente) >= self.tamano_bloque:
+            self._volcar()
+        return desplazamiento
+
+    def _escribir(self, desplazamiento, datos):
+        """Sobrescribe bytes existentes, estén ya en disco o todavía pendientes."""
+        if desplazamiento >= self._escrito:
+            inicio = desplazamiento - self._escrito
+            self._pendiente[inicio:inicio + len(datos)] = datos
+        else:
+            os.pwrite(self._abrir(), datos, desplazamiento)
+
+    def _leer(self, desplazamiento, longitud):
+        if desplazamiento >= self._escrito:
+            inicio = desplazamiento - self._escrito
+            return bytes(self._pendiente[inicio:inicio + longitud])
+        return os.pread(self._abrir(), longitud, desplazamiento)
+
+    def _leer_registro(self, desplazamiento):
+        cabecera = self._leer(desplazamiento, _CABECERA.size)
+        _, referencias, longitud, _ = _CABECERA.unpack(cabecera)
+        simbolo = pickle.loads(self._leer(desplazamiento + _CABECERA.size, longitud))
+        simbolo["Referencias"] = referencias
+        return simbolo
+
+    def _recordar(self, clave, simbolo):
+        self._cache[clave] = simbolo
+        self._cache.move_to_end(clave)
+        if len(self._cache) > self.capacidad_cache:
+            self._cache.popitem(last=False)
+
+    def guardar(self, simbolo):
+        """Inserta un símbolo o reemplaza el que tenga la misma clave."""
+        clave = clave_simbolo(simbolo)
+        datos = pickle.dumps(simbolo, pickle.HIGHEST_PROTOCOL)
+        referencias = simbolo.get("Referencias", 0)
+        desplazamiento = self._indice.get(clave)
+
+        if desplazamiento is not None:
+            _, _, _, capacidad = _CABECERA.unpack(self._leer(desplazamiento, _CABECERA.size))
+            if len(datos) <= capacidad:
+                self._escribir(desplazamiento, _CABECERA.pack(_VIVO, referencias, len(datos), capacidad) + datos)
+                self._cache.pop(clave, None)
+                return
+            # No cabe: el registro viejo queda como hueco y se escribe uno nuevo al final
+            self._escribir(desplazamiento, bytes([_BORRADO]))
+            self._cache.pop(clave, None)
+            self.borrados += 1
+
+        desplazamiento = self._agregar_al_final(_CABECERA.pack(_VIVO, referencias, len(datos), len(datos)) + datos)
+        self._indice[clave] = desplazamiento
+        self._primero.setdefault(clave[0], clave)
+        # Las inserciones no entran en la caché: solo las lecturas e incrementos la calientan
+
+    def clave_de(self, identificador, ambito=None):
+        """Clave del símbolo pedido; sin ámbito, la del primero que se guardó con ese nombre."""
+        if ambito is None:
+            return self._primero.get(identificador)
+        clave = (identificador, ambito)
+        return clave if clave in self._indice else None
+
+    def obtener(self, clave):
+        """Devuelve una copia del símbolo o None si no está."""
+        simbolo = self._cache.get(clave)
+        if simbolo is None:
+            desplazamiento = self._indice.get(clave)
+            if desplazamiento is None:
+                return None
+            simbolo = self._leer_registro(desplazamiento)
+        self._recordar(clave, simbolo)
+        return dict(simbolo)
+
+    def incrementar_referencia(self, clave, cantidad=1):
+        """Suma 'cantidad' al contador del símbolo en su sitio. Devuelve el total o None."""
+        desplazamiento = self._indice.get(clave)
+        if desplazamiento is None:
+            return None
+        simbolo = self._cache.get(clave)
+        if simbolo is None:
+            simbolo = self._leer_registro(desplazamiento)
+        simbolo["Referencias"] += cantidad
+        self._recordar(clave, simbolo)
+        self._escribir(desplazamiento + _DESPLAZAMIENTO_REFERENCIAS, _REFERENCIAS.pack(simbolo["Referencias"]))
+        return simbolo["Referencias"]
+
+    def todos(self):
+        """Todos los símbolos vivos en orden de inserción, leyendo el archivo una sola vez."""
+        if not self._indice:
+            return []
+        self._volcar()
+        with open(self.ruta, "rb") as archivo:
+            datos = archivo.read(self._fin)
+        simbolos = []
+        for desplazamiento in self._indice.values():
+            _, referencias, longitud, _ = _CABECERA.unpack_from(datos, desplazamiento)
+            inicio = desplazamiento + _CABECERA.size
+            simbolo = pickle.loads(datos[inicio:inicio + longitud])
+            simbolo["Referencias"] = referencias
+            simbolos.append(simbolo)
+        return simbolos
+
+    def limpiar(self):
+        self._indice.clear()
+        self._primero.clear()
+        self._cache.clear()
+        self.borrados = 0
+        self._pendiente.clear()
+        self._escrito = self._fin = 0
+        if self._archivo is not None:
+            self._archivo.truncate(0)
+        elif os.path.exists(self.ruta):
+            open(self.ruta, "wb").close()
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._volcar()
+            self._archivo.close()
+            self._archivo = None
+
+
+# Tabla de símbolos con manejo de desbordamiento
+class TablaSimbolos:
+    def __init__(self, capacidad=100, archivo_secundario=ARCHIVO_DESBORDE, capacidad_cache=1024):
+        self.capacidad = capacidad
+        self.simbolos = []  # Memoria principal
+        self._posiciones = {}  # {(identificador, ámbito): índice en self.simbolos}
+        self._primero = {}  # {identificador: clave} del primer símbolo en memoria con ese nombre
+        self.archivo_secundario = archivo_secundario
+        self.desborde = AlmacenDesborde(archivo_secundario, capacidad_cache)
+
+    def __len__(self):
+        return len(self.simbolos) + len(self.desborde)
+
+    def agregar(self, simbolo):
+        """Agrega un símbolo; si ya hay uno con el mismo identificador y ámbito, lo reemplaza."""
+        clave = clave_simbolo(simbolo)
+        posicion = self._posiciones.get(clave)
+        if posicion is not None:
+            self.simbolos[posicion] = simbolo
+        elif clave not in self.desborde and len(self.simbolos) < self.capacidad:
+            self._posiciones[clave] = len(self.simbolos)
+            self._primero.setdefault(clave[0], clave)
+            self.simbolos.append(simbolo)
+        else:
+            self.desborde.guardar(simbolo)
+        if esta_activo(log_simbolos):
+            log_simbolos.debug("Símbolo agregado: %s", simbolo)
+
+    def obtener(self, identificador, ambito=None):
+        """Busca un símbolo por identificador (y ámbito); sin ámbito devuelve el primero registrado."""
+        clave = self._primero.get(identificador) if ambito is None else (identificador, ambito)
+        posicion = self._posiciones.get(clave)
+        if posicion is not None:
+            return self.simbolos[posicion]
+        clave = self.desborde.clave_de(identificador, ambito)
+        return self.desborde.obtener(clave) if clave is not None else None
+
+    def obtener_todos(self):
+        return self.simbolos + self.desborde.todos()
+
+    def exportar(self, ruta):
+        """Guarda todos los símbolos en el formato compacto de formato_tabla.py."""
+        return escribir_tabla(ruta, (registro_de_fila(s) for s in self.obtener_todos()))
+
+    def limpiar(self):
+        self.simbolos.clear()
+        self._posiciones.clear()
+        self._primero.clear()
+        self.desborde.limpiar()
+
+    def cerrar(self):
+        self.desborde.cerrar()
+
+    def incrementar_referencia(self, identificador, ambito=None):
+        """Incrementa el contador de referencias de un símbolo por su identificador (y ámbito)"""
+        clave = self._primero.get(identificador) if ambito is None else (identificador, ambito)
+        posicion = self._posiciones.get(clave)
+        if posicion is not None:
+            simbolo = self.simbolos[posicion]
+            simbolo["Referencias"] += 1
+            log_simbolos.debug("Referencia incrementada para: %s, Total: %s", identificador, simbolo["Referencias"])
+            return
+        # Si no está en memoria principal, se actualiza el registro en el archivo secundario
+        clave = self.desborde.clave_de(identificador, ambito)
+        if clave is not None:
+            total = self.desborde.incrementar_referencia(clave)
+            log_simbolos.debug("Referencia incrementada para: %s en archivo secundario, Total: %s", identificador, total)
@@ -0,0 +1,73 @@
+"""
+Mide la resolución de identificadores en ámbitos muy anidados: un programa con una
+variable global 'g', N funciones anidadas (cada una abre un ámbito) y, en la más
+interna, muchas lecturas de 'g'. Compara el índice de enlaces de
+SymbolTableManager.lookup (O(1)) con el recorrido de la cadena de ámbitos
+(Scope.lookup, O(profundidad)).
+
+Uso:
+    python benchmarks/bench_anidamiento.py [--profundidades 50 200 800] [--usos 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+
+
+def programa_anidado(profundidad, usos):
+    lineas = ["int g = 1"]
+    lineas += [f"do function f_{i}() || int a_{i} = g" for i in range(profundidad)]
+    lineas += [f"int u_{i} = g" for i in range(usos)]
+    lineas += ["||"] * profundidad
+    return "\n".join(lineas) + "\n"
+
+
+def medir(analizador, arbol, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        analizador.start_analysis(arbol)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    if analizador.errors:
+        raise AssertionError(f"errores inesperados: {analizador.errors[:3]}")
+    return mejor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--profundidades", type=int, nargs="+", default=[50, 200, 800])
+    argumentos.add_argument("--usos", type=int, default=2000)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    opciones = argumentos.parse_args()
+
+    # El recorrido del árbol es recursivo: varios marcos por función anidada
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 30 * max(opciones.profundidades) + 1000))
+
+    modulo = cargar_modulo_semantico()
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    analizador = modulo.SemanticAnalyzer()
+    indice = modulo.SymbolTableManager.lookup
+
+    def por_cadena(self, name):
+        return self.current_scope.lookup(name, check_parents=True)
+
+    print(f"{'profundidad':>12} {'índice (ms)':>12} {'cadena (ms)':>12}")
+    for profundidad in opciones.profundidades:
+        arbol = parser.parse(programa_anidado(profundidad, opciones.usos))
+        tiempos = []
+        for resolucion in (indice, por_cadena):
+            modulo.SymbolTableManager.lookup = resolucion
+            try:
+                tiempos.append(medir(analizador, arbol, opciones.repeticiones))
+            finally:
+                modulo.SymbolTableManager.lookup = indice
+        print(f"{profundidad:>12} {tiempos[0] * 1e3:>12.2f} {tiempos[1] * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
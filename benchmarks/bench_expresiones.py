@@ -0,0 +1,127 @@
+"""
+Mide el rendimiento (expresiones por segundo) del evaluador RPN de expresiones.py sobre
+expresiones aritméticas y relacionales generadas al azar con int, float e identificadores:
+
+  parser        solo el parseo de la expresión con el parser LALR de la gramática (referencia)
+  sin caché     compilar a RPN (lexer + Shunting Yard) y evaluar, en cada evaluación
+  con caché     compilar_rpn con la caché LRU (un acierto) y evaluar
+  precompilado  solo ProgramaRPN.evaluar
+
+Cada ronda recorre --distintas expresiones distintas, con otros valores de las variables.
+
+Uso:
+    python benchmarks/bench_expresiones.py [--distintas 200] [--rondas 50] [--repeticiones 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expresiones import CompiladorRPN  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+
+VARIABLES = ("x", "y", "z", "total", "paso")
+
+
+def expresion_al_azar(azar, profundidad):
+    """Texto de una expresión aritmética (sin divisores que puedan valer 0)."""
+    if profundidad == 0 or azar.random() < 0.25:
+        eleccion = azar.random()
+        if eleccion < 0.4:
+            return azar.choice(VARIABLES)
+        if eleccion < 0.7:
+            return str(azar.randint(0, 100))
+        return f"{azar.uniform(0, 100):.2f}"
+    operador = azar.choice("+-*/%")
+    izquierda = expresion_al_azar(azar, profundidad - 1)
+    if operador in "/%":
+        return f"{izquierda} {operador} {azar.randint(1, 9)}"
+    derecha = expresion_al_azar(azar, profundidad - 1)
+    texto = f"{izquierda} {operador} {derecha}"
+    return f"({texto})" if azar.random() < 0.5 else texto
+
+
+def generar(distintas, semilla):
+    azar = random.Random(semilla)
+    expresiones = []
+    while len(expresiones) < distintas:
+        texto = expresion_al_azar(azar, 4)
+        if azar.random() < 0.3:
+            texto = f"{texto} < {expresion_al_azar(azar, 2)} AND NOT x == {azar.randint(0, 9)}"
+        expresiones.append(texto)
+    return expresiones
+
+
+def ligaduras(rondas, semilla):
+    azar = random.Random(semilla + 1)
+    return [{nombre: azar.choice((azar.randint(1, 50), azar.uniform(0.5, 50.0))) for nombre in VARIABLES}
+            for _ in range(rondas)]
+
+
+def mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--distintas", type=int, default=200)
+    argumentos.add_argument("--rondas", type=int, default=50)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--semilla", type=int, default=0)
+    opciones = argumentos.parse_args()
+
+    parser = cargar_parser()
+    expresiones = generar(opciones.distintas, opciones.semilla)
+    valores = ligaduras(opciones.rondas, opciones.semilla)
+    sin_cache = CompiladorRPN(parser, capacidad=0)
+    con_cache = CompiladorRPN(parser)
+    programas = [con_cache.compilar(texto) for texto in expresiones]
+
+    # Los tres caminos del evaluador tienen que dar lo mismo
+    for variables in valores[:3]:
+        for texto, programa in zip(expresiones, programas):
+            if not (sin_cache.evaluar(texto, variables) == con_cache.evaluar(texto, variables)
+                    == programa.evaluar(variables)):
+                print(f"'{texto}': los resultados difieren")
+                return 1
+
+    def parsear():
+        for _ in valores:
+            for texto in expresiones:
+                parser.parse(texto)
+
+    def evaluar_con(compilador):
+        def medir():
+            for variables in valores:
+                for texto in expresiones:
+                    compilador.evaluar(texto, variables)
+        return medir
+
+    def precompilado():
+        for variables in valores:
+            for programa in programas:
+                programa.evaluar(variables)
+
+    total = len(expresiones) * len(valores)
+    operaciones = sum(len(programa) for programa in programas) / len(programas)
+    print(f"{len(expresiones)} expresiones ({operaciones:.1f} operaciones RPN de media) x {len(valores)} rondas")
+    print(f"{'modo':<14} {'tiempo (ms)':>12} {'expresiones/s':>15}")
+    for nombre, funcion in (("parser", parsear), ("sin caché", evaluar_con(sin_cache)),
+                            ("con caché", evaluar_con(con_cache)), ("precompilado", precompilado)):
+        segundos = mejor_tiempo(funcion, opciones.repeticiones)
+        print(f"{nombre:<14} {segundos * 1e3:>12.1f} {total / segundos:>15,.0f}")
+    print(f"caché: {con_cache.aciertos} aciertos, {con_cache.fallos} fallos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Mide por separado cada fase del compilador sobre programas sintéticos de varios tamaños
+(generador_polux.py) y guarda los resultados en JSON para comparar entre commits.
+
+Fases:
+  gramatica         cargar_parser() sin caché en disco (construye las tablas LALR) y con ella
+  lexico            recorrer parser.lex(codigo)
+  sintactico        parser.parse(codigo) con las opciones del analizador semántico
+  extraer_simbolos  Analizador_sintactico.extraer_simbolos sobre su propio árbol
+  semantico         SemanticAnalyzer.start_analysis(arbol)
+  exportar_plxs     symbol_table.export_symbols() (formato_tabla.py)
+  exportar_json     registro_de_simbolo() de cada símbolo y json.dump, como compilador_batch
+
+De cada fase se guardan el mejor tiempo y la mediana de --repeticiones ejecuciones.
+Con --comparar se muestra la variación frente a un JSON anterior y el programa termina
+con código 1 si alguna fase empeoró más que --umbral.
+
+Uso:
+    python benchmarks/bench_fases.py [--tamanos pequeno mediano grande] [--repeticiones 5]
+                                     [--salida fases.json] [--comparar base.json] [--umbral 0.10]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import lark
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Analizador_sintactico  # noqa: E402
+import gramatica  # noqa: E402
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from formato_tabla import registro_de_simbolo  # noqa: E402
+from generador_polux import TAMANOS, GeneradorPolux  # noqa: E402
+
+VERSION_RESULTADOS = 1
+FASES = ("lexico", "sintactico", "extraer_simbolos", "semantico", "exportar_plxs", "exportar_json")
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """{"mejor", "mediana"} en segundos; preparar() se llama antes de cada ejecución, sin medirla."""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {"mejor": min(tiempos), "mediana": statistics.median(tiempos)}
+
+
+def commit_actual():
+    """(commit abreviado, hay cambios sin guardar) del repositorio, o (None, None) sin git."""
+    directorio = gramatica.DIRECTORIO_BASE
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=directorio, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directorio,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(cambios)
+
+
+def medir_gramatica(repeticiones):
+    def olvidar():
+        gramatica._parsers.clear()  # Sin esto cargar_parser devuelve el parser ya construido
+    opciones = {"propagate_positions": True, "keep_all_tokens": True}
+    return {
+        "sin_cache": medir(lambda: gramatica.cargar_parser(usar_cache=False, **opciones), repeticiones, olvidar),
+        "con_cache": medir(lambda: gramatica.cargar_parser(**opciones), repeticiones, olvidar),
+    }
+
+
+def medir_programa(codigo, repeticiones, directorio):
+    parser = gramatica.cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    # El analizador sintáctico usa su propio parser (sin keep_all_tokens) y su árbol es otro
+    arbol_sintactico = Analizador_sintactico.parser.parse(codigo)
+    analizador = cargar_modulo_semantico().SemanticAnalyzer()
+    arbol = parser.parse(codigo)
+    analizador.start_analysis(arbol)
+    simbolos = analizador.symbol_table.get_all_symbols()
+    ruta_plxs = os.path.join(directorio, "tabla.plxs")
+    ruta_json = os.path.join(directorio, "tabla.json")
+
+    def exportar_json():
+        with open(ruta_json, "w", encoding="utf-8") as destino:
+            json.dump([registro_de_simbolo(s) for s in analizador.symbol_table.get_all_symbols()], destino,
+                      ensure_ascii=False)
+
+    fases = {
+        "lexico": medir(lambda: sum(1 for _ in parser.lex(codigo)), repeticiones),
+        "sintactico": medir(lambda: parser.parse(codigo), repeticiones),
+        "extraer_simbolos": medir(lambda: Analizador_sintactico.extraer_simbolos(arbol_sintactico), repeticiones),
+        "semantico": medir(lambda: analizador.start_analysis(arbol), repeticiones),
+        "exportar_plxs": medir(lambda: analizador.symbol_table.export_symbols(ruta_plxs), repeticiones),
+        "exportar_json": medir(exportar_json, repeticiones),
+    }
+    datos = {"lineas": codigo.count("\n"), "caracteres": len(codigo), "tokens": sum(1 for _ in parser.lex(codigo)),
+             "simbolos": len(simbolos), "errores": len(analizador.errors)}
+    return datos, fases
+
+
+def comparar(anterior, actual, umbral):
+    """Imprime la variación de cada fase frente a 'anterior'; devuelve cuántas empeoraron más que 'umbral'."""
+    print(f"\nComparación con {anterior.get('commit') or '?'} ({anterior.get('fecha', '?')}), mejor tiempo:")
+    print(f"{'tamaño':<10} {'fase':<18} {'antes (ms)':>11} {'ahora (ms)':>11} {'cambio':>8}")
+    filas = [("-", "gramatica." + nombre, anterior.get("gramatica", {}).get(nombre), medida)
+             for nombre, medida in actual["gramatica"].items()]
+    previos = {programa["tamano"]: programa for programa in anterior.get("programas", [])}
+    for programa in actual["programas"]:
+        previo = previos.get(programa["tamano"])
+        if previo is None:
+            continue
+        if previo.get("perillas") != programa["perillas"]:
+            print(f"(el programa '{programa['tamano']}' se generó con otras perillas; no se compara)")
+            continue
+        filas += [(programa["tamano"], fase, previo["fases"].get(fase), medida)
+                  for fase, medida in programa["fases"].items()]
+
+    peores = 0
+    for tamano, fase, antes, ahora in filas:
+        if antes is None:
+            continue
+        cambio = ahora["mejor"] / antes["mejor"] - 1 if antes["mejor"] else 0.0
+        marca = "  <-- más lento" if cambio > umbral else ""
+        peores += cambio > umbral
+        print(f"{tamano:<10} {fase:<18} {antes['mejor'] * 1e3:>11.2f} {ahora['mejor'] * 1e3:>11.2f} "
+              f"{cambio:>+8.1%}{marca}")
+    return peores
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--tamanos", nargs="+", choices=list(TAMANOS), default=["pequeno", "mediano", "grande"])
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    argumentos.add_argument("--semilla", type=int, default=0)
+    argumentos.add_argument("--salida", help="JSON de resultados (por omisión, bench_fases_<commit>.json)")
+    argumentos.add_argument("--comparar", metavar="JSON", help="Resultados anteriores con los que comparar")
+    argumentos.add_argument("--umbral", type=float, default=0.10, help="Empeoramiento tolerado (0.10 = 10%%)")
+    opciones = argumentos.parse_args()
+
+    # Las expresiones y los bloques anidados se recorren recursivamente
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    commit, sucio = commit_actual()
+    resultados = {
+        "version": VERSION_RESULTADOS,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "cambios_sin_guardar": sucio,
+        "python": platform.python_version(),
+        "lark": lark.__version__,
+        "plataforma": platform.platform(),
+        "repeticiones": opciones.repeticiones,
+        "gramatica": medir_gramatica(opciones.repeticiones),
+        "programas": [],
+    }
+    print(f"{'tamaño':<10} {'fase':<18} {'mejor (ms)':>11} {'mediana (ms)':>13}")
+    for nombre, medida in resultados["gramatica"].items():
+        print(f"{'-':<10} {'gramatica.' + nombre:<18} {medida['mejor'] * 1e3:>11.2f} {medida['mediana'] * 1e3:>13.2f}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in opciones.tamanos:
+            perillas = dict(TAMANOS[tamano], semilla=opciones.semilla)
+            codigo = GeneradorPolux(**perillas).generar()
+            datos, fases = medir_programa(codigo, opciones.repeticiones, directorio)
+            resultados["programas"].append(dict(tamano=tamano, perillas=perillas, fases=fases, **datos))
+            print(f"{tamano:<10} {datos['lineas']} líneas, {datos['tokens']} tokens, {datos['simbolos']} símbolos, "
+                  f"{datos['errores']} errores")
+            for fase in FASES:
+                medida = fases[fase]
+                print(f"{'':<10} {fase:<18} {medida['mejor'] * 1e3:>11.2f} {medida['mediana'] * 1e3:>13.2f}")
+
+    salida = opciones.salida or f"bench_fases_{commit or datetime.date.today().isoformat()}.json"
+    with open(salida, "w", encoding="utf-8") as destino:
+        json.dump(resultados, destino, ensure_ascii=False, indent=2)
+        destino.write("\n")
+    print(f"\nResultados guardados en {salida}")
+
+    if opciones.comparar:
+        with open(opciones.comparar, "r", encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+        if comparar(anterior, resultados, opciones.umbral):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Mide la compilación incremental (compilacion_incremental.py) frente a la completa
+(parse + start_analysis) en un programa de unas N líneas, con ediciones de una línea:
+
+  literal      cambia un literal dentro de una función
+  uso          cambia el identificador que usa una sentencia
+  declaracion  renombra una variable global (se reanalizan las sentencias que la usan)
+  insercion    inserta una línea nueva (desplaza todo lo que viene después)
+  borrado      borra esa línea otra vez
+
+Con --verificar compara, después de cada edición, errores y tabla de símbolos con un
+análisis completo del mismo texto.
+
+Uso:
+    python benchmarks/bench_incremental.py [--lineas 5000] [--repeticiones 5] [--verificar]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilacion_incremental import CompilacionIncremental  # noqa: E402
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+
+
+def bloque(i):
+    """Unas 10 líneas con declaraciones, una función, una clase y estructuras de control."""
+    return [
+        f"int v_{i} = {i}",
+        f"cte c_{i} = {i} * 2",
+        f"do function f_{i}(a, b) ||",
+        f"    int t_{i} = a + b * v_{i}",
+        f"    show(t_{i})",
+        "||",
+        f"f_{i}(v_{i}, 2)",
+        f"while (v_{i} < 10) || v_{i} += 1 ||",
+        f"if (v_{i} == 3) || show(v_{i}) || else || show(c_{i}) ||",
+        f"class C_{i} || int px = 0 do function mover(d) || px = px + d || ||",
+    ]
+
+
+def programa(lineas):
+    texto = []
+    i = 0
+    while len(texto) < lineas:
+        texto += bloque(i)
+        i += 1
+    return "\n".join(texto) + "\n", i
+
+
+def ediciones(texto, bloques):
+    """(nombre, texto antes, texto después) de cada escenario, en un bloque de la mitad del programa."""
+    medio = bloques // 2
+    linea = f"    int t_{medio} = a + b * v_{medio}"
+    insertado = texto.replace(linea + "\n", linea + f"\n    show(c_{medio})\n", 1)
+    return [
+        ("literal", texto, texto.replace(f"int v_{medio} = {medio}\n", f"int v_{medio} = {medio + 7}\n", 1)),
+        ("uso", texto, texto.replace(f"show(t_{medio})", f"show(v_{medio})", 1)),
+        ("declaracion", texto, texto.replace(f"int v_{medio} = {medio}\n", f"int w_{medio} = {medio}\n", 1)),
+        ("insercion", texto, insertado),
+        ("borrado", insertado, texto),
+    ]
+
+
+def estado(analizador):
+    simbolos = [(s.name, s.kind, s.sym_type, s.scope.name if s.scope else None, s.line,
+                 s.initialized, s.references) for s in analizador.symbol_table.get_all_symbols()]
+    return list(analizador.errors), simbolos
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--lineas", type=int, default=5000)
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    argumentos.add_argument("--verificar", action="store_true")
+    opciones = argumentos.parse_args()
+
+    modulo = cargar_modulo_semantico()
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    texto, bloques = programa(opciones.lineas)
+
+    completo = modulo.SemanticAnalyzer()
+    inicio = time.perf_counter()
+    completo.start_analysis(parser.parse(texto))
+    segundos_completo = time.perf_counter() - inicio
+    print(f"Programa: {texto.count(chr(10))} líneas, compilación completa {segundos_completo * 1e3:.1f} ms")
+
+    incremental = CompilacionIncremental(parser, modulo.SemanticAnalyzer())
+    inicio = time.perf_counter()
+    incremental.compilar(texto)
+    print(f"Primera compilación incremental (todo el documento): {(time.perf_counter() - inicio) * 1e3:.1f} ms\n")
+
+    print(f"{'edición':<12} {'mejor (ms)':>11} {'mediana (ms)':>13} {'reparseadas':>12} {'reanalizadas':>13}")
+    for nombre, antes, editado in ediciones(texto, bloques):
+        tiempos = []
+        for _ in range(opciones.repeticiones):
+            # Cada repetición parte del mismo texto para medir siempre la misma edición
+            incremental.compilar(antes)
+            inicio = time.perf_counter()
+            incremental.compilar(editado)
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos.sort()
+        estadisticas = incremental.estadisticas
+        print(f"{nombre:<12} {tiempos[0] * 1e3:>11.2f} {tiempos[len(tiempos) // 2] * 1e3:>13.2f} "
+              f"{estadisticas.get('reparseados', 0):>12} {estadisticas.get('reanalizados', 0):>13}")
+        if opciones.verificar:
+            completo.start_analysis(parser.parse(editado))
+            if estado(completo) != estado(incremental.analizador):
+                raise AssertionError(f"la edición '{nombre}' no coincide con el análisis completo")
+
+    if opciones.verificar:
+        print("\nTodas las ediciones coinciden con el análisis completo.")
+
+
+if __name__ == "__main__":
+    main()
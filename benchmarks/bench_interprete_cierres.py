@@ -0,0 +1,75 @@
+"""
+Compara el intérprete que compila el árbol a cierres (interprete_cierres.py) con el
+intérprete directo que despacha por node.data en cada visita (interprete_arbol.py), en
+los programas de bucles de benchmarks/bench_maquina_virtual.py. La máquina virtual
+(maquina_virtual.py) queda como referencia.
+
+La compilación a cierres y la generación del bytecode se miden aparte: se hacen una vez
+por programa. Antes de medir se comprueba que los tres ejecutores escriben la misma salida.
+
+Uso:
+    python benchmarks/bench_interprete_cierres.py [--iteraciones 100000] [--repeticiones 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_maquina_virtual import PROGRAMAS, mejor_tiempo  # noqa: E402
+from codigo_intermedio import generar_codigo  # noqa: E402
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from interprete_arbol import interpretar  # noqa: E402
+from interprete_cierres import InterpreteCierres  # noqa: E402
+from maquina_virtual import ejecutar_programa  # noqa: E402
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--iteraciones", type=int, default=100000)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--programas", nargs="+", choices=list(PROGRAMAS), default=list(PROGRAMAS))
+    opciones = argumentos.parse_args()
+
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    modulo_semantico = cargar_modulo_semantico()
+    print(f"{'programa':<10} {'compilar (ms)':>14} {'árbol (ms)':>11} {'cierres (ms)':>13} {'aceleración':>12} "
+          f"{'vm (ms)':>10}")
+    for nombre in opciones.programas:
+        codigo = PROGRAMAS[nombre](opciones.iteraciones)
+        arbol = parser.parse(codigo)
+        analizador = modulo_semantico.SemanticAnalyzer()
+        analizador.start_analysis(arbol)
+        if analizador.errors:
+            print(f"{nombre}: el programa tiene errores semánticos:", *analizador.errors, sep="\n  ")
+            return 1
+
+        salidas = [io.StringIO() for _ in range(3)]
+        interprete = InterpreteCierres(salidas[1])
+        inicio = time.perf_counter()
+        compilado = interprete.compilar(arbol)
+        compilar = time.perf_counter() - inicio
+        programa = generar_codigo(arbol, analizador)
+
+        interpretar(arbol, salidas[0])
+        interprete.ejecutar_compilado(compilado)
+        ejecutar_programa(programa, salidas[2])
+        if len({salida.getvalue() for salida in salidas}) != 1:
+            print(f"{nombre}: la salida difiere\n  árbol:   {salidas[0].getvalue()!r}\n"
+                  f"  cierres: {salidas[1].getvalue()!r}\n  vm:      {salidas[2].getvalue()!r}")
+            return 1
+
+        interprete.salida = io.StringIO()
+        arbol_ms = mejor_tiempo(lambda: interpretar(arbol, io.StringIO()), opciones.repeticiones)
+        cierres_ms = mejor_tiempo(lambda: interprete.ejecutar_compilado(compilado), opciones.repeticiones)
+        vm_ms = mejor_tiempo(lambda: ejecutar_programa(programa, io.StringIO()), opciones.repeticiones)
+        print(f"{nombre:<10} {compilar * 1e3:>14.2f} {arbol_ms * 1e3:>11.1f} {cierres_ms * 1e3:>13.1f} "
+              f"{arbol_ms / cierres_ms:>11.1f}x {vm_ms * 1e3:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
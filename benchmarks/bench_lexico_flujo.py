@@ -0,0 +1,74 @@
+"""
+Compara el análisis léxico de un archivo generado de varios MB de dos formas:
+
+  lista   leer el archivo entero, list(parser.lex(texto)) y un dict de listas de valores
+          por categoría (lo que hacía el analizador léxico)
+  flujo   lexico_flujo.analizar_archivo: trozos de 64 KB, estadísticas en memoria constante
+
+Mide tiempo y, en una segunda pasada, memoria pico (tracemalloc, que la hace mucho más
+lenta) de cada una; la de flujo también con volcado de los tokens a disco.
+
+Uso:
+    python benchmarks/bench_lexico_flujo.py [--lineas 200000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_incremental import programa  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from lexico_flujo import analizar_archivo  # noqa: E402
+
+
+def en_lista(parser, ruta):
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        texto = archivo.read()
+    tokens = list(parser.lex(texto))
+    categorias = {}
+    for token in tokens:
+        categorias.setdefault(token.type, []).append(token.value)
+    return len(tokens)
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--lineas", type=int, default=200000)
+    opciones = argumentos.parse_args()
+
+    parser = cargar_parser()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "grande.polux")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(programa(opciones.lineas)[0])
+        volcado = os.path.join(directorio, "tokens.tsv")
+        print(f"Archivo: {os.path.getsize(ruta) / 2**20:.1f} MB, {opciones.lineas} líneas\n")
+
+        casos = [
+            ("lista", lambda: en_lista(parser, ruta)),
+            ("flujo", lambda: analizar_archivo(parser, ruta).total),
+            ("flujo + volcado", lambda: analizar_archivo(parser, ruta, volcado).total),
+        ]
+        print(f"{'modo':<16} {'tokens':>10} {'tiempo (s)':>11} {'pico (MB)':>10}")
+        for nombre, funcion in casos:
+            tokens, segundos, pico = medir(funcion)
+            print(f"{nombre:<16} {tokens:>10} {segundos:>11.2f} {pico / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara el análisis de programas con muchas cadenas largas usando la gramática actual
+(cadenas, caracteres y comentarios como un solo token) y la anterior, donde cada
+carácter de una cadena era un árbol 'char' propio. Mide tiempo de parseo y memoria
+pico (tracemalloc) con las opciones del analizador semántico.
+
+Uso:
+    python benchmarks/bench_literales.py [--cadenas 50] [--longitudes 100 1000 5000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+from lark import Lark
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gramatica import cargar_parser, leer_gramatica  # noqa: E402
+
+# Reglas por carácter de la gramática anterior, en lugar de los terminales actuales
+_REGLAS_POR_CARACTER = {
+    "string_literal: STRING_LITERAL": 'string_literal: "\\"" char* "\\""\nchar: /[^\\"]/',
+    "char_literal: CHAR_LITERAL": "char_literal: \"'\" char_in_single_quotes \"'\"\nchar_in_single_quotes: /[^']/",
+}
+
+
+def gramatica_por_caracter():
+    gramatica = leer_gramatica()
+    for actual, anterior in _REGLAS_POR_CARACTER.items():
+        if actual not in gramatica:
+            raise SystemExit(f"La gramática ya no contiene '{actual}'")
+        gramatica = gramatica.replace(actual, anterior)
+    return gramatica
+
+
+def programa_con_cadenas(cantidad, longitud):
+    # Sin espacios dentro de la cadena: la gramática anterior los descartaba
+    texto = ("abcdefghij" * (longitud // 10 + 1))[:longitud]
+    lineas = [f'string s_{i} = "{texto}"' for i in range(cantidad)]
+    lineas += [f">> comentario {i}" for i in range(cantidad)]
+    lineas += [f"char c_{i} = 'x'" for i in range(cantidad)]
+    return "\n".join(lineas) + "\n"
+
+
+def medir(parser, codigo, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        parser.parse(codigo)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    tracemalloc.start()
+    arbol = parser.parse(codigo)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    nodos = sum(1 for _ in arbol.iter_subtrees())
+    return mejor, pico, nodos
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--cadenas", type=int, default=50)
+    argumentos.add_argument("--longitudes", type=int, nargs="+", default=[100, 1000, 5000])
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    opciones = argumentos.parse_args()
+
+    parsers = {
+        "token": cargar_parser(propagate_positions=True, keep_all_tokens=True),
+        "por carácter": Lark(gramatica_por_caracter(), parser="lalr", propagate_positions=True, keep_all_tokens=True),
+    }
+
+    print(f"{'longitud':>9} {'gramática':>13} {'parseo (ms)':>12} {'pico (MB)':>10} {'nodos':>10}")
+    for longitud in opciones.longitudes:
+        codigo = programa_con_cadenas(opciones.cadenas, longitud)
+        for nombre, parser in parsers.items():
+            segundos, pico, nodos = medir(parser, codigo, opciones.repeticiones)
+            print(f"{longitud:>9} {nombre:>13} {segundos * 1e3:>12.1f} {pico / 2**20:>10.1f} {nodos:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compara la máquina virtual de pila (maquina_virtual.py) con el intérprete directo del árbol
+(interprete_arbol.py) en programas de bucles y aritmética.
+
+Programas:
+  bucle       un 'while' de --iteraciones vueltas que acumula una expresión aritmética
+  anidado     dos 'for' anidados sobre arreglos literales, con if/else en el cuerpo
+  llamadas    un 'while' que llama a una función y a un método en cada vuelta
+
+La generación del bytecode (codigo_intermedio.py) se mide aparte: se hace una vez por
+programa. Antes de medir se comprueba que los dos ejecutores escriben la misma salida.
+
+Uso:
+    python benchmarks/bench_maquina_virtual.py [--iteraciones 100000] [--repeticiones 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigo_intermedio import generar_codigo  # noqa: E402
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from interprete_arbol import interpretar  # noqa: E402
+from maquina_virtual import ejecutar_programa  # noqa: E402
+
+
+def programa_bucle(iteraciones):
+    return "\n".join([
+        "int i = 0",
+        "int total = 0",
+        f"while (i < {iteraciones}) ||",
+        "    total = (total + i * 3 - i / 2) % 1000003",
+        "    i += 1",
+        "||",
+        "show(i, total)",
+    ])
+
+
+def programa_anidado(iteraciones):
+    lado = max(1, int(iteraciones ** 0.5) // 10)
+    elementos = ", ".join(str(k) for k in range(10))
+    return "\n".join([
+        "int pares = 0",
+        "int suma = 0",
+        "int vuelta = 0",
+        f"while (vuelta < {lado * lado}) ||",
+        f"    for (a in [{elementos}]) ||",
+        "        if (a % 2 == 0) || pares += 1 || else || suma = suma + a * vuelta - 1 ||",
+        "    ||",
+        "    vuelta += 1",
+        "||",
+        "show(pares, suma)",
+    ])
+
+
+def programa_llamadas(iteraciones):
+    return "\n".join([
+        "int acumulado = 0",
+        "do function sumar(x) || acumulado = acumulado + x * 2 ||",
+        "class Contador || int cuenta = 0 do function avanzar(paso) || cuenta = cuenta + paso || ||",
+        "c = Contador()",
+        "int i = 0",
+        f"while (i < {iteraciones // 4}) ||",
+        "    sumar(i)",
+        "    c.avanzar(i % 3)",
+        "    i += 1",
+        "||",
+        "show(acumulado)",
+    ])
+
+
+PROGRAMAS = {"bucle": programa_bucle, "anidado": programa_anidado, "llamadas": programa_llamadas}
+
+
+def mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--iteraciones", type=int, default=100000)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--programas", nargs="+", choices=list(PROGRAMAS), default=list(PROGRAMAS))
+    opciones = argumentos.parse_args()
+
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    modulo_semantico = cargar_modulo_semantico()
+    print(f"{'programa':<10} {'generar (ms)':>13} {'árbol (ms)':>11} {'vm (ms)':>10} {'aceleración':>12}")
+    for nombre in opciones.programas:
+        codigo = PROGRAMAS[nombre](opciones.iteraciones)
+        arbol = parser.parse(codigo)
+        analizador = modulo_semantico.SemanticAnalyzer()
+        analizador.start_analysis(arbol)
+        if analizador.errors:
+            print(f"{nombre}: el programa tiene errores semánticos:", *analizador.errors, sep="\n  ")
+            return 1
+
+        inicio = time.perf_counter()
+        programa = generar_codigo(arbol, analizador)
+        generar = time.perf_counter() - inicio
+
+        salida_vm, salida_arbol = io.StringIO(), io.StringIO()
+        ejecutar_programa(programa, salida_vm)
+        interpretar(arbol, salida_arbol)
+        if salida_vm.getvalue() != salida_arbol.getvalue():
+            print(f"{nombre}: la salida difiere\n  vm:    {salida_vm.getvalue()!r}\n"
+                  f"  árbol: {salida_arbol.getvalue()!r}")
+            return 1
+
+        arbol_ms = mejor_tiempo(lambda: interpretar(arbol, io.StringIO()), opciones.repeticiones)
+        vm_ms = mejor_tiempo(lambda: ejecutar_programa(programa, io.StringIO()), opciones.repeticiones)
+        print(f"{nombre:<10} {generar * 1e3:>13.2f} {arbol_ms * 1e3:>11.1f} {vm_ms * 1e3:>10.1f} "
+              f"{arbol_ms / vm_ms:>11.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
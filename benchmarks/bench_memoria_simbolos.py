@@ -0,0 +1,115 @@
+"""
+Compara los bytes por símbolo de SymbolEntry (con __slots__ y colecciones perezosas)
+frente a la versión anterior con __dict__ y colecciones vacías por instancia.
+
+Se mide de dos formas con tracemalloc:
+  - construyendo N símbolos sueltos;
+  - analizando un programa de N declaraciones ('int v_i = i') y midiendo lo que
+    retiene la tabla de símbolos al terminar.
+
+Uso:
+    python benchmarks/bench_memoria_simbolos.py [--declaraciones 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+
+
+class SymbolEntryLegado:
+    """SymbolEntry tal como era antes de usar __slots__."""
+
+    def __init__(self, name, kind, sym_type, scope, line, initialized=False, value=None, is_constant=False, is_mutable=True):
+        self.name = name
+        self.kind = kind
+        self.sym_type = sym_type
+        self.scope = scope
+        self.line = line
+        self.initialized = initialized
+        self.references = 0
+        self.memory_size = None
+        self.relative_address = None
+        self.value = value
+        self.is_constant = is_constant
+        self.is_mutable = not is_constant
+        self.signature = None
+        self.parameters = []
+        self.return_type = None
+        self.local_symbol_table = None
+        self.is_defined = False
+        self.internal_structure = {}
+        self.associated_methods = {}
+        self.inheritance = None
+        self.restrictions = []
+
+
+def bytes_retenidos(funcion):
+    """Bytes que siguen asignados después de llamar a funcion() (mientras viva su resultado)."""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = funcion()
+    gc.collect()
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return despues - antes, resultado
+
+
+def medir_construccion(clase, cantidad):
+    # Los nombres se crean fuera de la medición: solo cuenta el objeto símbolo
+    nombres = [f"v_{i}" for i in range(cantidad)]
+    retenidos, _ = bytes_retenidos(lambda: [clase(n, "variable", "int", None, i, True) for i, n in enumerate(nombres)])
+    return retenidos / cantidad
+
+
+def medir_analisis(modulo, analizador, arbol, clase, cantidad):
+    # Los manejadores resuelven SymbolEntry como global del módulo al crear cada símbolo
+    actual = modulo.SymbolEntry
+    modulo.SymbolEntry = clase
+
+    def analizar():
+        analizador.start_analysis(arbol)
+        analizador._type_cache.clear()  # Solo interesa lo que retiene la tabla de símbolos
+
+    try:
+        retenidos, _ = bytes_retenidos(analizar)
+    finally:
+        modulo.SymbolEntry = actual
+    if analizador.errors:
+        raise AssertionError(f"errores inesperados: {analizador.errors[:3]}")
+    simbolos = len(analizador.symbol_table.get_all_symbols())
+    if simbolos != cantidad:
+        raise AssertionError(f"se esperaban {cantidad} símbolos y hay {simbolos}")
+    analizador.symbol_table.reset()
+    return retenidos / cantidad
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--declaraciones", type=int, default=100_000)
+    opciones = argumentos.parse_args()
+    cantidad = opciones.declaraciones
+
+    modulo = cargar_modulo_semantico()
+    clases = {"__slots__": modulo.SymbolEntry, "__dict__ (anterior)": SymbolEntryLegado}
+
+    print(f"Símbolos sueltos ({cantidad}):")
+    for nombre, clase in clases.items():
+        print(f"  {nombre:<22} {medir_construccion(clase, cantidad):>8.1f} bytes/símbolo")
+
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    arbol = parser.parse("".join(f"int v_{i} = {i}\n" for i in range(cantidad)))
+    analizador = modulo.SemanticAnalyzer()
+    print(f"\nTabla de símbolos tras analizar {cantidad} declaraciones:")
+    for nombre, clase in clases.items():
+        print(f"  {nombre:<22} {medir_analisis(modulo, analizador, arbol, clase, cantidad):>8.1f} bytes/símbolo")
+
+
+if __name__ == "__main__":
+    main()
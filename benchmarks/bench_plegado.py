@@ -0,0 +1,111 @@
+"""
+Mide el plegado de constantes (optimizador.py) en programas sintéticos (generador_polux.py)
+y el efecto sobre las fases que vienen después, con el árbol original y con el plegado:
+
+  semantico   un nuevo SemanticAnalyzer.start_analysis sobre el árbol
+  generar     codigo_intermedio.generar_codigo
+  ejecutar    la máquina virtual (solo con --ejecutar; la salida se descarta)
+
+Con --ejecutar se comprueba antes que el programa plegado escribe lo mismo que el original.
+
+Uso:
+    python benchmarks/bench_plegado.py [--tamanos pequeno mediano] [--repeticiones 5] [--ejecutar]
+"""
+import argparse
+import copy
+import gc
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigo_intermedio import generar_codigo  # noqa: E402
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from generador_polux import TAMANOS, GeneradorPolux  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from maquina_virtual import ejecutar_programa  # noqa: E402
+from optimizador import plegar_constantes  # noqa: E402
+
+
+def mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        gc.collect()  # Los dos árboles viven a la vez: que la basura de uno no cuente en el otro
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def nodos(arbol):
+    return sum(1 for _ in arbol.iter_subtrees())
+
+
+def fases(arbol, modulo_semantico, repeticiones, ejecutar):
+    """{fase: mejor tiempo} de las fases posteriores al análisis sobre 'arbol'."""
+    analizador = modulo_semantico.SemanticAnalyzer()
+    tiempos = {"semantico": mejor_tiempo(lambda: analizador.start_analysis(arbol), repeticiones)}
+    tiempos["generar"] = mejor_tiempo(lambda: generar_codigo(arbol, analizador), repeticiones)
+    if ejecutar:
+        programa = generar_codigo(arbol, analizador)
+        tiempos["ejecutar"] = mejor_tiempo(lambda: ejecutar_programa(programa, io.StringIO()), repeticiones)
+    return tiempos
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--tamanos", nargs="+", choices=list(TAMANOS), default=["pequeno", "mediano"])
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    argumentos.add_argument("--semilla", type=int, default=0)
+    argumentos.add_argument("--ejecutar", action="store_true", help="Medir también la ejecución en la máquina virtual")
+    opciones = argumentos.parse_args()
+
+    # Las expresiones y los bloques anidados se recorren recursivamente
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    modulo_semantico = cargar_modulo_semantico()
+    for tamano in opciones.tamanos:
+        codigo = GeneradorPolux(**dict(TAMANOS[tamano], semilla=opciones.semilla)).generar()
+        original = parser.parse(codigo)
+        analizador = modulo_semantico.SemanticAnalyzer()
+        analizador.start_analysis(original)
+        if analizador.errors:
+            print(f"{tamano}: el programa tiene errores semánticos", file=sys.stderr)
+            return 1
+
+        def plegar():
+            arbol = copy.deepcopy(original)
+            inicio = time.perf_counter()
+            resultado = plegar_constantes(arbol, analizador)
+            return arbol, resultado, time.perf_counter() - inicio
+        plegado, resultado, _ = plegar()
+        tiempo_plegado = min(plegar()[2] for _ in range(opciones.repeticiones))
+
+        if opciones.ejecutar:
+            salidas = []
+            for arbol in (original, plegado):
+                analizador.start_analysis(arbol)
+                salida = io.StringIO()
+                ejecutar_programa(generar_codigo(arbol, analizador), salida)
+                salidas.append(salida.getvalue())
+            if salidas[0] != salidas[1]:
+                print(f"{tamano}: el programa plegado escribe otra salida", file=sys.stderr)
+                return 1
+
+        print(f"{tamano}: {codigo.count(chr(10))} líneas, {nodos(original)} -> {nodos(plegado)} nodos, "
+              f"{resultado.reemplazos} reemplazos, {resultado.propagadas} usos de constantes propagados, "
+              f"plegado {tiempo_plegado * 1e3:.2f} ms")
+        antes = fases(original, modulo_semantico, opciones.repeticiones, opciones.ejecutar)
+        despues = fases(plegado, modulo_semantico, opciones.repeticiones, opciones.ejecutar)
+        print(f"  {'fase':<10} {'original (ms)':>14} {'plegado (ms)':>13} {'cambio':>8}")
+        for nombre in antes:
+            cambio = despues[nombre] / antes[nombre] - 1 if antes[nombre] else 0.0
+            print(f"  {nombre:<10} {antes[nombre] * 1e3:>14.2f} {despues[nombre] * 1e3:>13.2f} {cambio:>+8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Mide el tiempo de SemanticAnalyzer.start_analysis sobre expresiones cada vez más
+profundas ('int x = 1 + 1 + ... + 1'). Con el recorrido de una sola pasada el
+tiempo por nivel (última columna) debe mantenerse aproximadamente constante.
+
+Uso:
+    python benchmarks/bench_profundidad_expresiones.py [--profundidades 100 200 400 800 1600]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+
+
+def programa_profundo(profundidad):
+    return "int x = " + " + ".join(["1"] * (profundidad + 1)) + "\n"
+
+
+def medir(analizador, arbol, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        analizador.start_analysis(arbol)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--profundidades", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    opciones = argumentos.parse_args()
+
+    # El árbol tiene un nivel por operador y el recorrido es recursivo
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * max(opciones.profundidades) + 1000))
+
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    analizador = cargar_modulo_semantico().SemanticAnalyzer()
+
+    print(f"{'profundidad':>12} {'tiempo (ms)':>12} {'µs/nivel':>10}")
+    for profundidad in opciones.profundidades:
+        arbol = parser.parse(programa_profundo(profundidad))
+        segundos = medir(analizador, arbol, opciones.repeticiones)
+        if analizador.errors:
+            print(f"  errores inesperados: {analizador.errors[:3]}")
+        print(f"{profundidad:>12} {segundos * 1e3:>12.2f} {segundos * 1e6 / profundidad:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
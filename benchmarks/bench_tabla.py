@@ -0,0 +1,88 @@
+"""
+Mide el índice de la vista virtual de la tabla de símbolos (vista_tabla.IndiceSimbolos)
+con decenas de miles de símbolos: carga, orden por columna y filtros por categoría,
+ámbito y nombre, frente a volver a recorrer get_all_symbols() y ordenar en cada cambio.
+
+La parte de Tk no se mide aquí: la vista solo crea las filas que caben en la ventana,
+así que abrirla cuesta lo mismo con 100 símbolos que con 100 000.
+
+Uso:
+    python benchmarks/bench_tabla.py [--funciones 5000] [--repeticiones 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador_batch import cargar_modulo_semantico  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from vista_tabla import IndiceSimbolos  # noqa: E402
+
+
+def programa(funciones):
+    """Cada función declara tres locales y una constante global: ~5 símbolos por función."""
+    lineas = []
+    for i in range(funciones):
+        lineas.append(f"cte k_{i} = {i}")
+        lineas.append(f"do function f_{i}(a) || int x_{i} = a int y_{i} = x_{i} * 2 show(y_{i}) ||")
+    return "\n".join(lineas) + "\n"
+
+
+def mejor(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1e3
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--funciones", type=int, default=5000)
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    opciones = argumentos.parse_args()
+
+    modulo = cargar_modulo_semantico()
+    analizador = modulo.SemanticAnalyzer()
+    analizador.start_analysis(cargar_parser(propagate_positions=True, keep_all_tokens=True).parse(programa(opciones.funciones)))
+    simbolos = analizador.symbol_table.get_all_symbols()
+    columnas = ["Nombre", "Categoría", "Tipo", "Ámbito", "Línea Decl.", "Referencias"]
+    filas = [[s.name, s.kind, s.sym_type, s.scope.name if s.scope else "N/A", s.line, s.references] for s in simbolos]
+    ambito = filas[len(filas) // 2][3]
+    print(f"{len(filas)} símbolos\n")
+
+    indice = IndiceSimbolos(columnas, "Nombre", "Categoría", "Ámbito")
+    casos = [
+        ("cargar", lambda: indice.cargar(filas)),
+        ("cargar y ordenar", lambda: (indice.cargar(filas), indice.ordenar("Nombre"))),
+        ("filtrar categoría", lambda: indice.filtrar(categoria="variable")),
+        ("filtrar ámbito", lambda: indice.filtrar(ambito=ambito)),
+        ("filtrar nombre", lambda: indice.filtrar(nombre="x_1")),
+        ("reordenar (en caché)", lambda: indice.ordenar("Nombre", True)),
+    ]
+
+    def recorrer(categoria=None, ambito_filtro=None):
+        # Lo que hacía la ventana: releer todos los símbolos y ordenarlos en cada cambio
+        todos = analizador.symbol_table.get_all_symbols()
+        elegidos = [s for s in todos if (categoria is None or s.kind == categoria)
+                    and (ambito_filtro is None or (s.scope and s.scope.name == ambito_filtro))]
+        return sorted(elegidos, key=lambda s: s.name.lower())
+
+    print(f"{'operación':<24} {'índice (ms)':>12} {'recorrido (ms)':>15}")
+    referencias = {
+        "filtrar categoría": lambda: recorrer(categoria="variable"),
+        "filtrar ámbito": lambda: recorrer(ambito_filtro=ambito),
+        "cargar y ordenar": recorrer,
+    }
+    for nombre, funcion in casos:
+        tiempo = mejor(funcion, opciones.repeticiones)
+        referencia = referencias.get(nombre)
+        columna = f"{mejor(referencia, opciones.repeticiones):>15.2f}" if referencia else f"{'-':>15}"
+        print(f"{nombre:<24} {tiempo:>12.2f} {columna}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Mide TablaSimbolos (almacen_simbolos.py) con desbordamiento a disco: inserción,
+incrementos de referencias aleatorios, búsquedas y lectura completa, para tablas de
+10k a 1M símbolos. Con --legado también mide la versión anterior basada en un flujo
+pickle (cada incremento relee y reescribe el archivo), solo para tamaños pequeños.
+
+Uso:
+    python benchmarks/bench_tabla_simbolos.py [--tamanos 10000 100000 1000000] [--legado]
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacen_simbolos import TablaSimbolos  # noqa: E402
+
+
+class TablaSimbolosPickle:
+    """Implementación anterior: memoria principal + flujo pickle reescrito en cada incremento."""
+
+    def __init__(self, archivo_secundario, capacidad=100):
+        self.capacidad = capacidad
+        self.simbolos = []
+        self.archivo_secundario = archivo_secundario
+
+    def agregar(self, simbolo):
+        if len(self.simbolos) < self.capacidad:
+            self.simbolos.append(simbolo)
+        else:
+            with open(self.archivo_secundario, "ab") as f:
+                pickle.dump(simbolo, f)
+
+    def incrementar_referencia(self, identificador):
+        for simbolo in self.simbolos:
+            if simbolo["Identificador"] == identificador:
+                simbolo["Referencias"] += 1
+                return
+        simbolos_secundarios = []
+        encontrado = False
+        try:
+            with open(self.archivo_secundario, "rb") as f:
+                while True:
+                    simbolo = pickle.load(f)
+                    if simbolo["Identificador"] == identificador:
+                        simbolo["Referencias"] += 1
+                        encontrado = True
+                    simbolos_secundarios.append(simbolo)
+        except (EOFError, FileNotFoundError):
+            pass
+        if encontrado:
+            with open(self.archivo_secundario, "wb") as f:
+                for simbolo in simbolos_secundarios:
+                    pickle.dump(simbolo, f)
+
+
+def simbolo(i):
+    return {
+        "Identificador": f"var_{i}",
+        "Categoría": "Variable",
+        "Tipo de Dato": "int",
+        "Ámbito": f"funcion_{i % 97}",
+        "Dirección": f"0x{i:X}",
+        "Línea": i + 1,
+        "Valor": str(i),
+        "Estado": "Inicializado",
+        "Estructura": "Simple",
+        "Referencias": 0,
+    }
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def medir_tabla(tamano, operaciones, directorio, capacidad_cache):
+    tabla = TablaSimbolos(archivo_secundario=os.path.join(directorio, "tabla.dat"), capacidad_cache=capacidad_cache)
+    azar = random.Random(tamano)
+    # Accesos sesgados: la mitad cae en un 1% "caliente" de los símbolos, como en código real
+    calientes = max(1, tamano // 100)
+    objetivos = [azar.randrange(calientes) if azar.random() < 0.5 else azar.randrange(tamano)
+                 for _ in range(operaciones)]
+
+    def insertar():
+        for i in range(tamano):
+            tabla.agregar(simbolo(i))
+
+    def incrementar():
+        for i in objetivos:
+            tabla.incrementar_referencia(f"var_{i}", f"funcion_{i % 97}")
+
+    def buscar():
+        for i in objetivos:
+            tabla.obtener(f"var_{i}")
+
+    tiempos = {
+        "insertar": cronometrar(insertar),
+        "incrementar": cronometrar(incrementar),
+        "buscar": cronometrar(buscar),
+    }
+    todos = []
+    tiempos["obtener_todos"] = cronometrar(lambda: todos.extend(tabla.obtener_todos()))
+    esperadas = len(objetivos)
+    obtenidas = sum(s["Referencias"] for s in todos)
+    tabla.cerrar()
+    if len(todos) != tamano or obtenidas != esperadas:
+        raise AssertionError(f"resultado incorrecto: {len(todos)} símbolos, {obtenidas}/{esperadas} referencias")
+    return tiempos
+
+
+def medir_legado(tamano, operaciones, directorio):
+    tabla = TablaSimbolosPickle(os.path.join(directorio, "legado.pkl"))
+    azar = random.Random(tamano)
+    objetivos = [azar.randrange(tamano) for _ in range(operaciones)]
+    insertar = cronometrar(lambda: [tabla.agregar(simbolo(i)) for i in range(tamano)])
+    incrementar = cronometrar(lambda: [tabla.incrementar_referencia(f"var_{i}") for i in objetivos])
+    return {"insertar": insertar, "incrementar": incrementar}
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    argumentos.add_argument("--operaciones", type=int, default=100_000,
+                            help="Incrementos y búsquedas por tamaño")
+    argumentos.add_argument("--cache", type=int, default=1024, help="Capacidad de la caché LRU")
+    argumentos.add_argument("--legado", action="store_true",
+                            help="Medir también la tabla pickle anterior (solo tamaños <= 10000)")
+    opciones = argumentos.parse_args()
+
+    print(f"{'símbolos':>10} {'insertar (s)':>13} {'incr. µs/op':>12} {'buscar µs/op':>13} {'todos (s)':>10}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in opciones.tamanos:
+            tiempos = medir_tabla(tamano, opciones.operaciones, directorio, opciones.cache)
+            print(f"{tamano:>10} {tiempos['insertar']:>13.2f} "
+                  f"{tiempos['incrementar'] * 1e6 / opciones.operaciones:>12.2f} "
+                  f"{tiempos['buscar'] * 1e6 / opciones.operaciones:>13.2f} {tiempos['obtener_todos']:>10.2f}")
+
+        if opciones.legado:
+            print("\nTabla pickle anterior (100 incrementos):")
+            for tamano in (t for t in opciones.tamanos if t <= 10_000):
+                tiempos = medir_legado(tamano, 100, directorio)
+                print(f"{tamano:>10} {tiempos['insertar']:>13.2f} {tiempos['incrementar'] * 1e6 / 100:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compara la aritmética de arreglos sin vectorizar (Arreglo, elemento por elemento) con la
+vectorizada (Vector, vectores.py) en la máquina virtual.
+
+Programas:
+  enteros   un 'while' de --iteraciones vueltas con 'a = (a * 3 + BASE) % 1000' sobre
+            un arreglo literal de --elementos int
+  reales    lo mismo con float: 'a = (a * 0.5 + BASE) / 1.5'
+
+El parseo, el análisis y la generación del bytecode se miden aparte: se hacen una vez por
+programa. Antes de medir se comprueba que los dos modos escriben la misma salida. Los
+Vector necesitan NumPy: sin él los dos modos usan listas y el benchmark no se ejecuta.
+
+Uso:
+    python benchmarks/bench_vectores.py [--elementos 10000] [--iteraciones 100] [--repeticiones 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigo_intermedio import compilar_fuente  # noqa: E402
+from gramatica import cargar_parser  # noqa: E402
+from maquina_virtual import ejecutar_programa  # noqa: E402
+from vectores import HAY_NUMPY  # noqa: E402
+
+
+def programa_enteros(elementos, iteraciones):
+    return "\n".join([
+        f"cte BASE = [{', '.join(str(k) for k in range(elementos))}]",
+        "a = BASE",
+        "int i = 0",
+        f"while (i < {iteraciones}) ||",
+        "    a = (a * 3 + BASE) % 1000",
+        "    i += 1",
+        "||",
+        "show(a)",
+    ])
+
+
+def programa_reales(elementos, iteraciones):
+    return "\n".join([
+        f"cte BASE = [{', '.join(f'{k}.5' for k in range(elementos))}]",
+        "a = BASE",
+        "int i = 0",
+        f"while (i < {iteraciones}) ||",
+        "    a = (a * 0.5 + BASE) / 1.5",
+        "    i += 1",
+        "||",
+        "show(a)",
+    ])
+
+
+PROGRAMAS = {"enteros": programa_enteros, "reales": programa_reales}
+
+
+def mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--elementos", type=int, default=10000)
+    argumentos.add_argument("--iteraciones", type=int, default=100)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--programas", nargs="+", choices=list(PROGRAMAS), default=list(PROGRAMAS))
+    opciones = argumentos.parse_args()
+
+    if not HAY_NUMPY:
+        print("NumPy no está instalado: sin él no hay Vector que comparar (pip install numpy)", file=sys.stderr)
+        return 1
+    # El arreglo literal se recorre recursivamente en el análisis
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    print(f"{'programa':<10} {'compilar (ms)':>14} {'lista (ms)':>11} {'vector (ms)':>12} {'aceleración':>12}")
+    for nombre in opciones.programas:
+        codigo = PROGRAMAS[nombre](opciones.elementos, opciones.iteraciones)
+        inicio = time.perf_counter()
+        programa = compilar_fuente(codigo, parser)
+        compilar = time.perf_counter() - inicio
+
+        salida_lista, salida_vector = io.StringIO(), io.StringIO()
+        ejecutar_programa(programa, salida_lista)
+        ejecutar_programa(programa, salida_vector, vectorizar=True)
+        if salida_lista.getvalue() != salida_vector.getvalue():
+            print(f"{nombre}: la salida vectorizada difiere")
+            return 1
+
+        lista_ms = mejor_tiempo(lambda: ejecutar_programa(programa, io.StringIO()), opciones.repeticiones)
+        vector_ms = mejor_tiempo(lambda: ejecutar_programa(programa, io.StringIO(), vectorizar=True),
+                                 opciones.repeticiones)
+        print(f"{nombre:<10} {compilar * 1e3:>14.1f} {lista_ms * 1e3:>11.1f} {vector_ms * 1e3:>12.1f} "
+              f"{lista_ms / vector_ms:>11.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,584 @@
+"""
+Código intermedio (bytecode) de Polux para la máquina virtual de maquina_virtual.py.
+
+GeneradorCodigo recorre el árbol que ya analizó el SemanticAnalyzer y lo baja a un
+Programa: una FuncionCompilada por función, método y constructor (más la del programa
+principal y una por clase que inicializa sus atributos), las clases y una tabla de
+constantes compartida.
+
+Cada función es un arreglo compacto de enteros, array('i'), con pares (código de
+operación, argumento), y un arreglo paralelo con la línea de cada instrucción para los
+errores de ejecución. El argumento es el índice de una constante, una casilla, una
+función, un destino de salto o una cantidad, según la operación.
+
+Los nombres se resuelven aquí y una sola vez, con los Scope y SymbolEntry de la tabla
+de símbolos: cada variable, parámetro o constante recibe una casilla en el marco de su
+función (o en las globales) y cada atributo su posición dentro del objeto; el número
+queda en SymbolEntry.relative_address. La máquina virtual nunca busca una variable por
+su nombre; solo los métodos se buscan por nombre, en la clase del receptor y en el
+momento de la llamada (LLAMAR_METODO), porque el receptor se conoce recién ahí. Como
+en el análisis, un nombre es visible desde que se declara: un uso anterior a la
+declaración local de ese nombre sigue refiriéndose al de afuera.
+
+No se generan: funciones anidadas que leen variables de la función que las contiene
+(no hay clausuras) ni llamadas a un método a través de la clase (Clase.metodo()).
+"""
+from array import array
+
+from lark import Token, Tree
+from lark.visitors import Interpreter
+
+from ejecucion import OPERADORES_ASIGNACION, OPERADORES_BINARIOS, operador_de, valor_literal
+from vectores import Arreglo
+
+(CARGAR_CONSTANTE, CARGAR_LOCAL, GUARDAR_LOCAL, CARGAR_GLOBAL, GUARDAR_GLOBAL, CARGAR_CAMPO, GUARDAR_CAMPO,
+ BINARIA, NEGAR, NO, A_FLOTANTE, DUPLICAR, DESCARTAR, SALTAR, SALTAR_SI_FALSO, SALTAR_SI_FALSO_O_DESCARTAR,
+ SALTAR_SI_VERDADERO_O_DESCARTAR, CREAR_ARREGLO, ITERAR, SIGUIENTE, LLAMAR, LLAMAR_METODO, NUEVO, MOSTRAR,
+ RETORNAR) = range(25)
+
+NOMBRES = ("CARGAR_CONSTANTE", "CARGAR_LOCAL", "GUARDAR_LOCAL", "CARGAR_GLOBAL", "GUARDAR_GLOBAL", "CARGAR_CAMPO",
+           "GUARDAR_CAMPO", "BINARIA", "NEGAR", "NO", "A_FLOTANTE", "DUPLICAR", "DESCARTAR", "SALTAR",
+           "SALTAR_SI_FALSO", "SALTAR_SI_FALSO_O_DESCARTAR", "SALTAR_SI_VERDADERO_O_DESCARTAR", "CREAR_ARREGLO",
+           "ITERAR", "SIGUIENTE", "LLAMAR", "LLAMAR_METODO", "NUEVO", "MOSTRAR", "RETORNAR")
+
+# BINARIA n aplica OPERACIONES[n]; SIMBOLOS[n] es su operador en Polux
+SIMBOLOS = tuple(OPERADORES_BINARIOS)
+OPERACIONES = tuple(OPERADORES_BINARIOS.values())
+_INDICE_OPERACION = {simbolo: indice for indice, simbolo in enumerate(SIMBOLOS)}
+
+SALTOS = (SALTAR, SALTAR_SI_FALSO, SALTAR_SI_FALSO_O_DESCARTAR, SALTAR_SI_VERDADERO_O_DESCARTAR, SIGUIENTE)
+_CON_CONSTANTE = (CARGAR_CONSTANTE, LLAMAR_METODO, NUEVO)
+
+_VARIABLES = ('variable', 'parametro', 'constante', 'atributo')
+_LITERALES = frozenset(('integer', 'string_literal', 'char_literal', 'booleano'))
+# Sentencias que no dejan un valor en la pila (las demás son expresiones y se descarta su valor)
+_SIN_VALOR = frozenset(('variable_declaration', 'constant_declaration', 'control_structure', 'print_statement',
+                        'class_declaration', 'function_declaration', 'type', 'interface_declaration'))
+
+
+class ErrorGeneracion(Exception):
+    """El programa no se puede traducir a bytecode (errores semánticos o algo no soportado)."""
+
+    def __init__(self, mensaje, linea=None, diagnosticos=()):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.linea = linea
+        self.diagnosticos = list(diagnosticos)
+
+    def __str__(self):
+        if self.linea is None:
+            return f"Error de generación de código: {self.mensaje}"
+        return f"Error de generación de código (Línea {self.linea}): {self.mensaje}"
+
+
+class FuncionCompilada:
+    """Bytecode de una función: casillas 0..parametros-1 son los argumentos (0 es el objeto en un método)."""
+
+    __slots__ = ("nombre", "indice", "parametros", "locales", "codigo", "lineas")
+
+    def __init__(self, nombre, indice, parametros, locales, codigo, lineas):
+        self.nombre = nombre
+        self.indice = indice  # Posición en Programa.funciones
+        self.parametros = parametros  # Casillas que llegan con valor (incluye el objeto en los métodos)
+        self.locales = locales  # Casillas del marco
+        self.codigo = codigo  # array('i'): código de operación, argumento, código, argumento...
+        self.lineas = lineas  # array('i'): línea de cada instrucción (codigo[2 * i])
+
+
+class ClaseCompilada:
+    """Una clase: sus atributos (los de la base primero), inicializadores, constructor y métodos."""
+
+    __slots__ = ("nombre", "base", "campos", "inicializadores", "constructor", "metodos")
+
+    def __init__(self, nombre, base=None):
+        self.nombre = nombre
+        self.base = base
+        self.campos = list(base.campos) if base is not None else []
+        # Funciones que dan su valor inicial a los atributos, de la clase base a la derivada
+        self.inicializadores = list(base.inicializadores) if base is not None else []
+        self.constructor = None
+        self.metodos = dict(base.metodos) if base is not None else {}
+
+
+class Programa:
+    """Resultado de GeneradorCodigo.generar(); funciones[0] es el programa principal."""
+
+    __slots__ = ("funciones", "clases", "constantes", "globales")
+
+    def __init__(self, funciones, clases, constantes, globales):
+        self.funciones = funciones
+        self.clases = clases
+        self.constantes = constantes
+        self.globales = globales  # Casillas globales
+
+    @property
+    def principal(self):
+        return self.funciones[0]
+
+    def instrucciones(self):
+        return sum(len(funcion.codigo) // 2 for funcion in self.funciones)
+
+
+class _Marco:
+    """Una función en generación: sus instrucciones y sus casillas."""
+
+    def __init__(self, nombre, ambito, metodo=False):
+        self.nombre = nombre
+        self.ambito = ambito  # Scope cuyas variables son casillas de este marco (None: ninguna)
+        self.codigo = []
+        self.lineas = []
+        self.casillas = 1 if metodo else 0  # En un método la casilla 0 es el objeto
+        self.parametros = self.casillas
+        self.linea = 0
+
+    def emitir(self, operacion, argumento=0):
+        """Agrega una instrucción y devuelve la posición de su argumento (para parchear saltos)."""
+        self.codigo += (operacion, argumento)
+        self.lineas.append(self.linea)
+        return len(self.codigo) - 1
+
+    def aqui(self):
+        return len(self.codigo)
+
+    def parchear(self, posicion):
+        """El salto cuyo argumento está en 'posicion' va a la próxima instrucción."""
+        self.codigo[posicion] = len(self.codigo)
+
+    def cerrar(self, indice):
+        return FuncionCompilada(self.nombre, indice, self.parametros, self.casillas,
+                                array('i', self.codigo), array('i', self.lineas))
+
+
+class GeneradorCodigo(Interpreter):
+    """
+    Traduce un árbol a bytecode. 'analizador' es el SemanticAnalyzer que acaba de
+    analizar ese mismo árbol con start_analysis(); su tabla de símbolos da las casillas.
+    """
+
+    def __init__(self, analizador):
+        self.analizador = analizador
+        self.tabla = analizador.symbol_table
+
+    def generar(self, arbol):
+        if self.analizador.errors:
+            raise ErrorGeneracion(f"el programa tiene {len(self.analizador.errors)} errores semánticos",
+                                  diagnosticos=self.analizador.errors)
+        self.constantes = []
+        self._indices_constantes = {}
+        self.funciones = [None]  # La 0 es el programa principal
+        self.clases = []
+        self._indice_funcion = {}  # SymbolEntry -> posición en funciones
+        self._indice_clase = {}  # SymbolEntry -> posición en clases
+        self._declarados = {}  # Scope -> nombres ya declarados en el punto de la generación
+        self._globales = 0
+        self._clase = None  # ClaseCompilada y Scope de la clase cuyos métodos se generan
+        self._ambito_clase = None
+        self._ambito = self.tabla.global_scope
+        self._marco = _Marco("<programa>", None)
+        self.visit(arbol)
+        self._marco.emitir(RETORNAR)
+        self.funciones[0] = self._marco.cerrar(0)
+        return Programa(self.funciones, self.clases, self.constantes, self._globales)
+
+    # --- Utilidades ---
+
+    def _constante(self, valor):
+        clave = (type(valor), valor)  # 1, 1.0 y True son claves distintas
+        indice = self._indices_constantes.get(clave)
+        if indice is None:
+            indice = self._indices_constantes[clave] = len(self.constantes)
+            self.constantes.append(valor)
+        return indice
+
+    def _error(self, mensaje, nodo=None):
+        linea = getattr(getattr(nodo, "meta", nodo), "line", None) if nodo is not None else None
+        return ErrorGeneracion(mensaje, linea or self._marco.linea or None)
+
+    @staticmethod
+    def _nombre(nodo):
+        """Nombre de un nodo identifier (o variable)."""
+        while isinstance(nodo, Tree):
+            nodo = nodo.children[0]
+        return nodo.value
+
+    @staticmethod
+    def _subarboles(nodo):
+        return [hijo for hijo in nodo.children if isinstance(hijo, Tree)]
+
+    def _argumentos(self, nodo):
+        """Genera los argumentos de una llamada y devuelve cuántos son."""
+        argumentos = next((hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'argument_list'),
+                          None)
+        cantidad = 0
+        if argumentos is not None:
+            for argumento in self._subarboles(argumentos):
+                self.visit(argumento)
+                cantidad += 1
+        return cantidad
+
+    # --- Nombres y casillas ---
+
+    def _declarar(self, nombre, nodo):
+        """Marca 'nombre' como declarado en el ámbito actual y, si es una variable, le da su casilla."""
+        ambito = self._ambito
+        simbolo = ambito.symbols.get(nombre)
+        if simbolo is None:
+            raise self._error(f"'{nombre}' no está en la tabla de símbolos; ¿se analizó este árbol?", nodo)
+        declarados = self._declarados.setdefault(ambito, set())
+        if nombre not in declarados:
+            declarados.add(nombre)
+            if simbolo.kind in _VARIABLES:
+                simbolo.relative_address = self._nueva_casilla(ambito, nombre)
+        return simbolo
+
+    def _nueva_casilla(self, ambito, nombre):
+        if ambito is self.tabla.global_scope:
+            self._globales += 1
+            return self._globales - 1
+        if ambito is self._ambito_clase:
+            self._clase.campos.append(nombre)
+            return len(self._clase.campos) - 1
+        if ambito is self._marco.ambito:
+            self._marco.casillas += 1
+            return self._marco.casillas - 1
+        raise self._error(f"no se puede declarar '{nombre}' aquí")
+
+    def _resolver(self, nombre, nodo):
+        """(símbolo, ámbito) de 'nombre' visible en este punto, del ámbito más interno hacia afuera."""
+        ambito = self._ambito
+        while ambito is not None:
+            simbolo = ambito.symbols.get(nombre)
+            if simbolo is not None and nombre in self._declarados.get(ambito, ()):
+                return simbolo, ambito
+            ambito = ambito.parent
+        return None, None
+
+    def _acceso(self, simbolo, ambito, nodo):
+        """(cargar, guardar) para una variable ya resuelta."""
+        if simbolo.kind not in _VARIABLES:
+            raise self._error(f"'{simbolo.name}' no es una variable", nodo)
+        if ambito is self.tabla.global_scope:
+            return CARGAR_GLOBAL, GUARDAR_GLOBAL
+        if ambito is self._marco.ambito:
+            return CARGAR_LOCAL, GUARDAR_LOCAL
+        if ambito is self._ambito_clase:
+            return CARGAR_CAMPO, GUARDAR_CAMPO
+        raise self._error(f"'{simbolo.name}' pertenece a otra función (no hay clausuras)", nodo)
+
+    def _cargar(self, nombre, nodo):
+        simbolo, ambito = self._resolver(nombre, nodo)
+        if simbolo is None:
+            raise self._error(f"'{nombre}' no está declarado en este punto", nodo)
+        self._marco.emitir(self._acceso(simbolo, ambito, nodo)[0], simbolo.relative_address)
+
+    def _guardar(self, nombre, nodo):
+        """Guarda el tope de la pila en 'nombre'; si no existe todavía, lo declara aquí (como el análisis)."""
+        simbolo, ambito = self._resolver(nombre, nodo)
+        if simbolo is None:
+            simbolo, ambito = self._declarar(nombre, nodo), self._ambito
+        self._marco.emitir(self._acceso(simbolo, ambito, nodo)[1], simbolo.relative_address)
+
+    # --- Sentencias ---
+
+    def statement(self, nodo):
+        if not nodo.meta.empty:
+            self._marco.linea = nodo.meta.line
+        for hijo in self._subarboles(nodo):
+            if hijo.data == 'variable' and not self._es_variable(hijo):
+                continue  # Un nombre de clase o función suelto no tiene efecto, como en los intérpretes
+            self.visit(hijo)
+            if hijo.data not in _SIN_VALOR:
+                self._marco.emitir(DESCARTAR)
+
+    def _es_variable(self, nodo):
+        """False si el uso 'nodo' nombra algo declarado que no es una variable (una clase, una función)."""
+        simbolo, _ = self._resolver(self._nombre(nodo), nodo)
+        return simbolo is None or simbolo.kind in _VARIABLES
+
+    def type(self, nodo):
+        pass  # Un tipo suelto como sentencia no hace nada
+
+    def interface_declaration(self, nodo):
+        pass
+
+    def variable_declaration(self, nodo):
+        # type identifier ("=" expression)?
+        tipo, identificador = nodo.children[0], nodo.children[1]
+        if len(nodo.children) == 4:
+            self.visit(nodo.children[3])
+            if tipo.children and isinstance(tipo.children[0], Tree) and operador_de(tipo.children[0]) == 'float':
+                self._marco.emitir(A_FLOTANTE)  # 'float f = 1' guarda 1.0
+        else:
+            self._marco.emitir(CARGAR_CONSTANTE, self._constante(None))
+        self._declarar_y_guardar(identificador)
+
+    def constant_declaration(self, nodo):
+        # "cte" identifier "=" expression
+        identificador, expresion = self._subarboles(nodo)
+        self.visit(expresion)
+        self._declarar_y_guardar(identificador)
+
+    def _declarar_y_guardar(self, identificador):
+        nombre = self._nombre(identificador)
+        simbolo = self._declarar(nombre, identificador)
+        self._marco.emitir(self._acceso(simbolo, self._ambito, identificador)[1], simbolo.relative_address)
+
+    def print_statement(self, nodo):
+        self._marco.emitir(MOSTRAR, self._argumentos(nodo))
+
+    def if_statement(self, nodo):
+        # "if" "(" expression ")" "||" statement_block "||" else_clause?
+        subarboles = self._subarboles(nodo)
+        condicion, bloque = subarboles[0], subarboles[1]
+        self.visit(condicion)
+        salto_falso = self._marco.emitir(SALTAR_SI_FALSO)
+        self.visit(bloque)
+        if len(subarboles) > 2:
+            salto_fin = self._marco.emitir(SALTAR)
+            self._marco.parchear(salto_falso)
+            self.visit(subarboles[2])
+            self._marco.parchear(salto_fin)
+        else:
+            self._marco.parchear(salto_falso)
+
+    def while_loop(self, nodo):
+        condicion, bloque = self._subarboles(nodo)
+        inicio = self._marco.aqui()
+        self.visit(condicion)
+        salida = self._marco.emitir(SALTAR_SI_FALSO)
+        self.visit(bloque)
+        self._marco.emitir(SALTAR, inicio)
+        self._marco.parchear(salida)
+
+    def for_loop(self, nodo):
+        # "for" "(" identifier "in" expression ")" "||" statement_block "||"
+        identificador, iterable, bloque = self._subarboles(nodo)
+        self.visit(iterable)
+        self._marco.emitir(ITERAR)
+        inicio = self._marco.aqui()
+        salida = self._marco.emitir(SIGUIENTE)
+        self._guardar(self._nombre(identificador), identificador)
+        self.visit(bloque)
+        self._marco.emitir(SALTAR, inicio)
+        self._marco.parchear(salida)
+
+    # --- Funciones y clases ---
+
+    def function_declaration(self, nodo):
+        clase, ambito_clase = self._clase, self._ambito_clase
+        self._clase = self._ambito_clase = None  # Una función dentro de un método no ve los atributos
+        try:
+            self._generar_funcion(nodo, metodo=False)
+        finally:
+            self._clase, self._ambito_clase = clase, ambito_clase
+
+    def _generar_funcion(self, nodo, metodo):
+        """Genera una función, método o constructor y devuelve su FuncionCompilada."""
+        identificador = next(hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier')
+        simbolo = self._declarar(self._nombre(identificador), identificador)
+        indice = len(self.funciones)
+        self.funciones.append(None)
+        self._indice_funcion[simbolo] = indice  # Antes del cuerpo: la función puede llamarse a sí misma
+
+        nombre = f"{self._clase.nombre}.{simbolo.name}" if metodo else simbolo.name
+        marco_anterior, ambito_anterior = self._marco, self._ambito
+        self._marco = _Marco(nombre, simbolo.local_symbol_table, metodo)
+        self._marco.linea = identificador.meta.line if not identificador.meta.empty else marco_anterior.linea
+        self._ambito = simbolo.local_symbol_table
+        try:
+            for hijo in self._subarboles(nodo):
+                if hijo.data == 'parameter_list':
+                    for parametro in self._subarboles(hijo):
+                        self._declarar(self._nombre(parametro), parametro)
+                    self._marco.parametros = self._marco.casillas
+                elif hijo.data == 'statement_block':
+                    self.visit(hijo)
+            self._marco.emitir(RETORNAR)
+            funcion = self.funciones[indice] = self._marco.cerrar(indice)
+        finally:
+            self._marco, self._ambito = marco_anterior, ambito_anterior
+        return funcion
+
+    def class_declaration(self, nodo):
+        # "class" identifier ("inherits" identifier)? "||" class_body "||"
+        identificadores = [hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier']
+        simbolo = self._declarar(self._nombre(identificadores[0]), identificadores[0])
+        base = None
+        if len(identificadores) > 1:
+            simbolo_base, _ = self._resolver(self._nombre(identificadores[1]), identificadores[1])
+            base = self.clases[self._indice_clase[simbolo_base]]
+        clase = ClaseCompilada(simbolo.name, base)
+        self._indice_clase[simbolo] = len(self.clases)
+        self.clases.append(clase)
+
+        # Los atributos (y constantes) del cuerpo se inicializan en una función propia
+        estado = (self._clase, self._ambito_clase, self._marco, self._ambito)
+        self._clase, self._ambito_clase = clase, simbolo.local_symbol_table
+        self._ambito = simbolo.local_symbol_table
+        inicializar = self._marco = _Marco(f"{clase.nombre}.<atributos>", None, metodo=True)
+        inicializar.linea = estado[2].linea
+        try:
+            cuerpo = next(hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'class_body')
+            for miembro in cuerpo.children:
+                if miembro.data in ('method_declaration', 'constructor_declaration'):
+                    funcion = self._generar_funcion(miembro, metodo=True)
+                    # Como en el análisis, el constructor también es un método con el nombre de la clase
+                    clase.metodos[funcion.nombre.rsplit(".", 1)[1]] = funcion
+                    if miembro.data == 'constructor_declaration':
+                        clase.constructor = funcion
+                else:
+                    if not miembro.meta.empty:
+                        inicializar.linea = miembro.meta.line
+                    self.visit(miembro)
+            if inicializar.codigo:
+                inicializar.emitir(RETORNAR)
+                indice = len(self.funciones)
+                self.funciones.append(inicializar.cerrar(indice))
+                clase.inicializadores.append(self.funciones[indice])
+        finally:
+            self._clase, self._ambito_clase, self._marco, self._ambito = estado
+
+    # --- Expresiones ---
+
+    def integer(self, nodo):
+        self._marco.emitir(CARGAR_CONSTANTE, self._constante(valor_literal(nodo)))
+
+    string_literal = char_literal = booleano = integer
+
+    def variable(self, nodo):
+        self._cargar(self._nombre(nodo), nodo)
+
+    def grouped_expression(self, nodo):
+        self.visit(self._subarboles(nodo)[0])
+
+    def arithmetic_expression(self, nodo):
+        izquierda, operador, derecha = nodo.children
+        self.visit(izquierda)
+        self.visit(derecha)
+        self._marco.emitir(BINARIA, _INDICE_OPERACION[operador_de(operador)])
+
+    relational_expression = arithmetic_expression
+
+    def logical_expression(self, nodo):
+        # Cortocircuito: con AND un falso (con OR un verdadero) ya es el resultado
+        izquierda, operador, derecha = nodo.children
+        self.visit(izquierda)
+        salto = SALTAR_SI_FALSO_O_DESCARTAR if operador_de(operador) == 'AND' else SALTAR_SI_VERDADERO_O_DESCARTAR
+        fin = self._marco.emitir(salto)
+        self.visit(derecha)
+        self._marco.parchear(fin)
+
+    def unary_expression(self, nodo):
+        operador, operando = nodo.children
+        self.visit(operando)
+        self._marco.emitir(NO if operador_de(operador) == 'NOT' else NEGAR)
+
+    def array_literal(self, nodo):
+        elementos = self._subarboles(nodo)
+        if all(elemento.data in _LITERALES for elemento in elementos):
+            # Los arreglos no se modifican: uno de literales es una sola constante compartida
+            self.constantes.append(Arreglo(valor_literal(elemento) for elemento in elementos))
+            self._marco.emitir(CARGAR_CONSTANTE, len(self.constantes) - 1)
+            return
+        for elemento in elementos:
+            self.visit(elemento)
+        self._marco.emitir(CREAR_ARREGLO, len(elementos))
+
+    def assignment_expression(self, nodo):
+        # El valor de 'a = b' es el asignado, así que queda una copia en la pila
+        destino, operador, valor = nodo.children
+        nombre = self._nombre(destino)
+        operador = operador_de(operador)
+        if operador == '=':
+            self.visit(valor)
+        else:
+            # 'x += e' es 'x = x + e': el destino se lee antes de evaluar 'e', como en los intérpretes
+            self._cargar(nombre, destino)
+            self.visit(valor)
+            self._marco.emitir(BINARIA, _INDICE_OPERACION[OPERADORES_ASIGNACION[operador]])
+        self._marco.emitir(DUPLICAR)
+        self._guardar(nombre, destino)
+
+    def instance_creation(self, nodo):
+        """f(args) llama a una función; Clase(args) crea un objeto; metodo(args) dentro de un método usa el objeto."""
+        nombre = self._nombre(nodo.children[0])
+        simbolo, ambito = self._resolver(nombre, nodo)
+        if simbolo is None:
+            raise self._error(f"'{nombre}' no está declarado en este punto", nodo)
+        if simbolo.kind == 'clase':
+            cantidad = self._argumentos(nodo)
+            self._marco.emitir(NUEVO, self._constante((self._indice_clase[simbolo], cantidad)))
+        elif simbolo.kind == 'funcion':
+            self._argumentos(nodo)
+            self._marco.emitir(LLAMAR, self._indice_funcion[simbolo])
+        elif simbolo.kind == 'metodo' and ambito is self._ambito_clase:
+            self._marco.emitir(CARGAR_LOCAL, 0)
+            self._marco.emitir(LLAMAR_METODO, self._constante((nombre, self._argumentos(nodo))))
+        else:
+            raise self._error(f"no se puede llamar a '{nombre}' aquí", nodo)
+
+    def method_call(self, nodo):
+        # identifier "." identifier "(" argument_list? ")"
+        receptor, metodo = [hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier']
+        simbolo, _ = self._resolver(self._nombre(receptor), receptor)
+        if simbolo is not None and simbolo.kind == 'clase':
+            raise self._error("las llamadas a través de la clase (Clase.metodo()) no se generan", nodo)
+        self._cargar(self._nombre(receptor), receptor)
+        self._marco.emitir(LLAMAR_METODO, self._constante((self._nombre(metodo), self._argumentos(nodo))))
+
+
+def generar_codigo(arbol, analizador):
+    """Programa de 'arbol', que 'analizador' acaba de analizar con start_analysis()."""
+    return GeneradorCodigo(analizador).generar(arbol)
+
+
+def compilar_fuente(codigo, parser=None, analizador=None, plegar=True):
+    """
+    Parsea, analiza y genera el bytecode de un texto. Lanza ErrorGeneracion si tiene errores.
+    Con 'plegar' las constantes se pliegan antes de generar (optimizador.py).
+    """
+    from compilador_batch import cargar_modulo_semantico  # Evita importar el analizador al cargar este módulo
+    from gramatica import cargar_parser
+    if parser is None:
+        parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    if analizador is None:
+        analizador = cargar_modulo_semantico().SemanticAnalyzer()
+    arbol = parser.parse(codigo)
+    analizador.start_analysis(arbol)
+    if plegar and not analizador.errors:
+        from optimizador import plegar_constantes
+        plegar_constantes(arbol, analizador)
+    return generar_codigo(arbol, analizador)
+
+
+def _argumento(programa, operacion, argumento):
+    if operacion in _CON_CONSTANTE:
+        texto = repr(programa.constantes[argumento])
+        return texto if len(texto) <= 60 else texto[:56] + " ..."  # Arreglos literales largos
+    if operacion == BINARIA:
+        return SIMBOLOS[argumento]
+    if operacion == LLAMAR:
+        return programa.funciones[argumento].nombre
+    if operacion in SALTOS:
+        return f"-> {argumento // 2}"
+    if operacion in (DUPLICAR, DESCARTAR, NEGAR, NO, A_FLOTANTE, ITERAR, RETORNAR):
+        return ""
+    return str(argumento)
+
+
+def desensamblar(programa):
+    """Listado legible del bytecode de todas las funciones."""
+    lineas = [f"{len(programa.funciones)} funciones, {len(programa.clases)} clases, "
+              f"{len(programa.constantes)} constantes, {programa.globales} casillas globales"]
+    for funcion in programa.funciones:
+        lineas.append("")
+        lineas.append(f"{funcion.nombre}: {funcion.parametros} parámetros, {funcion.locales} casillas")
+        anterior = None
+        for i in range(0, len(funcion.codigo), 2):
+            operacion, argumento = funcion.codigo[i], funcion.codigo[i + 1]
+            linea = funcion.lineas[i // 2]
+            columna_linea = f"{linea:>5}" if linea != anterior else " " * 5
+            anterior = linea
+            lineas.append(f"{columna_linea} {i // 2:>5}  {NOMBRES[operacion]:<32} "
+                          f"{_argumento(programa, operacion, argumento)}".rstrip())
+    return "\n".join(lineas)
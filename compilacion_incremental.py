@@ -0,0 +1,460 @@
+"""
+Compilación incremental para el editor: tras una edición solo se vuelven a parsear las
+sentencias de nivel superior que tocó el cambio, y solo se vuelven a analizar las que
+dependen de los nombres que cambiaron.
+
+Cada sentencia de nivel superior es un Fragmento con su texto, su posición en el
+documento, su subárbol y lo que dejó en el análisis semántico: los símbolos que creó,
+los ámbitos que abrió, los nombres globales que consultó y sus errores.
+
+ParserIncremental compara el texto nuevo con el anterior (prefijo y sufijo comunes) y
+vuelve a parsear solo la región editada, ampliada con la sentencia anterior y la
+siguiente: entre dos sentencias el parser LALR está siempre en el mismo estado, así que
+si la sentencia siguiente vuelve a salir igual, lo que viene después no cambia. Las
+sentencias que quedan detrás de la edición se reutilizan desplazando sus posiciones.
+
+CompilacionIncremental deshace el efecto de los fragmentos afectados sobre la tabla de
+símbolos (sus símbolos globales, sus ámbitos y los cambios que hicieron a símbolos de
+otros fragmentos) y los vuelve a visitar en orden. Un fragmento que no cambió se vuelve
+a analizar solo si consultó algún nombre que declara, asigna o usa un fragmento afectado.
+"""
+from bisect import bisect_left, bisect_right
+
+from lark import Token, Tree, UnexpectedInput
+from lark.exceptions import UnexpectedCharacters, UnexpectedEOF, UnexpectedToken
+
+from perfilado import fase
+from registro import obtener_registro, esta_activo
+
+log_incremental = obtener_registro("incremental")
+
+_REINTENTOS = 3  # Ampliaciones de la región antes de parsear hasta el final del documento
+# Inicios de los terminales que pueden abarcar mucho texto (comentarios, cadenas, caracteres)
+_APERTURAS = ("<<", '"', "'")
+# Los errores de redeclaración citan la línea de otro símbolo: se regeneran si cambian las líneas
+_CITA_LINEA = "(Línea: "
+
+
+class Fragmento:
+    """Una sentencia de nivel superior y lo que produjo al analizarla."""
+
+    __slots__ = ("texto", "inicio", "fin", "linea", "columna", "linea_fin", "arbol", "pendiente",
+                 "accesos", "globales", "simbolos", "ambitos", "ambitos_globales", "instantaneas",
+                 "errores", "_nombres")
+
+    def __init__(self, texto, inicio, fin, arbol):
+        self.texto = texto
+        self.inicio = inicio  # Desplazamientos en el documento: texto == documento[inicio:fin]
+        self.fin = fin
+        self.linea = arbol.meta.line
+        self.columna = arbol.meta.column
+        self.linea_fin = arbol.meta.end_line
+        self.arbol = arbol
+        self.pendiente = 0  # Líneas que aún no se sumaron a las posiciones del subárbol
+        self._nombres = None
+        self.reiniciar_semantica()
+
+    def reiniciar_semantica(self):
+        self.accesos = set()  # Nombres globales consultados, declarados o asignados
+        self.globales = []  # Símbolos que agregó al ámbito global
+        self.simbolos = []  # Todos los símbolos que creó (para desplazar sus líneas)
+        self.ambitos = []  # Ámbitos que abrió, a cualquier nivel
+        self.ambitos_globales = []  # Los que cuelgan directamente del ámbito global
+        self.instantaneas = []  # (símbolo ajeno, referencias, inicializado, tipo) antes de tocarlo
+        self.errores = []
+
+    def nombres(self):
+        """Identificadores que aparecen en el texto (cota superior de lo que puede consultar)."""
+        if self._nombres is None:
+            self._nombres = {token.value for nodo in self.arbol.find_data("identifier")
+                             for token in nodo.children if isinstance(token, Token)}
+        return self._nombres
+
+    def desplazar(self, caracteres, lineas):
+        """Mueve el fragmento en el documento sin tocar todavía su subárbol."""
+        self.inicio += caracteres
+        self.fin += caracteres
+        if lineas:
+            self.linea += lineas
+            self.linea_fin += lineas
+            self.pendiente += lineas
+            for simbolo in self.simbolos:
+                if isinstance(simbolo.line, int):
+                    simbolo.line += lineas
+            for error in self.errores:
+                error.desplazar(lineas)
+
+    def arbol_al_dia(self):
+        """Subárbol con las líneas actualizadas (se recorre solo si hubo desplazamientos)."""
+        if self.pendiente:
+            lineas = self.pendiente
+            for nodo in self.arbol.iter_subtrees():
+                if not nodo.meta.empty:
+                    nodo.meta.line += lineas
+                    nodo.meta.end_line += lineas
+                for hijo in nodo.children:
+                    if isinstance(hijo, Token) and hijo.line is not None:
+                        hijo.line += lineas
+                        hijo.end_line += lineas
+            self.pendiente = 0
+        return self.arbol
+
+
+def _inicio(fragmento):
+    return fragmento.inicio
+
+
+def _fin(fragmento):
+    return fragmento.fin
+
+
+def _prefijo_comun(a, b):
+    """Longitud del prefijo común, comparando mitades (memcmp) en lugar de carácter a carácter."""
+    bajo, alto = 0, min(len(a), len(b))
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[bajo:medio] == b[bajo:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def _sufijo_comun(a, b, limite):
+    """Longitud del sufijo común, sin pasar de 'limite' caracteres."""
+    bajo, alto = 0, min(len(a), len(b), limite)
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[len(a) - medio:len(a) - bajo] == b[len(b) - medio:len(b) - bajo]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def _error_de_contexto(error, texto, inicio):
+    """
+    True si el error puede deberse a que la región se cortó: ocurre al final, o antes de
+    él empieza un comentario o una cadena que en el documento completo podría cerrarse
+    después de la región. Si no, hasta el error los tokens y estados son los mismos que
+    al parsear el documento completo, y el error también ocurriría ahí.
+    """
+    if isinstance(error, UnexpectedEOF) or (isinstance(error, UnexpectedToken) and error.token.type == "$END"):
+        return True
+    posicion = getattr(error, "pos_in_stream", None)
+    # Se incluye el propio token del error: puede ser el primer '<' de un '<<' sin cerrar
+    previo = texto if posicion is None else texto[:max(posicion - inicio + 2, 0)]
+    return any(apertura in previo for apertura in _APERTURAS)
+
+
+class ParserIncremental:
+    """Mantiene el árbol de un documento y lo actualiza parseando solo la región editada."""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.texto = None  # Último texto parseado con éxito
+        self.fragmentos = []
+        self.lineas = 0  # Líneas que añadió (o quitó) la última edición
+        self.estadisticas = {}
+
+    def arbol(self):
+        """Árbol 'start' del último texto parseado con éxito."""
+        return Tree("start", [fragmento.arbol_al_dia() for fragmento in self.fragmentos])
+
+    def _parsear(self, texto, inicio, linea, columna):
+        """
+        Parsea documento[inicio:...] == texto con posiciones absolutas: el relleno de saltos
+        de línea y espacios (que la gramática ignora) hace que el lexer empiece en (linea, columna).
+        Devuelve los fragmentos de sus sentencias.
+        """
+        relleno = "\n" * (linea - 1) + " " * (columna - 1)
+        try:
+            arbol = self.parser.parse(relleno + texto)
+        except UnexpectedInput as error:
+            if getattr(error, "pos_in_stream", None) is not None:
+                error.pos_in_stream += inicio - len(relleno)
+            raise
+        base = inicio - len(relleno)
+        fragmentos = []
+        for sentencia in arbol.children:
+            desde, hasta = sentencia.meta.start_pos + base, sentencia.meta.end_pos + base
+            fragmentos.append(Fragmento(texto[desde - inicio:hasta - inicio], desde, hasta, sentencia))
+        return fragmentos
+
+    def actualizar(self, texto):
+        """
+        Actualiza el árbol para 'texto'. Devuelve (eliminados, nuevos, desde): los
+        fragmentos anteriores que ya no existen, los que se crearon y la posición del
+        primer fragmento que no está antes de la edición; None si el texto no cambió.
+        Si hay un error sintáctico lanza UnexpectedInput y conserva el estado anterior.
+        """
+        if texto == self.texto:
+            return None
+        if self.texto is None or not self.fragmentos:
+            nuevos = self._parsear(texto, 0, 1, 1)
+            eliminados, self.fragmentos, self.texto = self.fragmentos, nuevos, texto
+            self.lineas = 0
+            self.estadisticas = {"fragmentos": len(nuevos), "reparseados": len(nuevos)}
+            return eliminados, nuevos, 0
+
+        anterior, fragmentos = self.texto, self.fragmentos
+        prefijo = _prefijo_comun(anterior, texto)
+        sufijo = _sufijo_comun(anterior, texto, min(len(anterior), len(texto)) - prefijo)
+        fin_anterior = len(anterior) - sufijo  # La edición reemplaza anterior[prefijo:fin_anterior]
+        caracteres = len(texto) - len(anterior)
+        lineas = texto.count("\n", prefijo, len(texto) - sufijo) - anterior.count("\n", prefijo, fin_anterior)
+
+        # Región a reparsear: los fragmentos que toca la edición más el anterior y el siguiente
+        primero = bisect_left(fragmentos, prefijo, key=_fin)
+        ultimo = bisect_right(fragmentos, fin_anterior, key=_inicio) - 1
+        bajo = max(primero - 1, 0)
+        alto = ultimo + 1
+        if primero == 0:
+            inicio, linea, columna = 0, 1, 1
+        else:
+            inicio, linea, columna = fragmentos[bajo].inicio, fragmentos[bajo].linea, fragmentos[bajo].columna
+
+        for intento in range(_REINTENTOS + 1):
+            # Las sentencias que empiezan en la línea donde acaba la región cambian de columna
+            while alto + 1 < len(fragmentos) and fragmentos[alto + 1].linea == fragmentos[alto].linea_fin:
+                alto += 1
+            if intento == _REINTENTOS or alto >= len(fragmentos):
+                alto = len(fragmentos)
+            siguiente = fragmentos[alto] if alto < len(fragmentos) else None
+            fin = siguiente.fin + caracteres if siguiente else len(texto)
+            try:
+                region = self._parsear(texto[inicio:fin], inicio, linea, columna)
+            except UnexpectedInput as error:
+                if siguiente is None or not _error_de_contexto(error, texto[inicio:fin], inicio):
+                    raise
+                alto += 1
+                continue
+            if siguiente is None:
+                break
+            # La siguiente sentencia no cambió: si vuelve a salir igual, lo que sigue tampoco cambia
+            if (region and region[-1].inicio == siguiente.inicio + caracteres
+                    and region[-1].fin == fin and region[-1].columna == siguiente.columna):
+                break
+            alto += 1
+
+        # Se reutilizan los fragmentos de la región que quedaron fuera de la edición
+        intactos = {}
+        for fragmento in fragmentos[bajo:alto + 1]:
+            if fragmento.fin < prefijo:
+                intactos[(fragmento.inicio, fragmento.fin)] = (fragmento, 0, 0)
+            elif fragmento.inicio > fin_anterior:
+                intactos[(fragmento.inicio + caracteres, fragmento.fin + caracteres)] = (fragmento, caracteres, lineas)
+        reutilizados, nuevos = [], []
+        desde = bajo
+        for fragmento in region:
+            previo = intactos.get((fragmento.inicio, fragmento.fin))
+            if previo and previo[0].texto == fragmento.texto and previo[0].columna == fragmento.columna:
+                previo[0].desplazar(previo[1], previo[2])
+                reutilizados.append(previo[0])
+                if previo[0].fin < prefijo:
+                    desde += 1
+            else:
+                reutilizados.append(fragmento)
+                nuevos.append(fragmento)
+        conservados = {id(f) for f in reutilizados}
+        eliminados = [f for f in fragmentos[bajo:alto + 1] if id(f) not in conservados]
+
+        posteriores = fragmentos[alto + 1:]
+        for fragmento in posteriores:
+            fragmento.desplazar(caracteres, lineas)
+        self.fragmentos = fragmentos[:bajo] + reutilizados + posteriores
+        self.texto = texto
+        self.lineas = lineas
+        self.estadisticas = {"fragmentos": len(self.fragmentos), "reparseados": len(region)}
+        return eliminados, nuevos, desde
+
+
+class CompilacionIncremental:
+    """
+    Parser incremental más análisis semántico incremental sobre un SemanticAnalyzer.
+
+    Después de compilar(), analizador.errors y analizador.symbol_table tienen el mismo
+    contenido que dejaría analizador.start_analysis(arbol) sobre el documento completo.
+    """
+
+    def __init__(self, parser, analizador):
+        self.parser = ParserIncremental(parser)
+        self.analizador = analizador
+        self.estadisticas = {}
+        self.perfilador = None  # perfilado.Perfilador que mide las fases de compilar(), si se asigna
+        self._actual = None  # Fragmento que se está analizando
+        self._propios = set()  # Símbolos creados por el fragmento actual
+        self._vistos = set()  # Símbolos ajenos de los que ya se guardó una instantánea
+        self._desordenado = False  # El ámbito global no sigue el orden del documento
+        self._instalar_registro(analizador.symbol_table)
+
+    def _instalar_registro(self, tabla):
+        """Envuelve lookup/add_symbol/push_scope de la tabla para registrar qué hace cada fragmento."""
+        buscar, agregar, entrar, todos = tabla.lookup, tabla.add_symbol, tabla.push_scope, tabla.get_all_symbols
+
+        def lookup(name):
+            simbolo = buscar(name)
+            fragmento = self._actual
+            if fragmento is not None and (simbolo is None or simbolo not in self._propios):
+                fragmento.accesos.add(name)
+                if simbolo is not None:
+                    self._guardar_instantanea(fragmento, simbolo)
+                    if simbolo.kind == 'clase':
+                        for metodo in simbolo.associated_methods.values():
+                            self._guardar_instantanea(fragmento, metodo)
+            return simbolo
+
+        def add_symbol(symbol_entry):
+            global_ = tabla.current_scope is tabla.global_scope
+            exito, mensaje = agregar(symbol_entry)
+            fragmento = self._actual
+            if fragmento is not None:
+                if global_:
+                    fragmento.accesos.add(symbol_entry.name)
+                if exito:
+                    self._propios.add(symbol_entry)
+                    fragmento.simbolos.append(symbol_entry)
+                    if global_:
+                        fragmento.globales.append(symbol_entry)
+            return exito, mensaje
+
+        def push_scope(name=None):
+            padre = tabla.current_scope
+            ambito = entrar(name)
+            fragmento = self._actual
+            if fragmento is not None:
+                fragmento.ambitos.append(ambito)
+                if padre is tabla.global_scope:
+                    fragmento.ambitos_globales.append(ambito)
+            return ambito
+
+        def get_all_symbols():
+            if self._desordenado:
+                self._ordenar_ambito_global()
+            return todos()
+
+        tabla.lookup, tabla.add_symbol, tabla.push_scope = lookup, add_symbol, push_scope
+        tabla.get_all_symbols = get_all_symbols
+
+    def _guardar_instantanea(self, fragmento, simbolo):
+        if simbolo not in self._vistos:
+            self._vistos.add(simbolo)
+            fragmento.instantaneas.append((simbolo, simbolo.references, simbolo.initialized, simbolo.sym_type))
+
+    def arbol(self):
+        return self.parser.arbol()
+
+    def compilar(self, texto):
+        """
+        Actualiza la tabla de símbolos y los errores del analizador para 'texto'. Devuelve
+        False si el texto no cambió desde la última compilación. El árbol se pide aparte
+        con arbol(), que recorre los subárboles desplazados solo cuando hace falta.
+        Un error sintáctico se propaga como UnexpectedInput y deja intacto el último estado.
+        """
+        with fase(self.perfilador, "sintactico"):
+            cambios = self.parser.actualizar(texto)
+        if cambios is None:
+            return False
+        eliminados, nuevos, desde = cambios
+        with fase(self.perfilador, "semantico"):
+            if not eliminados and len(nuevos) == len(self.parser.fragmentos):
+                self._analizar_todo()
+            elif not self._analizar_cambios(eliminados, nuevos, desde):
+                self._analizar_todo()
+            self._recoger_errores()
+        self.estadisticas.update(self.parser.estadisticas)
+        if esta_activo(log_incremental):
+            log_incremental.debug("Compilación incremental: %s", self.estadisticas)
+        return True
+
+    def _analizar_fragmento(self, fragmento):
+        analizador, tabla = self.analizador, self.analizador.symbol_table
+        fragmento.reiniciar_semantica()
+        self._actual, self._propios, self._vistos = fragmento, set(), set()
+        tabla.current_scope = tabla.global_scope
+        analizador.current_function = None
+        inicio = len(analizador.errors)
+        try:
+            analizador.analyze_tree(fragmento.arbol_al_dia())
+        finally:
+            self._actual = None
+        fragmento.errores = analizador.errors[inicio:]
+
+    def _analizar_todo(self):
+        self.analizador.prepare_analysis()
+        for fragmento in self.parser.fragmentos:
+            self._analizar_fragmento(fragmento)
+        self._desordenado = False
+        self.estadisticas = {"modo": "completo", "reanalizados": len(self.parser.fragmentos)}
+
+    def _analizar_cambios(self, eliminados, nuevos, desde):
+        """Reanaliza lo afectado por la edición. Devuelve False si hace falta un análisis completo."""
+        fragmentos = self.parser.fragmentos
+        nuevos_set = set(nuevos)
+        afectados = set()  # Nombres cuyo estado puede haber cambiado
+        for fragmento in eliminados:
+            afectados |= fragmento.accesos
+        for fragmento in nuevos:
+            afectados |= fragmento.nombres()
+
+        # Los fragmentos anteriores a la edición no dependen de lo que viene después
+        lineas = self.parser.lineas
+        sucios = []  # Fragmentos a reanalizar, en orden
+        for fragmento in fragmentos[desde:]:
+            if fragmento in nuevos_set:
+                sucios.append(fragmento)
+            elif not afectados.isdisjoint(fragmento.accesos) or (
+                    lineas and any(_CITA_LINEA in error.mensaje for error in fragmento.errores)):
+                sucios.append(fragmento)
+                afectados |= fragmento.accesos
+
+        # Deshacer en orden inverso al del análisis anterior: los eliminados estaban en la
+        # región editada, antes que cualquier fragmento reutilizado que haya que reanalizar
+        tabla = self.analizador.symbol_table
+        deshacer = eliminados + [f for f in sucios if f not in nuevos_set]
+        for fragmento in reversed(deshacer):
+            for simbolo, referencias, inicializado, tipo in reversed(fragmento.instantaneas):
+                simbolo.references, simbolo.initialized, simbolo.sym_type = referencias, inicializado, tipo
+            for simbolo in fragmento.globales:
+                if tabla.global_scope.symbols.get(simbolo.name) is simbolo:
+                    del tabla.global_scope.symbols[simbolo.name]
+                    enlaces = tabla._bindings.get(simbolo.name)
+                    if enlaces and enlaces[-1] is simbolo:
+                        enlaces.pop()
+                        if not enlaces:
+                            del tabla._bindings[simbolo.name]
+            for ambito in fragmento.ambitos:
+                if tabla.scopes.get(ambito.name) is ambito:
+                    del tabla.scopes[ambito.name]
+
+        analizador = self.analizador
+        analizador.prepare_reanalysis()
+        nuevos_accesos = set()
+        for fragmento in sucios:
+            self._analizar_fragmento(fragmento)
+            nuevos_accesos |= fragmento.accesos - afectados
+        if nuevos_accesos:
+            # La versión nueva consultó nombres que no se previeron: si algún fragmento que
+            # no se reanalizó también los usa, su análisis anterior ya no vale
+            reanalizados = set(sucios)
+            if any(not nuevos_accesos.isdisjoint(f.accesos) for f in fragmentos[desde:] if f not in reanalizados):
+                return False
+        self._desordenado = True
+        self.estadisticas = {"modo": "incremental", "reanalizados": len(sucios)}
+        return True
+
+    def _recoger_errores(self):
+        self.analizador.symbol_table.current_scope = self.analizador.symbol_table.global_scope
+        self.analizador.errors = [error for f in self.parser.fragmentos for error in f.errores]
+
+    def _ordenar_ambito_global(self):
+        """
+        Los fragmentos reanalizados agregan sus símbolos y ámbitos al final del ámbito
+        global; get_all_symbols los devuelve en el orden del documento reordenándolos
+        aquí, solo cuando alguien pide la tabla completa.
+        """
+        global_ = self.analizador.symbol_table.global_scope
+        fragmentos = self.parser.fragmentos
+        global_.symbols = {simbolo.name: simbolo for f in fragmentos for simbolo in f.globales}
+        global_._children_scopes = [ambito for f in fragmentos for ambito in f.ambitos_globales] or None
+        self._desordenado = False
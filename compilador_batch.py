@@ -0,0 +1,329 @@
+"""
+Compilador por lotes (sin interfaz gráfica) para programas Polux.
+
+Ejemplo:
+    python compilador_batch.py programas/ otros/*.polux --salida resultados.json
+    python compilador_batch.py corpus/ --trabajos 0 --tiempo-limite 10
+    python compilador_batch.py prueba.polux --registro semantico=DEBUG,ambitos=DEBUG
+    python compilador_batch.py programas/ --exportar-tablas tablas/
+    python compilador_batch.py config/ --plegar --exportar-tablas tablas/
+    python compilador_batch.py grande.polux --perfilar --perfil-pilas pilas.txt --perfil-pstats perfil.pstats
+"""
+import argparse
+import concurrent.futures
+import glob
+import importlib.util
+import json
+import os
+import signal
+import sys
+
+from lark import UnexpectedInput
+
+from diagnosticos import ERROR
+from formato_tabla import escribir_tabla, registro_de_simbolo
+from gramatica import DIRECTORIO_BASE, cargar_parser
+from optimizador import plegar_constantes
+from perfilado import Perfilador, fase, reglas_de
+from registro import configurar_registro
+
+EXTENSION_POLUX = ".polux"
+RUTA_SEMANTICO = os.path.join(DIRECTORIO_BASE, "Analizador semantico.py")
+NOMBRE_MODULO_SEMANTICO = "analizador_semantico"
+
+def cargar_modulo_semantico():
+    """
+    Importa 'Analizador semantico.py' (el nombre tiene un espacio, así que no se puede
+    usar import normal). La interfaz Tk solo se crea cuando ese archivo se ejecuta
+    directamente, por lo que importarlo aquí no abre ninguna ventana.
+    """
+    if NOMBRE_MODULO_SEMANTICO in sys.modules:
+        return sys.modules[NOMBRE_MODULO_SEMANTICO]
+    spec = importlib.util.spec_from_file_location(NOMBRE_MODULO_SEMANTICO, RUTA_SEMANTICO)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[NOMBRE_MODULO_SEMANTICO] = modulo
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[NOMBRE_MODULO_SEMANTICO]
+        raise
+    return modulo
+
+
+def expandir_entradas(entradas):
+    """Convierte archivos, directorios y patrones glob en una lista ordenada de archivos."""
+    archivos = []
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = glob.glob(os.path.join(entrada, "**", f"*{EXTENSION_POLUX}"), recursive=True)
+        elif glob.has_magic(entrada):
+            candidatos = glob.glob(entrada, recursive=True)
+        else:
+            candidatos = [entrada]
+        for ruta in sorted(candidatos):
+            if ruta not in vistos and not os.path.isdir(ruta):
+                vistos.add(ruta)
+                archivos.append(ruta)
+    return archivos
+
+
+def _diagnostico(fase, codigo, mensaje, linea=None, columna=None):
+    """Diagnóstico de las fases previas al análisis semántico, con las claves de Diagnostico.como_dict()."""
+    return {"fase": fase, "severidad": ERROR, "codigo": codigo, "linea": linea, "columna": columna,
+            "linea_fin": linea, "columna_fin": None, "mensaje": mensaje}
+
+
+def _mensaje_sintactico(error):
+    """Mensaje de error sintáctico estable (Lark lista los tokens esperados en orden de conjunto)."""
+    esperados = sorted(t for t in getattr(error, "accepts", None) or getattr(error, "expected", None) or []
+                       if not t.startswith("__"))
+    token = getattr(error, "token", None)
+    encontrado = f"token inesperado '{token}'" if token is not None else "entrada inesperada"
+    return (f"Error sintáctico en línea {error.line}, columna {error.column}: {encontrado}. "
+            f"Se esperaba: {', '.join(esperados) if esperados else 'desconocido'}")
+
+
+class CompiladorPolux:
+    """
+    Ejecuta las fases léxica, sintáctica y semántica sobre textos fuente. Con un
+    perfilador (perfilado.py) mide cada fase y cada método visitante del analizador.
+    Con 'plegar', un programa sin errores pasa además por el plegado de constantes
+    (optimizador.py): la tabla de símbolos sale con los valores plegados.
+    """
+
+    def __init__(self, perfilador=None, plegar=False):
+        self.parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+        self.analizador = cargar_modulo_semantico().SemanticAnalyzer()
+        self.perfilador = perfilador
+        self.plegar = plegar
+        if perfilador is not None:
+            perfilador.instrumentar(self.analizador, reglas_de(self.parser))
+
+    def compilar(self, codigo, archivo="<texto>"):
+        resultado = {"archivo": archivo, "tokens": 0, "diagnosticos": [], "simbolos": []}
+
+        # Fase léxica
+        try:
+            with fase(self.perfilador, "lexico"):
+                resultado["tokens"] = sum(1 for _ in self.parser.lex(codigo))
+        except UnexpectedInput as error:
+            resultado["diagnosticos"].append(_diagnostico(
+                "lexico", "L001", f"Error léxico: {error}", error.line, error.column))
+            return resultado
+
+        # Fase sintáctica (el parser vuelve a lexear con su lexer contextual)
+        try:
+            with fase(self.perfilador, "sintactico"):
+                arbol = self.parser.parse(codigo)
+        except UnexpectedInput as error:
+            resultado["diagnosticos"].append(_diagnostico(
+                "sintactico", "P001", _mensaje_sintactico(error), error.line, error.column))
+            return resultado
+
+        # Fase semántica
+        with fase(self.perfilador, "semantico"):
+            self.analizador.start_analysis(arbol)
+        if self.plegar and not self.analizador.errors:
+            with fase(self.perfilador, "plegado"):
+                plegado = plegar_constantes(arbol, self.analizador)
+            resultado["diagnosticos"].extend(advertencia.como_dict() for advertencia in plegado.advertencias)
+            resultado["plegado"] = {clave: valor for clave, valor in plegado.como_dict().items()
+                                    if clave != "advertencias"}
+        with fase(self.perfilador, "tabla"):
+            resultado["diagnosticos"].extend(error.como_dict() for error in self.analizador.errors)
+            resultado["simbolos"] = [registro_de_simbolo(s) for s in self.analizador.symbol_table.get_all_symbols()]
+        return resultado
+
+    def compilar_archivo(self, ruta):
+        try:
+            with open(ruta, "r", encoding="utf-8") as archivo:
+                codigo = archivo.read()
+        except (OSError, UnicodeDecodeError) as error:
+            return {"archivo": ruta, "tokens": 0, "simbolos": [],
+                    "diagnosticos": [_diagnostico("entrada", "E001", f"No se pudo leer el archivo: {error}")]}
+        return self.compilar(codigo, ruta)
+
+
+class TiempoAgotado(BaseException):
+    """
+    Se lanza desde SIGALRM cuando un archivo excede su tiempo límite. Hereda de
+    BaseException para que el 'except Exception' de start_analysis no la absorba.
+    """
+
+
+def _alarma(signum, frame):
+    raise TiempoAgotado()
+
+
+def compilar_con_limite(compilador, ruta, tiempo_limite=None):
+    """
+    Compila un archivo cortándolo si tarda más de 'tiempo_limite' segundos.
+    El límite usa SIGALRM, así que solo se aplica en sistemas POSIX.
+    """
+    if not tiempo_limite or not hasattr(signal, "SIGALRM"):
+        return compilador.compilar_archivo(ruta)
+    anterior = signal.signal(signal.SIGALRM, _alarma)
+    signal.setitimer(signal.ITIMER_REAL, tiempo_limite)
+    try:
+        return compilador.compilar_archivo(ruta)
+    except TiempoAgotado:
+        return {"archivo": ruta, "tokens": 0, "simbolos": [],
+                "diagnosticos": [_diagnostico("entrada", "E002", f"Tiempo límite de {tiempo_limite} s agotado")]}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+# Estado de cada proceso trabajador: un compilador (y su parser) por proceso
+_compilador_trabajador = None
+_tiempo_limite_trabajador = None
+
+
+def _iniciar_trabajador(registro, tiempo_limite, plegar=False):
+    global _compilador_trabajador, _tiempo_limite_trabajador
+    # Con 'spawn' el proceso no hereda los niveles configurados en el principal
+    configurar_registro(registro)
+    # El parser se carga una vez por proceso desde la caché en disco de gramatica.py
+    _compilador_trabajador = CompiladorPolux(plegar=plegar)
+    _tiempo_limite_trabajador = tiempo_limite
+
+
+def _compilar_en_trabajador(ruta):
+    return compilar_con_limite(_compilador_trabajador, ruta, _tiempo_limite_trabajador)
+
+
+def compilar_archivos(archivos, trabajos=1, tiempo_limite=None, registro=None, perfilador=None, plegar=False):
+    """
+    Compila una lista de archivos y devuelve los resultados en el mismo orden.
+
+    Con trabajos > 1 los archivos se reparten en un pool de procesos; cada proceso
+    reutiliza su parser y su SemanticAnalyzer para todos los archivos que recibe, así
+    que el estado mutable de los analizadores nunca se comparte entre procesos.
+    'registro' es la especificación de niveles de registro.py que usan los trabajadores.
+    Con 'perfilador' todo corre en este proceso, para que las mediciones queden en él.
+    """
+    if trabajos is None or trabajos <= 0:
+        trabajos = os.cpu_count() or 1
+    trabajos = min(trabajos, len(archivos)) or 1
+    if perfilador is not None:
+        trabajos = 1
+
+    if trabajos == 1:
+        compilador = CompiladorPolux(perfilador, plegar)
+        return [compilar_con_limite(compilador, ruta, tiempo_limite) for ruta in archivos]
+
+    # Lotes pequeños para equilibrar carga sin pagar un viaje IPC por archivo
+    tamano_lote = max(1, min(16, len(archivos) // (trabajos * 4)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=trabajos, initializer=_iniciar_trabajador,
+                                                initargs=(registro, tiempo_limite, plegar)) as pool:
+        # map conserva el orden de entrada, así que la mezcla es determinista
+        return list(pool.map(_compilar_en_trabajador, archivos, chunksize=tamano_lote))
+
+
+def resumir(resultados):
+    resumen = {"archivos": len(resultados), "archivos_con_errores": 0, "diagnosticos": 0, "simbolos": 0}
+    for resultado in resultados:
+        if any(diagnostico["severidad"] == ERROR for diagnostico in resultado["diagnosticos"]):
+            resumen["archivos_con_errores"] += 1
+        resumen["diagnosticos"] += len(resultado["diagnosticos"])
+        resumen["simbolos"] += len(resultado["simbolos"])
+    return resumen
+
+
+def escribir_resultados(resultados, destino, formato):
+    if formato == "jsonl":
+        for resultado in resultados:
+            destino.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+    else:
+        json.dump({"resumen": resumir(resultados), "resultados": resultados}, destino, ensure_ascii=False, indent=2)
+        destino.write("\n")
+
+
+def exportar_tablas(resultados, directorio):
+    """
+    Guarda la tabla de símbolos de cada archivo como <nombre>.plxs (ver formato_tabla.py),
+    con los subdirectorios que tenga respecto de la raíz común de las entradas: a/main.polux
+    y b/main.polux quedan como a/main.plxs y b/main.plxs, no uno encima del otro.
+    """
+    rutas = [os.path.abspath(resultado["archivo"]) for resultado in resultados]
+    try:
+        raiz = os.path.commonpath([os.path.dirname(ruta) for ruta in rutas]) if rutas else ""
+    except ValueError:
+        raiz = None  # En Windows, archivos de unidades distintas: se conserva la ruta entera
+    for resultado, ruta in zip(resultados, rutas):
+        relativa = os.path.relpath(ruta, raiz) if raiz is not None else os.path.splitdrive(ruta)[1].lstrip("\\/")
+        destino = os.path.join(directorio, os.path.splitext(relativa)[0] + ".plxs")
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        escribir_tabla(destino, resultado["simbolos"])
+
+
+def crear_argumentos():
+    argumentos = argparse.ArgumentParser(description="Compila programas Polux sin interfaz gráfica.")
+    argumentos.add_argument("entradas", nargs="+", help="Archivos, directorios o patrones glob de programas .polux")
+    argumentos.add_argument("-o", "--salida", help="Archivo de salida (por defecto, la salida estándar)")
+    argumentos.add_argument("--formato", choices=["json", "jsonl"], default="json",
+                            help="json: un documento con resumen; jsonl: una línea por archivo")
+    argumentos.add_argument("--exportar-tablas", metavar="DIRECTORIO",
+                            help="Guardar también la tabla de símbolos de cada archivo en formato .plxs")
+    argumentos.add_argument("--plegar", action="store_true",
+                            help="Plegar las constantes de los programas sin errores (optimizador.py)")
+    argumentos.add_argument("-j", "--trabajos", type=int, default=1,
+                            help="Procesos en paralelo (0 = uno por CPU)")
+    argumentos.add_argument("--tiempo-limite", type=float, default=None,
+                            help="Segundos máximos por archivo (solo POSIX)")
+    argumentos.add_argument("--registro", metavar="ESPEC", default=None,
+                            help="Niveles de registro: 'DEBUG' o 'semantico=DEBUG,arbol=DEBUG' "
+                                 "(por defecto, la variable POLUX_LOG)")
+    argumentos.add_argument("--depuracion", action="store_true", help="Atajo de --registro DEBUG")
+    perfil = argumentos.add_argument_group("perfilado", "Cualquiera de estas opciones compila en un solo proceso")
+    perfil.add_argument("--perfilar", action="store_true",
+                        help="Mostrar en stderr el tiempo de cada fase y de cada método visitante")
+    perfil.add_argument("--perfil-memoria", action="store_true",
+                        help="Medir también la memoria pico de cada fase (tracemalloc, más lento)")
+    perfil.add_argument("--perfil-pstats", metavar="RUTA", help="Guardar un perfil de cProfile (pstats)")
+    perfil.add_argument("--perfil-pilas", metavar="RUTA",
+                        help="Guardar las pilas colapsadas fase;método para flamegraph.pl o speedscope")
+    return argumentos
+
+
+def main(argv=None):
+    opciones = crear_argumentos().parse_args(argv)
+    registro = "DEBUG" if opciones.depuracion else opciones.registro
+    configurar_registro(registro)
+    archivos = expandir_entradas(opciones.entradas)
+    if not archivos:
+        print("No se encontraron programas para compilar.", file=sys.stderr)
+        return 2
+
+    perfilador = None
+    if opciones.perfilar or opciones.perfil_memoria or opciones.perfil_pstats or opciones.perfil_pilas:
+        perfilador = Perfilador(memoria=opciones.perfil_memoria, cprofile=bool(opciones.perfil_pstats))
+
+    resultados = compilar_archivos(archivos, trabajos=opciones.trabajos, tiempo_limite=opciones.tiempo_limite,
+                                   registro=registro, perfilador=perfilador, plegar=opciones.plegar)
+
+    if opciones.salida:
+        with open(opciones.salida, "w", encoding="utf-8") as destino:
+            escribir_resultados(resultados, destino, opciones.formato)
+    else:
+        escribir_resultados(resultados, sys.stdout, opciones.formato)
+
+    if opciones.exportar_tablas:
+        exportar_tablas(resultados, opciones.exportar_tablas)
+
+    if perfilador is not None:
+        print(perfilador.informe(), file=sys.stderr)
+        if opciones.perfil_pstats:
+            perfilador.guardar_pstats(opciones.perfil_pstats)
+        if opciones.perfil_pilas:
+            perfilador.guardar_pilas(opciones.perfil_pilas)
+
+    resumen = resumir(resultados)
+    print(f"{resumen['archivos']} archivo(s), {resumen['archivos_con_errores']} con errores, "
+          f"{resumen['diagnosticos']} diagnóstico(s).", file=sys.stderr)
+    return 1 if resumen["archivos_con_errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Diagnósticos estructurados del compilador.
+
+Cada Diagnostico guarda por separado su severidad, su código, su fase, la posición de
+inicio y de fin del nodo (el span) y el mensaje; str(diagnostico) da el texto de siempre,
+"Error Semántico (Línea N, Col M): mensaje", así que mostrarlo no cambia nada, pero quien
+necesita la línea o la columna la lee del atributo en lugar de volver a parsear el texto.
+
+IndiceDiagnosticos agrupa una lista de diagnósticos por línea: los conteos por
+severidad, los diagnósticos de una línea y los rangos que hay que resaltar en el editor
+(líneas consecutivas unidas, listos para un único Text.tag_add) salen del índice.
+
+El SemanticAnalyzer descarta los diagnósticos repetidos (mismo código, posición y
+mensaje) y no guarda más de MAXIMO_POR_NODO por nodo: en un archivo roto la cascada de
+errores sobre una misma expresión no crece sin límite.
+"""
+
+ERROR = "error"
+ADVERTENCIA = "advertencia"
+
+MAXIMO_POR_NODO = 3  # Diagnósticos que se guardan como mucho sobre un mismo nodo
+
+# Código -> descripción. La primera letra es la fase: E entrada (compilador_batch.py),
+# L léxica, P sintáctica, S semántica
+CODIGOS = {
+    "E001": "archivo ilegible",
+    "E002": "tiempo límite agotado",
+    "L001": "carácter inesperado",
+    "P001": "token inesperado",
+    "S001": "error interno del analizador",
+    "S002": "estructura inesperada del árbol",
+    "S101": "identificador ya declarado",
+    "S102": "identificador no declarado",
+    "S103": "asignación a una constante",
+    "S104": "destino de asignación inválido",
+    "S105": "constante sin valor",
+    "S201": "tipo incompatible en declaración o asignación",
+    "S202": "operandos de tipos incompatibles",
+    "S203": "condición no booleana",
+    "S204": "'for' sobre un valor no iterable",
+    "S205": "división por cero",
+    "S206": "elementos de un arreglo de tipos distintos",
+    "S301": "número de argumentos incorrecto",
+    "S302": "argumento de tipo incompatible",
+    "S303": "llamada a algo que no es función",
+    "S304": "método inexistente",
+    "S305": "clase base no declarada",
+    "S306": "función sin cuerpo",
+}
+
+_TITULOS = {
+    ("lexico", ERROR): "Error Léxico",
+    ("sintactico", ERROR): "Error Sintáctico",
+    ("semantico", ERROR): "Error Semántico",
+    ("semantico", ADVERTENCIA): "Advertencia Semántica",
+}
+
+
+class Diagnostico:
+    """Un error o advertencia con su posición (1-based; None si no se conoce)."""
+
+    __slots__ = ("severidad", "codigo", "fase", "linea", "columna", "linea_fin", "columna_fin", "mensaje")
+
+    def __init__(self, codigo, mensaje, linea=None, columna=None, linea_fin=None, columna_fin=None,
+                 severidad=ERROR, fase="semantico"):
+        self.severidad = severidad
+        self.codigo = codigo
+        self.fase = fase
+        self.linea = linea
+        self.columna = columna
+        self.linea_fin = linea_fin if linea_fin is not None else linea
+        self.columna_fin = columna_fin
+        self.mensaje = mensaje
+
+    @classmethod
+    def en_nodo(cls, codigo, mensaje, nodo, severidad=ERROR):
+        """Diagnóstico semántico con la posición de un Tree (propagate_positions) o de un Token."""
+        posicion = getattr(nodo, "meta", nodo)  # Token: las posiciones están en el propio token
+        if getattr(posicion, "empty", False):
+            return cls(codigo, mensaje, severidad=severidad)
+        return cls(codigo, mensaje, getattr(posicion, "line", None), getattr(posicion, "column", None),
+                   getattr(posicion, "end_line", None), getattr(posicion, "end_column", None), severidad)
+
+    def clave(self):
+        """Lo que identifica al diagnóstico para descartar repetidos."""
+        return (self.codigo, self.linea, self.columna, self.mensaje)
+
+    def desplazar(self, lineas):
+        """Mueve el diagnóstico 'lineas' líneas (compilación incremental)."""
+        if self.linea is not None:
+            self.linea += lineas
+        if self.linea_fin is not None:
+            self.linea_fin += lineas
+
+    def como_dict(self):
+        return {"fase": self.fase, "severidad": self.severidad, "codigo": self.codigo, "linea": self.linea,
+                "columna": self.columna, "linea_fin": self.linea_fin, "columna_fin": self.columna_fin,
+                "mensaje": str(self)}
+
+    def __str__(self):
+        titulo = _TITULOS.get((self.fase, self.severidad), "Error")
+        if self.linea is None:
+            return f"{titulo} (General): {self.mensaje}"
+        columna = self.columna if self.columna is not None else "N/A"
+        return f"{titulo} (Línea {self.linea}, Col {columna}): {self.mensaje}"
+
+    def __repr__(self):
+        return f"Diagnostico({self.codigo!r}, {self.mensaje!r}, línea={self.linea}, col={self.columna})"
+
+    def __eq__(self, otro):
+        if not isinstance(otro, Diagnostico):
+            return NotImplemented
+        return (self.severidad, self.fase, self.linea_fin, self.columna_fin) + self.clave() == \
+            (otro.severidad, otro.fase, otro.linea_fin, otro.columna_fin) + otro.clave()
+
+    def __hash__(self):
+        return hash(self.clave())
+
+
+class IndiceDiagnosticos:
+    """Diagnósticos en el orden en que llegaron, indexados por línea."""
+
+    def __init__(self, diagnosticos=()):
+        self.diagnosticos = []
+        self.por_linea = {}  # línea -> [Diagnostico]; los que no tienen línea no se indexan
+        self.conteos = {}  # severidad -> cantidad
+        self._claves = set()
+        for diagnostico in diagnosticos:
+            self.agregar(diagnostico)
+
+    def agregar(self, diagnostico):
+        """Agrega el diagnóstico si no había otro igual. Devuelve True si se agregó."""
+        clave = diagnostico.clave()
+        if clave in self._claves:
+            return False
+        self._claves.add(clave)
+        self.diagnosticos.append(diagnostico)
+        if diagnostico.linea is not None:
+            self.por_linea.setdefault(diagnostico.linea, []).append(diagnostico)
+        self.conteos[diagnostico.severidad] = self.conteos.get(diagnostico.severidad, 0) + 1
+        return True
+
+    def __len__(self):
+        return len(self.diagnosticos)
+
+    def __iter__(self):
+        return iter(self.diagnosticos)
+
+    def en_linea(self, linea):
+        return self.por_linea.get(linea, [])
+
+    def lineas(self, severidad=None):
+        """Líneas con algún diagnóstico (de esa severidad, si se da), en orden."""
+        if severidad is None:
+            return sorted(self.por_linea)
+        return sorted(linea for linea, lista in self.por_linea.items()
+                      if any(d.severidad == severidad for d in lista))
+
+    def rangos(self, severidad=None):
+        """
+        Índices de Tk "inicio", "fin", "inicio", "fin"... que cubren las líneas con
+        diagnósticos, uniendo las consecutivas: text.tag_add(etiqueta, *indice.rangos()).
+        """
+        indices = []
+        desde = anterior = None
+        for linea in self.lineas(severidad):
+            if anterior is not None and linea == anterior + 1:
+                anterior = linea
+                continue
+            if desde is not None:
+                indices += (f"{desde}.0", f"{anterior}.end")
+            desde = anterior = linea
+        if desde is not None:
+            indices += (f"{desde}.0", f"{anterior}.end")
+        return indices
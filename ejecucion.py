@@ -0,0 +1,119 @@
+"""
+Semántica de ejecución de Polux, compartida por la máquina virtual (maquina_virtual.py)
+y los intérpretes del árbol: valores de los literales, operadores, objetos y el texto
+que escribe show().
+
+Los valores son los de Python: int, float, bool, str (string y char), Objeto
+(instancias de clases) y, para los arreglos, Arreglo o Vector de vectores.py, que
+operan elemento a elemento. Las funciones no tienen 'return' en la gramática, así
+que toda llamada vale None.
+
+La división entre dos enteros es entera (redondea hacia abajo, como el '%' de Python,
+para que a == (a / b) * b + a % b); con algún float es la división real.
+"""
+import operator
+import re
+
+from lark import Token
+
+from vectores import Vector, dividir
+
+
+class ErrorEjecucion(Exception):
+    """Error al ejecutar un programa (división por cero, operación inválida...), con su línea."""
+
+    def __init__(self, mensaje, linea=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.linea = linea
+
+    def __str__(self):
+        if self.linea is None:
+            return f"Error de ejecución: {self.mensaje}"
+        return f"Error de ejecución (Línea {self.linea}): {self.mensaje}"
+
+
+class Objeto:
+    """Instancia de una clase: sus atributos van en 'campos', en el orden de la clase (base primero)."""
+
+    __slots__ = ("clase", "campos")
+
+    def __init__(self, clase, campos):
+        self.clase = clase  # Cualquier descripción de la clase con 'nombre'
+        self.campos = campos
+
+
+OPERADORES_BINARIOS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": dividir, "%": operator.mod, "^": operator.pow,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+}
+# Operador de asignación compuesta -> operador binario
+OPERADORES_ASIGNACION = {"+=": "+", "-=": "-", "*=": "*", "/=": "/"}
+
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}
+
+
+def decodificar_cadena(texto):
+    """Contenido de un literal de cadena o carácter tal como se escribió (con comillas y escapes)."""
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), texto[1:-1])
+
+
+_CODIGOS_ESCAPE = {"\\": "\\\\", "\n": "\\n", "\t": "\\t", "\r": "\\r", "\0": "\\0"}
+
+
+def codificar_cadena(valor, comilla='"'):
+    """Literal de Polux (con comillas y escapes) cuyo contenido es 'valor'; inverso de decodificar_cadena."""
+    escapes = dict(_CODIGOS_ESCAPE, **{comilla: "\\" + comilla})
+    return comilla + "".join(escapes.get(c, c) for c in valor) + comilla
+
+
+def texto_de(nodo):
+    """Texto de los tokens que cuelgan directamente del nodo."""
+    return "".join(hijo.value for hijo in nodo.children if isinstance(hijo, Token))
+
+
+def valor_literal(nodo):
+    """Valor de un nodo integer, string_literal, char_literal o booleano."""
+    texto = texto_de(nodo)
+    if nodo.data == "integer":
+        # DIGIT es NUMBER: también llegan literales con parte decimal o exponente
+        return float(texto) if any(c in texto for c in ".eE") else int(texto)
+    if nodo.data == "booleano":
+        return texto == "True"
+    return decodificar_cadena(texto)
+
+
+def operador_de(nodo):
+    """Texto del operador de un nodo *_operator (o del token mismo)."""
+    return nodo.value if isinstance(nodo, Token) else texto_de(nodo)
+
+
+def formatear(valor):
+    """Texto de un valor para show()."""
+    if isinstance(valor, str):
+        return valor
+    if isinstance(valor, (list, Vector)):
+        return "[" + ", ".join(formatear(elemento) for elemento in valor) + "]"
+    if isinstance(valor, Objeto):
+        return f"<{valor.clase.nombre}>"
+    return str(valor)  # True/False se escriben igual que en Polux
+
+
+def mostrar(valores, salida):
+    """Una línea con los valores separados por espacios, como show(a, b, ...)."""
+    salida.write(" ".join(formatear(valor) for valor in valores) + "\n")
+
+
+def describir_error(error):
+    """Mensaje para un error de Python producido por una operación del programa."""
+    if isinstance(error, ZeroDivisionError):
+        return "división por cero"
+    if isinstance(error, RecursionError):
+        return "demasiadas llamadas anidadas"
+    return f"operación no válida ({error})"
+
+
+# Errores de Python que una operación de Polux puede producir con valores inesperados
+ERRORES_OPERACION = (ZeroDivisionError, TypeError, ValueError, OverflowError, AttributeError, KeyError,
+                     RecursionError)
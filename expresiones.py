@@ -0,0 +1,316 @@
+"""
+Evaluador de expresiones de Polux compiladas a notación polaca inversa (RPN).
+
+compilar_rpn(texto) toma los tokens del lexer de la gramática (gramatica.py), los ordena
+con el algoritmo de Shunting Yard y devuelve un ProgramaRPN: dos secuencias paralelas,
+'codigos' (un array de bytes con las operaciones) y 'operandos' (la constante, el nombre,
+la función del operador o el destino de un salto de cada operación). El programa no
+depende de los valores de las variables, así que se compila una sola vez por texto y
+se guarda en una caché LRU; evaluar(variables) lo ejecuta con una pila.
+
+Las expresiones admitidas son las de la gramática sin llamadas, arreglos ni asignación:
+números (int o float), True/False, cadenas y caracteres,
+identificadores, paréntesis, los operadores unarios '-' y NOT, y los binarios con la
+precedencia de polux.txt, de menor a mayor:
+
+    AND OR  <  relacionales  <  + -  <  * / %  <  ^  <  unarios
+
+Todos asocian por la izquierda salvo '^' (2 ^ 3 ^ 2 es 2 ^ 9). Los operadores son los de
+la máquina virtual (ejecucion.py): la división entre enteros es entera. AND y OR se
+compilan como saltos y no evalúan el lado derecho si el izquierdo decide el resultado.
+
+Los identificadores se resuelven en 'variables', un diccionario {nombre: valor};
+variables_de_tabla() lo arma con los valores de una TablaSimbolos (almacen_simbolos.py).
+
+Uso:
+    python expresiones.py "2 * (x + 3) ^ 2" [--variable x=1.5 ...] [--rpn]
+"""
+import argparse
+import sys
+from array import array
+from collections import OrderedDict
+
+from lark.exceptions import UnexpectedCharacters
+from lark.lexer import BasicLexer, LexerThread
+
+from ejecucion import ERRORES_OPERACION, OPERADORES_BINARIOS, decodificar_cadena, describir_error
+from gramatica import cargar_parser
+from registro import obtener_registro
+
+log_expresiones = obtener_registro("expresiones")
+
+CAPACIDAD_CACHE = 1024  # Programas compilados que se recuerdan por texto
+
+# Operaciones de un ProgramaRPN
+CONSTANTE, VARIABLE, BINARIA, NEGAR, NO, SI_FALSO, SI_VERDADERO = range(7)
+
+# Operador binario -> (precedencia, asocia por la derecha)
+_BINARIOS = {"AND": (1, False), "OR": (1, False)}
+_BINARIOS.update({simbolo: (2, False) for simbolo in ("<", "<=", ">", ">=", "==", "!=")})
+_BINARIOS.update({"+": (3, False), "-": (3, False), "*": (4, False), "/": (4, False), "%": (4, False),
+                  "^": (5, True)})
+_UNARIOS = {"-": NEGAR, "NOT": NO}
+_PRECEDENCIA_UNARIA = 6
+_LOGICOS = {"AND": SI_FALSO, "OR": SI_VERDADERO}
+_LITERALES = {"TRUE": True, "FALSE": False}
+
+
+class ErrorExpresion(Exception):
+    """Expresión que no se puede compilar o evaluar, con la columna donde está el problema."""
+
+    def __init__(self, mensaje, columna=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.columna = columna
+
+    def __str__(self):
+        return f"{self.mensaje} (columna {self.columna})" if self.columna is not None else self.mensaje
+
+
+class ProgramaRPN:
+    """Expresión compilada: operaciones y operandos en paralelo, y su RPN como texto."""
+
+    __slots__ = ("texto", "codigos", "operandos", "rpn", "nombres")
+
+    def __init__(self, texto, codigos, operandos, rpn):
+        self.texto = texto
+        self.codigos = codigos  # array('B') de operaciones
+        self.operandos = tuple(operandos)
+        self.rpn = tuple(rpn)  # Tokens en notación polaca inversa, como los escribía shunting_yard
+        self.nombres = frozenset(o for c, o in zip(codigos, self.operandos) if c == VARIABLE)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def evaluar(self, variables=None):
+        """Valor de la expresión con los identificadores de 'variables' ({nombre: valor})."""
+        codigos, operandos = self.codigos, self.operandos
+        if variables is None:
+            variables = {}
+        pila = []
+        apilar, desapilar = pila.append, pila.pop
+        contador, final = 0, len(codigos)
+        try:
+            while contador < final:
+                codigo = codigos[contador]
+                argumento = operandos[contador]
+                contador += 1
+                if codigo == CONSTANTE:
+                    apilar(argumento)
+                elif codigo == VARIABLE:
+                    apilar(variables[argumento])
+                elif codigo == BINARIA:
+                    derecha = desapilar()
+                    pila[-1] = argumento(pila[-1], derecha)
+                elif codigo == NEGAR:
+                    pila[-1] = -pila[-1]
+                elif codigo == NO:
+                    pila[-1] = not pila[-1]
+                elif (codigo == SI_FALSO) != bool(pila[-1]):
+                    contador = argumento  # AND con el izquierdo falso, OR con el izquierdo verdadero
+                else:
+                    desapilar()  # Decide el lado derecho
+        except KeyError as error:
+            if error.args and error.args[0] in self.nombres:
+                raise ErrorExpresion(f"'{error.args[0]}' no tiene valor") from None
+            raise ErrorExpresion(describir_error(error)) from None
+        except ERRORES_OPERACION as error:
+            raise ErrorExpresion(describir_error(error)) from None
+        return pila[-1]
+
+    def __repr__(self):
+        return f"ProgramaRPN({self.texto!r}: {' '.join(self.rpn)})"
+
+
+def _numero(texto):
+    # DIGIT es NUMBER: sin signo, pero también con parte decimal o exponente
+    return float(texto) if any(c in texto for c in ".eE") else int(texto)
+
+
+class CompiladorRPN:
+    """Compila expresiones a ProgramaRPN con el lexer de la gramática y una caché LRU por texto."""
+
+    def __init__(self, parser=None, capacidad=CAPACIDAD_CACHE):
+        if parser is None:
+            parser = cargar_parser()
+        self.lexer = BasicLexer(parser.lexer_conf)  # El de parser.lex(), creado una sola vez
+        self.capacidad = capacidad
+        self._cache = OrderedDict()  # texto -> ProgramaRPN, el más reciente al final
+        self.aciertos = 0
+        self.fallos = 0
+
+    def compilar(self, texto):
+        """ProgramaRPN de 'texto' (de la caché si ya se compiló). Lanza ErrorExpresion."""
+        programa = self._cache.get(texto)
+        if programa is not None:
+            self._cache.move_to_end(texto)
+            self.aciertos += 1
+            return programa
+        self.fallos += 1
+        programa = self._compilar(texto)
+        self._cache[texto] = programa
+        if len(self._cache) > self.capacidad:
+            self._cache.popitem(last=False)
+        return programa
+
+    def evaluar(self, texto, variables=None):
+        return self.compilar(texto).evaluar(variables)
+
+    def limpiar(self):
+        self._cache.clear()
+        self.aciertos = self.fallos = 0
+
+    def _tokens(self, texto):
+        try:
+            return list(LexerThread.from_text(self.lexer, texto).lex(None))
+        except UnexpectedCharacters as error:
+            raise ErrorExpresion(f"carácter inesperado {texto[error.pos_in_stream]!r}", error.column) from None
+
+    def _compilar(self, texto):
+        codigos, operandos, rpn = array('B'), [], []
+        operadores = []  # Pila de (símbolo, precedencia, operación unaria, salto a completar, columna)
+        espera_operando = True
+
+        def emitir(codigo, operando, token):
+            codigos.append(codigo)
+            operandos.append(operando)
+            rpn.append(token)
+
+        def sacar():
+            simbolo, _, unaria, salto, _ = operadores.pop()
+            if unaria is not None:
+                emitir(unaria, None, "NEG" if unaria == NEGAR else simbolo)
+            elif salto is not None:
+                operandos[salto] = len(codigos)  # El lado derecho termina aquí
+                rpn.append(simbolo)
+            else:
+                emitir(BINARIA, OPERADORES_BINARIOS[simbolo], simbolo)
+
+        def operando(codigo, valor, token, texto=None):
+            nonlocal espera_operando
+            if not espera_operando:
+                raise ErrorExpresion(f"falta un operador antes de {token.value!r}", token.column)
+            emitir(codigo, valor, texto or token.value)
+            espera_operando = False
+
+        for token in self._tokens(texto):
+            tipo, valor = token.type, token.value
+            if tipo == 'DIGIT':
+                operando(CONSTANTE, _numero(valor), token)
+            elif tipo in _LITERALES:
+                operando(CONSTANTE, _LITERALES[tipo], token)
+            elif tipo in ('STRING_LITERAL', 'CHAR_LITERAL'):
+                operando(CONSTANTE, decodificar_cadena(valor), token)
+            elif valor == "(":
+                if not espera_operando:
+                    raise ErrorExpresion("falta un operador antes de '('", token.column)
+                operadores.append(("(", 0, None, None, token.column))
+            elif valor == ")":
+                if espera_operando:
+                    raise ErrorExpresion("falta un operando antes de ')'", token.column)
+                while operadores and operadores[-1][0] != "(":
+                    sacar()
+                if not operadores:
+                    raise ErrorExpresion("')' sin '(' que lo abra", token.column)
+                operadores.pop()
+            elif espera_operando and valor in _UNARIOS:
+                operadores.append((valor, _PRECEDENCIA_UNARIA, _UNARIOS[valor], None, token.column))
+            elif valor in _BINARIOS:
+                if espera_operando:
+                    raise ErrorExpresion(f"falta un operando antes de {valor!r}", token.column)
+                self._binario(valor, token.column, operadores, sacar, codigos)
+                if valor in _LOGICOS:
+                    emitir(_LOGICOS[valor], None, None)
+                    rpn.pop()  # El salto no es un token de la RPN: el operador se escribe al completarlo
+                espera_operando = True
+            elif valor[0].isalpha():
+                operando(VARIABLE, valor, token)
+            else:
+                raise ErrorExpresion(f"{valor!r} no se admite en una expresión", token.column)
+
+        if espera_operando:
+            raise ErrorExpresion("la expresión está incompleta" if codigos else "la expresión está vacía")
+        while operadores:
+            if operadores[-1][0] == "(":
+                raise ErrorExpresion("'(' sin cerrar", operadores[-1][4])
+            sacar()
+        return ProgramaRPN(texto, codigos, operandos, rpn)
+
+    @staticmethod
+    def _binario(simbolo, columna, operadores, sacar, codigos):
+        """Saca los operadores que se aplican antes que 'simbolo' y lo apila."""
+        precedencia, derecha = _BINARIOS[simbolo]
+        while operadores and (operadores[-1][1] > precedencia or
+                              (operadores[-1][1] == precedencia and not derecha)):
+            sacar()
+        # Un AND/OR recuerda dónde está su salto: la operación que se emite a continuación
+        salto = len(codigos) if simbolo in _LOGICOS else None
+        operadores.append((simbolo, precedencia, None, salto, columna))
+
+
+_compilador = None
+
+
+def compilador_por_defecto():
+    """CompiladorRPN compartido (se crea al primer uso, con el parser de la gramática)."""
+    global _compilador
+    if _compilador is None:
+        _compilador = CompiladorRPN()
+    return _compilador
+
+
+def compilar_rpn(texto):
+    """ProgramaRPN de 'texto' con el compilador compartido y su caché."""
+    return compilador_por_defecto().compilar(texto)
+
+
+def evaluar_expresion(texto, variables=None):
+    """Valor de la expresión 'texto' con los identificadores de 'variables'."""
+    return compilador_por_defecto().compilar(texto).evaluar(variables)
+
+
+def variables_de_tabla(tabla, ambito=None):
+    """
+    {identificador: valor} de los símbolos de una TablaSimbolos cuyo "Valor" es una
+    expresión constante (un literal, '2+3'...). Los demás se omiten. Con 'ambito' solo
+    se toman los de ese ámbito; si no, gana el primero registrado con cada nombre.
+    """
+    variables = {}
+    for simbolo in tabla.obtener_todos():
+        nombre, texto = simbolo.get("Identificador"), simbolo.get("Valor")
+        if nombre in variables or not isinstance(texto, str) or (ambito is not None and simbolo.get("Ámbito") != ambito):
+            continue
+        try:
+            variables[nombre] = evaluar_expresion(texto, {})
+        except ErrorExpresion:
+            log_expresiones.debug("'%s' no tiene un valor constante: %r", nombre, texto)
+    return variables
+
+
+def _variable(texto):
+    nombre, _, valor = texto.partition("=")
+    try:
+        return nombre.strip(), evaluar_expresion(valor, {})
+    except ErrorExpresion as error:
+        raise argparse.ArgumentTypeError(f"valor inválido para '{nombre.strip()}': {error}")
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Evalúa una expresión de Polux compilada a RPN.")
+    argumentos.add_argument("expresion")
+    argumentos.add_argument("--variable", type=_variable, action="append", default=[], metavar="NOMBRE=VALOR")
+    argumentos.add_argument("--rpn", action="store_true", help="Mostrar también la expresión en RPN")
+    opciones = argumentos.parse_args(argv)
+    try:
+        programa = compilar_rpn(opciones.expresion)
+        if opciones.rpn:
+            print(" ".join(programa.rpn))
+        print(programa.evaluar(dict(opciones.variable)))
+    except ErrorExpresion as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Formato binario compacto para tablas de símbolos (.plxs).
+
+Distribución del archivo (todo little-endian):
+
+    cabecera   magia 'PLXS', versión, número de registros y desplazamientos de cada sección
+    registros  N registros de ancho fijo (ver _REGISTRO)
+    índice     N pares (nombre, registro) ordenados por nombre, para búsqueda binaria
+    cadenas    reserva de cadenas internadas: longitud (I) + UTF-8
+
+Los textos (nombre, categoría, tipo, ámbito, ...) se guardan una sola vez en la reserva
+y los registros solo llevan su desplazamiento, así que el símbolo N está en
+cabecera + N * tamaño_registro. TablaMapeada lee el archivo con mmap: abrirlo no carga
+los registros, tabla[N] es O(1) y buscar(nombre) es O(log n).
+
+Cada registro tiene las mismas columnas que compilador_batch exporta en JSON
+(ver registro_de_simbolo). El valor se guarda como texto.
+"""
+import mmap
+import os
+import struct
+
+MAGIA = b"PLXS"
+VERSION = 1
+SIN_TEXTO = 0xFFFFFFFF  # Desplazamiento que representa None
+SIN_NUMERO = -1
+
+_CABECERA = struct.Struct("<4sHHIIQQQQ")  # magia, versión, tamaño registro, n, reservado, 4 desplazamientos
+_REGISTRO = struct.Struct("<IIIIIIIiiIHB")
+_ENTRADA_INDICE = struct.Struct("<II")  # (desplazamiento del nombre, número de registro)
+_LONGITUD = struct.Struct("<I")
+
+CAMPOS_TEXTO = ("nombre", "categoria", "tipo", "ambito", "valor", "firma", "tipo_retorno")
+_BANDERAS = ("inicializado", "constante", "mutable")
+
+
+def registro_de_simbolo(simbolo):
+    """Registro exportable de un SymbolEntry del analizador semántico."""
+    return {
+        "nombre": simbolo.name,
+        "categoria": simbolo.kind,
+        "tipo": simbolo.sym_type,
+        "ambito": simbolo.scope.name if simbolo.scope else None,
+        "nivel_ambito": simbolo.scope.level if simbolo.scope else None,
+        "linea": simbolo.line,
+        "inicializado": simbolo.initialized,
+        "referencias": simbolo.references,
+        "valor": simbolo.value,
+        "constante": simbolo.is_constant,
+        "mutable": simbolo.is_mutable,
+        "firma": simbolo.signature,
+        "tipo_retorno": simbolo.return_type,
+        "parametros": len(simbolo.parameters),
+    }
+
+
+def registro_de_fila(fila):
+    """Registro exportable de una fila de TablaSimbolos (claves 'Identificador', 'Ámbito', ...)."""
+    linea = fila.get("Línea")
+    return {
+        "nombre": fila.get("Identificador"),
+        "categoria": fila.get("Categoría"),
+        "tipo": fila.get("Tipo de Dato"),
+        "ambito": fila.get("Ámbito"),
+        "nivel_ambito": None,
+        "linea": linea if isinstance(linea, int) else None,
+        "inicializado": fila.get("Estado") in ("Inicializado", "Asignado", "Definido"),
+        "referencias": fila.get("Referencias", 0),
+        "valor": fila.get("Valor"),
+        "constante": fila.get("Categoría") == "Constante",
+        "mutable": fila.get("Categoría") != "Constante",
+        "firma": None,
+        "tipo_retorno": None,
+        "parametros": 0,
+    }
+
+
+class _ReservaCadenas:
+    """Interna cadenas: cada texto distinto se escribe una sola vez."""
+
+    def __init__(self):
+        self.datos = bytearray()
+        self._desplazamientos = {}
+
+    def agregar(self, texto):
+        if texto is None:
+            return SIN_TEXTO
+        texto = str(texto)
+        desplazamiento = self._desplazamientos.get(texto)
+        if desplazamiento is None:
+            codificado = texto.encode("utf-8")
+            desplazamiento = len(self.datos)
+            self.datos += _LONGITUD.pack(len(codificado))
+            self.datos += codificado
+            self._desplazamientos[texto] = desplazamiento
+        return desplazamiento
+
+
+def _numero(valor):
+    return valor if isinstance(valor, int) and not isinstance(valor, bool) else SIN_NUMERO
+
+
+def escribir_tabla(ruta, registros):
+    """
+    Escribe los registros (dicts como los de registro_de_simbolo) en 'ruta'.
+    El archivo se escribe aparte y se renombra, así que un lector nunca ve uno a medias.
+    """
+    reserva = _ReservaCadenas()
+    cuerpo = bytearray()
+    nombres = []
+    for numero, registro in enumerate(registros):
+        textos = [reserva.agregar(registro.get(campo)) for campo in CAMPOS_TEXTO]
+        banderas = sum(1 << i for i, campo in enumerate(_BANDERAS) if registro.get(campo))
+        cuerpo += _REGISTRO.pack(*textos, _numero(registro.get("nivel_ambito")), _numero(registro.get("linea")),
+                                 max(0, _numero(registro.get("referencias"))), registro.get("parametros") or 0,
+                                 banderas)
+        nombre = str(registro.get("nombre") or "")
+        nombres.append((nombre, numero, reserva.agregar(nombre)))
+
+    nombres.sort()
+    indice = bytearray()
+    for _, numero, desplazamiento in nombres:
+        indice += _ENTRADA_INDICE.pack(desplazamiento, numero)
+
+    inicio_registros = _CABECERA.size
+    inicio_indice = inicio_registros + len(cuerpo)
+    inicio_cadenas = inicio_indice + len(indice)
+    cabecera = _CABECERA.pack(MAGIA, VERSION, _REGISTRO.size, len(nombres), 0,
+                              inicio_registros, inicio_indice, inicio_cadenas, len(reserva.datos))
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(cabecera)
+        archivo.write(cuerpo)
+        archivo.write(indice)
+        archivo.write(reserva.datos)
+    os.replace(temporal, ruta)
+    return len(nombres)
+
+
+class TablaMapeada:
+    """Lector de archivos .plxs sobre mmap, con acceso aleatorio y búsqueda por nombre."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (magia, version, tamano_registro, self._cantidad, _,
+         self._inicio_registros, self._inicio_indice, self._inicio_cadenas, _) = _CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA or version != VERSION or tamano_registro != _REGISTRO.size:
+            self._mapa.close()
+            raise ValueError(f"'{ruta}' no es una tabla de símbolos Polux compatible")
+        self._textos = {}  # Cadenas ya decodificadas: {desplazamiento: str}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self._mapa.close()
+
+    def __len__(self):
+        return self._cantidad
+
+    def _texto(self, desplazamiento):
+        if desplazamiento == SIN_TEXTO:
+            return None
+        texto = self._textos.get(desplazamiento)
+        if texto is None:
+            inicio = self._inicio_cadenas + desplazamiento
+            (longitud,) = _LONGITUD.unpack_from(self._mapa, inicio)
+            texto = self._mapa[inicio + _LONGITUD.size:inicio + _LONGITUD.size + longitud].decode("utf-8")
+            self._textos[desplazamiento] = texto
+        return texto
+
+    def __getitem__(self, numero):
+        if numero < 0:
+            numero += self._cantidad
+        if not 0 <= numero < self._cantidad:
+            raise IndexError(numero)
+        campos = _REGISTRO.unpack_from(self._mapa, self._inicio_registros + numero * _REGISTRO.size)
+        registro = {campo: self._texto(d) for campo, d in zip(CAMPOS_TEXTO, campos)}
+        nivel, linea, referencias, parametros, banderas = campos[len(CAMPOS_TEXTO):]
+        registro["nivel_ambito"] = None if nivel == SIN_NUMERO else nivel
+        registro["linea"] = None if linea == SIN_NUMERO else linea
+        registro["referencias"] = referencias
+        registro["parametros"] = parametros
+        for i, campo in enumerate(_BANDERAS):
+            registro[campo] = bool(banderas & (1 << i))
+        return registro
+
+    def __iter__(self):
+        return (self[i] for i in range(self._cantidad))
+
+    def _entrada(self, posicion):
+        return _ENTRADA_INDICE.unpack_from(self._mapa, self._inicio_indice + posicion * _ENTRADA_INDICE.size)
+
+    def buscar(self, nombre):
+        """Todos los registros con ese nombre (uno por ámbito), por búsqueda binaria en el índice."""
+        bajo, alto = 0, self._cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._texto(self._entrada(medio)[0]) < nombre:
+                bajo = medio + 1
+            else:
+                alto = medio
+        encontrados = []
+        while bajo < self._cantidad:
+            desplazamiento, numero = self._entrada(bajo)
+            if self._texto(desplazamiento) != nombre:
+                break
+            encontrados.append(self[numero])
+            bajo += 1
+        return encontrados
+
+
+def leer_tabla(ruta):
+    """Carga todos los registros de un archivo .plxs."""
+    with TablaMapeada(ruta) as tabla:
+        return list(tabla)
@@ -0,0 +1,396 @@
+"""
+Generador de programas Polux sintéticos y válidos, para benchmarks y pruebas de carga.
+
+Los programas siguen la gramática de polux.txt y pasan el análisis semántico sin errores:
+cada expresión se construye para el tipo que se le pide (solo usa variables ya
+declaradas y visibles de ese tipo), los divisores son literales distintos de cero, los
+'while' avanzan un contador propio y ninguna función se llama a sí misma, así que
+también terminan si se ejecutan.
+
+Perillas (argumentos de GeneradorPolux y de la línea de órdenes):
+
+  declaraciones          variables y constantes globales
+  funciones              funciones globales, con un cuerpo de 'sentencias_por_bloque'
+  clases                 clases con atributos, constructor y métodos; la mitad hereda de otra
+  sentencias             sentencias sueltas del nivel superior (llamadas, asignaciones, control)
+  profundidad            altura máxima de las expresiones
+  anidamiento            niveles máximos de if/while/for unos dentro de otros
+  largo_literales        caracteres de las cadenas y elementos de los arreglos literales
+  sentencias_por_bloque  sentencias de cada cuerpo de función, método o estructura de control
+
+Con la misma semilla y las mismas perillas el programa es siempre el mismo.
+
+Uso:
+    python generador_polux.py [--tamano mediano] [--declaraciones 500] [--semilla 1] [-o programa.polux]
+"""
+import argparse
+import random
+import string
+import sys
+
+# Tamaños predefinidos (los usa benchmarks/bench_fases.py); cada uno ~4-5 veces el anterior
+TAMANOS = {
+    "pequeno": {"declaraciones": 40, "funciones": 8, "clases": 2, "sentencias": 20},
+    "mediano": {"declaraciones": 200, "funciones": 40, "clases": 10, "sentencias": 100},
+    "grande": {"declaraciones": 1000, "funciones": 200, "clases": 40, "sentencias": 500},
+    "enorme": {"declaraciones": 5000, "funciones": 1000, "clases": 200, "sentencias": 2500},
+}
+
+_PREFIJOS = {"int": "i", "float": "r", "bool": "b", "char": "c", "string": "s"}
+_TIPOS = tuple(_PREFIJOS)
+_LETRAS = string.ascii_letters + string.digits + " "
+SANGRIA = "    "
+
+
+class _Ambito:
+    """Nombres visibles en un bloque: por tipo, y los que se pueden asignar."""
+
+    __slots__ = ("visibles", "asignables", "numericos", "objetos")
+
+    def __init__(self):
+        self.visibles = {tipo: [] for tipo in _TIPOS}
+        self.asignables = {tipo: [] for tipo in _TIPOS}
+        self.numericos = []  # Parámetros: el tipo es 'desconocido', pero siempre reciben enteros
+        self.objetos = []  # (nombre, clase)
+
+
+class GeneradorPolux:
+    """Construye el texto de un programa Polux con las perillas dadas."""
+
+    def __init__(self, declaraciones=200, funciones=40, clases=10, sentencias=100, profundidad=3, anidamiento=2,
+                 largo_literales=8, sentencias_por_bloque=4, semilla=0):
+        self.declaraciones = declaraciones
+        self.funciones = funciones
+        self.clases = clases
+        self.sentencias = sentencias
+        self.profundidad = max(0, profundidad)
+        self.anidamiento = max(0, anidamiento)
+        self.largo_literales = max(1, largo_literales)
+        self.sentencias_por_bloque = max(1, sentencias_por_bloque)
+        self.semilla = semilla
+
+    def generar(self):
+        """Texto del programa (termina en salto de línea)."""
+        self.azar = random.Random(self.semilla)
+        self._contador = 0
+        self._ambitos = [_Ambito()]
+        self._funciones = []  # (nombre, cantidad de parámetros), ya completas
+        self._clases = []  # (nombre, parámetros del constructor, [(método, parámetros)])
+        self._lineas = []
+        self._nivel = 0
+
+        plan = (["declaracion"] * self.declaraciones + ["funcion"] * self.funciones
+                + ["clase"] * self.clases + ["sentencia"] * self.sentencias)
+        self.azar.shuffle(plan)
+        emitir = {"declaracion": self._declaracion_global, "funcion": self._funcion, "clase": self._clase,
+                  "sentencia": lambda: self._sentencia(0)}
+        for elemento in plan:
+            emitir[elemento]()
+        return "\n".join(self._lineas) + "\n"
+
+    # --- Nombres, ámbitos y líneas ---
+
+    def _nombre(self, prefijo):
+        self._contador += 1
+        return f"{prefijo}_{self._contador}"
+
+    def _declarar(self, tipo, nombre, asignable=True):
+        ambito = self._ambitos[-1]
+        ambito.visibles[tipo].append(nombre)
+        if asignable:
+            ambito.asignables[tipo].append(nombre)
+
+    def _candidatos(self, campo, tipo=None):
+        """Lo visible desde el bloque actual: ambito.campo (o ambito.campo[tipo]) de todos los ámbitos abiertos."""
+        nombres = []
+        for ambito in self._ambitos:
+            nombres.extend(getattr(ambito, campo)[tipo] if tipo is not None else getattr(ambito, campo))
+        return nombres
+
+    def _linea(self, texto):
+        self._lineas.append(SANGRIA * self._nivel + texto)
+
+    def _bloque(self, cabecera, cuerpo, cierre="||"):
+        """Emite 'cabecera ||', el cuerpo en un ámbito propio y el cierre."""
+        self._linea(cabecera + " ||")
+        self._nivel += 1
+        self._ambitos.append(_Ambito())
+        try:
+            cuerpo()
+        finally:
+            self._ambitos.pop()
+            self._nivel -= 1
+        self._linea(cierre)
+
+    # --- Literales y expresiones ---
+
+    def _literal(self, tipo):
+        azar = self.azar
+        if tipo == "int":
+            return str(azar.randint(0, 99))
+        if tipo == "float":
+            return f"{azar.randint(0, 99)}.{azar.randint(0, 99):02d}"
+        if tipo == "bool":
+            return azar.choice(("True", "False"))
+        if tipo == "char":
+            return "'" + azar.choice(string.ascii_letters) + "'"
+        texto = "".join(azar.choice(_LETRAS) for _ in range(self.largo_literales))
+        return f'"{texto}"'
+
+    def _hoja(self, tipo):
+        """Literal o variable visible del tipo pedido."""
+        candidatos = self._candidatos("visibles", tipo)
+        if tipo == "int":
+            candidatos = candidatos + self._candidatos("numericos")
+        if candidatos and self.azar.random() < 0.6:
+            return self.azar.choice(candidatos)
+        return self._literal(tipo)
+
+    def _agrupar(self, texto):
+        """Paréntesis alrededor de una subexpresión (no de una hoja), con cierta probabilidad."""
+        if " " in texto and self.azar.random() < 0.4:
+            return f"({texto})"
+        return texto
+
+    def expresion(self, tipo, profundidad=None):
+        """Texto de una expresión del tipo dado, de altura máxima 'profundidad'."""
+        if profundidad is None:
+            profundidad = self.profundidad
+        azar = self.azar
+        if profundidad <= 0 or azar.random() < 0.2:
+            return self._hoja(tipo)
+        siguiente = profundidad - 1
+
+        if tipo == "int":
+            operador = azar.choice(("+", "-", "*", "+", "-", "/", "%", "^", "neg"))
+            izquierda = self._agrupar(self.expresion("int", siguiente))
+            if operador == "neg":
+                return f"-{izquierda}" if izquierda.isidentifier() else f"-({izquierda})"
+            if operador in ("/", "%"):
+                return f"{izquierda} {operador} {azar.randint(1, 9)}"  # Nunca divide por cero
+            if operador == "^":
+                return f"({izquierda}) ^ 2"
+            return f"{izquierda} {operador} {self._agrupar(self.expresion('int', siguiente))}"
+
+        if tipo == "float":
+            # La hoja de más a la izquierda es float, así que el resultado también lo es
+            derecha = self._agrupar(self.expresion(azar.choice(("int", "float")), siguiente))
+            return f"{self._agrupar(self.expresion('float', siguiente))} {azar.choice('+-*')} {derecha}"
+
+        if tipo == "bool":
+            forma = azar.random()
+            if forma < 0.5:
+                operador = azar.choice(("<", ">", "<=", ">=", "==", "!="))
+                return f"{self.expresion('int', siguiente)} {operador} {self.expresion('int', siguiente)}"
+            if forma < 0.8:
+                operador = azar.choice(("AND", "OR"))
+                return f"{self.expresion('bool', siguiente)} {operador} {self.expresion('bool', siguiente)}"
+            # NOT se aplica a un primario: 'NOT a < b' sería '(NOT a) < b'
+            operando = self.expresion("bool", siguiente)
+            return f"NOT {operando}" if operando.isidentifier() or operando in ("True", "False") else f"NOT ({operando})"
+
+        if tipo == "string" and azar.random() < 0.5:
+            return f"{self._literal('string')} + {self._literal('string')}"
+        return self._hoja(tipo)
+
+    def _arreglo(self):
+        elementos = [self.expresion("int", 1) for _ in range(self.largo_literales)]
+        return "[" + ", ".join(elementos) + "]"
+
+    def _argumentos(self, cantidad):
+        return ", ".join(self.expresion("int", 1) for _ in range(cantidad))
+
+    # --- Declaraciones ---
+
+    def _declaracion_global(self):
+        if self.azar.random() < 0.2:
+            nombre = self._nombre("k")
+            self._linea(f"cte {nombre} = {self.expresion('int')}")
+            self._declarar("int", nombre, asignable=False)
+        elif self.azar.random() < 0.1:
+            nombre = self._nombre("a")
+            self._linea(f"array lista [int] {nombre} = {self._arreglo()}")
+        else:
+            self._variable()
+
+    def _variable(self):
+        tipo = self.azar.choice(_TIPOS)
+        nombre = self._nombre(_PREFIJOS[tipo])
+        self._linea(f"{tipo} {nombre} = {self.expresion(tipo)}")
+        # Las variables 'string' quedan con tipo 'desconocido' en la tabla: no se reasignan
+        self._declarar(tipo, nombre, asignable=tipo != "string")
+
+    def _parametros(self):
+        return [self._nombre("p") for _ in range(self.azar.randint(0, 3))]
+
+    def _cuerpo(self, parametros, sentencias, nivel):
+        def cuerpo():
+            self._ambitos[-1].numericos.extend(parametros)
+            for _ in range(sentencias):
+                self._sentencia(nivel)
+        return cuerpo
+
+    def _funcion(self):
+        nombre = self._nombre("f")
+        parametros = self._parametros()
+        if self.azar.random() < 0.3:
+            self._linea(f"<<* {nombre}: {len(parametros)} parámetro(s) *>>")
+        self._bloque(f"do function {nombre}({', '.join(parametros)})",
+                     self._cuerpo(parametros, self.sentencias_por_bloque, 1))
+        self._funciones.append((nombre, len(parametros)))
+
+    def _clase(self):
+        nombre = self._nombre("C")
+        base = self.azar.choice(self._clases) if self._clases and self.azar.random() < 0.5 else None
+        metodos = list(base[2]) if base else []
+        parametros_constructor = self._parametros()
+
+        def cuerpo():
+            atributos = []
+            for _ in range(self.azar.randint(1, 3)):
+                atributo = self._nombre("t")
+                self._linea(f"int {atributo} = {self._literal('int')}")
+                self._declarar("int", atributo)
+                atributos.append(atributo)
+
+            def constructor():
+                self._ambitos[-1].numericos.extend(parametros_constructor)
+                for atributo in atributos:
+                    self._linea(f"{atributo} = {self.expresion('int', 1)}")
+            self._bloque(f"do {nombre}({', '.join(parametros_constructor)})", constructor)
+            for _ in range(self.azar.randint(1, 3)):
+                metodo = self._nombre("m")
+                parametros = self._parametros()
+                # Los métodos no tienen estructuras anidadas: se llaman muchas veces por objeto
+                self._bloque(f"do function {metodo}({', '.join(parametros)})",
+                             self._cuerpo(parametros, max(1, self.sentencias_por_bloque // 2), self.anidamiento))
+                metodos.append((metodo, len(parametros)))
+
+        herencia = f" inherits {base[0]}" if base else ""
+        self._bloque(f"class {nombre}{herencia}", cuerpo)
+        self._clases.append((nombre, len(parametros_constructor), metodos))
+
+    # --- Sentencias ---
+
+    def _sentencia(self, nivel):
+        azar = self.azar
+        opciones = ["variable", "asignacion", "show"]
+        if self._funciones:
+            opciones.append("llamada")
+        if self._clases:
+            opciones.append("objeto")
+        if nivel < self.anidamiento:
+            opciones += ["if", "while", "for"]
+        eleccion = azar.choice(opciones)
+
+        if eleccion == "variable":
+            self._variable()
+        elif eleccion == "asignacion":
+            tipo = azar.choice(("int", "int", "float", "bool", "char"))
+            destinos = self._candidatos("asignables", tipo)
+            if not destinos:
+                self._variable()
+            elif tipo == "int" and azar.random() < 0.4:
+                self._linea(f"{azar.choice(destinos)} {azar.choice(('+=', '-=', '*='))} {self.expresion('int', 1)}")
+            else:
+                self._linea(f"{azar.choice(destinos)} = {self.expresion(tipo)}")
+        elif eleccion == "show":
+            tipos = [azar.choice(_TIPOS) for _ in range(azar.randint(1, 3))]
+            self._linea(f"show({', '.join(self.expresion(tipo, 1) for tipo in tipos)})")
+        elif eleccion == "llamada":
+            nombre, cantidad = azar.choice(self._funciones)
+            self._linea(f"{nombre}({self._argumentos(cantidad)})")
+        elif eleccion == "objeto":
+            self._objeto()
+        elif eleccion == "if":
+            self._si(nivel)
+        elif eleccion == "while":
+            self._mientras(nivel)
+        else:
+            self._para(nivel)
+
+    def _objeto(self):
+        """Crea un objeto (asignación con declaración implícita) o usa uno visible, y llama a un método."""
+        objetos = self._candidatos("objetos")
+        if objetos and self.azar.random() < 0.6:
+            objeto, clase = self.azar.choice(objetos)
+        else:
+            clase = self.azar.choice(self._clases)
+            objeto = self._nombre("o")
+            self._linea(f"{objeto} = {clase[0]}({self._argumentos(clase[1])})")
+            self._ambitos[-1].objetos.append((objeto, clase))
+        if clase[2]:
+            metodo, cantidad = self.azar.choice(clase[2])
+            self._linea(f"{objeto}.{metodo}({self._argumentos(cantidad)})")
+
+    def _si(self, nivel):
+        cuerpo = self._cuerpo((), self.sentencias_por_bloque, nivel + 1)
+        condicion = self.expresion("bool")
+        if self.azar.random() < 0.5:
+            self._bloque(f"if ({condicion})", cuerpo, cierre="|| else ||")
+            self._bloque_sin_cabecera(self._cuerpo((), self.sentencias_por_bloque, nivel + 1))
+        else:
+            self._bloque(f"if ({condicion})", cuerpo)
+
+    def _bloque_sin_cabecera(self, cuerpo):
+        """Cuerpo del 'else': la cabecera ya la escribió el cierre del bloque 'if'."""
+        self._nivel += 1
+        self._ambitos.append(_Ambito())
+        try:
+            cuerpo()
+        finally:
+            self._ambitos.pop()
+            self._nivel -= 1
+        self._linea("||")
+
+    def _mientras(self, nivel):
+        contador = self._nombre("w")
+        self._linea(f"int {contador} = 0")
+        self._declarar("int", contador, asignable=False)  # Solo lo modifica el propio bucle
+        cuerpo = self._cuerpo((), self.sentencias_por_bloque, nivel + 1)
+
+        def cuerpo_con_avance():
+            cuerpo()
+            self._linea(f"{contador} += 1")
+        self._bloque(f"while ({contador} < {self.azar.randint(1, 4)})", cuerpo_con_avance)
+
+    def _para(self, nivel):
+        elemento = self._nombre("e")
+        arreglo = self._arreglo()
+        cuerpo = self._cuerpo((), self.sentencias_por_bloque, nivel + 1)
+
+        def cuerpo_con_elemento():
+            self._declarar("int", elemento, asignable=False)
+            cuerpo()
+        self._bloque(f"for ({elemento} in {arreglo})", cuerpo_con_elemento)
+
+
+def generar_programa(tamano=None, **perillas):
+    """Texto de un programa; 'tamano' toma las perillas de TAMANOS y 'perillas' las reemplaza."""
+    opciones = dict(TAMANOS[tamano]) if tamano else {}
+    opciones.update(perillas)
+    return GeneradorPolux(**opciones).generar()
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Genera un programa Polux sintético y válido.")
+    argumentos.add_argument("--tamano", choices=sorted(TAMANOS), help="Perillas predefinidas")
+    for perilla in ("declaraciones", "funciones", "clases", "sentencias", "profundidad", "anidamiento",
+                    "largo_literales", "sentencias_por_bloque", "semilla"):
+        argumentos.add_argument("--" + perilla.replace("_", "-"), dest=perilla, type=int)
+    argumentos.add_argument("-o", "--salida", help="Archivo de salida (por omisión, la salida estándar)")
+    opciones = argumentos.parse_args(argv)
+
+    perillas = {clave: valor for clave, valor in vars(opciones).items()
+                if clave not in ("tamano", "salida") and valor is not None}
+    texto = generar_programa(opciones.tamano, **perillas)
+    if opciones.salida:
+        with open(opciones.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    else:
+        sys.stdout.write(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
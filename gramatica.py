@@ -0,0 +1,71 @@
+import hashlib
+import os
+import sys
+
+import lark
+from lark import Lark
+
+# Ruta de la gramática y carpeta donde se guardan las tablas LALR serializadas
+DIRECTORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+RUTA_GRAMATICA = os.path.join(DIRECTORIO_BASE, "polux.txt")
+DIRECTORIO_CACHE = os.path.join(DIRECTORIO_BASE, ".polux_cache")
+
+# Parsers ya construidos en este proceso: {hash: Lark}
+_parsers = {}
+
+
+def leer_gramatica(ruta=RUTA_GRAMATICA):
+    """Lee el texto de la gramática EBNF."""
+    with open(ruta, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def hash_gramatica(grammar, propagate_positions=False, keep_all_tokens=False):
+    """Calcula la huella de la gramática junto con las opciones de Lark que afectan a las tablas."""
+    huella = hashlib.sha256()
+    huella.update(grammar.encode("utf-8"))
+    huella.update(f"|propagate_positions={bool(propagate_positions)}".encode("utf-8"))
+    huella.update(f"|keep_all_tokens={bool(keep_all_tokens)}".encode("utf-8"))
+    huella.update(f"|lark={lark.__version__}|python={sys.version_info[:2]}".encode("utf-8"))
+    return huella.hexdigest()
+
+
+def _limpiar_cache_obsoleta(prefijo, vigente):
+    """Borra las tablas serializadas de versiones anteriores de la gramática."""
+    try:
+        archivos = os.listdir(DIRECTORIO_CACHE)
+    except FileNotFoundError:
+        return
+    for nombre in archivos:
+        if nombre.startswith(prefijo) and nombre != vigente:
+            try:
+                os.remove(os.path.join(DIRECTORIO_CACHE, nombre))
+            except OSError:
+                pass  # Otro proceso pudo haberlo borrado ya
+
+
+def cargar_parser(propagate_positions=False, keep_all_tokens=False, ruta=RUTA_GRAMATICA, usar_cache=True):
+    """
+    Devuelve un parser LALR para la gramática de Polux.
+
+    El parser se construye una sola vez por huella de gramática (texto de polux.txt +
+    opciones). Las tablas LALR se guardan en disco (.polux_cache/) para que los
+    siguientes arranques las carguen en lugar de reconstruirlas; cualquier cambio en
+    la gramática o en las opciones produce otra huella e invalida la caché.
+    """
+    grammar = leer_gramatica(ruta)
+    huella = hash_gramatica(grammar, propagate_positions, keep_all_tokens)
+    if huella in _parsers:
+        return _parsers[huella]
+
+    opciones = {"parser": "lalr", "propagate_positions": propagate_positions, "keep_all_tokens": keep_all_tokens}
+    if usar_cache:
+        os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+        prefijo = f"polux_p{int(bool(propagate_positions))}k{int(bool(keep_all_tokens))}_"
+        nombre = f"{prefijo}{huella[:16]}.lark"
+        _limpiar_cache_obsoleta(prefijo, nombre)
+        opciones["cache"] = os.path.join(DIRECTORIO_CACHE, nombre)
+
+    parser = Lark(grammar, **opciones)
+    _parsers[huella] = parser
+    return parser
@@ -0,0 +1,301 @@
+"""
+Intérprete directo del árbol de Polux, sin compilar nada.
+
+Es la forma más simple de ejecutar un programa: un lark Interpreter que en cada visita
+busca el método por el nombre del nodo (node.data), y variables en diccionarios
+encadenados que se consultan por nombre en cada uso. Sirve de referencia para la máquina
+virtual (maquina_virtual.py): los dos dan la misma salida, y benchmarks/bench_maquina_virtual.py
+compara sus tiempos.
+
+Los nombres se buscan como en el análisis semántico: primero en la función (o el
+método) actual, después en el objeto, y por último donde se declaró la función.
+"""
+from lark import Tree
+from lark.visitors import Interpreter
+
+from ejecucion import (
+    ERRORES_OPERACION, OPERADORES_ASIGNACION, OPERADORES_BINARIOS, ErrorEjecucion, Objeto, describir_error, mostrar,
+    operador_de, valor_literal)
+from vectores import crear_arreglo
+
+
+class Entorno:
+    """Variables de un ámbito en ejecución, con el entorno que lo contiene."""
+
+    __slots__ = ("variables", "padre")
+
+    def __init__(self, variables=None, padre=None):
+        self.variables = variables if variables is not None else {}
+        self.padre = padre
+
+    def buscar(self, nombre):
+        """Diccionario donde está 'nombre', o None."""
+        entorno = self
+        while entorno is not None:
+            if nombre in entorno.variables:
+                return entorno.variables
+            entorno = entorno.padre
+        return None
+
+
+class Funcion:
+    """Función, método o constructor: su nodo y el entorno donde se declaró."""
+
+    __slots__ = ("nombre", "parametros", "cuerpo", "entorno")
+
+    def __init__(self, nombre, parametros, cuerpo, entorno):
+        self.nombre = nombre
+        self.parametros = parametros
+        self.cuerpo = cuerpo
+        self.entorno = entorno
+
+
+class Clase:
+    __slots__ = ("nombre", "base", "cuerpo", "entorno", "metodos", "constructor")
+
+    def __init__(self, nombre, base, cuerpo, entorno):
+        self.nombre = nombre
+        self.base = base
+        self.cuerpo = cuerpo  # class_body: los atributos se evalúan al crear cada objeto
+        self.entorno = entorno
+        self.metodos = dict(base.metodos) if base is not None else {}
+        self.constructor = None
+
+
+def _subarboles(nodo):
+    return [hijo for hijo in nodo.children if isinstance(hijo, Tree)]
+
+
+def _nombre(nodo):
+    while isinstance(nodo, Tree):
+        nodo = nodo.children[0]
+    return nodo.value
+
+
+class InterpreteArbol(Interpreter):
+    """Ejecuta un árbol (del parser con keep_all_tokens) ya analizado sin errores."""
+
+    def __init__(self, salida=None, vectorizar=False):
+        import sys
+        self.salida = salida if salida is not None else sys.stdout
+        self.vectorizar = vectorizar  # Arreglos de int/float como Vector (vectores.py)
+        self.globales = Entorno()
+        self.entorno = self.globales
+        self.objeto = None  # Objeto del método en ejecución
+        self._linea = None
+
+    def ejecutar(self, arbol):
+        self.globales = self.entorno = Entorno()
+        self.objeto = None
+        try:
+            self.visit(arbol)
+        except ERRORES_OPERACION as error:
+            raise ErrorEjecucion(describir_error(error), self._linea) from error
+
+    # --- Sentencias ---
+
+    def statement(self, nodo):
+        if not nodo.meta.empty:
+            self._linea = nodo.meta.line
+        self.visit_children(nodo)
+
+    def type(self, nodo):
+        pass
+
+    def interface_declaration(self, nodo):
+        pass
+
+    def variable_declaration(self, nodo):
+        valor = None
+        if len(nodo.children) == 4:
+            valor = self.visit(nodo.children[3])
+            tipo = nodo.children[0].children[0]
+            if isinstance(tipo, Tree) and operador_de(tipo) == 'float':
+                valor = float(valor)
+        self.entorno.variables[_nombre(nodo.children[1])] = valor
+
+    def constant_declaration(self, nodo):
+        identificador, expresion = _subarboles(nodo)
+        self.entorno.variables[_nombre(identificador)] = self.visit(expresion)
+
+    def print_statement(self, nodo):
+        mostrar(self._argumentos(nodo), self.salida)
+
+    def if_statement(self, nodo):
+        subarboles = _subarboles(nodo)
+        if self.visit(subarboles[0]):
+            self.visit(subarboles[1])
+        elif len(subarboles) > 2:
+            self.visit(subarboles[2])
+
+    def while_loop(self, nodo):
+        condicion, bloque = _subarboles(nodo)
+        while self.visit(condicion):
+            self.visit(bloque)
+
+    def for_loop(self, nodo):
+        identificador, iterable, bloque = _subarboles(nodo)
+        nombre = _nombre(identificador)
+        for valor in self.visit(iterable):
+            self._asignar(nombre, valor)
+            self.visit(bloque)
+
+    def function_declaration(self, nodo):
+        funcion = self._funcion(nodo)
+        self.entorno.variables[funcion.nombre] = funcion
+
+    def _funcion(self, nodo):
+        parametros, cuerpo = [], None
+        for hijo in _subarboles(nodo):
+            if hijo.data == 'parameter_list':
+                parametros = [_nombre(parametro) for parametro in _subarboles(hijo)]
+            elif hijo.data == 'statement_block':
+                cuerpo = hijo
+        nombre = _nombre(next(h for h in _subarboles(nodo) if h.data == 'identifier'))
+        return Funcion(nombre, parametros, cuerpo, self.entorno)
+
+    def class_declaration(self, nodo):
+        identificadores = [h for h in _subarboles(nodo) if h.data == 'identifier']
+        base = self.entorno.buscar(_nombre(identificadores[1]))[_nombre(identificadores[1])] \
+            if len(identificadores) > 1 else None
+        cuerpo = next(h for h in _subarboles(nodo) if h.data == 'class_body')
+        clase = Clase(_nombre(identificadores[0]), base, cuerpo, self.entorno)
+        self.entorno.variables[clase.nombre] = clase
+        for miembro in cuerpo.children:
+            if miembro.data in ('method_declaration', 'constructor_declaration'):
+                metodo = self._funcion(miembro)
+                clase.metodos[metodo.nombre] = metodo
+                if miembro.data == 'constructor_declaration':
+                    clase.constructor = metodo
+
+    # --- Llamadas ---
+
+    def _argumentos(self, nodo):
+        for hijo in nodo.children:
+            if isinstance(hijo, Tree) and hijo.data == 'argument_list':
+                return [self.visit(argumento) for argumento in _subarboles(hijo)]
+        return []
+
+    def _llamar(self, funcion, argumentos, objeto=None):
+        entorno_anterior, objeto_anterior, linea = self.entorno, self.objeto, self._linea
+        padre = funcion.entorno
+        if objeto is not None:
+            # Dentro de un método los atributos se ven antes que el entorno de la clase
+            padre = Entorno(objeto.campos, padre)
+        self.entorno = Entorno(dict(zip(funcion.parametros, argumentos)), padre)
+        self.objeto = objeto
+        try:
+            if funcion.cuerpo is not None:
+                self.visit(funcion.cuerpo)
+        finally:
+            self.entorno, self.objeto, self._linea = entorno_anterior, objeto_anterior, linea
+        return None
+
+    def _nuevo(self, clase, argumentos):
+        objeto = Objeto(clase, {})
+        # Los atributos de la base primero, como en la máquina virtual
+        cadena = []
+        while clase is not None:
+            cadena.append(clase)
+            clase = clase.base
+        entorno_anterior = self.entorno
+        try:
+            for actual in reversed(cadena):
+                self.entorno = Entorno(objeto.campos, actual.entorno)
+                for miembro in actual.cuerpo.children:
+                    if miembro.data in ('variable_declaration', 'constant_declaration'):
+                        self.visit(miembro)
+        finally:
+            self.entorno = entorno_anterior
+        if objeto.clase.constructor is not None:
+            self._llamar(objeto.clase.constructor, argumentos, objeto)
+        return objeto
+
+    def _llamar_metodo(self, objeto, nombre, argumentos):
+        metodo = objeto.clase.metodos.get(nombre) if isinstance(objeto, Objeto) else None
+        if metodo is None:
+            raise ErrorEjecucion(f"el valor no tiene un método '{nombre}'", self._linea)
+        return self._llamar(metodo, argumentos, objeto)
+
+    def instance_creation(self, nodo):
+        nombre = _nombre(nodo.children[0])
+        argumentos = self._argumentos(nodo)
+        valor = self._valor(nombre)
+        if isinstance(valor, Clase):
+            return self._nuevo(valor, argumentos)
+        if self.objeto is not None and self.objeto.clase.metodos.get(nombre) is valor:
+            return self._llamar(valor, argumentos, self.objeto)  # metodo(args) dentro de un método
+        return self._llamar(valor, argumentos)
+
+    def method_call(self, nodo):
+        receptor, metodo = [h for h in _subarboles(nodo) if h.data == 'identifier']
+        objeto = self._valor(_nombre(receptor))
+        return self._llamar_metodo(objeto, _nombre(metodo), self._argumentos(nodo))
+
+    # --- Variables ---
+
+    def _valor(self, nombre):
+        variables = self.entorno.buscar(nombre)
+        if variables is None and self.objeto is not None and nombre in self.objeto.clase.metodos:
+            return self.objeto.clase.metodos[nombre]
+        if variables is None:
+            raise ErrorEjecucion(f"'{nombre}' no está definido", self._linea)
+        return variables[nombre]
+
+    def _asignar(self, nombre, valor):
+        variables = self.entorno.buscar(nombre)
+        (variables if variables is not None else self.entorno.variables)[nombre] = valor
+
+    # --- Expresiones ---
+
+    def integer(self, nodo):
+        return valor_literal(nodo)
+
+    string_literal = char_literal = booleano = integer
+
+    def variable(self, nodo):
+        return self._valor(_nombre(nodo))
+
+    def grouped_expression(self, nodo):
+        return self.visit(_subarboles(nodo)[0])
+
+    def arithmetic_expression(self, nodo):
+        izquierda, operador, derecha = nodo.children
+        return OPERADORES_BINARIOS[operador_de(operador)](self.visit(izquierda), self.visit(derecha))
+
+    relational_expression = arithmetic_expression
+
+    def logical_expression(self, nodo):
+        izquierda, operador, derecha = nodo.children
+        valor = self.visit(izquierda)
+        if operador_de(operador) == 'AND':
+            return valor and self.visit(derecha)
+        return valor or self.visit(derecha)
+
+    def unary_expression(self, nodo):
+        operador, operando = nodo.children
+        valor = self.visit(operando)
+        return (not valor) if operador_de(operador) == 'NOT' else -valor
+
+    def array_literal(self, nodo):
+        return crear_arreglo([self.visit(elemento) for elemento in _subarboles(nodo)], self.vectorizar)
+
+    def assignment_expression(self, nodo):
+        destino, operador, valor = nodo.children
+        nombre = _nombre(destino)
+        operador = operador_de(operador)
+        if operador == '=':
+            resultado = self.visit(valor)
+        else:
+            # 'x += e' es 'x = x + e': el destino se lee antes de evaluar 'e'
+            actual = self._valor(nombre)
+            resultado = OPERADORES_BINARIOS[OPERADORES_ASIGNACION[operador]](actual, self.visit(valor))
+        self._asignar(nombre, resultado)
+        return resultado
+
+
+def interpretar(arbol, salida=None, vectorizar=False):
+    """Ejecuta 'arbol' con InterpreteArbol y devuelve el intérprete (con sus globales finales)."""
+    interprete = InterpreteArbol(salida, vectorizar)
+    interprete.ejecutar(arbol)
+    return interprete
@@ -0,0 +1,381 @@
+"""
+Intérprete del árbol de Polux que compila cada nodo a una función de Python (un cierre).
+
+El intérprete directo (interprete_arbol.py) decide en cada visita qué hacer con un nodo:
+busca el método por node.data, separa los hijos, lee el operador del token... y repite
+ese trabajo en cada vuelta de un bucle. Aquí ese trabajo se hace una sola vez, al
+compilar: cada nodo se convierte en un cierre que ya tiene a mano los cierres de sus
+hijos, la función del operador, el nombre de la variable o la constante del literal.
+Ejecutar el programa es llamar al cierre de la raíz, sin consultar node.data.
+
+Los cierres de sentencias se llaman sin argumentos y devuelven None; los de expresiones
+devuelven el valor. El estado de la ejecución (entorno actual, objeto del método, línea)
+vive en el InterpreteCierres, como en InterpreteArbol, y las variables se siguen
+buscando por nombre en entornos encadenados (Entorno, Funcion y Clase de
+interprete_arbol.py): los dos intérpretes dan la misma salida, y
+benchmarks/bench_interprete_cierres.py compara sus tiempos.
+
+Cada cuerpo de función o de bucle se compila una sola vez, aunque se ejecute muchas
+veces; compilar(arbol) devuelve el programa listo para ejecutarse más de una vez con
+ejecutar_compilado(). Los cierres quedan ligados al intérprete que los compiló: usan su
+estado y su 'salida'.
+"""
+import sys
+
+from lark import Tree
+
+from ejecucion import (
+    ERRORES_OPERACION, OPERADORES_ASIGNACION, OPERADORES_BINARIOS, ErrorEjecucion, Objeto, describir_error, mostrar,
+    operador_de, valor_literal)
+from interprete_arbol import Clase, Entorno, Funcion
+from vectores import crear_arreglo
+
+_LITERALES = frozenset(('integer', 'string_literal', 'char_literal', 'booleano'))
+# Nodos que no hacen nada al ejecutarse
+_SIN_EFECTO = frozenset(('type', 'interface_declaration'))
+
+
+def _subarboles(nodo):
+    return [hijo for hijo in nodo.children if isinstance(hijo, Tree)]
+
+
+def _nombre(nodo):
+    while isinstance(nodo, Tree):
+        nodo = nodo.children[0]
+    return nodo.value
+
+
+def _nada():
+    return None
+
+
+def _secuencia(cierres):
+    """Un cierre que ejecuta 'cierres' en orden."""
+    cierres = tuple(cierre for cierre in cierres if cierre is not _nada)
+    if not cierres:
+        return _nada
+    if len(cierres) == 1:
+        return cierres[0]
+
+    def secuencia():
+        for cierre in cierres:
+            cierre()
+    return secuencia
+
+
+class InterpreteCierres:
+    """Compila un árbol (del parser con keep_all_tokens) ya analizado sin errores y lo ejecuta."""
+
+    def __init__(self, salida=None, vectorizar=False):
+        self.salida = salida if salida is not None else sys.stdout
+        self.vectorizar = vectorizar  # Arreglos de int/float como Vector (vectores.py)
+        self.globales = Entorno()
+        self.entorno = self.globales
+        self.objeto = None  # Objeto del método en ejecución
+        self._linea = None
+        self.nodos_compilados = 0
+
+    def ejecutar(self, arbol):
+        self.ejecutar_compilado(self.compilar(arbol))
+
+    def ejecutar_compilado(self, programa):
+        """Ejecuta un programa de compilar() desde cero (las globales empiezan vacías)."""
+        self.globales = self.entorno = Entorno()
+        self.objeto = None
+        try:
+            programa()
+        except ERRORES_OPERACION as error:
+            raise ErrorEjecucion(describir_error(error), self._linea) from error
+
+    def compilar(self, nodo):
+        """Cierre que ejecuta 'nodo' (y devuelve su valor, si es una expresión)."""
+        self.nodos_compilados += 1
+        compilador = getattr(self, "_c_" + nodo.data, None)
+        if compilador is None:
+            if nodo.data in _SIN_EFECTO:
+                return _nada
+            # start, statement_block, else_clause, control_structure...: sus hijos en orden
+            return _secuencia(self.compilar(hijo) for hijo in _subarboles(nodo))
+        return compilador(nodo)
+
+    # --- Sentencias ---
+
+    def _c_statement(self, nodo):
+        cuerpo = _secuencia(self.compilar(hijo) for hijo in _subarboles(nodo))
+        if nodo.meta.empty:
+            return cuerpo
+        linea = nodo.meta.line
+
+        def sentencia():
+            self._linea = linea
+            cuerpo()
+        return sentencia
+
+    def _c_variable_declaration(self, nodo):
+        nombre = _nombre(nodo.children[1])
+        if len(nodo.children) != 4:
+            def declarar():
+                self.entorno.variables[nombre] = None
+            return declarar
+        valor = self.compilar(nodo.children[3])
+        tipo = nodo.children[0].children[0]
+        if isinstance(tipo, Tree) and operador_de(tipo) == 'float':
+            def declarar():
+                self.entorno.variables[nombre] = float(valor())
+        else:
+            def declarar():
+                self.entorno.variables[nombre] = valor()
+        return declarar
+
+    def _c_constant_declaration(self, nodo):
+        identificador, expresion = _subarboles(nodo)
+        nombre, valor = _nombre(identificador), self.compilar(expresion)
+
+        def declarar():
+            self.entorno.variables[nombre] = valor()
+        return declarar
+
+    def _c_print_statement(self, nodo):
+        argumentos = self._argumentos(nodo)
+
+        def mostrar_valores():
+            mostrar([argumento() for argumento in argumentos], self.salida)
+        return mostrar_valores
+
+    def _c_if_statement(self, nodo):
+        subarboles = _subarboles(nodo)
+        condicion, bloque = self.compilar(subarboles[0]), self.compilar(subarboles[1])
+        if len(subarboles) == 2:
+            def si():
+                if condicion():
+                    bloque()
+            return si
+        alternativa = self.compilar(subarboles[2])
+
+        def si_no():
+            if condicion():
+                bloque()
+            else:
+                alternativa()
+        return si_no
+
+    def _c_while_loop(self, nodo):
+        condicion, bloque = (self.compilar(hijo) for hijo in _subarboles(nodo))
+
+        def mientras():
+            while condicion():
+                bloque()
+        return mientras
+
+    def _c_for_loop(self, nodo):
+        identificador, iterable, bloque = _subarboles(nodo)
+        nombre, iterable, bloque = _nombre(identificador), self.compilar(iterable), self.compilar(bloque)
+        asignar = self._asignar
+
+        def para():
+            for valor in iterable():
+                asignar(nombre, valor)
+                bloque()
+        return para
+
+    def _c_function_declaration(self, nodo):
+        nombre, parametros, cuerpo = self._funcion(nodo)
+
+        def declarar():
+            self.entorno.variables[nombre] = Funcion(nombre, parametros, cuerpo, self.entorno)
+        return declarar
+
+    def _funcion(self, nodo):
+        """(nombre, parámetros, cuerpo compilado o None) de una función, método o constructor."""
+        parametros, cuerpo = [], None
+        for hijo in _subarboles(nodo):
+            if hijo.data == 'parameter_list':
+                parametros = [_nombre(parametro) for parametro in _subarboles(hijo)]
+            elif hijo.data == 'statement_block':
+                cuerpo = self.compilar(hijo)
+        nombre = _nombre(next(h for h in _subarboles(nodo) if h.data == 'identifier'))
+        return nombre, parametros, cuerpo
+
+    def _c_class_declaration(self, nodo):
+        identificadores = [_nombre(h) for h in _subarboles(nodo) if h.data == 'identifier']
+        nombre, base = identificadores[0], identificadores[1] if len(identificadores) > 1 else None
+        miembros = next(h for h in _subarboles(nodo) if h.data == 'class_body').children
+        # Los atributos se evalúan al crear cada objeto: Clase.cuerpo son sus cierres
+        atributos = tuple(self.compilar(miembro) for miembro in miembros
+                          if miembro.data in ('variable_declaration', 'constant_declaration'))
+        metodos = [(miembro.data == 'constructor_declaration', self._funcion(miembro)) for miembro in miembros
+                   if miembro.data in ('method_declaration', 'constructor_declaration')]
+
+        def declarar():
+            entorno = self.entorno
+            clase_base = entorno.buscar(base)[base] if base is not None else None
+            clase = Clase(nombre, clase_base, atributos, entorno)
+            entorno.variables[nombre] = clase
+            for es_constructor, (nombre_metodo, parametros, cuerpo) in metodos:
+                metodo = Funcion(nombre_metodo, parametros, cuerpo, entorno)
+                clase.metodos[nombre_metodo] = metodo
+                if es_constructor:
+                    clase.constructor = metodo
+        return declarar
+
+    # --- Llamadas ---
+
+    def _argumentos(self, nodo):
+        for hijo in nodo.children:
+            if isinstance(hijo, Tree) and hijo.data == 'argument_list':
+                return tuple(self.compilar(argumento) for argumento in _subarboles(hijo))
+        return ()
+
+    def _llamar(self, funcion, argumentos, objeto=None):
+        entorno_anterior, objeto_anterior, linea = self.entorno, self.objeto, self._linea
+        padre = funcion.entorno
+        if objeto is not None:
+            # Dentro de un método los atributos se ven antes que el entorno de la clase
+            padre = Entorno(objeto.campos, padre)
+        self.entorno = Entorno(dict(zip(funcion.parametros, argumentos)), padre)
+        self.objeto = objeto
+        try:
+            if funcion.cuerpo is not None:
+                funcion.cuerpo()
+        finally:
+            self.entorno, self.objeto, self._linea = entorno_anterior, objeto_anterior, linea
+        return None
+
+    def _nuevo(self, clase, argumentos):
+        objeto = Objeto(clase, {})
+        # Los atributos de la base primero, como en la máquina virtual
+        cadena = []
+        while clase is not None:
+            cadena.append(clase)
+            clase = clase.base
+        entorno_anterior = self.entorno
+        try:
+            for actual in reversed(cadena):
+                self.entorno = Entorno(objeto.campos, actual.entorno)
+                for atributo in actual.cuerpo:
+                    atributo()
+        finally:
+            self.entorno = entorno_anterior
+        if objeto.clase.constructor is not None:
+            self._llamar(objeto.clase.constructor, argumentos, objeto)
+        return objeto
+
+    def _c_instance_creation(self, nodo):
+        nombre, argumentos = _nombre(nodo.children[0]), self._argumentos(nodo)
+        leer = self._lector(nombre)
+
+        def crear_o_llamar():
+            valores = [argumento() for argumento in argumentos]
+            valor = leer()
+            if isinstance(valor, Clase):
+                return self._nuevo(valor, valores)
+            if self.objeto is not None and self.objeto.clase.metodos.get(nombre) is valor:
+                return self._llamar(valor, valores, self.objeto)  # metodo(args) dentro de un método
+            return self._llamar(valor, valores)
+        return crear_o_llamar
+
+    def _c_method_call(self, nodo):
+        receptor, metodo = [_nombre(h) for h in _subarboles(nodo) if h.data == 'identifier']
+        leer, argumentos = self._lector(receptor), self._argumentos(nodo)
+
+        def llamar_metodo():
+            objeto = leer()
+            valores = [argumento() for argumento in argumentos]
+            funcion = objeto.clase.metodos.get(metodo) if isinstance(objeto, Objeto) else None
+            if funcion is None:
+                raise ErrorEjecucion(f"el valor no tiene un método '{metodo}'", self._linea)
+            return self._llamar(funcion, valores, objeto)
+        return llamar_metodo
+
+    # --- Variables ---
+
+    def _lector(self, nombre):
+        """Cierre que devuelve el valor de 'nombre' en el entorno actual."""
+        def leer():
+            entorno = self.entorno
+            while entorno is not None:
+                variables = entorno.variables
+                if nombre in variables:
+                    return variables[nombre]
+                entorno = entorno.padre
+            # metodo(args) dentro de un método, o un nombre sin definir
+            if self.objeto is not None and nombre in self.objeto.clase.metodos:
+                return self.objeto.clase.metodos[nombre]
+            raise ErrorEjecucion(f"'{nombre}' no está definido", self._linea)
+        return leer
+
+    def _asignar(self, nombre, valor):
+        variables = self.entorno.buscar(nombre)
+        (variables if variables is not None else self.entorno.variables)[nombre] = valor
+
+    # --- Expresiones ---
+
+    def _c_integer(self, nodo):
+        valor = valor_literal(nodo)
+        return lambda: valor
+
+    _c_string_literal = _c_char_literal = _c_booleano = _c_integer
+
+    def _c_variable(self, nodo):
+        return self._lector(_nombre(nodo))
+
+    def _c_grouped_expression(self, nodo):
+        return self.compilar(_subarboles(nodo)[0])
+
+    def _c_arithmetic_expression(self, nodo):
+        izquierda, operador, derecha = nodo.children
+        operacion = OPERADORES_BINARIOS[operador_de(operador)]
+        izquierda = self.compilar(izquierda)
+        if derecha.data in _LITERALES:
+            constante = valor_literal(derecha)  # 'i + 1', 'a % 2': sin llamar a un cierre para el literal
+            return lambda: operacion(izquierda(), constante)
+        derecha = self.compilar(derecha)
+        return lambda: operacion(izquierda(), derecha())
+
+    _c_relational_expression = _c_arithmetic_expression
+
+    def _c_logical_expression(self, nodo):
+        izquierda, operador, derecha = nodo.children
+        izquierda, derecha = self.compilar(izquierda), self.compilar(derecha)
+        if operador_de(operador) == 'AND':
+            return lambda: izquierda() and derecha()
+        return lambda: izquierda() or derecha()
+
+    def _c_unary_expression(self, nodo):
+        operador, operando = nodo.children
+        operando = self.compilar(operando)
+        if operador_de(operador) == 'NOT':
+            return lambda: not operando()
+        return lambda: -operando()
+
+    def _c_array_literal(self, nodo):
+        elementos = tuple(self.compilar(elemento) for elemento in _subarboles(nodo))
+        vectorizar = self.vectorizar
+        return lambda: crear_arreglo([elemento() for elemento in elementos], vectorizar)
+
+    def _c_assignment_expression(self, nodo):
+        destino, operador, valor = nodo.children
+        nombre, operador, valor = _nombre(destino), operador_de(operador), self.compilar(valor)
+        asignar = self._asignar
+        if operador == '=':
+            def asignacion():
+                resultado = valor()
+                asignar(nombre, resultado)
+                return resultado
+            return asignacion
+        operacion, leer = OPERADORES_BINARIOS[OPERADORES_ASIGNACION[operador]], self._lector(nombre)
+
+        def asignacion_compuesta():
+            # 'x += e' es 'x = x + e': el destino se lee antes de evaluar 'e'
+            actual = leer()
+            resultado = operacion(actual, valor())
+            asignar(nombre, resultado)
+            return resultado
+        return asignacion_compuesta
+
+
+def interpretar_cierres(arbol, salida=None, vectorizar=False):
+    """Compila 'arbol' con InterpreteCierres, lo ejecuta y devuelve el intérprete (con sus globales finales)."""
+    interprete = InterpreteCierres(salida, vectorizar)
+    interprete.ejecutar(arbol)
+    return interprete
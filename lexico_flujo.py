@@ -0,0 +1,243 @@
+"""
+Análisis léxico en flujo para entradas enormes.
+
+tokens_en_flujo(parser, archivo) lee el archivo por trozos y entrega los tokens uno a
+uno, con su línea y columna en el archivo completo, sin tener nunca el texto entero ni
+la lista de tokens en memoria: solo se guarda el trozo que todavía no se pudo lexear.
+
+Entre un trozo y el siguiente puede quedar un token partido, y la parte que llegó puede
+lexearse como varios tokens pegados ('3.25e-' son '3.25', 'e' y '-'). Por eso de cada
+trozo se guardan el último token y los pegados a él que todavía podrían unirse con lo que
+sigue (a lo sumo _UNIBLES tokens), y se vuelven a lexear junto con el trozo siguiente; lo
+guardado no crece con el trozo, así que un archivo sin espacios se procesa en tiempo
+lineal y memoria acotada. Si el trozo tiene un
+comentario '<<' sin cerrar (el lexer lo ve como dos '<'), o el lexer se detiene en una
+comilla, el corte se adelanta hasta ahí: el cierre puede venir después. Los demás
+errores léxicos se informan en cuanto aparecen.
+
+EstadisticasLexicas acumula conteos por categoría (tipo de token) en memoria constante,
+y volcar_tokens() escribe los tokens en disco a medida que llegan.
+
+Uso:
+    python lexico_flujo.py programa.polux [--volcado tokens.tsv] [--formato tsv|jsonl] [--trozo 65536]
+"""
+import argparse
+import json
+import sys
+from copy import copy
+
+from lark import UnexpectedInput
+from lark.exceptions import UnexpectedCharacters
+from lark.lexer import BasicLexer, LexerThread
+
+from gramatica import cargar_parser
+from registro import obtener_registro
+
+log_lexico = obtener_registro("lexico")
+
+TAMANO_TROZO = 64 * 1024
+MUESTRAS = 20  # Valores distintos que se recuerdan por categoría
+AVISO_CADA = 50000  # Tokens entre dos avisos de progreso
+# Terminales que pueden abarcar mucho texto y cuyo cierre puede estar en el trozo siguiente
+_COMILLAS = ('"', "'")
+# Un error léxico a menos de estos caracteres del final del trozo puede ser un operador partido
+_COLA = 4
+# Tokens pegados que más texto puede convertir en uno solo: '3.25' 'e' '-' y '2' son '3.25e-2'
+_UNIBLES = 3
+
+
+def _ajustar(token, linea_base, columna_base, posicion_base):
+    """Pasa la posición del token de relativa al trozo a absoluta en el archivo."""
+    if token.line == 1:
+        token.column += columna_base - 1
+    if token.end_line == 1:
+        token.end_column += columna_base - 1
+    token.line += linea_base - 1
+    token.end_line += linea_base - 1
+    token.start_pos += posicion_base
+    token.end_pos += posicion_base
+    return token
+
+
+def _avanzar(texto, linea, columna):
+    """Línea y columna tras recorrer 'texto' desde (linea, columna)."""
+    saltos = texto.count("\n")
+    if saltos:
+        return linea + saltos, len(texto) - texto.rfind("\n")
+    return linea, columna + len(texto)
+
+
+def _comentario_abierto(tokens):
+    """Índice del primer par '<' '<' seguido (un comentario sin cerrar), o None."""
+    for i in range(len(tokens) - 1):
+        if tokens[i].value == "<" and tokens[i + 1].value == "<" and tokens[i + 1].start_pos == tokens[i].end_pos:
+            return i
+    return None
+
+
+def _lexer_sin_descartes(parser):
+    """Lexer básico que también entrega los espacios y comentarios."""
+    configuracion = copy(parser.lexer_conf)
+    configuracion.ignore = ()
+    return BasicLexer(configuracion)
+
+
+def tokens_en_flujo(parser, archivo, tamano_trozo=TAMANO_TROZO):
+    """
+    Genera los tokens de 'archivo' (un objeto de texto con read()) leyéndolo por trozos.
+    Un error léxico se propaga como UnexpectedCharacters con la línea y columna del archivo.
+    """
+    lexer = BasicLexer(parser.lexer_conf)  # El de parser.lex(), creado una sola vez
+    descartes = None
+    pendiente = ""  # Texto leído y aún sin lexear
+    linea, columna, posicion = 1, 1, 0  # Dónde empieza 'pendiente' en el archivo
+    final = False
+    while not final:
+        trozo = archivo.read(tamano_trozo)
+        final = not trozo
+        pendiente += trozo
+        if not pendiente:
+            break
+
+        listos = []  # Tokens de esta vuelta, aún con posiciones relativas a 'pendiente'
+        corte = len(pendiente)
+        try:
+            for token in LexerThread.from_text(lexer, pendiente).lex(None):
+                listos.append(token)
+        except UnexpectedCharacters as error:
+            partido = pendiente[error.pos_in_stream] in _COMILLAS or error.pos_in_stream >= len(pendiente) - _COLA
+            # Dentro de un comentario '<<' sin cerrar cualquier carácter es válido ('í', '¿'...)
+            if final or not (partido or _comentario_abierto(listos) is not None):
+                error.line, error.column = _avanzar(pendiente[:error.pos_in_stream], linea, columna)
+                error.pos_in_stream += posicion
+                raise
+            corte = error.pos_in_stream
+
+        if not final:
+            abierto = _comentario_abierto(listos)
+            if abierto is not None:
+                corte = listos[abierto].start_pos
+                del listos[abierto:]
+            elif listos and corte == len(pendiente):
+                # El último token puede continuar en el trozo siguiente, y con él cambiar los
+                # pegados a él: '3.25e' + '2' se lexea como '3.25' 'e' y luego 'e2'. Se guardan
+                # los últimos _UNIBLES tokens sin espacio entre ellos, no toda la racha
+                inicio = len(listos) - 1
+                while (inicio > 0 and len(listos) - inicio < _UNIBLES
+                       and listos[inicio - 1].end_pos == listos[inicio].start_pos):
+                    inicio -= 1
+                corte = listos[inicio].start_pos
+                del listos[inicio:]
+            elif not listos:
+                # Solo espacios y comentarios: se conservan desde el último, que puede seguir
+                if descartes is None:
+                    descartes = _lexer_sin_descartes(parser)
+                ultimo = None
+                for ultimo in LexerThread.from_text(descartes, pendiente[:corte]).lex(None):
+                    pass
+                corte = ultimo.start_pos if ultimo is not None else 0
+
+        for token in listos:
+            yield _ajustar(token, linea, columna, posicion)
+        consumido = pendiente[:corte]
+        linea, columna = _avanzar(consumido, linea, columna)
+        posicion += corte
+        pendiente = pendiente[corte:]
+    if pendiente.strip():
+        log_lexico.debug("Texto sin lexear al final del archivo: %r", pendiente[:40])
+
+
+class EstadisticasLexicas:
+    """Conteos por categoría de token, acumulados de uno en uno en memoria constante."""
+
+    def __init__(self, muestras=MUESTRAS):
+        self.muestras = muestras
+        self.total = 0
+        self.categorias = {}  # tipo -> {"cantidad", "caracteres", "primera_linea", "ultima_linea", "valores"}
+        self.lineas = 0
+
+    def agregar(self, token):
+        self.total += 1
+        categoria = self.categorias.get(token.type)
+        if categoria is None:
+            categoria = self.categorias[token.type] = {"cantidad": 0, "caracteres": 0, "primera_linea": token.line,
+                                                       "ultima_linea": token.line, "valores": []}
+        categoria["cantidad"] += 1
+        categoria["caracteres"] += len(token)
+        categoria["ultima_linea"] = token.line
+        # Solo las primeras MUESTRAS variantes: la memoria no crece con el tamaño del archivo
+        valores = categoria["valores"]
+        if len(valores) < self.muestras and token.value not in valores:
+            valores.append(str(token.value))
+        self.lineas = max(self.lineas, token.end_line or token.line)
+
+    def contar(self, tokens, avisar=None):
+        """
+        Agrega cada token y lo vuelve a entregar, para encadenar con otros consumidores.
+        Cada AVISO_CADA tokens llama a avisar(texto), si se da (p. ej. el de trabajador_analisis).
+        """
+        for token in tokens:
+            self.agregar(token)
+            if avisar is not None and self.total % AVISO_CADA == 0:
+                avisar(f"{self.total} tokens, línea {token.line}...")
+            yield token
+
+    def resumen(self):
+        lineas = [f"{self.total} tokens en {self.lineas} líneas, {len(self.categorias)} categorías"]
+        for tipo, datos in sorted(self.categorias.items(), key=lambda par: -par[1]["cantidad"]):
+            promedio = datos["caracteres"] / datos["cantidad"]
+            lineas.append(f"{tipo:<28} {datos['cantidad']:>10} tokens  largo medio {promedio:6.1f}  "
+                          f"líneas {datos['primera_linea']}-{datos['ultima_linea']}")
+        return "\n".join(lineas)
+
+
+def volcar_tokens(tokens, destino, formato="tsv"):
+    """Escribe cada token en 'destino' en cuanto llega (tsv: tipo, línea, columna, valor). Devuelve cuántos."""
+    cantidad = 0
+    if formato == "tsv":
+        destino.write("tipo\tlinea\tcolumna\tvalor\n")
+    for token in tokens:
+        if formato == "jsonl":
+            destino.write(json.dumps({"tipo": token.type, "linea": token.line, "columna": token.column,
+                                      "valor": str(token.value)}, ensure_ascii=False) + "\n")
+        else:
+            valor = str(token.value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+            destino.write(f"{token.type}\t{token.line}\t{token.column}\t{valor}\n")
+        cantidad += 1
+    return cantidad
+
+
+def analizar_archivo(parser, ruta, volcado=None, formato="tsv", tamano_trozo=TAMANO_TROZO, avisar=None):
+    """Estadísticas léxicas de 'ruta' (y volcado de tokens si se pide), en un solo recorrido."""
+    estadisticas = EstadisticasLexicas()
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        tokens = estadisticas.contar(tokens_en_flujo(parser, archivo, tamano_trozo), avisar)
+        if volcado is None:
+            for _ in tokens:
+                pass
+        else:
+            with open(volcado, "w", encoding="utf-8") as destino:
+                volcar_tokens(tokens, destino, formato)
+    return estadisticas
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Análisis léxico en flujo de un programa Polux.")
+    argumentos.add_argument("archivo")
+    argumentos.add_argument("--volcado", metavar="RUTA", help="Escribir los tokens en este archivo")
+    argumentos.add_argument("--formato", choices=["tsv", "jsonl"], default="tsv")
+    argumentos.add_argument("--trozo", type=int, default=TAMANO_TROZO, help="Caracteres leídos por vez")
+    opciones = argumentos.parse_args(argv)
+
+    try:
+        estadisticas = analizar_archivo(cargar_parser(), opciones.archivo, opciones.volcado, opciones.formato,
+                                        opciones.trozo)
+    except UnexpectedInput as error:
+        print(f"Error léxico en línea {error.line}, columna {error.column}", file=sys.stderr)
+        return 1
+    print(estadisticas.resumen())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
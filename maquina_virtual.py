@@ -0,0 +1,220 @@
+"""
+Máquina virtual de pila para el bytecode de codigo_intermedio.py.
+
+Cada llamada ejecuta el código de una FuncionCompilada sobre una lista de casillas
+(argumentos y variables locales) y una pila de operandos propia; las globales son una
+lista compartida. El ciclo principal lee pares (operación, argumento) de una lista de
+Python (el array('i') del programa se copia una vez: indexar una lista es más rápido)
+y despacha con una cadena de comparaciones ordenada por frecuencia, con los códigos
+de operación en variables locales.
+
+Con vectorizar=True y NumPy instalado los arreglos de int o de float son Vector
+(vectores.py) y su aritmética se hace en bloque; si no, son Arreglo y se opera
+elemento por elemento.
+
+Un error de Python en una operación (división por cero, tipos que no se pueden sumar...)
+se convierte en ejecucion.ErrorEjecucion con la línea de la instrucción que lo produjo.
+
+Uso:
+    python maquina_virtual.py programa.polux [--desensamblar] [--sin-plegar] [--vectorizar]
+"""
+import argparse
+import sys
+
+from lark import UnexpectedInput
+
+from codigo_intermedio import (
+    A_FLOTANTE, BINARIA, CARGAR_CAMPO, CARGAR_CONSTANTE, CARGAR_GLOBAL, CARGAR_LOCAL, CREAR_ARREGLO, DESCARTAR,
+    DUPLICAR, GUARDAR_CAMPO, GUARDAR_GLOBAL, GUARDAR_LOCAL, ITERAR, LLAMAR, LLAMAR_METODO, MOSTRAR, NEGAR, NO, NUEVO,
+    OPERACIONES, RETORNAR, SALTAR, SALTAR_SI_FALSO, SALTAR_SI_FALSO_O_DESCARTAR, SALTAR_SI_VERDADERO_O_DESCARTAR,
+    SIGUIENTE, ErrorGeneracion, compilar_fuente, desensamblar)
+from ejecucion import ERRORES_OPERACION, ErrorEjecucion, Objeto, describir_error, formatear, mostrar
+from registro import obtener_registro
+from vectores import crear_arreglo, vectorizado
+
+log_ejecucion = obtener_registro("ejecucion")
+
+_FIN = object()  # next(iterador, _FIN) al terminar un 'for'
+
+
+class MaquinaVirtual:
+    """Ejecuta un Programa; show() escribe en 'salida' (sys.stdout si no se da)."""
+
+    def __init__(self, programa, salida=None, vectorizar=False):
+        self.programa = programa
+        self.salida = salida if salida is not None else sys.stdout
+        self.vectorizar = vectorizar
+        # Los arreglos literales constantes se convierten una vez, no en cada evaluación
+        self.constantes = [vectorizado(c) for c in programa.constantes] if vectorizar else programa.constantes
+        self.funciones = programa.funciones
+        self.clases = programa.clases
+        self._codigos = [funcion.codigo.tolist() for funcion in programa.funciones]
+        self.globales = []
+
+    def ejecutar(self):
+        """Ejecuta el programa principal desde cero (las globales empiezan vacías)."""
+        self.globales = [None] * self.programa.globales
+        self._llamar(self.programa.principal, [])
+
+    def _llamar(self, funcion, argumentos):
+        """Ejecuta 'funcion' con 'argumentos' en sus primeras casillas y devuelve su resultado (None)."""
+        faltan = funcion.locales - len(argumentos)
+        if faltan:
+            argumentos += [None] * faltan
+        return self._ejecutar(funcion, self._codigos[funcion.indice], argumentos)
+
+    def _nuevo(self, clase, argumentos):
+        objeto = Objeto(clase, [None] * len(clase.campos))
+        for inicializar in clase.inicializadores:
+            self._llamar(inicializar, [objeto])
+        if clase.constructor is not None:
+            self._llamar(clase.constructor, [objeto] + argumentos)
+        return objeto
+
+    def _ejecutar(self, funcion, codigo, locales):
+        # Códigos de operación en variables locales: una comparación con una local es más barata
+        cargar_local, cargar_constante, cargar_global, guardar_local, guardar_global = (
+            CARGAR_LOCAL, CARGAR_CONSTANTE, CARGAR_GLOBAL, GUARDAR_LOCAL, GUARDAR_GLOBAL)
+        binaria, saltar_si_falso, saltar, duplicar, descartar = BINARIA, SALTAR_SI_FALSO, SALTAR, DUPLICAR, DESCARTAR
+        cargar_campo, guardar_campo, siguiente = CARGAR_CAMPO, GUARDAR_CAMPO, SIGUIENTE
+        constantes, globales, operaciones = self.constantes, self.globales, OPERACIONES
+        pila = []
+        apilar, desapilar = pila.append, pila.pop
+        pc = 0
+        try:
+            while True:
+                operacion = codigo[pc]
+                argumento = codigo[pc + 1]
+                pc += 2
+                if operacion == cargar_local:
+                    apilar(locales[argumento])
+                elif operacion == cargar_constante:
+                    apilar(constantes[argumento])
+                elif operacion == binaria:
+                    derecha = desapilar()
+                    pila[-1] = operaciones[argumento](pila[-1], derecha)
+                elif operacion == cargar_global:
+                    apilar(globales[argumento])
+                elif operacion == saltar_si_falso:
+                    if not desapilar():
+                        pc = argumento
+                elif operacion == guardar_local:
+                    locales[argumento] = desapilar()
+                elif operacion == guardar_global:
+                    globales[argumento] = desapilar()
+                elif operacion == duplicar:
+                    apilar(pila[-1])
+                elif operacion == descartar:
+                    desapilar()
+                elif operacion == saltar:
+                    pc = argumento
+                elif operacion == cargar_campo:
+                    apilar(locales[0].campos[argumento])
+                elif operacion == guardar_campo:
+                    locales[0].campos[argumento] = desapilar()
+                elif operacion == siguiente:
+                    valor = next(pila[-1], _FIN)
+                    if valor is _FIN:
+                        desapilar()
+                        pc = argumento
+                    else:
+                        apilar(valor)
+                elif operacion == NEGAR:
+                    pila[-1] = -pila[-1]
+                elif operacion == NO:
+                    pila[-1] = not pila[-1]
+                elif operacion == SALTAR_SI_FALSO_O_DESCARTAR:
+                    if pila[-1]:
+                        desapilar()
+                    else:
+                        pc = argumento
+                elif operacion == SALTAR_SI_VERDADERO_O_DESCARTAR:
+                    if pila[-1]:
+                        pc = argumento
+                    else:
+                        desapilar()
+                elif operacion == A_FLOTANTE:
+                    pila[-1] = float(pila[-1])
+                elif operacion == LLAMAR:
+                    llamada = self.funciones[argumento]
+                    cantidad = llamada.parametros
+                    argumentos = pila[len(pila) - cantidad:]
+                    del pila[len(pila) - cantidad:]
+                    apilar(self._llamar(llamada, argumentos))
+                elif operacion == LLAMAR_METODO:
+                    nombre, cantidad = constantes[argumento]
+                    argumentos = pila[len(pila) - cantidad:]
+                    del pila[len(pila) - cantidad:]
+                    receptor = desapilar()
+                    metodo = receptor.clase.metodos.get(nombre) if isinstance(receptor, Objeto) else None
+                    if metodo is None:
+                        raise ErrorEjecucion(f"{formatear(receptor)} no tiene un método '{nombre}'",
+                                             funcion.lineas[pc // 2 - 1])
+                    apilar(self._llamar(metodo, [receptor] + argumentos))
+                elif operacion == NUEVO:
+                    indice, cantidad = constantes[argumento]
+                    argumentos = pila[len(pila) - cantidad:]
+                    del pila[len(pila) - cantidad:]
+                    apilar(self._nuevo(self.clases[indice], argumentos))
+                elif operacion == CREAR_ARREGLO:
+                    elementos = pila[len(pila) - argumento:]
+                    del pila[len(pila) - argumento:]
+                    apilar(crear_arreglo(elementos, self.vectorizar))
+                elif operacion == ITERAR:
+                    pila[-1] = iter(pila[-1])
+                elif operacion == MOSTRAR:
+                    valores = pila[len(pila) - argumento:]
+                    del pila[len(pila) - argumento:]
+                    mostrar(valores, self.salida)
+                elif operacion == RETORNAR:
+                    return None
+                else:
+                    raise ErrorEjecucion(f"código de operación desconocido {operacion}", funcion.lineas[pc // 2 - 1])
+        except ERRORES_OPERACION as error:
+            raise ErrorEjecucion(describir_error(error), funcion.lineas[pc // 2 - 1]) from error
+
+
+def ejecutar_programa(programa, salida=None, vectorizar=False):
+    """Ejecuta un Programa de codigo_intermedio y devuelve la máquina (con sus globales finales)."""
+    maquina = MaquinaVirtual(programa, salida, vectorizar)
+    maquina.ejecutar()
+    return maquina
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Ejecuta un programa Polux en la máquina virtual.")
+    argumentos.add_argument("archivo")
+    argumentos.add_argument("--desensamblar", action="store_true", help="Mostrar el bytecode en lugar de ejecutarlo")
+    argumentos.add_argument("--sin-plegar", action="store_true", help="No plegar las constantes antes de generar")
+    argumentos.add_argument("--vectorizar", action="store_true",
+                            help="Arreglos de int o float en ndarray de NumPy (si está instalado), "
+                                 "con aritmética en bloque (vectores.py)")
+    opciones = argumentos.parse_args(argv)
+
+    with open(opciones.archivo, "r", encoding="utf-8") as archivo:
+        codigo = archivo.read()
+    try:
+        programa = compilar_fuente(codigo, plegar=not opciones.sin_plegar)
+    except UnexpectedInput as error:
+        print(f"Error sintáctico en línea {error.line}, columna {error.column}", file=sys.stderr)
+        return 1
+    except ErrorGeneracion as error:
+        for diagnostico in error.diagnosticos:
+            print(diagnostico, file=sys.stderr)
+        print(error, file=sys.stderr)
+        return 1
+    log_ejecucion.debug("%d instrucciones en %d funciones", programa.instrucciones(), len(programa.funciones))
+
+    if opciones.desensamblar:
+        print(desensamblar(programa))
+        return 0
+    try:
+        ejecutar_programa(programa, vectorizar=opciones.vectorizar)
+    except ErrorEjecucion as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""
+Plegado y propagación de constantes sobre un árbol que el SemanticAnalyzer ya analizó sin errores.
+
+PlegadorConstantes recorre el árbol una vez, con los mismos ámbitos que el análisis, y:
+
+  - pliega las operaciones aritméticas, relacionales, lógicas y unarias cuyos operandos
+    son literales: '2 * (3 + 4)' queda como el literal 14 y 'NOT (1 < 2)' como False;
+    también las de arreglos literales, elemento a elemento: '[1, 2] * 3' queda [3, 6];
+  - propaga el valor de cada 'cte' que se pudo plegar a sus usos, así que
+    'cte N = 4 * 1024' seguido de 'x = N * 2' deja 'x = 8192';
+  - guarda el texto del valor plegado en SymbolEntry.value de las constantes (y de las
+    variables cuyo valor inicial se plegó), la columna "valor" de la tabla de símbolos.
+
+Con vectorizar=True los arreglos constantes de int o de float se evalúan como Vector
+(vectores.py). Con reescribir=False solo se calculan los valores y se anotan en la tabla, sin tocar el
+árbol. Cada subárbol plegado se reemplaza por un nodo literal (integer, booleano,
+string_literal o char_literal) con las posiciones del original, así que las fases
+siguientes (codigo_intermedio.py, los intérpretes, un nuevo análisis) lo tratan como si
+el literal estuviera escrito en el fuente.
+
+Los valores se calculan con los operadores de ejecucion.py, los mismos de la máquina
+virtual: la división entre enteros es entera. No se pliega lo que daría otro tipo que
+el del análisis (2 ^ -1 es float), un float infinito, un arreglo de más de
+MAXIMO_LITERAL elementos ni una división o un módulo por cero: esa operación queda
+en el árbol y se informa como advertencia S205. Un valor cuyo literal pasaría de
+MAXIMO_LITERAL caracteres se sigue propagando, pero no se escribe en el árbol. Un '^'
+o un '*' entre int cuyo resultado pasaría de MAXIMO_BITS bits (9 ^ 9 ^ 9) ni siquiera
+se calcula: queda para la ejecución.
+"""
+import copy
+import math
+
+from lark import Token, Tree
+from lark.visitors import Interpreter
+
+from diagnosticos import ADVERTENCIA, Diagnostico
+from ejecucion import (
+    ERRORES_OPERACION, OPERADORES_BINARIOS, codificar_cadena, operador_de, texto_de, valor_literal)
+from vectores import Vector, crear_arreglo
+
+MAXIMO_LITERAL = 200  # Caracteres como mucho del texto de un literal plegado
+# Bits como mucho de un int que se calcula al plegar (200 cifras decimales son unos 665)
+MAXIMO_BITS = 4 * MAXIMO_LITERAL
+
+_LITERALES = frozenset(('integer', 'booleano', 'string_literal', 'char_literal'))
+_NUMERICOS = ('int', 'float')
+_RELACIONALES = frozenset(('<', '<=', '>', '>=', '==', '!='))
+_TIPOS_PYTHON = {'int': int, 'float': float, 'bool': bool, 'string': str, 'char': str}
+
+
+class Constante:
+    """Valor conocido de una expresión: su tipo en el análisis, el valor y su texto como literal."""
+
+    __slots__ = ("tipo", "valor", "texto")
+
+    def __init__(self, tipo, valor, texto):
+        self.tipo = tipo
+        self.valor = valor
+        self.texto = texto
+
+
+class ResultadoPlegado:
+    """Lo que hizo una pasada de PlegadorConstantes."""
+
+    __slots__ = ("reemplazos", "propagadas", "nodos_eliminados", "constantes", "advertencias")
+
+    def __init__(self):
+        self.reemplazos = 0  # Subárboles reemplazados por un literal
+        self.propagadas = 0  # Usos de una 'cte' cuyo valor se conocía
+        self.nodos_eliminados = 0  # Nodos Tree que el árbol tiene de menos
+        self.constantes = 0  # Constantes con valor plegado
+        self.advertencias = []  # Diagnostico (divisiones por cero que aparecen al plegar)
+
+    def como_dict(self):
+        return {"reemplazos": self.reemplazos, "propagadas": self.propagadas,
+                "nodos_eliminados": self.nodos_eliminados, "constantes": self.constantes,
+                "advertencias": [advertencia.como_dict() for advertencia in self.advertencias]}
+
+
+def _elemento(tipo):
+    """'int' para 'array<int>'; None si el tipo no es de arreglo."""
+    return tipo[6:-1] if tipo.startswith('array<') else None
+
+
+def _valida(constante):
+    """La constante si su valor es del tipo que dio el análisis (y los float finitos); si no, None."""
+    elemento = _elemento(constante.tipo)
+    if elemento is not None:
+        valores = constante.valor
+        if not isinstance(valores, (list, Vector)) or len(valores) > MAXIMO_LITERAL:
+            return None
+        return constante if all(_valida(Constante(elemento, valor, None)) for valor in valores) else None
+    if type(constante.valor) is not _TIPOS_PYTHON.get(constante.tipo):
+        return None
+    if constante.tipo == 'float' and not math.isfinite(constante.valor):
+        return None
+    return constante
+
+
+def _texto(constante):
+    """Texto de la constante como literal de Polux, o None si pasa de MAXIMO_LITERAL caracteres."""
+    if constante.texto is None:
+        tipo, valor = constante.tipo, constante.valor
+        elemento = _elemento(tipo)
+        if elemento is not None:
+            textos = [_texto(Constante(elemento, v, None)) for v in valor]
+            if None in textos:
+                return None
+            constante.texto = "[" + ", ".join(textos) + "]"
+        elif tipo == 'bool':
+            constante.texto = "True" if valor else "False"
+        elif tipo == 'string':
+            constante.texto = codificar_cadena(valor)
+        elif tipo == 'char':
+            constante.texto = codificar_cadena(valor, "'")
+        else:
+            constante.texto = repr(valor)  # repr de un float siempre lleva '.' o 'e'
+    return constante.texto if len(constante.texto) <= MAXIMO_LITERAL else None
+
+
+def _demasiado_grande(operador, izquierda, derecha):
+    """
+    True si 'izquierda operador derecha' daría un int de más de MAXIMO_BITS bits, sin
+    calcularlo: 9 ^ 9 ^ 9 tardaría minutos. Con arreglos se mira cada par de elementos.
+    """
+    if operador not in ('^', '*'):
+        return False
+    if isinstance(izquierda, (list, Vector)) or isinstance(derecha, (list, Vector)):
+        izquierdas = izquierda if isinstance(izquierda, (list, Vector)) else [izquierda] * len(derecha)
+        derechas = derecha if isinstance(derecha, (list, Vector)) else [derecha] * len(izquierdas)
+        return any(_demasiado_grande(operador, a, b) for a, b in zip(izquierdas, derechas))
+    if type(izquierda) is not int or type(derecha) is not int:
+        return False  # Con un float el resultado no crece: desborda (OverflowError) o da inf
+    if operador == '*':
+        return izquierda.bit_length() + derecha.bit_length() > MAXIMO_BITS
+    # Un exponente negativo da float; con base 0, 1 o -1 el resultado no crece
+    # |base| >= 2 ^ (bits - 1): el resultado tiene al menos exponente * (bits - 1) bits
+    return derecha > 0 and derecha * (izquierda.bit_length() - 1) > MAXIMO_BITS
+
+
+def _tipo_resultado(operador, izquierda, derecha):
+    """Tipo (como en el análisis) de 'izquierda operador derecha' entre esos tipos, o None si no se pliega."""
+    if operador in _RELACIONALES:
+        comparables = izquierda == derecha or (izquierda in _NUMERICOS and derecha in _NUMERICOS)
+        return 'bool' if comparables else None
+    # Con un arreglo la operación es elemento a elemento (vectores.py)
+    elemento_izquierda, elemento_derecha = _elemento(izquierda) or izquierda, _elemento(derecha) or derecha
+    if elemento_izquierda in _NUMERICOS and elemento_derecha in _NUMERICOS:
+        tipo = 'float' if 'float' in (elemento_izquierda, elemento_derecha) else 'int'
+        return f"array<{tipo}>" if _elemento(izquierda) or _elemento(derecha) else tipo
+    return 'string' if operador == '+' and izquierda == derecha == 'string' else None
+
+
+def _token(tipo, valor, meta):
+    if meta.empty:
+        return Token(tipo, valor)
+    return Token(tipo, valor, meta.start_pos, meta.line, meta.column, meta.end_line, meta.end_column, meta.end_pos)
+
+
+def _nodo_literal(constante, meta):
+    """Nodo literal (con las posiciones de 'meta') de una constante con _texto()."""
+    texto = _texto(constante)
+    elemento = _elemento(constante.tipo)
+    if elemento is not None:
+        hijos = [_token('LSQB', '[', meta)]
+        for indice, valor in enumerate(constante.valor):
+            if indice:
+                hijos.append(_token('COMMA', ',', meta))
+            hijos.append(_nodo_literal(Constante(elemento, valor, None), copy.copy(meta)))
+        hijos.append(_token('RSQB', ']', meta))
+        return Tree('array_literal', hijos, meta)
+    if constante.tipo in _NUMERICOS:
+        return Tree('integer', [_token('DIGIT', texto, meta)], meta)
+    if constante.tipo == 'bool':
+        return Tree('booleano', [_token(texto.upper(), texto, meta)], meta)
+    if constante.tipo == 'char':
+        return Tree('char_literal', [_token('CHAR_LITERAL', texto, meta)], meta)
+    return Tree('string_literal', [_token('STRING_LITERAL', texto, meta)], meta)
+
+
+def _nombre(nodo):
+    while isinstance(nodo, Tree):
+        nodo = nodo.children[0]
+    return nodo.value
+
+
+class PlegadorConstantes(Interpreter):
+    """
+    Pliega las constantes de un árbol. 'analizador' es el SemanticAnalyzer que acaba de
+    analizarlo con start_analysis(); sus ámbitos dicen a qué símbolo se refiere cada uso.
+    Cada manejador de expresión devuelve la Constante de su nodo, o None si no es constante.
+    """
+
+    def __init__(self, analizador, reescribir=True, vectorizar=False):
+        self.analizador = analizador
+        self.tabla = analizador.symbol_table
+        self.reescribir = reescribir
+        self.vectorizar = vectorizar  # Arreglos constantes de int/float como Vector (vectores.py)
+
+    def plegar(self, arbol):
+        """Pliega 'arbol' (en el lugar) y devuelve un ResultadoPlegado."""
+        self.resultado = ResultadoPlegado()
+        if self.analizador.errors:
+            return self.resultado  # Con errores los símbolos pueden no corresponder al árbol
+        self._valores = {}  # SymbolEntry de una 'cte' -> Constante
+        self._declarados = {}  # Scope -> nombres ya declarados en el punto del recorrido
+        self._ambito = self.tabla.global_scope
+        self.visit(arbol)
+        self.resultado.constantes = len(self._valores)
+        return self.resultado
+
+    # --- Recorrido ---
+
+    def __default__(self, nodo):
+        for indice, hijo in enumerate(nodo.children):
+            if isinstance(hijo, Tree):
+                self._hijo(nodo, indice)
+        return None
+
+    def _hijo(self, nodo, indice):
+        """Visita nodo.children[indice]; si resulta constante, lo reemplaza por su literal."""
+        hijo = nodo.children[indice]
+        constante = self.visit(hijo)
+        # Un array_literal constante ya quedó con literales en cada elemento
+        if (constante is not None and self.reescribir and hijo.data not in _LITERALES and hijo.data != 'array_literal'
+                and _texto(constante) is not None):
+            nodo.children[indice] = _nodo_literal(constante, hijo.meta)
+            self.resultado.reemplazos += 1
+            self.resultado.nodos_eliminados += sum(1 for _ in hijo.iter_subtrees()) - 1
+        return constante
+
+    # --- Ámbitos (como GeneradorCodigo en codigo_intermedio.py) ---
+
+    def _declarar(self, nombre):
+        """Marca 'nombre' como declarado en el ámbito actual y devuelve su símbolo (None si no está)."""
+        simbolo = self._ambito.symbols.get(nombre)
+        if simbolo is not None:
+            self._declarados.setdefault(self._ambito, set()).add(nombre)
+        return simbolo
+
+    def _resolver(self, nombre):
+        """Símbolo de 'nombre' visible en este punto, del ámbito más interno hacia afuera."""
+        ambito = self._ambito
+        while ambito is not None:
+            simbolo = ambito.symbols.get(nombre)
+            if simbolo is not None and nombre in self._declarados.get(ambito, ()):
+                return simbolo
+            ambito = ambito.parent
+        return None
+
+    def _asignado(self, nombre):
+        """Un nombre que recibe un valor: si no estaba declarado, el análisis lo declaró aquí."""
+        if self._resolver(nombre) is None:
+            self._declarar(nombre)
+
+    # --- Sentencias ---
+
+    def type(self, nodo):
+        pass
+
+    def identifier(self, nodo):
+        pass  # Nombres de declaraciones, funciones, métodos y receptores: no son valores
+
+    def variable_declaration(self, nodo):
+        # type identifier ("=" expression)?
+        constante = self._hijo(nodo, 3) if len(nodo.children) == 4 else None
+        simbolo = self._declarar(_nombre(nodo.children[1]))
+        if simbolo is not None and constante is not None and _texto(constante) is not None:
+            simbolo.value = constante.texto
+
+    def constant_declaration(self, nodo):
+        # "cte" identifier "=" expression
+        indice = max(i for i, hijo in enumerate(nodo.children) if isinstance(hijo, Tree))
+        constante = self._hijo(nodo, indice)
+        identificador = next(hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier')
+        simbolo = self._declarar(_nombre(identificador))
+        if simbolo is not None and constante is not None:
+            self._valores[simbolo] = constante
+            if _texto(constante) is not None:
+                simbolo.value = constante.texto
+
+    def for_loop(self, nodo):
+        # "for" "(" identifier "in" expression ")" "||" statement_block "||"
+        subarboles = [i for i, hijo in enumerate(nodo.children) if isinstance(hijo, Tree)]
+        identificador, iterable, bloque = subarboles
+        self._hijo(nodo, iterable)
+        self._asignado(_nombre(nodo.children[identificador]))
+        self.visit(nodo.children[bloque])
+
+    def function_declaration(self, nodo):
+        identificador = next(hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier')
+        simbolo = self._declarar(_nombre(identificador))
+        if simbolo is None or simbolo.local_symbol_table is None:
+            return
+        ambito_anterior, self._ambito = self._ambito, simbolo.local_symbol_table
+        try:
+            for hijo in nodo.children:
+                if not isinstance(hijo, Tree):
+                    continue
+                if hijo.data == 'parameter_list':
+                    for parametro in hijo.children:
+                        if isinstance(parametro, Tree):
+                            self._declarar(_nombre(parametro))
+                elif hijo.data == 'statement_block':
+                    self.visit(hijo)
+        finally:
+            self._ambito = ambito_anterior
+
+    method_declaration = constructor_declaration = function_declaration
+
+    def class_declaration(self, nodo):
+        # "class" identifier ("inherits" identifier)? "||" class_body "||"
+        identificador = next(hijo for hijo in nodo.children if isinstance(hijo, Tree) and hijo.data == 'identifier')
+        simbolo = self._declarar(_nombre(identificador))
+        if simbolo is None or simbolo.local_symbol_table is None:
+            return
+        ambito_anterior, self._ambito = self._ambito, simbolo.local_symbol_table
+        try:
+            for hijo in nodo.children:
+                if isinstance(hijo, Tree) and hijo.data == 'class_body':
+                    self.visit(hijo)
+        finally:
+            self._ambito = ambito_anterior
+
+    # --- Expresiones ---
+
+    def integer(self, nodo):
+        valor = valor_literal(nodo)
+        tipo = 'float' if isinstance(valor, float) else 'int'
+        return Constante(tipo, valor, texto_de(nodo))
+
+    def booleano(self, nodo):
+        return Constante('bool', valor_literal(nodo), texto_de(nodo))
+
+    def string_literal(self, nodo):
+        return Constante('string', valor_literal(nodo), nodo.children[0].value)
+
+    def char_literal(self, nodo):
+        return Constante('char', valor_literal(nodo), nodo.children[0].value)
+
+    def variable(self, nodo):
+        constante = self._valores.get(self._resolver(_nombre(nodo)))
+        if constante is not None:
+            self.resultado.propagadas += 1
+        return constante
+
+    def grouped_expression(self, nodo):
+        indice = next(i for i, hijo in enumerate(nodo.children) if isinstance(hijo, Tree))
+        return self._hijo(nodo, indice)
+
+    def arithmetic_expression(self, nodo):
+        izquierda = self._hijo(nodo, 0)
+        derecha = self._hijo(nodo, 2)
+        operador = operador_de(nodo.children[1])
+        if derecha is not None and operador in ('/', '%') and derecha.tipo in _NUMERICOS and derecha.valor == 0:
+            self.resultado.advertencias.append(Diagnostico.en_nodo(
+                "S205", "División por cero: el divisor vale 0 al plegar las constantes", nodo.children[2],
+                ADVERTENCIA))
+            return None
+        if izquierda is None or derecha is None:
+            return None
+        tipo = _tipo_resultado(operador, izquierda.tipo, derecha.tipo)
+        if tipo is None or _demasiado_grande(operador, izquierda.valor, derecha.valor):
+            return None
+        try:
+            valor = OPERADORES_BINARIOS[operador](izquierda.valor, derecha.valor)
+        except ZeroDivisionError:
+            if operador in ('/', '%'):  # Un arreglo divisor con algún 0
+                self.resultado.advertencias.append(Diagnostico.en_nodo(
+                    "S205", "División por cero: el divisor vale 0 al plegar las constantes", nodo.children[2],
+                    ADVERTENCIA))
+            return None
+        except ERRORES_OPERACION:
+            return None  # Queda para la ejecución, que informa el error con su línea
+        return _valida(Constante(tipo, valor, None))
+
+    relational_expression = arithmetic_expression
+
+    def logical_expression(self, nodo):
+        izquierda = self._hijo(nodo, 0)
+        derecha = self._hijo(nodo, 2)
+        if izquierda is None or derecha is None or izquierda.tipo != 'bool' or derecha.tipo != 'bool':
+            return None
+        if operador_de(nodo.children[1]) == 'AND':
+            return Constante('bool', izquierda.valor and derecha.valor, None)
+        return Constante('bool', izquierda.valor or derecha.valor, None)
+
+    def unary_expression(self, nodo):
+        operando = self._hijo(nodo, 1)
+        if operando is None:
+            return None
+        if operador_de(nodo.children[0]) == 'NOT':
+            return Constante('bool', not operando.valor, None) if operando.tipo == 'bool' else None
+        return _valida(Constante(operando.tipo, -operando.valor, None)) if operando.tipo in _NUMERICOS else None
+
+    def array_literal(self, nodo):
+        constantes = [self._hijo(nodo, indice) for indice, hijo in enumerate(nodo.children) if isinstance(hijo, Tree)]
+        if len(constantes) > MAXIMO_LITERAL or None in constantes:
+            return None
+        tipos = {constante.tipo for constante in constantes}
+        if len(tipos) != 1:
+            return None
+        valores = crear_arreglo([constante.valor for constante in constantes], self.vectorizar)
+        return Constante(f"array<{tipos.pop()}>", valores, None)
+
+    def assignment_expression(self, nodo):
+        # El destino no se pliega aunque sea el nombre de una constante
+        self._hijo(nodo, 2)
+        self._asignado(_nombre(nodo.children[0]))
+        return None
+
+
+def plegar_constantes(arbol, analizador, reescribir=True, vectorizar=False):
+    """Pliega las constantes de 'arbol', que 'analizador' acaba de analizar con start_analysis()."""
+    return PlegadorConstantes(analizador, reescribir, vectorizar).plegar(arbol)
@@ -0,0 +1,235 @@
+"""
+Perfilado por fases del compilador.
+
+Un Perfilador mide cada fase (léxica, sintáctica, extraer_simbolos, semántica, la
+inserción en la interfaz...) con tiempo de pared, tiempo de CPU y, si se pide, memoria
+pico (tracemalloc). instrumentar() envuelve además los métodos visitantes de un
+SemanticAnalyzer (uno por regla de la gramática: variable_declaration,
+assignment_expression, method_call, ...) para contar sus llamadas y su tiempo
+acumulado y propio.
+
+Fases y métodos forman una pila; el tiempo propio de cada pila se acumula en formato
+"fase;metodo;metodo" para escribir un archivo de pilas colapsadas (flamegraph.pl,
+speedscope, inferno). Con cprofile=True la fase más externa corre también bajo cProfile
+y guardar_pstats() escribe el resultado para pstats o snakeviz.
+
+Sin perfilador nada de esto cuesta: las fases se abren con fase(perfilador, nombre),
+que sin perfilador es un contextlib.nullcontext, y los métodos solo se envuelven en el
+analizador que se instrumenta.
+"""
+import cProfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from registro import obtener_registro
+
+log_perfil = obtener_registro("perfil")
+
+LIMITE_INFORME = 25  # Métodos visitantes que se listan en el informe
+
+
+def fase(perfilador, nombre):
+    """Contexto que mide 'nombre' con el perfilador, o que no hace nada si es None."""
+    return perfilador.fase(nombre) if perfilador is not None else nullcontext()
+
+
+def reglas_de(parser):
+    """Nombres de nodo que puede producir el parser (tree.data: la regla o su alias)."""
+    return sorted({str(regla.alias or regla.origin.name) for regla in parser.rules
+                   if not regla.origin.name.startswith("_")})
+
+
+class _Marco:
+    """Una fase o una llamada en curso."""
+
+    __slots__ = ("nombre", "ruta", "inicio", "cpu", "hijos", "pico")
+
+    def __init__(self, nombre, ruta):
+        self.nombre = nombre
+        self.ruta = ruta
+        self.hijos = 0.0  # Tiempo de pared de los marcos hijos, para el tiempo propio
+        self.pico = 0
+        self.cpu = 0.0
+        self.inicio = time.perf_counter()
+
+
+class _Fase:
+    """Contexto de Perfilador.fase(): un marco de la pila con tiempo de CPU y memoria."""
+
+    __slots__ = ("perfilador", "nombre", "marco")
+
+    def __init__(self, perfilador, nombre):
+        self.perfilador = perfilador
+        self.nombre = nombre
+
+    def __enter__(self):
+        perfilador = self.perfilador
+        if not perfilador._pila:
+            perfilador._arrancar()
+        elif perfilador._memoria:
+            # El pico de la fase padre hasta aquí; reset_peak() lo borraría
+            padre = perfilador._pila[-1]
+            padre.pico = max(padre.pico, tracemalloc.get_traced_memory()[1])
+        if perfilador._memoria:
+            tracemalloc.reset_peak()
+        self.marco = perfilador._entrar(self.nombre)
+        self.marco.cpu = time.process_time()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        perfilador = self.perfilador
+        marco = self.marco
+        cpu = time.process_time() - marco.cpu
+        pared = perfilador._salir(marco)
+        pico = max(marco.pico, tracemalloc.get_traced_memory()[1]) if perfilador._memoria else None
+        datos = perfilador.fases.setdefault(self.nombre, {"llamadas": 0, "pared": 0.0, "cpu": 0.0, "pico": None})
+        datos["llamadas"] += 1
+        datos["pared"] += pared
+        datos["cpu"] += cpu
+        if pico is not None:
+            datos["pico"] = max(datos["pico"] or 0, pico)
+            if perfilador._pila:
+                padre = perfilador._pila[-1]
+                padre.pico = max(padre.pico, pico)
+        if not perfilador._pila:
+            perfilador._detener()
+        return False
+
+
+class Perfilador:
+    """Tiempos por fase y por método visitante; memoria pico y cProfile opcionales."""
+
+    def __init__(self, memoria=False, cprofile=False):
+        self.fases = {}  # nombre -> {"llamadas", "pared", "cpu", "pico"} (segundos, bytes)
+        self.visitantes = {}  # método -> {"llamadas", "acumulado", "propio"}
+        self.pilas = {}  # "fase;metodo;..." -> segundos propios
+        self.perfil = cProfile.Profile() if cprofile else None
+        self._memoria = memoria
+        self._pila = []
+        self._activos = {}  # método -> llamadas en curso (recursión: el acumulado se cuenta una vez)
+        self._inicio_tracemalloc = False
+        self._instrumentados = []  # (objeto, nombre) con un envoltorio en la instancia
+
+    # --- Fases ---
+
+    def fase(self, nombre):
+        """Contexto que mide 'nombre'. Las fases se pueden anidar."""
+        return _Fase(self, nombre)
+
+    def _arrancar(self):
+        if self._memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._inicio_tracemalloc = True
+        if self.perfil is not None:
+            try:
+                self.perfil.enable()
+            except ValueError:
+                log_perfil.warning("Ya hay otro perfilador activo en este hilo; no se usa cProfile")
+
+    def _detener(self):
+        if self.perfil is not None:
+            self.perfil.disable()
+        if self._inicio_tracemalloc:
+            tracemalloc.stop()
+            self._inicio_tracemalloc = False
+
+    def _entrar(self, nombre):
+        ruta = f"{self._pila[-1].ruta};{nombre}" if self._pila else nombre
+        marco = _Marco(nombre, ruta)
+        self._pila.append(marco)
+        return marco
+
+    def _salir(self, marco):
+        """Saca 'marco' de la pila, acumula su tiempo propio y devuelve su tiempo de pared."""
+        pared = time.perf_counter() - marco.inicio
+        self._pila.pop()
+        self.pilas[marco.ruta] = self.pilas.get(marco.ruta, 0.0) + pared - marco.hijos
+        if self._pila:
+            self._pila[-1].hijos += pared
+        return pared
+
+    # --- Métodos visitantes ---
+
+    def instrumentar(self, analizador, nombres):
+        """
+        Envuelve en la instancia 'analizador' cada método de 'nombres' (p. ej. reglas_de(parser)).
+        Las reglas sin método propio usan __default__ y también se cuentan.
+        """
+        for nombre in nombres:
+            if nombre in vars(analizador):
+                continue  # Ya envuelto
+            self._instrumentados.append((analizador, nombre))
+            setattr(analizador, nombre, self._envolver(nombre, getattr(analizador, nombre)))
+
+    def desinstrumentar(self):
+        """Quita los envoltorios: el analizador vuelve a usar los métodos de su clase."""
+        for objeto, nombre in self._instrumentados:
+            vars(objeto).pop(nombre, None)
+        self._instrumentados = []
+
+    def _envolver(self, nombre, metodo):
+        visitantes, activos = self.visitantes, self._activos
+
+        def envoltorio(*args, **kwargs):
+            marco = self._entrar(nombre)
+            activos[nombre] = activos.get(nombre, 0) + 1
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                activos[nombre] -= 1
+                pared = self._salir(marco)
+                datos = visitantes.get(nombre)
+                if datos is None:
+                    datos = visitantes[nombre] = {"llamadas": 0, "acumulado": 0.0, "propio": 0.0}
+                datos["llamadas"] += 1
+                datos["propio"] += pared - marco.hijos
+                if not activos[nombre]:
+                    datos["acumulado"] += pared
+        envoltorio.__name__ = nombre
+        return envoltorio
+
+    # --- Resultados ---
+
+    def como_dict(self):
+        """Resultados en tipos de JSON (segundos y bytes)."""
+        return {"fases": self.fases, "visitantes": self.visitantes}
+
+    def informe(self, limite=LIMITE_INFORME):
+        """Tabla de texto: fases y los 'limite' métodos visitantes con más tiempo propio."""
+        lineas = [f"{'fase':<22} {'veces':>7} {'pared (ms)':>11} {'CPU (ms)':>10} {'pico (MB)':>10}"]
+        for nombre, datos in self.fases.items():
+            pico = f"{datos['pico'] / 2**20:>10.1f}" if datos["pico"] is not None else f"{'-':>10}"
+            lineas.append(f"{nombre:<22} {datos['llamadas']:>7} {datos['pared'] * 1e3:>11.2f} "
+                          f"{datos['cpu'] * 1e3:>10.2f} {pico}")
+        if self.visitantes:
+            lineas.append("")
+            lineas.append(f"{'método visitante':<28} {'llamadas':>9} {'acumulado (ms)':>15} {'propio (ms)':>12}")
+            ordenados = sorted(self.visitantes.items(), key=lambda par: -par[1]["propio"])
+            for nombre, datos in ordenados[:limite]:
+                lineas.append(f"{nombre:<28} {datos['llamadas']:>9} {datos['acumulado'] * 1e3:>15.2f} "
+                              f"{datos['propio'] * 1e3:>12.2f}")
+            if len(ordenados) > limite:
+                lineas.append(f"... y {len(ordenados) - limite} métodos más")
+        return "\n".join(lineas)
+
+    def guardar_pilas(self, ruta):
+        """Pilas colapsadas ('fase;metodo;metodo microsegundos' por línea) para flamegraph.pl o speedscope."""
+        with open(ruta, "w", encoding="utf-8") as destino:
+            for pila, segundos in sorted(self.pilas.items()):
+                microsegundos = round(segundos * 1e6)
+                if microsegundos > 0:
+                    destino.write(f"{pila} {microsegundos}\n")
+
+    def guardar(self, ruta):
+        """Según la extensión: .pstats o .prof, el perfil de cProfile; cualquier otra, las pilas colapsadas."""
+        if ruta.lower().endswith((".pstats", ".prof")):
+            self.guardar_pstats(ruta)
+        else:
+            self.guardar_pilas(ruta)
+
+    def guardar_pstats(self, ruta):
+        """Estadísticas de cProfile (leer con pstats.Stats(ruta) o snakeviz). Requiere cprofile=True."""
+        if self.perfil is None:
+            raise ValueError("El perfilador se creó sin cprofile=True")
+        self.perfil.dump_stats(ruta)
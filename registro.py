@@ -0,0 +1,79 @@
+"""
+Registro de diagnósticos por niveles y por subsistema.
+
+Cada módulo obtiene su logger con obtener_registro("<subsistema>"); todos cuelgan de
+"polux", así que se pueden activar por separado:
+
+    POLUX_LOG=DEBUG                       -> todo en DEBUG
+    POLUX_LOG=semantico=DEBUG,ambitos=INFO -> solo esos subsistemas
+    POLUX_LOG=arbol=DEBUG                 -> volcados completos del árbol sintáctico
+
+Por defecto solo se muestran advertencias y errores. Los bucles calientes consultan
+esta_activo() una sola vez antes de iterar, así que con la depuración apagada los
+mensajes ni siquiera se formatean.
+"""
+import logging
+import os
+import sys
+
+RAIZ = "polux"
+SUBSISTEMAS = ("gramatica", "lexico", "simbolos", "ambitos", "semantico", "arbol", "lote", "incremental", "trabajador", "sesion", "perfil",
+               "ejecucion")
+VARIABLE_ENTORNO = "POLUX_LOG"
+FORMATO = "%(levelname)s [%(name)s] %(message)s"
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+
+_manejador = None
+
+
+def obtener_registro(subsistema):
+    """Logger del subsistema, p. ej. obtener_registro('semantico') -> 'polux.semantico'."""
+    return logging.getLogger(f"{RAIZ}.{subsistema}")
+
+
+def esta_activo(registro, nivel=DEBUG):
+    """True si el logger emitiría mensajes de ese nivel (para evitar formatear en vano)."""
+    return registro.isEnabledFor(nivel)
+
+
+def _nivel(texto):
+    nivel = logging.getLevelName(texto.strip().upper())
+    if not isinstance(nivel, int):
+        raise ValueError(f"Nivel de registro desconocido: '{texto}'")
+    return nivel
+
+
+def configurar_registro(especificacion=None, destino=None):
+    """
+    Aplica una especificación 'NIVEL' o 'subsistema=NIVEL,...'. Sin argumento se usa la
+    variable de entorno POLUX_LOG. Se puede llamar varias veces: los niveles se
+    reinician en cada llamada.
+    """
+    global _manejador
+    if especificacion is None:
+        especificacion = os.environ.get(VARIABLE_ENTORNO, "")
+
+    raiz = logging.getLogger(RAIZ)
+    if _manejador is None or destino is not None:
+        if _manejador is not None:
+            raiz.removeHandler(_manejador)
+        _manejador = logging.StreamHandler(destino or sys.stderr)
+        _manejador.setFormatter(logging.Formatter(FORMATO))
+        raiz.addHandler(_manejador)
+        raiz.propagate = False
+
+    raiz.setLevel(logging.WARNING)
+    for subsistema in SUBSISTEMAS:
+        obtener_registro(subsistema).setLevel(logging.NOTSET)
+
+    for parte in filter(None, (p.strip() for p in especificacion.split(","))):
+        if "=" in parte:
+            subsistema, nivel = parte.split("=", 1)
+            obtener_registro(subsistema.strip()).setLevel(_nivel(nivel))
+        else:
+            raiz.setLevel(_nivel(parte))
+
+
+configurar_registro()
@@ -0,0 +1,137 @@
+"""
+Sesión de compilación: cada versión del código fuente se lexea y se parsea una sola vez.
+
+Las vistas (tokens, árbol, tabla de símbolos) y los botones de las interfaces no llaman
+al parser por su cuenta: piden a la SesionCompilacion el resultado del texto actual y la
+sesión lo busca por la huella (hash) del texto. Si el texto no cambió, todas reciben la
+misma Compilacion, con los tokens, el árbol, los símbolos y los diagnósticos ya hechos.
+
+Los tokens y el árbol salen de una sola pasada: el parser interactivo de Lark entrega
+cada token según lo lee su lexer contextual, así que no hace falta un parser.lex()
+aparte. En modo incremental el árbol lo construye ParserIncremental (solo se reparsea lo
+editado) y los tokens se lexean la primera vez que alguien los pide.
+
+Lo que cada vista calcula a partir del resultado (el árbol formateado, las filas de la
+tabla...) se guarda también en la Compilacion con derivado(), para no repetirlo.
+"""
+import hashlib
+from collections import OrderedDict
+
+from lark import UnexpectedInput
+from lark.exceptions import UnexpectedCharacters
+
+from compilacion_incremental import ParserIncremental
+from diagnosticos import Diagnostico
+from perfilado import fase
+from registro import obtener_registro
+
+log_sesion = obtener_registro("sesion")
+
+CAPACIDAD = 8  # Versiones recordadas (deshacer/rehacer vuelve a textos ya compilados)
+
+
+def huella(codigo):
+    return hashlib.blake2b(codigo.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def diagnostico_de_error(error):
+    """Diagnóstico de un UnexpectedInput: léxico si ningún token empieza ahí, sintáctico si no."""
+    lexico = isinstance(error, UnexpectedCharacters)
+    mensaje = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+    return Diagnostico("L001" if lexico else "P001", mensaje, getattr(error, "line", None),
+                       getattr(error, "column", None), fase="lexico" if lexico else "sintactico")
+
+
+class Compilacion:
+    """Resultado de compilar una versión del código: tokens, árbol, símbolos y diagnósticos."""
+
+    __slots__ = ("huella", "codigo", "arbol", "error", "simbolos", "diagnosticos", "_tokens", "_parser", "_derivados")
+
+    def __init__(self, codigo, clave, parser):
+        self.huella = clave
+        self.codigo = codigo
+        self.arbol = None
+        self.error = None  # UnexpectedInput si el código no es válido
+        self.simbolos = []
+        self.diagnosticos = []
+        self._tokens = None
+        self._parser = parser
+        self._derivados = {}
+
+    @property
+    def valida(self):
+        return self.error is None
+
+    @property
+    def tokens(self):
+        """Tokens del código (hasta el error, si lo hay); no incluye los ignorados."""
+        if self._tokens is None:
+            # Solo en modo incremental: el árbol no pasó por una lectura completa de tokens
+            tokens = []
+            try:
+                for token in self._parser.lex(self.codigo):
+                    tokens.append(token)
+            except UnexpectedInput:
+                pass
+            self._tokens = tokens
+        return self._tokens
+
+    def derivado(self, nombre, funcion):
+        """funcion(self), calculada una sola vez por compilación y guardada con 'nombre'."""
+        if nombre not in self._derivados:
+            self._derivados[nombre] = funcion(self)
+        return self._derivados[nombre]
+
+
+class SesionCompilacion:
+    """Compila cada versión del texto una vez y devuelve el resultado guardado en las demás."""
+
+    def __init__(self, parser, extraer_simbolos=None, incremental=False, capacidad=CAPACIDAD):
+        self.parser = parser
+        self.extraer_simbolos = extraer_simbolos
+        self.incremental = ParserIncremental(parser) if incremental else None
+        # En modo incremental los subárboles se comparten entre versiones y se desplazan
+        # al editar, así que solo es fiable el árbol de la última versión
+        self.capacidad = 1 if incremental else max(1, capacidad)
+        self._compilaciones = OrderedDict()  # huella -> Compilacion, la más reciente al final
+        self.estadisticas = {"compilaciones": 0, "reutilizadas": 0}
+        self.perfilador = None  # perfilado.Perfilador que mide las fases de compilar(), si se asigna
+
+    def compilar(self, codigo):
+        clave = huella(codigo)
+        compilacion = self._compilaciones.get(clave)
+        if compilacion is not None:
+            self._compilaciones.move_to_end(clave)
+            self.estadisticas["reutilizadas"] += 1
+            return compilacion
+
+        compilacion = Compilacion(codigo, clave, self.parser)
+        try:
+            with fase(self.perfilador, "sintactico"):
+                if self.incremental is not None:
+                    self.incremental.actualizar(codigo)
+                    compilacion.arbol = self.incremental.arbol()
+                else:
+                    compilacion._tokens = []
+                    compilacion.arbol = self._parsear(codigo, compilacion._tokens)
+        except UnexpectedInput as error:
+            compilacion.error = error
+            compilacion.diagnosticos.append(diagnostico_de_error(error))
+        if compilacion.arbol is not None and self.extraer_simbolos is not None:
+            with fase(self.perfilador, "extraer_simbolos"):
+                compilacion.simbolos = self.extraer_simbolos(compilacion.arbol)
+
+        self.estadisticas["compilaciones"] += 1
+        self._compilaciones[clave] = compilacion
+        while len(self._compilaciones) > self.capacidad:
+            self._compilaciones.popitem(last=False)
+        log_sesion.debug("Compilación %s: %d diagnóstico(s)", clave[:8], len(compilacion.diagnosticos))
+        return compilacion
+
+    def _parsear(self, codigo, tokens):
+        """Árbol del código; guarda en 'tokens' cada token leído (los anteriores al error, si lo hay)."""
+        interactivo = self.parser.parse_interactive(codigo)
+        for token in interactivo.iter_parse():
+            tokens.append(token)
+        # El fin de archivo toma la posición del último token, como en parser.parse()
+        return interactivo.feed_eof(tokens[-1] if tokens else None)
@@ -0,0 +1,227 @@
+"""
+Análisis en segundo plano para las interfaces Tk.
+
+Los botones de los analizadores no ejecutan el análisis dentro del callback de Tk:
+lo encargan a un TrabajadorAnalisis, que lo corre en un único hilo aparte (los
+analizadores guardan estado entre ejecuciones, así que los trabajos van de uno en
+uno) y entrega el resultado en el hilo de Tk con ventana.after. Mientras tanto la
+ventana sigue respondiendo y el IndicadorProgreso muestra la fase en curso.
+
+Cada trabajo lleva una clave ("analisis", "tabla", ...). Un trabajo nuevo con la misma
+clave deja obsoleto al anterior: si aún no empezó se cancela, y si ya está corriendo
+su resultado se descarta. El trabajo recibe una función avisar(fase) que actualiza el
+indicador y, si el trabajo ya es obsoleto, lo interrumpe con TrabajoCancelado; así que
+cada aviso es también un punto de cancelación. Entre dos avisos el trabajo no se
+interrumpe, para no dejar a medias el estado de los analizadores.
+
+programar() sirve para analizar mientras se escribe: cada llamada reinicia la espera y
+la acción solo se ejecuta cuando el usuario deja de teclear durante retardo_ms
+(configurable con POLUX_RETARDO_MS).
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+from registro import obtener_registro, esta_activo
+
+log_trabajador = obtener_registro("trabajador")
+
+VARIABLE_RETARDO = "POLUX_RETARDO_MS"
+RETARDO_MS = 500  # Espera por defecto tras la última pulsación antes de analizar
+INTERVALO_MS = 40  # Cada cuánto revisa el hilo de Tk si hay resultados o avisos
+
+
+class TrabajoCancelado(Exception):
+    """Un trabajo más reciente con la misma clave dejó obsoleto a este."""
+
+
+def retardo_configurado():
+    """Retardo de análisis al escribir en ms: POLUX_RETARDO_MS o RETARDO_MS."""
+    texto = os.environ.get(VARIABLE_RETARDO, "").strip()
+    try:
+        return max(0, int(texto)) if texto else RETARDO_MS
+    except ValueError:
+        log_trabajador.warning("%s no es un número de milisegundos: %r", VARIABLE_RETARDO, texto)
+        return RETARDO_MS
+
+
+class IndicadorProgreso:
+    """Barra indeterminada y texto de la fase en curso, dentro de un frame de la ventana."""
+
+    def __init__(self, padre):
+        self.frame = ttk.Frame(padre)
+        self.barra = ttk.Progressbar(self.frame, mode="indeterminate", length=160)
+        self.etiqueta = ttk.Label(self.frame, text="")
+        self.barra.pack(side="left", padx=(0, 8))
+        self.etiqueta.pack(side="left")
+
+    def pack(self, **opciones):
+        self.frame.pack(**opciones)
+
+    def empezar(self, texto):
+        self.etiqueta.config(text=texto)
+        self.barra.start(12)
+
+    def fase(self, texto):
+        self.etiqueta.config(text=texto)
+
+    def terminar(self, texto=""):
+        self.barra.stop()
+        self.etiqueta.config(text=texto)
+
+
+class _Trabajo:
+    __slots__ = ("clave", "generacion", "descripcion", "funcion", "entregar", "fallar", "futuro", "inicio")
+
+    def __init__(self, clave, generacion, descripcion, funcion, entregar, fallar):
+        self.clave = clave
+        self.generacion = generacion
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self.entregar = entregar
+        self.fallar = fallar
+        self.futuro = None
+        self.inicio = None
+
+
+class TrabajadorAnalisis:
+    """Ejecuta los trabajos en un hilo aparte y entrega sus resultados en el hilo de Tk."""
+
+    def __init__(self, ventana, indicador=None, retardo_ms=None):
+        self.ventana = ventana
+        self.indicador = indicador
+        self.retardo_ms = retardo_configurado() if retardo_ms is None else retardo_ms
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="polux-analisis")
+        self._mensajes = queue.Queue()  # Del hilo de análisis al de Tk: (tipo, trabajo, dato)
+        self._cerrojo = threading.Lock()
+        self._generaciones = {}  # clave -> generación del trabajo vigente
+        self._pendientes = {}  # clave -> trabajo encargado y aún sin entregar
+        self._esperas = {}  # clave -> identificador de ventana.after de programar()
+        self._revisando = None
+        self._cerrado = False
+
+    # --- Hilo de Tk ---
+
+    def enviar(self, funcion, entregar, fallar=None, clave="analisis", descripcion="Analizando..."):
+        """
+        Encarga funcion(avisar) y deja obsoleto el trabajo anterior con la misma clave.
+        entregar(resultado) o fallar(excepcion) se llaman después en el hilo de Tk, solo
+        si para entonces ningún trabajo más reciente reemplazó a este.
+        """
+        if self._cerrado:
+            return
+        self._cancelar_espera(clave)
+        with self._cerrojo:
+            generacion = self._generaciones.get(clave, 0) + 1
+            self._generaciones[clave] = generacion
+        anterior = self._pendientes.get(clave)
+        if anterior is not None and anterior.futuro.cancel():
+            log_trabajador.debug("Trabajo '%s' #%d cancelado antes de empezar", clave, anterior.generacion)
+        trabajo = _Trabajo(clave, generacion, descripcion, funcion, entregar, fallar)
+        self._pendientes[clave] = trabajo
+        trabajo.futuro = self._ejecutor.submit(self._ejecutar, trabajo)
+        if self.indicador is not None:
+            self.indicador.empezar(descripcion)
+        self._revisar_pronto()
+
+    def programar(self, accion, clave="analisis"):
+        """
+        Llama a accion() en el hilo de Tk cuando pasen retardo_ms sin otra llamada con la
+        misma clave (para analizar al escribir: accion lee el texto y llama a enviar()).
+        """
+        if self._cerrado:
+            return
+        self._cancelar_espera(clave)
+        self._esperas[clave] = self.ventana.after(self.retardo_ms, lambda: self._disparar(clave, accion))
+
+    def _disparar(self, clave, accion):
+        self._esperas.pop(clave, None)
+        accion()
+
+    def ocupado(self):
+        return bool(self._pendientes)
+
+    def cerrar(self):
+        """Cancela lo que no empezó y descarta lo que esté en curso (al cerrar la ventana)."""
+        self._cerrado = True
+        for clave in list(self._esperas):
+            self._cancelar_espera(clave)
+        with self._cerrojo:
+            for clave in self._generaciones:
+                self._generaciones[clave] += 1
+        self._pendientes.clear()
+        if self._revisando is not None:
+            self.ventana.after_cancel(self._revisando)
+            self._revisando = None
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def _cancelar_espera(self, clave):
+        espera = self._esperas.pop(clave, None)
+        if espera is not None:
+            self.ventana.after_cancel(espera)
+
+    def _revisar_pronto(self):
+        if self._revisando is None:
+            self._revisando = self.ventana.after(INTERVALO_MS, self._revisar)
+
+    def _revisar(self):
+        """Procesa avisos y resultados; se vuelve a programar mientras haya trabajos pendientes."""
+        self._revisando = None
+        while True:
+            try:
+                tipo, trabajo, dato = self._mensajes.get_nowait()
+            except queue.Empty:
+                break
+            if not self._vigente(trabajo):
+                continue  # Un trabajo más reciente lo reemplazó: su resultado ya no importa
+            if tipo == "fase":
+                if self.indicador is not None:
+                    self.indicador.fase(dato)
+                continue
+            del self._pendientes[trabajo.clave]
+            if self.indicador is not None and not self._pendientes:
+                segundos = time.perf_counter() - trabajo.inicio
+                self.indicador.terminar(f"Listo ({segundos * 1e3:.0f} ms)" if tipo == "resultado" else "")
+            try:
+                if tipo == "resultado":
+                    trabajo.entregar(dato)
+                elif trabajo.fallar is not None:
+                    trabajo.fallar(dato)
+                else:
+                    log_trabajador.error("Error en el trabajo '%s'", trabajo.clave, exc_info=dato)
+            except Exception:
+                log_trabajador.exception("Error al mostrar el resultado del trabajo '%s'", trabajo.clave)
+        if self._pendientes and not self._cerrado:
+            self._revisar_pronto()
+
+    # --- Hilo de análisis ---
+
+    def _vigente(self, trabajo):
+        with self._cerrojo:
+            return self._generaciones.get(trabajo.clave) == trabajo.generacion
+
+    def _ejecutar(self, trabajo):
+        if not self._vigente(trabajo):
+            return
+        trabajo.inicio = time.perf_counter()
+
+        def avisar(fase):
+            if not self._vigente(trabajo):
+                raise TrabajoCancelado(trabajo.clave)
+            self._mensajes.put(("fase", trabajo, fase))
+
+        try:
+            resultado = trabajo.funcion(avisar)
+        except TrabajoCancelado:
+            log_trabajador.debug("Trabajo '%s' #%d interrumpido por uno más reciente", trabajo.clave, trabajo.generacion)
+            return
+        except Exception as error:
+            self._mensajes.put(("error", trabajo, error))
+            return
+        if esta_activo(log_trabajador):
+            log_trabajador.debug("Trabajo '%s' #%d terminado en %.1f ms", trabajo.clave, trabajo.generacion,
+                                 (time.perf_counter() - trabajo.inicio) * 1e3)
+        self._mensajes.put(("resultado", trabajo, resultado))
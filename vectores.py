@@ -0,0 +1,236 @@
+"""
+Arreglos de Polux en ejecución y su aritmética elemento a elemento.
+
+En Polux un arreglo no se modifica (no hay indexación ni asignación a un elemento), así
+que las operaciones crean arreglos nuevos: 'a + b' entre dos arreglos del mismo largo
+suma elemento a elemento, y 'a * 2' o '2 * a' opera cada elemento con el escalar. Los
+operadores son + - * / % ^, con la semántica de los escalares (la división entre
+enteros es entera).
+
+Hay dos representaciones:
+
+  Arreglo  una list de Python; cada operación recorre los elementos uno por uno. Es la
+           de siempre, y la única para arreglos que no son de int o de float.
+  Vector   un arreglo homogéneo de int o de float en un ndarray de NumPy: cada
+           operación es una sola llamada sobre todo el buffer.
+
+NumPy es una dependencia opcional (pip install numpy). crear_arreglo(elementos,
+vectorizar=True) devuelve un Vector si NumPy está instalado y todos los elementos son
+int o todos float, y un Arreglo en cualquier otro caso: sin NumPy la opción no cambia
+nada, porque un buffer recorrido elemento por elemento no es más rápido que una list.
+La máquina virtual, los intérpretes y el plegado de constantes reciben la opción
+'vectorizar'; benchmarks/bench_vectores.py compara los dos modos.
+
+Los resultados son los mismos que con un Arreglo. Los int de un Vector son de 64 bits,
+así que una operación entre int que podría salirse de ese rango (según el mayor valor
+absoluto de cada operando) se hace elemento por elemento, y su resultado vuelve a ser
+un Vector solo si cabe; también '^' con algún float o con exponentes negativos, porque
+el pow de NumPy no da lo mismo que el de Python. Un arreglo literal con un int que no
+entra en 64 bits queda como Arreglo.
+"""
+import operator
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional: sin él no hay Vector y los arreglos son Arreglo
+    numpy = None
+
+HAY_NUMPY = numpy is not None
+
+_TIPOS = {int: 'int', float: 'float'}
+_MINIMO_INT64, _MAXIMO_INT64 = -2 ** 63, 2 ** 63 - 1
+
+
+def dividir(a, b):
+    if type(a) is int and type(b) is int:
+        return a // b
+    return a / b
+
+
+# Operador de Polux -> operación sobre dos escalares
+_ESCALARES = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": dividir, "%": operator.mod,
+              "^": operator.pow}
+
+
+def _elemento_a_elemento(simbolo, izquierda, derecha):
+    """Arreglo con 'izquierda simbolo derecha' de cada par de elementos (o de cada elemento y el escalar)."""
+    if isinstance(izquierda, Vector) or isinstance(derecha, Vector):
+        return NotImplemented  # Lo resuelve el Vector, en bloque
+    operacion = _ESCALARES[simbolo]
+    if isinstance(izquierda, list):
+        if isinstance(derecha, list):
+            if len(izquierda) != len(derecha):
+                raise ValueError(f"arreglos de distinto largo ({len(izquierda)} y {len(derecha)})")
+            return Arreglo(map(operacion, izquierda, derecha))
+        return Arreglo([operacion(elemento, derecha) for elemento in izquierda])
+    return Arreglo([operacion(izquierda, elemento) for elemento in derecha])
+
+
+def _operadores(operar):
+    """Pares (__op__, __rop__) de los seis operadores aritméticos a partir de operar(simbolo, izq, der)."""
+    nombres = {"+": "add", "-": "sub", "*": "mul", "/": "truediv", "%": "mod", "^": "pow"}
+    metodos = {}
+    for simbolo, nombre in nombres.items():
+        metodos[f"__{nombre}__"] = lambda self, otro, s=simbolo: operar(s, self, otro)
+        metodos[f"__r{nombre}__"] = lambda self, otro, s=simbolo: operar(s, otro, self)
+    return metodos
+
+
+class Arreglo(list):
+    """Arreglo sin vectorizar: una list cuyas operaciones aritméticas van elemento por elemento."""
+
+    __slots__ = ()
+
+
+for _nombre, _metodo in _operadores(_elemento_a_elemento).items():
+    setattr(Arreglo, _nombre, _metodo)
+
+
+def _dtype(tipo):
+    return numpy.int64 if tipo == 'int' else numpy.float64
+
+
+def crear_arreglo(elementos, vectorizar=True):
+    """Vector si 'vectorizar', hay NumPy y los elementos son todos int o todos float; si no, Arreglo."""
+    if vectorizar and numpy is not None and elementos:
+        clase = type(elementos[0])
+        tipo = _TIPOS.get(clase)
+        if tipo is not None and all(type(elemento) is clase for elemento in elementos):
+            try:
+                return Vector(numpy.array(elementos, dtype=_dtype(tipo)), tipo)
+            except OverflowError:
+                pass  # Algún int no entra en 64 bits: queda como Arreglo
+    return Arreglo(elementos)
+
+
+def vectorizado(valor):
+    """El mismo arreglo como Vector, si se puede (los demás valores no cambian)."""
+    if isinstance(valor, list):
+        return crear_arreglo(valor)
+    return valor
+
+
+def _operando(valor):
+    """(buffer o escalar, tipo) de un operando de un Vector, o None si no es numérico."""
+    if isinstance(valor, Vector):
+        return valor.datos, valor.tipo
+    tipo = _TIPOS.get(type(valor))
+    if tipo is not None:
+        return (valor, tipo) if tipo == 'float' or _MINIMO_INT64 <= valor <= _MAXIMO_INT64 else None
+    if isinstance(valor, list):
+        valor = crear_arreglo(valor)
+        if isinstance(valor, Vector):
+            return valor.datos, valor.tipo
+    return None
+
+
+def _maximo_absoluto(valor):
+    """max(|x|) de un buffer de int64 o de un int, como int de Python (|-2^63| no cabe en int64)."""
+    if isinstance(valor, int):
+        return abs(valor)
+    return max(int(valor.max()), -int(valor.min())) if len(valor) else 0
+
+
+def _cabe_en_int64(simbolo, a, b):
+    """True si 'a simbolo b' entre int no puede salirse de int64 (así no da la vuelta)."""
+    maximo_a, maximo_b = _maximo_absoluto(a), _maximo_absoluto(b)
+    if simbolo in ("+", "-"):
+        return maximo_a + maximo_b <= _MAXIMO_INT64
+    if simbolo == "*":
+        return maximo_a * maximo_b <= _MAXIMO_INT64
+    if simbolo == "^":
+        # Con algún exponente negativo cada elemento da int o float según el suyo, como en Python
+        if (b < 0 if isinstance(b, int) else numpy.any(b < 0)):
+            return False
+        return maximo_a <= 1 or maximo_b * maximo_a.bit_length() <= 63
+    return maximo_a <= _MAXIMO_INT64  # '/' y '%': solo -2^63 // -1 se sale
+
+
+def _operar_numpy(simbolo, a, b, tipo):
+    """Vector con 'a simbolo b' en bloque, o None si el resultado podría no ser el de Python."""
+    if tipo == 'int':
+        if not _cabe_en_int64(simbolo, a, b):
+            return None
+    elif simbolo == "^":
+        return None  # pow de NumPy no redondea igual que el de Python, ni desborda ni da complejos igual
+    if simbolo in ("/", "%") and numpy.any(b == 0):
+        raise ZeroDivisionError("división por cero")
+    with numpy.errstate(all="ignore"):  # Un float que desborda queda como inf, igual que en Python
+        if simbolo == "/":
+            resultado = numpy.floor_divide(a, b) if tipo == 'int' else numpy.true_divide(a, b)
+        else:
+            operacion = {"+": numpy.add, "-": numpy.subtract, "*": numpy.multiply, "%": numpy.remainder,
+                         "^": numpy.power}[simbolo]
+            resultado = operacion(a, b)
+    return Vector(numpy.asarray(resultado, dtype=_dtype(tipo)), tipo)
+
+
+def _operar_vector(simbolo, izquierda, derecha):
+    operandos = _operando(izquierda), _operando(derecha)
+    if operandos[0] is None or operandos[1] is None:
+        # Un arreglo que no se puede vectorizar, un int de más de 64 bits o un valor no
+        # numérico: elemento por elemento, con los mismos resultados y errores que un Arreglo
+        return _elemento_a_elemento(simbolo, Arreglo(izquierda) if isinstance(izquierda, Vector) else izquierda,
+                                    Arreglo(derecha) if isinstance(derecha, Vector) else derecha)
+    (a, tipo_a), (b, tipo_b) = operandos
+    if not isinstance(a, (int, float)) and not isinstance(b, (int, float)) and len(a) != len(b):
+        raise ValueError(f"arreglos de distinto largo ({len(a)} y {len(b)})")
+    resultado = _operar_numpy(simbolo, a, b, 'float' if 'float' in (tipo_a, tipo_b) else 'int')
+    if resultado is None:
+        # Como un Arreglo, y de nuevo Vector si el resultado es homogéneo y cabe
+        return crear_arreglo(_elemento_a_elemento(simbolo, Arreglo(izquierda) if isinstance(izquierda, Vector)
+                                                  else izquierda,
+                                                  Arreglo(derecha) if isinstance(derecha, Vector) else derecha))
+    return resultado
+
+
+class Vector:
+    """Arreglo homogéneo de int o float en un ndarray de NumPy."""
+
+    __slots__ = ("datos", "tipo")
+
+    def __init__(self, datos, tipo):
+        self.datos = datos
+        self.tipo = tipo  # 'int' o 'float'
+
+    def tolist(self):
+        """Los elementos como int/float de Python."""
+        return self.datos.tolist()
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __iter__(self):
+        # Un 'for' recibe escalares de Python, no numpy.int64: así dividir() los reconoce
+        return iter(self.datos.tolist())
+
+    def __eq__(self, otro):
+        if isinstance(otro, (Vector, list)):
+            return self.tolist() == list(otro)
+        return NotImplemented
+
+    def __ne__(self, otro):
+        igual = self.__eq__(otro)
+        return igual if igual is NotImplemented else not igual
+
+    # Las comparaciones de orden son las de las listas, como con un Arreglo
+    def __lt__(self, otro):
+        return self.tolist() < list(otro)
+
+    def __le__(self, otro):
+        return self.tolist() <= list(otro)
+
+    def __gt__(self, otro):
+        return self.tolist() > list(otro)
+
+    def __ge__(self, otro):
+        return self.tolist() >= list(otro)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Vector({self.tipo}, {self.tolist()!r})"
+
+
+for _nombre, _metodo in _operadores(_operar_vector).items():
+    setattr(Vector, _nombre, _metodo)
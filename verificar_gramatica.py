@@ -0,0 +1,200 @@
+"""
+Pruebas de regresión de la gramática de expresiones (polux.txt).
+
+Comprueba que:
+  - cada expresión de CASOS_PRECEDENCIA produce el árbol esperado, escrito con
+    paréntesis completos: la precedencia va de menor a mayor
+        asignación < lógica < relacional < aditiva < multiplicativa < potencia < unaria
+    y '^' y la asignación asocian a la derecha, el resto a la izquierda;
+  - las reglas envoltorio se inlinan: un literal cuelga directamente de la declaración;
+  - los programas de PROGRAMAS se siguen analizando y dan los diagnósticos esperados;
+  - el análisis léxico en flujo (lexico_flujo.py) da los mismos tokens que parser.lex
+    con los textos de TEXTOS_FLUJO partidos en trozos de TAMANOS_TROZO caracteres, y
+    entrega cada token sin haber leído más de un trozo y RETRASO_FLUJO caracteres
+    después de él (también en un texto sin espacios mucho más largo que un trozo).
+
+Uso:
+    python verificar_gramatica.py [-v]
+"""
+import argparse
+import io
+import sys
+
+from lark import Token, Tree
+from lark.exceptions import LarkError
+
+from compilador_batch import CompiladorPolux
+from gramatica import cargar_parser
+from lexico_flujo import tokens_en_flujo
+
+# Nodos binarios: [izquierda, operador, derecha]
+BINARIOS = {"assignment_expression", "logical_expression", "relational_expression", "arithmetic_expression"}
+
+# (expresión, forma esperada con paréntesis completos)
+CASOS_PRECEDENCIA = [
+    ("a + b * c", "(a + (b * c))"),
+    ("a * b + c", "((a * b) + c)"),
+    ("a - b - c", "((a - b) - c)"),
+    ("x-1", "(x - 1)"),
+    ("2*3-4", "((2 * 3) - 4)"),
+    ("3-4^2", "(3 - (4 ^ 2))"),
+    ("a-1-b", "((a - 1) - b)"),
+    ("x - -1", "(x - (-1))"),
+    ("a / b % c", "((a / b) % c)"),
+    ("a ^ b ^ c", "(a ^ (b ^ c))"),
+    ("a * b ^ c", "(a * (b ^ c))"),
+    ("-a ^ 2", "((-a) ^ 2)"),
+    ("- - a", "(-(-a))"),
+    ("-a * b", "((-a) * b)"),
+    ("(a + b) * c", "((a + b) * c)"),
+    ("a + b < c * d", "((a + b) < (c * d))"),
+    ("a < b AND c >= d", "((a < b) AND (c >= d))"),
+    ("a AND b OR c", "((a AND b) OR c)"),
+    ("NOT a AND b", "((NOT a) AND b)"),
+    ("NOT a < b", "((NOT a) < b)"),
+    ("a == b != c", "((a == b) != c)"),
+    ("a = b = c", "(a = (b = c))"),
+    ("a += b * c", "(a += (b * c))"),
+    ("a = b OR c AND d", "(a = ((b OR c) AND d))"),
+    ("f(a + b) * 2", "(f(...) * 2)"),
+    ('"x" + y', '("x" + y)'),
+    ("True AND 'c' == d", "(True AND ('c' == d))"),
+    ("[1, 2] + a", "([...] + a)"),
+]
+
+# (nombre, código, número de diagnósticos esperados)
+PROGRAMAS = [
+    ("declaraciones", "int x = 5\nint y = x * 2 + 1\nbool b = x < y AND NOT False\nstring s = \"hola\"\n", 0),
+    ("constantes", "cte N = 2 ^ 3 ^ 2\nint m = -N % 7\n", 0),
+    ("asignaciones", "int x = 1\nint y = 2\nx = y = 3\nx += y * 2\n", 0),
+    ("control", "int x = 0\nwhile (x < 10) || x += 1 ||\nif (x == 10 OR x > 20) || show(x) || else || show(-x) ||\n"
+                "for (i in [1, 2, 3]) || show(i * 2) ||\n", 0),
+    ("funciones", "do function f(a, b) || int z = a + b show(z) ||\nf(1, 2)\n", 0),
+    ("clases", "class Punto || int px = 0 do function mover(d) || px = px + d || ||\nPunto p = Punto()\n", 0),
+    ("errores", "int x = 5\nbool b = x + True\nshow(y)\nint z = 5 / 0\n", 3),
+]
+
+# Textos con tokens que un corte de trozo puede partir en otros tokens válidos
+TEXTOS_FLUJO = [
+    "float f = 3.25e2\nint x = 10-4\n",
+    "string s = \"a << b\" >> comentario\nbool b = x<=y AND NOT z>=1.5E-3\n",
+    "<< varias\nlíneas >> do function f(a, b) || show(a+=b, 'c') ||\n<<* doc *>> cte N = -12\n",
+    "x=" + "y*1.5e-3+x1" * 60 + "-1\n",  # Sin espacios: 'x=y*...' es una sola racha de tokens pegados
+]
+TAMANOS_TROZO = (1, 2, 3, 5, 7, 64)
+# Lo que se lee de más tras un token antes de entregarlo, además del trozo: los tokens guardados
+RETRASO_FLUJO = 32
+
+
+def expresion_en_parentesis(nodo):
+    """Escribe el árbol de una expresión con paréntesis completos."""
+    if isinstance(nodo, Token):
+        return str(nodo)
+    if nodo.data in BINARIOS:
+        izquierda, operador, derecha = nodo.children
+        return f"({expresion_en_parentesis(izquierda)} {expresion_en_parentesis(operador)} {expresion_en_parentesis(derecha)})"
+    if nodo.data == "unary_expression":
+        operador, operando = nodo.children
+        separador = " " if str(expresion_en_parentesis(operador)).isalpha() else ""
+        return f"({expresion_en_parentesis(operador)}{separador}{expresion_en_parentesis(operando)})"
+    if nodo.data == "grouped_expression":
+        # Los paréntesis del código solo cambian la forma del árbol, no se imprimen aparte
+        interna = nodo.children[1] if len(nodo.children) == 3 else nodo.children[0]  # Sin '(' ni ')'
+        return expresion_en_parentesis(interna)
+    if nodo.data == "instance_creation":
+        return f"{expresion_en_parentesis(nodo.children[0])}(...)"
+    if nodo.data == "array_literal":
+        return "[...]"
+    return "".join(expresion_en_parentesis(hijo) for hijo in nodo.children)
+
+
+def expresion_declarada(parser, expresion):
+    """Árbol de 'expresion' dentro de una declaración 'int r = expresion'."""
+    arbol = parser.parse(f"int r = {expresion}\n")
+    declaracion = next(arbol.find_data("variable_declaration"))
+    return declaracion.children[-1]
+
+
+def verificar_precedencia(parser, detallado):
+    fallos = []
+    for expresion, esperada in CASOS_PRECEDENCIA:
+        try:
+            obtenida = expresion_en_parentesis(expresion_declarada(parser, expresion))
+        except LarkError as error:
+            obtenida = f"error: {error}".splitlines()[0]
+        if obtenida != esperada:
+            fallos.append(f"precedencia: '{expresion}' -> {obtenida}, se esperaba {esperada}")
+        elif detallado:
+            print(f"  ok  {expresion:<22} {obtenida}")
+    return fallos
+
+
+def verificar_arbol_plano(parser):
+    """Sin cadenas de envoltorios: un literal o una variable cuelgan directamente de la declaración."""
+    fallos = []
+    for expresion, esperado in (("1", "integer"), ("a", "variable"), ("(1)", "grouped_expression")):
+        nodo = expresion_declarada(parser, expresion)
+        if not isinstance(nodo, Tree) or nodo.data != esperado:
+            fallos.append(f"árbol plano: '{expresion}' produce {getattr(nodo, 'data', nodo)}, se esperaba {esperado}")
+    return fallos
+
+
+def verificar_programas(detallado):
+    fallos = []
+    compilador = CompiladorPolux()
+    for nombre, codigo, esperados in PROGRAMAS:
+        resultado = compilador.compilar(codigo)
+        diagnosticos = resultado["diagnosticos"]
+        if len(diagnosticos) != esperados:
+            mensajes = "; ".join(d["mensaje"] for d in diagnosticos) or "ninguno"
+            fallos.append(f"programa '{nombre}': {len(diagnosticos)} diagnósticos, se esperaban {esperados} ({mensajes})")
+        elif detallado:
+            print(f"  ok  programa '{nombre}' ({esperados} diagnósticos)")
+    return fallos
+
+
+def verificar_lexico_flujo(parser, detallado):
+    fallos = []
+    for numero, texto in enumerate(TEXTOS_FLUJO, 1):
+        esperados = [(t.type, t.value, t.line, t.column) for t in parser.lex(texto)]
+        for tamano in TAMANOS_TROZO:
+            archivo, obtenidos, retraso = io.StringIO(texto), [], 0
+            for t in tokens_en_flujo(parser, archivo, tamano_trozo=tamano):
+                obtenidos.append((t.type, t.value, t.line, t.column))
+                retraso = max(retraso, archivo.tell() - t.end_pos)
+            if retraso > tamano + RETRASO_FLUJO:
+                fallos.append(f"léxico en flujo: texto {numero} en trozos de {tamano}: un token se entregó "
+                              f"{retraso} caracteres después de leído")
+                break
+            if obtenidos != esperados:
+                distinto = next((i for i, par in enumerate(zip(obtenidos, esperados)) if par[0] != par[1]),
+                                min(len(obtenidos), len(esperados)))
+                fallos.append(f"léxico en flujo: texto {numero} en trozos de {tamano}: token {distinto} es "
+                              f"{obtenidos[distinto:distinto + 1]}, se esperaba {esperados[distinto:distinto + 1]}")
+                break
+        else:
+            if detallado:
+                print(f"  ok  léxico en flujo, texto {numero} ({len(esperados)} tokens)")
+    return fallos
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("-v", "--detallado", action="store_true", help="Muestra también los casos correctos")
+    opciones = argumentos.parse_args()
+
+    parser = cargar_parser(propagate_positions=True, keep_all_tokens=True)
+    fallos = verificar_precedencia(parser, opciones.detallado)
+    fallos += verificar_arbol_plano(parser)
+    fallos += verificar_programas(opciones.detallado)
+    fallos += verificar_lexico_flujo(parser, opciones.detallado)
+
+    total = len(CASOS_PRECEDENCIA) + 3 + len(PROGRAMAS) + len(TEXTOS_FLUJO)
+    for fallo in fallos:
+        print(f"FALLO {fallo}")
+    print(f"{total - len(fallos)}/{total} verificaciones correctas")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Vista virtual de la tabla de símbolos para las interfaces Tk.
+
+Con decenas de miles de símbolos, insertar una fila de ttk.Treeview por símbolo cuesta
+segundos y mucha memoria. VistaTablaVirtual solo crea las filas que caben en la
+ventana y, al desplazarse, reescribe sus valores con los de la posición nueva: el
+Treeview nunca tiene más de unas decenas de elementos, sea cual sea la tabla.
+
+El orden y los filtros (categoría, ámbito y nombre) se resuelven sobre IndiceSimbolos,
+un índice en memoria de las filas ya leídas: por categoría y por ámbito guarda las
+posiciones de sus filas y cada orden por columna se calcula una vez por carga. Tras un
+nuevo análisis, actualizar(filas) recarga el índice y la vista conserva el orden, los
+filtros y la posición de desplazamiento.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+TODOS = "(todos)"  # Valor de los desplegables de filtro que no filtra
+
+
+def _clave_orden(valor):
+    """Números antes que texto, y el texto sin distinguir mayúsculas."""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return (0, valor, "")
+    return (1, 0, str(valor).lower())
+
+
+class IndiceSimbolos:
+    """Filas de la tabla con sus índices por categoría y ámbito, y la selección visible."""
+
+    def __init__(self, columnas, columna_nombre, columna_categoria, columna_ambito):
+        self.columnas = list(columnas)
+        self._nombre = self.columnas.index(columna_nombre)
+        self._categoria = self.columnas.index(columna_categoria)
+        self._ambito = self.columnas.index(columna_ambito)
+        self.filas = []
+        self.visibles = []  # Posiciones en self.filas, en el orden y con los filtros actuales
+        self.orden = None  # (columna, descendente)
+        self.filtros = {"categoria": None, "ambito": None, "nombre": ""}
+        self._por_categoria = {}
+        self._por_ambito = {}
+        self._nombres = []  # Nombres en minúsculas, para el filtro por nombre
+        self._ordenes = {}  # columna -> posiciones ordenadas por esa columna (por carga)
+
+    def cargar(self, filas):
+        """Reemplaza las filas y reaplica el orden y los filtros actuales."""
+        self.filas = filas
+        self._por_categoria, self._por_ambito = {}, {}
+        for posicion, fila in enumerate(filas):
+            self._por_categoria.setdefault(fila[self._categoria], []).append(posicion)
+            self._por_ambito.setdefault(fila[self._ambito], []).append(posicion)
+        self._nombres = [str(fila[self._nombre]).lower() for fila in filas]
+        self._ordenes = {}
+        self._aplicar()
+
+    def categorias(self):
+        return sorted(self._por_categoria, key=_clave_orden)
+
+    def ambitos(self):
+        return sorted(self._por_ambito, key=_clave_orden)
+
+    def ordenar(self, columna, descendente=False):
+        self.orden = (columna, descendente)
+        self._aplicar()
+
+    def filtrar(self, categoria=None, ambito=None, nombre=""):
+        """Categoría y ámbito exactos (None = todos); nombre, subcadena sin distinguir mayúsculas."""
+        self.filtros = {"categoria": categoria, "ambito": ambito, "nombre": nombre.strip().lower()}
+        self._aplicar()
+
+    def __len__(self):
+        return len(self.visibles)
+
+    def fila(self, indice):
+        return self.filas[self.visibles[indice]]
+
+    def _posiciones_ordenadas(self, columna):
+        posiciones = self._ordenes.get(columna)
+        if posiciones is None:
+            i = self.columnas.index(columna)
+            filas = self.filas
+            posiciones = sorted(range(len(filas)), key=lambda p: _clave_orden(filas[p][i]))
+            self._ordenes[columna] = posiciones
+        return posiciones
+
+    def _aplicar(self):
+        categoria, ambito, nombre = self.filtros["categoria"], self.filtros["ambito"], self.filtros["nombre"]
+        # Los índices por categoría y ámbito dan las candidatas sin recorrer todas las filas
+        candidatas = None
+        for valor, indice in ((categoria, self._por_categoria), (ambito, self._por_ambito)):
+            if valor is None:
+                continue
+            posiciones = indice.get(valor, ())
+            candidatas = set(posiciones) if candidatas is None else candidatas.intersection(posiciones)
+        if nombre:
+            nombres = self._nombres
+            fuente = range(len(self.filas)) if candidatas is None else candidatas
+            candidatas = {p for p in fuente if nombre in nombres[p]}
+
+        if self.orden is None:
+            visibles = range(len(self.filas)) if candidatas is None else sorted(candidatas)
+        else:
+            columna, descendente = self.orden
+            ordenadas = self._posiciones_ordenadas(columna)
+            if candidatas is not None:
+                ordenadas = [p for p in ordenadas if p in candidatas]
+            visibles = reversed(ordenadas) if descendente else ordenadas
+        self.visibles = list(visibles)
+
+
+class VistaTablaVirtual(ttk.Frame):
+    """Barra de filtros, Treeview con solo las filas visibles y barras de desplazamiento."""
+
+    ALTO_FILA = 25  # Debe coincidir con rowheight del estilo del Treeview
+
+    def __init__(self, padre, columnas, columna_nombre, columna_categoria, columna_ambito,
+                 anchos=None, anclajes=None, estilo="Treeview", **opciones):
+        super().__init__(padre, **opciones)
+        self.indice = IndiceSimbolos(columnas, columna_nombre, columna_categoria, columna_ambito)
+        self.inicio = 0  # Primera fila visible (posición en indice.visibles)
+        self._items = []  # Elementos del Treeview, reutilizados al desplazarse
+        self._titulos = {}
+
+        filtros = ttk.Frame(self)
+        filtros.pack(fill="x", padx=10, pady=(10, 0))
+        self._categoria = tk.StringVar(value=TODOS)
+        self._ambito = tk.StringVar(value=TODOS)
+        self._nombre = tk.StringVar()
+        ttk.Label(filtros, text="Categoría:").pack(side="left")
+        self._combo_categoria = ttk.Combobox(filtros, textvariable=self._categoria, state="readonly", width=14)
+        self._combo_categoria.pack(side="left", padx=(4, 12))
+        ttk.Label(filtros, text="Ámbito:").pack(side="left")
+        self._combo_ambito = ttk.Combobox(filtros, textvariable=self._ambito, state="readonly", width=24)
+        self._combo_ambito.pack(side="left", padx=(4, 12))
+        ttk.Label(filtros, text="Nombre:").pack(side="left")
+        ttk.Entry(filtros, textvariable=self._nombre, width=20).pack(side="left", padx=(4, 12))
+        self._contador = ttk.Label(filtros, text="")
+        self._contador.pack(side="left")
+        self._combo_categoria.bind("<<ComboboxSelected>>", self._al_filtrar)
+        self._combo_ambito.bind("<<ComboboxSelected>>", self._al_filtrar)
+        self._nombre.trace_add("write", self._al_filtrar)
+
+        cuerpo = ttk.Frame(self)
+        cuerpo.pack(fill="both", expand=True)
+        self.tabla = ttk.Treeview(cuerpo, columns=columnas, show="headings", style=estilo, height=1)
+        for col in columnas:
+            self._titulos[col] = col
+            self.tabla.heading(col, text=col, command=lambda c=col: self._al_ordenar(c))
+            self.tabla.column(col, width=(anchos or {}).get(col, 110), anchor=(anclajes or {}).get(col, "w"))
+        # La barra vertical mueve el índice de la primera fila, no el Treeview
+        self.scroll_y = ttk.Scrollbar(cuerpo, orient="vertical", command=self._al_desplazar)
+        self.scroll_x = ttk.Scrollbar(cuerpo, orient="horizontal", command=self.tabla.xview)
+        self.tabla.configure(xscrollcommand=self.scroll_x.set)
+        self.tabla.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.scroll_y.grid(row=0, column=1, sticky="ns")
+        self.scroll_x.grid(row=1, column=0, sticky="ew", padx=10)
+        cuerpo.grid_rowconfigure(0, weight=1)
+        cuerpo.grid_columnconfigure(0, weight=1)
+
+        self.tabla.bind("<Configure>", self._al_redimensionar)
+        self.tabla.bind("<MouseWheel>", lambda e: self._mover(-1 if e.delta > 0 else 1, "units"))
+        self.tabla.bind("<Button-4>", lambda e: self._mover(-1, "units"))
+        self.tabla.bind("<Button-5>", lambda e: self._mover(1, "units"))
+        for tecla, paso, unidad in (("<Prior>", -1, "pages"), ("<Next>", 1, "pages"),
+                                    ("<Home>", -10**9, "units"), ("<End>", 10**9, "units")):
+            self.tabla.bind(tecla, lambda e, p=paso, u=unidad: self._mover(p, u))
+
+    # --- Datos ---
+
+    def actualizar(self, filas):
+        """Carga filas nuevas (p. ej. tras reanalizar) sin perder orden, filtros ni posición."""
+        self.indice.cargar(filas)
+        self._combo_categoria["values"] = [TODOS] + [str(v) for v in self.indice.categorias()]
+        self._combo_ambito["values"] = [TODOS] + [str(v) for v in self.indice.ambitos()]
+        # Si el valor filtrado ya no existe, el filtro deja de aplicarse
+        if self._categoria.get() not in self._combo_categoria["values"]:
+            self._categoria.set(TODOS)
+        if self._ambito.get() not in self._combo_ambito["values"]:
+            self._ambito.set(TODOS)
+        self._al_filtrar(conservar_posicion=True)
+
+    def _valor_filtro(self, variable, valores):
+        texto = variable.get()
+        if texto == TODOS:
+            return None
+        # Los desplegables muestran texto; el índice guarda los valores originales
+        return next((v for v in valores if str(v) == texto), texto)
+
+    def _al_filtrar(self, *args, conservar_posicion=False):
+        self.indice.filtrar(self._valor_filtro(self._categoria, self.indice.categorias()),
+                            self._valor_filtro(self._ambito, self.indice.ambitos()),
+                            self._nombre.get())
+        if not conservar_posicion:
+            self.inicio = 0
+        self._dibujar()
+
+    def _al_ordenar(self, columna):
+        anterior = self.indice.orden
+        descendente = anterior is not None and anterior[0] == columna and not anterior[1]
+        self.indice.ordenar(columna, descendente)
+        for col, titulo in self._titulos.items():
+            flecha = (" ▼" if descendente else " ▲") if col == columna else ""
+            self.tabla.heading(col, text=titulo + flecha)
+        self.inicio = 0
+        self._dibujar()
+
+    # --- Desplazamiento y dibujo ---
+
+    def _filas_que_caben(self):
+        alto = self.tabla.winfo_height()
+        # Descuenta la fila de títulos; antes del primer <Configure> el alto es 1
+        return max(1, alto // self.ALTO_FILA - 1) if alto > 1 else 20
+
+    def _al_redimensionar(self, evento=None):
+        self._dibujar()
+
+    def _al_desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * len(self.indice))
+            self._dibujar()
+        else:
+            self._mover(int(cantidad), unidad)
+
+    def _mover(self, pasos, unidad):
+        self.inicio += pasos * (self._filas_que_caben() if unidad == "pages" else 3)
+        self._dibujar()
+
+    def _dibujar(self):
+        total = len(self.indice)
+        capacidad = self._filas_que_caben()
+        self.inicio = max(0, min(self.inicio, total - capacidad))
+        cantidad = min(capacidad, total - self.inicio)
+
+        # Solo existen tantos elementos como filas se ven; se crean o borran los que sobran
+        while len(self._items) < cantidad:
+            self._items.append(self.tabla.insert("", "end"))
+        if len(self._items) > cantidad:
+            self.tabla.delete(*self._items[cantidad:])
+            del self._items[cantidad:]
+        for desplazamiento, item in enumerate(self._items):
+            self.tabla.item(item, values=self.indice.fila(self.inicio + desplazamiento))
+        self.tabla.selection_remove(self.tabla.selection())
+
+        if total:
+            self.scroll_y.set(self.inicio / total, (self.inicio + cantidad) / total)
+        else:
+            self.scroll_y.set(0, 1)
+        self._contador.config(text=f"{total} de {len(self.indice.filas)} símbolos")